@@ -0,0 +1,58 @@
+"""
+Endpoints de administración siempre disponibles.
+
+A diferencia de los endpoints de `API/profiling.py`, que solo existen con
+`PROFILING_ENABLED=1`, estos se montan siempre y no agregan middleware ni
+costo al camino de inferencia. Requieren el header `X-Admin-Token` con el
+token de `ADMIN_TOKEN` (o `PROFILING_TOKEN` si no está definido); sin token
+configurado responden 403.
+
+- `GET /api/v1/admin/memory`: memoria del worker que atiende el request.
+"""
+
+from datetime import datetime
+import asyncio
+import hmac
+import os
+from typing import Any, Dict, Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request
+
+ADMIN_TOKEN_HEADER = "X-Admin-Token"
+
+
+def admin_token_from_env() -> Optional[str]:
+    """Token de administración configurado (None si no hay ninguno)."""
+    return os.getenv("ADMIN_TOKEN") or os.getenv("PROFILING_TOKEN") or None
+
+
+def require_admin_token(request: Request, x_admin_token: Optional[str] = Header(None)) -> None:
+    """Dependencia que valida el header contra `app.state.admin_token`."""
+    expected = getattr(request.app.state, "admin_token", None)
+    if not (expected and x_admin_token is not None and hmac.compare_digest(x_admin_token, expected)):
+        raise HTTPException(
+            status_code=403,
+            detail={
+                "error": "Forbidden",
+                "message": f"A valid {ADMIN_TOKEN_HEADER} header is required",
+                "timestamp": datetime.utcnow().isoformat() + "Z",
+            },
+        )
+
+
+router = APIRouter(dependencies=[Depends(require_admin_token)])
+
+
+@router.get("/memory", summary="Uso de memoria del worker")
+async def memory(
+    top: int = Query(10, ge=0, le=50, description="Archivos con más memoria a listar (tracemalloc)"),
+) -> Dict[str, Any]:
+    """
+    Memoria del proceso que atiende el request: RSS, PSS y páginas compartidas,
+    heap de Python (detalle por archivo solo con PYTHONTRACEMALLOC=1) y tamaño
+    estimado de las caches de inferencia.
+    """
+    from mlops_obesidad.monitoring.memory import memory_report
+
+    # smaps_rollup y el snapshot de tracemalloc recorren toda la memoria del proceso
+    return await asyncio.to_thread(memory_report, top)
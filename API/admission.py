@@ -0,0 +1,319 @@
+"""
+Control de admisión para los endpoints de inferencia.
+
+Protege al modelo de la sobrecarga rechazando de inmediato lo que no se puede
+atender a tiempo, en lugar de encolar requests sin límite:
+
+- Límite de concurrencia: como máximo `max_concurrency` inferencias en curso;
+  el resto espera en una cola acotada (`max_queue`, `max_queue_wait`).
+- Rate limiting por cliente: un token bucket por API key (header `X-API-Key`,
+  o la IP del cliente si no se envía).
+- Deadlines: el header `X-Request-Deadline-Ms` indica el presupuesto de tiempo
+  del cliente; si la espera estimada más el tiempo de servicio lo excede, el
+  request se rechaza sin entrar a la cola.
+
+Los rechazos usan 429 (rate limit) o 503 (sobrecarga o deadline inalcanzable)
+con el header `Retry-After`. El estado es por proceso: con el servidor
+multi-worker los límites se aplican por worker.
+"""
+
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+from datetime import datetime
+import asyncio
+import math
+import time
+from typing import Any, Deque, Dict, Optional, Sequence
+
+from loguru import logger
+from starlette.responses import JSONResponse
+
+API_KEY_HEADER = b"x-api-key"
+DEADLINE_HEADER = b"x-request-deadline-ms"
+
+# Peso de la última observación en la media móvil del tiempo de servicio
+_EWMA_ALPHA = 0.2
+
+
+class TokenBucket:
+    """Token bucket: `rate` tokens por segundo con capacidad máxima `capacity`."""
+
+    __slots__ = ("rate", "capacity", "tokens", "updated")
+
+    def __init__(self, rate: float, capacity: float, now: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = now
+
+    def try_acquire(self, now: float, cost: float = 1.0) -> float:
+        """
+        Intenta consumir `cost` tokens.
+
+        Returns:
+            0.0 si se consumieron, o los segundos hasta que haya tokens suficientes
+        """
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= cost:
+            self.tokens -= cost
+            return 0.0
+        return (cost - self.tokens) / self.rate
+
+
+class RateLimiter:
+    """Token buckets por cliente, con un número máximo de clientes recordados (LRU)."""
+
+    def __init__(self, rate: float, burst: float, max_clients: int = 10_000):
+        self.rate = rate
+        self.burst = burst
+        self.max_clients = max_clients
+        self._buckets: "OrderedDict[str, TokenBucket]" = OrderedDict()
+
+    def check(self, client: str, now: Optional[float] = None) -> float:
+        """
+        Consume un token del cliente.
+
+        Args:
+            client: API key o identificador del cliente
+            now: Tiempo monotónico actual (para tests)
+
+        Returns:
+            0.0 si el request está permitido, o los segundos a esperar
+        """
+        if now is None:
+            now = time.monotonic()
+        bucket = self._buckets.get(client)
+        if bucket is None:
+            bucket = TokenBucket(self.rate, self.burst, now)
+            self._buckets[client] = bucket
+            if len(self._buckets) > self.max_clients:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(client)
+        return bucket.try_acquire(now)
+
+
+@dataclass
+class Rejection:
+    """Motivo de rechazo de un request."""
+
+    status_code: int
+    error: str
+    message: str
+    retry_after: float
+
+
+class AdmissionController:
+    """
+    Límite de concurrencia con cola acotada, rate limiting y deadlines.
+
+    Todo el estado se modifica desde el event loop, por lo que no necesita locks.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = 2,
+        max_queue: int = 64,
+        max_queue_wait: float = 1.0,
+        rate: float = 0.0,
+        burst: Optional[float] = None,
+        default_deadline: Optional[float] = None,
+    ):
+        """
+        Args:
+            max_concurrency: Inferencias simultáneas permitidas
+            max_queue: Requests que pueden esperar un lugar
+            max_queue_wait: Segundos máximos de espera en la cola
+            rate: Requests por segundo por cliente (0 = sin rate limiting)
+            burst: Capacidad del token bucket (por defecto, 2 × rate)
+            default_deadline: Deadline en segundos para requests sin header
+        """
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.max_queue_wait = max_queue_wait
+        self.default_deadline = default_deadline
+        self.limiter = RateLimiter(rate, burst or max(2 * rate, 1.0)) if rate > 0 else None
+
+        self.in_flight = 0
+        self.service_time = 0.05  # estimación inicial; se ajusta con EWMA
+        self._waiters: Deque[asyncio.Future] = deque()
+        self.counters: Dict[str, int] = {
+            "admitted": 0,
+            "rejected_rate_limit": 0,
+            "rejected_overload": 0,
+            "rejected_deadline": 0,
+        }
+
+    @property
+    def queued(self) -> int:
+        """Requests esperando un lugar."""
+        return len(self._waiters)
+
+    def estimated_wait(self) -> float:
+        """Segundos estimados que esperaría un request nuevo antes de ejecutarse."""
+        if self.in_flight < self.max_concurrency and not self._waiters:
+            return 0.0
+        return (self.queued + 1) / self.max_concurrency * self.service_time
+
+    def saturated(self) -> bool:
+        """Indica si un request nuevo sería rechazado por sobrecarga."""
+        return self.queued >= self.max_queue or self.estimated_wait() >= self.max_queue_wait
+
+    def _reject(self, counter: str, status_code: int, error: str, message: str,
+                retry_after: float) -> Rejection:
+        self.counters[counter] += 1
+        return Rejection(status_code, error, message, retry_after)
+
+    async def admit(self, client: str, deadline: Optional[float] = None) -> Optional[Rejection]:
+        """
+        Decide si un request entra; si entra, ocupa un lugar hasta `release()`.
+
+        Args:
+            client: Identificador del cliente para el rate limiting
+            deadline: Presupuesto de tiempo del request en segundos (None = sin deadline)
+
+        Returns:
+            None si el request fue admitido, o el motivo del rechazo
+        """
+        if self.limiter is not None:
+            wait = self.limiter.check(client)
+            if wait > 0:
+                return self._reject("rejected_rate_limit", 429, "RateLimitExceeded",
+                                    "Rate limit exceeded for this API key", wait)
+
+        if deadline is None:
+            deadline = self.default_deadline
+
+        expected_wait = self.estimated_wait()
+        if deadline is not None and expected_wait + self.service_time > deadline:
+            return self._reject("rejected_deadline", 503, "DeadlineExceeded",
+                                "The request cannot be completed within its deadline",
+                                expected_wait)
+
+        if expected_wait == 0.0:
+            self.in_flight += 1
+            self.counters["admitted"] += 1
+            return None
+
+        if self.queued >= self.max_queue:
+            return self._reject("rejected_overload", 503, "ServiceOverloaded",
+                                "Too many requests in queue", expected_wait)
+
+        timeout = self.max_queue_wait
+        if deadline is not None:
+            timeout = min(timeout, deadline - self.service_time)
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await asyncio.wait({waiter}, timeout=timeout)
+        except asyncio.CancelledError:
+            # El cliente se desconectó: devolver el lugar si ya se le había cedido
+            self._abandon(waiter)
+            raise
+        if not waiter.done():
+            self._abandon(waiter)
+            return self._reject("rejected_overload", 503, "ServiceOverloaded",
+                                "Timed out waiting for an inference slot", self.estimated_wait())
+
+        # release() cedió su lugar a este request (in_flight no cambia)
+        self.counters["admitted"] += 1
+        return None
+
+    def _abandon(self, waiter: asyncio.Future) -> None:
+        """Saca a un request de la cola; si ya tenía lugar asignado, lo libera."""
+        if waiter.done() and not waiter.cancelled():
+            self.release()
+            return
+        waiter.cancel()
+        try:
+            self._waiters.remove(waiter)
+        except ValueError:
+            pass
+
+    def release(self, elapsed: Optional[float] = None) -> None:
+        """
+        Libera el lugar de un request admitido, cediéndolo al siguiente en cola.
+
+        Args:
+            elapsed: Tiempo de servicio del request, para la estimación de espera
+        """
+        if elapsed is not None:
+            self.service_time += _EWMA_ALPHA * (elapsed - self.service_time)
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.in_flight -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Estado actual del control de admisión."""
+        return {
+            "max_concurrency": self.max_concurrency,
+            "in_flight": self.in_flight,
+            "queued": self.queued,
+            "max_queue": self.max_queue,
+            "service_time_ms": self.service_time * 1000,
+            "estimated_wait_ms": self.estimated_wait() * 1000,
+            "rate_limit_per_client": self.limiter.rate if self.limiter else None,
+            **self.counters,
+        }
+
+
+def _rejection_response(rejection: Rejection) -> JSONResponse:
+    """Respuesta HTTP de un rechazo, con el formato de ErrorResponse."""
+    retry_after = max(1, math.ceil(rejection.retry_after))
+    return JSONResponse(
+        status_code=rejection.status_code,
+        content={
+            "detail": {
+                "error": rejection.error,
+                "message": rejection.message,
+                "details": {"retry_after_seconds": retry_after},
+                "timestamp": datetime.utcnow().isoformat() + "Z",
+            }
+        },
+        headers={"Retry-After": str(retry_after)},
+    )
+
+
+class AdmissionMiddleware:
+    """Middleware ASGI que aplica el `AdmissionController` a ciertos paths."""
+
+    def __init__(self, app: Any, controller: AdmissionController,
+                 paths: Sequence[str] = ("/api/v1/predict",)):
+        self.app = app
+        self.controller = controller
+        self.paths = tuple(paths)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not scope["path"].startswith(self.paths):
+            await self.app(scope, receive, send)
+            return
+
+        client = None
+        deadline = None
+        for name, value in scope["headers"]:
+            if name == API_KEY_HEADER:
+                client = value.decode("latin-1")
+            elif name == DEADLINE_HEADER:
+                try:
+                    deadline = float(value) / 1000
+                except ValueError:
+                    pass
+        if client is None:
+            client = scope["client"][0] if scope.get("client") else "anonymous"
+
+        rejection = await self.controller.admit(client, deadline)
+        if rejection is not None:
+            logger.warning(f"Request rechazado ({rejection.status_code} {rejection.error})")
+            await _rejection_response(rejection)(scope, receive, send)
+            return
+
+        start = time.monotonic()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.controller.release(time.monotonic() - start)
@@ -0,0 +1,634 @@
+"""
+Cliente Python de la API de predicción.
+
+Reemplaza los `requests.post` sueltos: cada llamada suelta abre una conexión
+TCP nueva. El cliente mantiene un pool de conexiones keep-alive (httpx) y se
+construye sobre los schemas de la API (`PredictionRequest`,
+`PredictionResponse`):
+
+- `ObesityClient` (síncrono) y `AsyncObesityClient` (asyncio), ambos
+  usables como context manager.
+- `predict_many` parte las instancias en lotes de `batch_size` para
+  `/predict/batch`. Si el servidor no tiene el endpoint (404/405), usa
+  `/predict` por instancia. En el cliente asíncrono, los `predict`
+  concurrentes se agrupan en un solo lote.
+- Reintentos ante 429/503 y errores de conexión, con backoff exponencial y
+  jitter completo; se respeta `Retry-After` si el servidor lo envía.
+- Jobs grandes: el archivo se sube por bloques (`submit_job`), el estado se
+  consulta hasta que termina (`wait_job`) y los resultados se descargan
+  como stream y se descomprimen por filas (`iter_job_results`).
+
+Uso:
+    from API.client import ObesityClient
+
+    with ObesityClient("http://localhost:8000") as client:
+        responses = client.predict_many(instances)
+"""
+
+import asyncio
+import codecs
+import csv
+import io
+from pathlib import Path
+import random
+import time
+from typing import (
+    Any,
+    AsyncIterator,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+import zlib
+
+import httpx
+
+from API.schemas import (
+    MAX_BATCH_SIZE,
+    BatchPredictionResponse,
+    PredictionRequest,
+    PredictionResponse,
+)
+
+DEFAULT_BASE_URL = "http://localhost:8000"
+API_PREFIX = "/api/v1"
+
+# Respuestas que se reintentan: admisión saturada o rate limit, modelo no disponible
+RETRY_STATUSES = (429, 503)
+
+# Backoff de los reintentos (segundos): base exponencial y tope
+DEFAULT_BACKOFF = 0.2
+DEFAULT_MAX_BACKOFF = 10.0
+
+# Espera (segundos) del cliente asíncrono para juntar predicciones en un lote
+DEFAULT_MAX_WAIT = 0.002
+
+# Bloques de lectura/escritura al subir y descargar archivos de jobs
+UPLOAD_BLOCK_SIZE = 1 << 20
+
+# Extensión del archivo de entrada -> Content-Type de POST /jobs
+JOB_CONTENT_TYPES = {
+    ".csv": "text/csv",
+    ".jsonl": "application/x-ndjson",
+    ".ndjson": "application/x-ndjson",
+    ".parquet": "application/vnd.apache.parquet",
+}
+
+FINAL_JOB_STATES = ("succeeded", "failed", "cancelled")
+
+Instance = Union[PredictionRequest, Dict[str, Any]]
+
+
+class PredictionAPIError(Exception):
+    """Respuesta de error de la API (después de agotar los reintentos)."""
+
+    def __init__(self, status_code: int, payload: Any):
+        self.status_code = status_code
+        self.payload = payload
+        detail = payload.get("detail", payload) if isinstance(payload, dict) else payload
+        if isinstance(detail, dict):
+            message = f"{detail.get('error', 'Error')}: {detail.get('message', '')}"
+        else:
+            message = str(detail)
+        super().__init__(f"HTTP {status_code} - {message}")
+
+
+# =============================================================================
+# Utilidades compartidas
+# =============================================================================
+
+
+def retry_delay(
+    attempt: int,
+    backoff: float = DEFAULT_BACKOFF,
+    max_backoff: float = DEFAULT_MAX_BACKOFF,
+    retry_after: Optional[str] = None,
+) -> float:
+    """
+    Segundos a esperar antes del reintento `attempt` (0 = primer reintento).
+
+    Jitter completo: uniforme entre 0 y el backoff exponencial, para que los
+    clientes que fallaron juntos no reintenten juntos. Si el servidor envió
+    `Retry-After`, se espera al menos eso.
+    """
+    delay = random.uniform(0, min(max_backoff, backoff * 2**attempt))
+    if retry_after:
+        try:
+            delay = max(delay, float(retry_after))
+        except ValueError:
+            pass
+    return delay
+
+
+def _payload(instance: Instance) -> Dict[str, Any]:
+    """Instancia validada con `PredictionRequest`, lista para enviar como JSON."""
+    if not isinstance(instance, PredictionRequest):
+        instance = PredictionRequest.model_validate(instance)
+    return instance.model_dump(mode="json")
+
+
+def _chunks(items: Sequence[Any], size: int) -> Iterator[Sequence[Any]]:
+    for start in range(0, len(items), size):
+        yield items[start : start + size]
+
+
+def _check(response: httpx.Response) -> httpx.Response:
+    """Devuelve la respuesta si es 2xx; si no, lanza `PredictionAPIError`."""
+    if response.is_success:
+        return response
+    try:
+        payload = response.json()
+    except ValueError:
+        payload = response.text
+    raise PredictionAPIError(response.status_code, payload)
+
+
+def _should_retry(response: httpx.Response) -> bool:
+    return response.status_code in RETRY_STATUSES
+
+
+def _job_headers(path: Path, content_type: Optional[str]) -> Dict[str, str]:
+    """Headers de la subida de un archivo a POST /jobs (formato por extensión)."""
+    suffixes = [s.lower() for s in path.suffixes]
+    headers = {}
+    if suffixes and suffixes[-1] == ".gz":
+        headers["Content-Encoding"] = "gzip"
+        suffixes = suffixes[:-1]
+    if content_type is None:
+        if not suffixes or suffixes[-1] not in JOB_CONTENT_TYPES:
+            raise ValueError(f"No se puede inferir el formato de {path}; indicar content_type")
+        content_type = JOB_CONTENT_TYPES[suffixes[-1]]
+    headers["Content-Type"] = content_type
+    return headers
+
+
+def _read_blocks(path: Path) -> Iterator[bytes]:
+    with open(path, "rb") as f:
+        while block := f.read(UPLOAD_BLOCK_SIZE):
+            yield block
+
+
+class GzipCSVReader:
+    """
+    Decodifica por partes el `.csv.gz` de resultados de un job.
+
+    Los resultados son varios miembros gzip concatenados; el encabezado solo
+    está en el primero. `feed` recibe bytes comprimidos y devuelve las filas
+    completas como diccionarios.
+    """
+
+    def __init__(self):
+        self._decompressor = zlib.decompressobj(wbits=31)
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+        self._buffer = ""
+        self._header: Optional[List[str]] = None
+
+    def _decompress(self, data: bytes) -> bytes:
+        out = []
+        while data:
+            out.append(self._decompressor.decompress(data))
+            if not self._decompressor.eof:
+                break
+            # Fin de un miembro: lo que sigue es el siguiente
+            data = self._decompressor.unused_data
+            self._decompressor = zlib.decompressobj(wbits=31)
+        return b"".join(out)
+
+    def _rows(self, text: str) -> List[Dict[str, str]]:
+        rows = list(csv.reader(io.StringIO(text)))
+        if self._header is None and rows:
+            self._header, rows = rows[0], rows[1:]
+        return [dict(zip(self._header, row)) for row in rows]
+
+    def feed(self, data: bytes) -> List[Dict[str, str]]:
+        """Filas completas contenidas en los bytes recibidos hasta ahora."""
+        self._buffer += self._decoder.decode(self._decompress(data))
+        complete, newline, rest = self._buffer.rpartition("\n")
+        if not newline:
+            return []
+        self._buffer = rest
+        return self._rows(complete + "\n")
+
+    def close(self) -> List[Dict[str, str]]:
+        """Filas pendientes al terminar el stream (última línea sin salto)."""
+        rows = self._rows(self._buffer) if self._buffer.strip() else []
+        self._buffer = ""
+        return rows
+
+
+# =============================================================================
+# Cliente síncrono
+# =============================================================================
+
+
+class ObesityClient:
+    """Cliente síncrono con pool de conexiones keep-alive."""
+
+    def __init__(
+        self,
+        base_url: str = DEFAULT_BASE_URL,
+        timeout: float = 30.0,
+        max_connections: int = 10,
+        max_retries: int = 3,
+        backoff: float = DEFAULT_BACKOFF,
+        max_backoff: float = DEFAULT_MAX_BACKOFF,
+        batch_size: int = MAX_BATCH_SIZE,
+        transport: Optional[httpx.BaseTransport] = None,
+    ):
+        """
+        Args:
+            base_url: URL base de la API (sin el prefijo /api/v1)
+            timeout: Timeout de cada request (segundos)
+            max_connections: Conexiones máximas del pool (todas keep-alive)
+            max_retries: Reintentos ante 429/503 o errores de conexión
+            backoff: Base del backoff exponencial (segundos)
+            max_backoff: Tope del backoff (segundos)
+            batch_size: Instancias por request a /predict/batch
+            transport: Transporte de httpx (tests)
+        """
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.batch_size = min(batch_size, MAX_BATCH_SIZE)
+        # None = aún no se sabe si el servidor tiene /predict/batch
+        self.batch_supported: Optional[bool] = None
+        self._client = httpx.Client(
+            base_url=base_url.rstrip("/") + API_PREFIX,
+            timeout=timeout,
+            limits=httpx.Limits(
+                max_connections=max_connections, max_keepalive_connections=max_connections
+            ),
+            transport=transport,
+        )
+
+    def __enter__(self) -> "ObesityClient":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Cierra las conexiones del pool."""
+        self._client.close()
+
+    def request(
+        self, method: str, path: str, content: Optional[Callable[[], Iterable[bytes]]] = None, **kwargs
+    ) -> httpx.Response:
+        """
+        Request con reintentos ante 429/503 y errores de conexión.
+
+        Args:
+            method: Método HTTP
+            path: Ruta relativa a /api/v1
+            content: Función que genera el body por bloques (se vuelve a
+                llamar en cada intento)
+            **kwargs: Argumentos de `httpx.Client.request`
+
+        Returns:
+            Respuesta 2xx
+
+        Raises:
+            PredictionAPIError: Si la respuesta final no es 2xx
+            httpx.TransportError: Si la conexión sigue fallando
+        """
+        attempt = 0
+        while True:
+            if content is not None:
+                kwargs["content"] = content()
+            try:
+                response = self._client.request(method, path, **kwargs)
+            except (httpx.ConnectError, httpx.RemoteProtocolError):
+                if attempt >= self.max_retries:
+                    raise
+                retry_after = None
+            else:
+                if attempt >= self.max_retries or not _should_retry(response):
+                    return _check(response)
+                retry_after = response.headers.get("Retry-After")
+            time.sleep(retry_delay(attempt, self.backoff, self.max_backoff, retry_after))
+            attempt += 1
+
+    def predict(self, instance: Instance) -> PredictionResponse:
+        """Predicción de una instancia con `/predict`."""
+        response = self.request("POST", "/predict", json=_payload(instance))
+        return PredictionResponse.model_validate(response.json())
+
+    def predict_many(self, instances: Sequence[Instance]) -> List[PredictionResponse]:
+        """
+        Predicciones de muchas instancias, en lotes de `batch_size` a `/predict/batch`.
+
+        Returns:
+            Respuestas en el mismo orden que las instancias
+        """
+        payloads = [_payload(instance) for instance in instances]
+        results: List[PredictionResponse] = []
+        for chunk in _chunks(payloads, self.batch_size):
+            results.extend(self._predict_chunk(chunk))
+        return results
+
+    def _predict_chunk(self, payloads: Sequence[Dict[str, Any]]) -> List[PredictionResponse]:
+        if self.batch_supported is not False:
+            try:
+                response = self.request("POST", "/predict/batch", json={"instances": list(payloads)})
+                self.batch_supported = True
+                return BatchPredictionResponse.model_validate(response.json()).predictions
+            except PredictionAPIError as e:
+                if self.batch_supported or e.status_code not in (404, 405):
+                    raise
+                self.batch_supported = False
+        return [
+            PredictionResponse.model_validate(
+                self.request("POST", "/predict", json=payload).json()
+            )
+            for payload in payloads
+        ]
+
+    def submit_job(self, path: Union[str, Path], content_type: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Sube un archivo por bloques y crea un job de predicción.
+
+        Args:
+            path: CSV, JSONL o Parquet (`.gz` se envía con Content-Encoding: gzip)
+            content_type: Content-Type explícito (si no, por la extensión)
+
+        Returns:
+            Estado inicial del job (incluye su `id`)
+        """
+        path = Path(path)
+        headers = _job_headers(path, content_type)
+        return self.request("POST", "/jobs", content=lambda: _read_blocks(path), headers=headers).json()
+
+    def job(self, job_id: str) -> Dict[str, Any]:
+        """Estado y progreso de un job."""
+        return self.request("GET", f"/jobs/{job_id}").json()
+
+    def wait_job(
+        self, job_id: str, poll_interval: float = 0.5, timeout: Optional[float] = None
+    ) -> Dict[str, Any]:
+        """
+        Espera a que un job termine (succeeded, failed o cancelled).
+
+        Raises:
+            TimeoutError: Si el job no termina dentro de `timeout` segundos
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            job = self.job(job_id)
+            if job["status"] in FINAL_JOB_STATES:
+                return job
+            if deadline is not None and time.monotonic() > deadline:
+                raise TimeoutError(f"El job {job_id} sigue en estado {job['status']}")
+            time.sleep(poll_interval)
+
+    def iter_job_results(self, job_id: str) -> Iterator[Dict[str, str]]:
+        """
+        Filas de los resultados de un job, descomprimidas a medida que llegan.
+
+        Yields:
+            Diccionario por fila (columnas del CSV de resultados, como texto)
+        """
+        reader = GzipCSVReader()
+        with self._client.stream("GET", f"/jobs/{job_id}/results") as response:
+            if not response.is_success:
+                response.read()
+                _check(response)
+            for block in response.iter_raw(UPLOAD_BLOCK_SIZE):
+                yield from reader.feed(block)
+        yield from reader.close()
+
+    def download_job_results(self, job_id: str, path: Union[str, Path]) -> Path:
+        """Guarda los resultados de un job (`.csv.gz`) sin cargarlos en memoria."""
+        path = Path(path)
+        with self._client.stream("GET", f"/jobs/{job_id}/results") as response:
+            if not response.is_success:
+                response.read()
+                _check(response)
+            with open(path, "wb") as f:
+                for block in response.iter_raw(UPLOAD_BLOCK_SIZE):
+                    f.write(block)
+        return path
+
+
+# =============================================================================
+# Cliente asíncrono
+# =============================================================================
+
+
+class AsyncObesityClient:
+    """
+    Cliente asyncio con pool de conexiones keep-alive.
+
+    Las llamadas concurrentes a `predict` se juntan durante `max_wait` (o
+    hasta `batch_size`) y viajan en un solo request a `/predict/batch`. Hay a
+    lo sumo `max_connections` lotes en vuelo.
+    """
+
+    def __init__(
+        self,
+        base_url: str = DEFAULT_BASE_URL,
+        timeout: float = 30.0,
+        max_connections: int = 10,
+        max_retries: int = 3,
+        backoff: float = DEFAULT_BACKOFF,
+        max_backoff: float = DEFAULT_MAX_BACKOFF,
+        batch_size: int = MAX_BATCH_SIZE,
+        max_wait: float = DEFAULT_MAX_WAIT,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        """
+        Args:
+            base_url: URL base de la API (sin el prefijo /api/v1)
+            timeout: Timeout de cada request (segundos)
+            max_connections: Conexiones máximas del pool y lotes en vuelo
+            max_retries: Reintentos ante 429/503 o errores de conexión
+            backoff: Base del backoff exponencial (segundos)
+            max_backoff: Tope del backoff (segundos)
+            batch_size: Instancias por request a /predict/batch
+            max_wait: Segundos que `predict` espera a otras llamadas para
+                formar un lote (0 = solo las que ya están encoladas)
+            transport: Transporte de httpx (tests)
+        """
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.batch_size = min(batch_size, MAX_BATCH_SIZE)
+        self.max_wait = max_wait
+        self.batch_supported: Optional[bool] = None
+        self._client = httpx.AsyncClient(
+            base_url=base_url.rstrip("/") + API_PREFIX,
+            timeout=timeout,
+            limits=httpx.Limits(
+                max_connections=max_connections, max_keepalive_connections=max_connections
+            ),
+            transport=transport,
+        )
+        self._in_flight = asyncio.Semaphore(max_connections)
+        self._pending: List[Tuple[Dict[str, Any], asyncio.Future]] = []
+        self._drain_task: Optional[asyncio.Task] = None
+        self._batches: set = set()
+
+    async def __aenter__(self) -> "AsyncObesityClient":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        """Espera los lotes pendientes y cierra las conexiones del pool."""
+        if self._drain_task is not None:
+            await self._drain_task
+        if self._batches:
+            await asyncio.gather(*self._batches, return_exceptions=True)
+        await self._client.aclose()
+
+    async def request(
+        self,
+        method: str,
+        path: str,
+        content: Optional[Callable[[], AsyncIterator[bytes]]] = None,
+        **kwargs,
+    ) -> httpx.Response:
+        """
+        Request con reintentos ante 429/503 y errores de conexión.
+
+        Ver `ObesityClient.request`.
+        """
+        attempt = 0
+        while True:
+            if content is not None:
+                kwargs["content"] = content()
+            try:
+                response = await self._client.request(method, path, **kwargs)
+            except (httpx.ConnectError, httpx.RemoteProtocolError):
+                if attempt >= self.max_retries:
+                    raise
+                retry_after = None
+            else:
+                if attempt >= self.max_retries or not _should_retry(response):
+                    return _check(response)
+                retry_after = response.headers.get("Retry-After")
+            await asyncio.sleep(retry_delay(attempt, self.backoff, self.max_backoff, retry_after))
+            attempt += 1
+
+    async def predict(self, instance: Instance) -> PredictionResponse:
+        """
+        Predicción de una instancia; se agrupa con las llamadas concurrentes.
+
+        Raises:
+            PredictionAPIError: Si el lote que la contiene falla
+        """
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((_payload(instance), future))
+        if self._drain_task is None or self._drain_task.done():
+            self._drain_task = asyncio.create_task(self._drain())
+        return await future
+
+    async def predict_many(self, instances: Sequence[Instance]) -> List[PredictionResponse]:
+        """
+        Predicciones de muchas instancias, con los lotes enviados en paralelo.
+
+        Returns:
+            Respuestas en el mismo orden que las instancias
+        """
+        payloads = [_payload(instance) for instance in instances]
+        chunks = await asyncio.gather(
+            *(self._predict_chunk(chunk) for chunk in _chunks(payloads, self.batch_size))
+        )
+        return [response for chunk in chunks for response in chunk]
+
+    async def _drain(self) -> None:
+        """Forma lotes con las predicciones encoladas hasta vaciar la cola."""
+        while self._pending:
+            if len(self._pending) < self.batch_size and self.max_wait > 0:
+                await asyncio.sleep(self.max_wait)
+            batch = self._pending[: self.batch_size]
+            self._pending = self._pending[self.batch_size :]
+            task = asyncio.create_task(self._run_batch(batch))
+            self._batches.add(task)
+            task.add_done_callback(self._batches.discard)
+
+    async def _run_batch(self, batch: List[Tuple[Dict[str, Any], asyncio.Future]]) -> None:
+        """Envía un lote y resuelve los futures que siguen esperando."""
+        live = [(payload, future) for payload, future in batch if not future.done()]
+        if not live:
+            return
+        try:
+            responses = await self._predict_chunk([payload for payload, _ in live])
+        except Exception as e:
+            for _, future in live:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (_, future), response in zip(live, responses):
+            if not future.done():
+                future.set_result(response)
+
+    async def _predict_chunk(self, payloads: Sequence[Dict[str, Any]]) -> List[PredictionResponse]:
+        async with self._in_flight:
+            if self.batch_supported is not False:
+                try:
+                    response = await self.request(
+                        "POST", "/predict/batch", json={"instances": list(payloads)}
+                    )
+                    self.batch_supported = True
+                    return BatchPredictionResponse.model_validate(response.json()).predictions
+                except PredictionAPIError as e:
+                    if self.batch_supported or e.status_code not in (404, 405):
+                        raise
+                    self.batch_supported = False
+            return [
+                PredictionResponse.model_validate(
+                    (await self.request("POST", "/predict", json=payload)).json()
+                )
+                for payload in payloads
+            ]
+
+    async def submit_job(
+        self, path: Union[str, Path], content_type: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Sube un archivo por bloques y crea un job (ver `ObesityClient.submit_job`)."""
+        path = Path(path)
+        headers = _job_headers(path, content_type)
+
+        async def blocks() -> AsyncIterator[bytes]:
+            with open(path, "rb") as f:
+                while block := await asyncio.to_thread(f.read, UPLOAD_BLOCK_SIZE):
+                    yield block
+
+        return (await self.request("POST", "/jobs", content=blocks, headers=headers)).json()
+
+    async def job(self, job_id: str) -> Dict[str, Any]:
+        """Estado y progreso de un job."""
+        return (await self.request("GET", f"/jobs/{job_id}")).json()
+
+    async def wait_job(
+        self, job_id: str, poll_interval: float = 0.5, timeout: Optional[float] = None
+    ) -> Dict[str, Any]:
+        """Espera a que un job termine (ver `ObesityClient.wait_job`)."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            job = await self.job(job_id)
+            if job["status"] in FINAL_JOB_STATES:
+                return job
+            if deadline is not None and time.monotonic() > deadline:
+                raise TimeoutError(f"El job {job_id} sigue en estado {job['status']}")
+            await asyncio.sleep(poll_interval)
+
+    async def iter_job_results(self, job_id: str) -> AsyncIterator[Dict[str, str]]:
+        """Filas de los resultados de un job (ver `ObesityClient.iter_job_results`)."""
+        reader = GzipCSVReader()
+        async with self._client.stream("GET", f"/jobs/{job_id}/results") as response:
+            if not response.is_success:
+                await response.aread()
+                _check(response)
+            async for block in response.aiter_raw(UPLOAD_BLOCK_SIZE):
+                for row in reader.feed(block):
+                    yield row
+        for row in reader.close():
+            yield row
@@ -0,0 +1,736 @@
+"""
+Router local que reparte el tráfico entre procesos worker de inferencia independientes.
+
+A diferencia de `API.server` (N workers uvicorn que comparten un socket y a los
+que el kernel asigna conexiones), aquí cada worker es un proceso con su propio
+socket Unix (o puerto de localhost) y su propia cache de predicciones, y un
+router liviano delante decide a qué worker va cada request:
+
+- `/api/v1/predict` y `/api/v1/predict/explain` se enrutan con hashing
+  consistente sobre la clave canónica del request (la misma de la cache de
+  inferencia), así que un request repetido siempre llega al worker que ya lo
+  tiene en cache.
+- El resto de las rutas se reparte round-robin entre los workers sanos.
+- Un worker se expulsa del anillo tras `max_failures` errores de conexión
+  consecutivos o si su `/readyz` falla; vuelve al anillo cuando `/readyz`
+  responde 200. Solo se reasignan las claves del worker expulsado.
+- `/cluster/stats` agrega requests, errores, latencias y caches de todos los
+  workers.
+
+Uso:
+    python -m API.cluster --port 8000 --workers 4
+"""
+
+import asyncio
+from bisect import bisect_right
+from collections import deque
+from dataclasses import dataclass, field
+import hashlib
+import itertools
+import os
+from pathlib import Path
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, AsyncIterator, Deque, Dict, List, Optional, Sequence, Union
+
+from fastapi import FastAPI, Request
+import httpx
+from loguru import logger
+from starlette.background import BackgroundTask
+from starlette.responses import Response, StreamingResponse
+import typer
+
+from API.responses import FastJSONResponse
+
+# Rutas enrutadas por la clave canónica del request (un solo registro por body)
+KEYED_PATHS = ("/api/v1/predict", "/api/v1/predict/explain")
+
+# Métodos que se pueden repetir en otro worker aunque el primero haya recibido el request
+IDEMPOTENT_METHODS = ("GET", "HEAD", "OPTIONS")
+
+# Nodos virtuales por worker en el anillo (reparte la carga de forma pareja)
+VIRTUAL_NODES = 64
+
+# Latencias recientes por worker usadas para los percentiles de /cluster/stats
+LATENCY_WINDOW = 2048
+
+# Headers hop-by-hop: describen cada conexión y no se reenvían en ningún sentido
+_HOP_BY_HOP_HEADERS = frozenset(
+    (
+        "connection",
+        "keep-alive",
+        "proxy-authenticate",
+        "proxy-authorization",
+        "te",
+        "trailer",
+        "transfer-encoding",
+        "upgrade",
+    )
+)
+
+# Headers que el servidor del router agrega a cada respuesta; los del worker se descartan
+_SERVER_HEADERS = ("date", "server")
+
+app = typer.Typer()
+
+
+# =============================================================================
+# Hashing consistente
+# =============================================================================
+
+
+def _hash(data: bytes) -> int:
+    """Hash estable de 64 bits (no depende de PYTHONHASHSEED)."""
+    return int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), "big")
+
+
+class HashRing:
+    """Anillo de hashing consistente con nodos virtuales."""
+
+    def __init__(self, nodes: Sequence[str], virtual_nodes: int = VIRTUAL_NODES):
+        points = sorted(
+            (_hash(f"{node}#{i}".encode()), node) for node in nodes for i in range(virtual_nodes)
+        )
+        self._hashes = [h for h, _ in points]
+        self._nodes = [node for _, node in points]
+
+    def lookup(self, key: bytes, available: Optional[set] = None) -> Optional[str]:
+        """
+        Nodo responsable de una clave.
+
+        Recorre el anillo en sentido horario desde el hash de la clave hasta el
+        primer nodo disponible, de modo que al expulsar un nodo solo cambian
+        de destino sus propias claves.
+
+        Args:
+            key: Clave a enrutar
+            available: Nodos disponibles (None = todos)
+
+        Returns:
+            Nombre del nodo, o None si no hay ninguno disponible
+        """
+        if not self._hashes:
+            return None
+        start = bisect_right(self._hashes, _hash(key))
+        n = len(self._nodes)
+        for offset in range(n):
+            node = self._nodes[(start + offset) % n]
+            if available is None or node in available:
+                return node
+        return None
+
+
+def routing_key(body: bytes) -> bytes:
+    """
+    Clave de enrutamiento de un request de predicción.
+
+    Usa la clave canónica de la cache de inferencia (`request_key`), de modo
+    que requests equivalentes (por ejemplo `21` y `21.0`) van al mismo worker.
+    Si el body no es un request válido se usa el body tal cual: el worker
+    devolverá el error de validación.
+    """
+    from API.schemas import PredictionRequest
+    from mlops_obesidad.inference.cache import request_key
+
+    try:
+        request = PredictionRequest.model_validate_json(body)
+    except Exception:
+        return body
+    return repr(request_key(request)).encode()
+
+
+class RequestBody:
+    """
+    Body del cliente que se reenvía al worker a medida que este lo lee.
+
+    `consumed` indica si el worker ya empezó a leerlo: desde ese momento el
+    body no se puede volver a enviar a otro worker.
+    """
+
+    def __init__(self, chunks: AsyncIterator[bytes]):
+        self._chunks = chunks
+        self.consumed = False
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        self.consumed = True
+        async for chunk in self._chunks:
+            yield chunk
+
+
+# =============================================================================
+# Estado de los workers
+# =============================================================================
+
+
+@dataclass
+class WorkerEndpoint:
+    """Worker de inferencia visto desde el router."""
+
+    name: str
+    client: httpx.AsyncClient
+    healthy: bool = False
+    consecutive_failures: int = 0
+    requests: int = 0
+    errors: int = 0
+    ejections: int = 0
+    latencies: Deque[float] = field(default_factory=lambda: deque(maxlen=LATENCY_WINDOW))
+
+    def stats(self) -> Dict[str, Any]:
+        """Contadores y percentiles de latencia del worker (ms)."""
+        latencies = sorted(self.latencies)
+
+        def percentile(q: float) -> Optional[float]:
+            if not latencies:
+                return None
+            return round(1000 * latencies[min(int(q * len(latencies)), len(latencies) - 1)], 2)
+
+        return {
+            "healthy": self.healthy,
+            "requests": self.requests,
+            "errors": self.errors,
+            "ejections": self.ejections,
+            "consecutive_failures": self.consecutive_failures,
+            "latency_p50_ms": percentile(0.50),
+            "latency_p95_ms": percentile(0.95),
+        }
+
+
+class ClusterRouter:
+    """
+    Reparte requests entre workers y los expulsa o readmite según su salud.
+
+    Args:
+        workers: Workers de inferencia (con su cliente HTTP ya configurado)
+        policy: 'hash' (consistente por clave) o 'round_robin'
+        max_failures: Errores de conexión consecutivos para expulsar un worker
+        health_interval: Segundos entre chequeos activos de `/readyz`
+        health_timeout: Timeout de cada chequeo
+    """
+
+    def __init__(
+        self,
+        workers: Sequence[WorkerEndpoint],
+        policy: str = "hash",
+        max_failures: int = 3,
+        health_interval: float = 1.0,
+        health_timeout: float = 2.0,
+    ):
+        if policy not in ("hash", "round_robin"):
+            raise ValueError(f"Política de enrutamiento desconocida: {policy}")
+        self.workers = {worker.name: worker for worker in workers}
+        self.ring = HashRing(list(self.workers))
+        self.policy = policy
+        self.max_failures = max_failures
+        self.health_interval = health_interval
+        self.health_timeout = health_timeout
+        self._round_robin = itertools.cycle(list(self.workers))
+        self._health_task: Optional[asyncio.Task] = None
+        self.started_at = time.time()
+
+    def available(self) -> set:
+        """Nombres de los workers que están en el anillo."""
+        return {name for name, worker in self.workers.items() if worker.healthy}
+
+    def pick(
+        self, key: Optional[bytes], available: Optional[set] = None
+    ) -> Optional[WorkerEndpoint]:
+        """
+        Worker destino: por hashing consistente si hay clave, si no round-robin.
+
+        Args:
+            key: Clave de enrutamiento (None para rutas sin clave)
+            available: Workers candidatos (None = los que están en el anillo)
+        """
+        if available is None:
+            available = self.available()
+        if not available:
+            return None
+        if key is not None and self.policy == "hash":
+            return self.workers[self.ring.lookup(key, available)]
+        for _ in range(len(self.workers)):
+            name = next(self._round_robin)
+            if name in available:
+                return self.workers[name]
+        return None
+
+    def _eject(self, worker: WorkerEndpoint, reason: str) -> None:
+        if worker.healthy:
+            worker.healthy = False
+            worker.ejections += 1
+            logger.warning(f"Worker {worker.name} expulsado del anillo: {reason}")
+
+    def _record_failure(self, worker: WorkerEndpoint, reason: str) -> None:
+        worker.consecutive_failures += 1
+        if worker.consecutive_failures >= self.max_failures:
+            self._eject(worker, reason)
+
+    async def check(self, worker: WorkerEndpoint) -> bool:
+        """
+        Chequeo activo de readiness de un worker.
+
+        Una conexión rechazada (proceso caído) o un `/readyz` distinto de 200
+        (modelo sin cargar o cola saturada) lo expulsan de inmediato; los
+        timeouts cuentan como fallos hasta `max_failures`.
+        """
+        try:
+            response = await worker.client.get("/readyz", timeout=self.health_timeout)
+        except httpx.ConnectError:
+            worker.consecutive_failures += 1
+            self._eject(worker, "conexión rechazada")
+            return False
+        except httpx.HTTPError as e:
+            self._record_failure(worker, f"/readyz sin respuesta ({type(e).__name__})")
+            return False
+        if response.status_code != 200:
+            worker.consecutive_failures += 1
+            self._eject(worker, f"/readyz respondió {response.status_code}")
+            return False
+        if not worker.healthy:
+            logger.info(f"Worker {worker.name} disponible; entra al anillo")
+        worker.healthy = True
+        worker.consecutive_failures = 0
+        return True
+
+    async def check_all(self) -> None:
+        """Chequea a todos los workers en paralelo."""
+        await asyncio.gather(*(self.check(worker) for worker in self.workers.values()))
+
+    async def _health_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.health_interval)
+            await self.check_all()
+
+    async def start(self) -> None:
+        """Primer chequeo de salud e inicio del chequeo periódico."""
+        await self.check_all()
+        self._health_task = asyncio.create_task(self._health_loop())
+
+    async def stop(self) -> None:
+        """Detiene el chequeo periódico y cierra las conexiones a los workers."""
+        if self._health_task is not None:
+            self._health_task.cancel()
+        await asyncio.gather(
+            *(worker.client.aclose() for worker in self.workers.values()), return_exceptions=True
+        )
+
+    async def forward(
+        self,
+        method: str,
+        path: str,
+        query: bytes,
+        headers: Dict[str, str],
+        body: Union[bytes, RequestBody],
+    ) -> Response:
+        """
+        Reenvía un request al worker que corresponde.
+
+        El body se envía al worker a medida que llega (salvo en las rutas de
+        inferencia, que se leen completas para calcular la clave) y la
+        respuesta se devuelve al cliente en streaming, de modo que ni una
+        subida a `/api/v1/jobs` ni la descarga de sus resultados quedan
+        enteras en la memoria del router.
+
+        Si la conexión con el worker falla se registra el fallo y el request se
+        reintenta una vez en el siguiente worker disponible, siempre que el
+        body no se haya empezado a enviar. Solo los GET y las rutas de
+        inferencia (`KEYED_PATHS`) se reintentan ante cualquier error de
+        transporte; el resto (p. ej. `POST /api/v1/jobs`) solo si la conexión
+        no llegó a establecerse, para no enviar dos veces un request que el
+        worker pudo haber procesado.
+
+        Args:
+            body: Body completo, o `RequestBody` para reenviarlo en streaming
+
+        Returns:
+            Respuesta del worker, 502 si falló un request no repetible o 503 si
+            no hay workers disponibles
+        """
+        keyed = method == "POST" and path in KEYED_PATHS
+        key = routing_key(body) if keyed else None
+        idempotent = keyed or method in IDEMPOTENT_METHODS
+        tried: set = set()
+
+        for _ in range(2):
+            worker = self.pick(key, self.available() - tried)
+            if worker is None:
+                break
+            tried.add(worker.name)
+
+            start = time.perf_counter()
+            try:
+                response = await worker.client.send(
+                    worker.client.build_request(
+                        method,
+                        path,
+                        params=query.decode("latin-1") or None,
+                        headers=headers,
+                        content=body,
+                    ),
+                    stream=True,
+                )
+            except httpx.TransportError as e:
+                worker.errors += 1
+                self._record_failure(worker, type(e).__name__)
+                replayable = not (isinstance(body, RequestBody) and body.consumed)
+                if replayable and (idempotent or isinstance(e, httpx.ConnectError)):
+                    continue
+                return FastJSONResponse(
+                    {
+                        "error": "WorkerError",
+                        "message": f"El worker {worker.name} falló durante el request; "
+                        "puede haberlo procesado, no se reintenta",
+                    },
+                    status_code=502,
+                )
+
+            # Latencia hasta los headers de la respuesta (el body sigue en streaming)
+            worker.requests += 1
+            worker.latencies.append(time.perf_counter() - start)
+            worker.consecutive_failures = 0
+            streamed = StreamingResponse(
+                response.aiter_raw(),
+                response.status_code,
+                background=BackgroundTask(response.aclose),
+            )
+            # Se reenvían todos los headers del worker (repetidos incluidos) salvo
+            # los hop-by-hop y los que agrega el servidor del router; aiter_raw no
+            # descomprime, así que Content-Encoding y Content-Length siguen siendo válidos
+            streamed.raw_headers = [
+                (name.encode("latin-1"), value.encode("latin-1"))
+                for name, value in response.headers.multi_items()
+                if name not in _HOP_BY_HOP_HEADERS and name not in _SERVER_HEADERS
+            ]
+            streamed.raw_headers.append((b"x-cluster-worker", worker.name.encode("latin-1")))
+            return streamed
+
+        return FastJSONResponse(
+            {"error": "NoWorkerAvailable", "message": "No hay workers de inferencia disponibles"},
+            status_code=503,
+            headers={"Retry-After": "1"},
+        )
+
+    async def stats(self) -> Dict[str, Any]:
+        """
+        Estadísticas agregadas del cluster.
+
+        Incluye los contadores del router por worker y, para los workers
+        sanos, las estadísticas de sus caches de inferencia.
+        """
+
+        async def worker_caches(worker: WorkerEndpoint) -> Optional[Dict[str, Any]]:
+            if not worker.healthy:
+                return None
+            try:
+                response = await worker.client.get(
+                    "/api/v1/monitoring/cache", timeout=self.health_timeout
+                )
+                return response.json() if response.status_code == 200 else None
+            except httpx.HTTPError:
+                return None
+
+        names = list(self.workers)
+        caches = await asyncio.gather(*(worker_caches(self.workers[n]) for n in names))
+
+        per_worker = {}
+        totals = {"requests": 0, "errors": 0, "cache_hits": 0, "cache_misses": 0}
+        all_latencies: List[float] = []
+        for name, cache in zip(names, caches):
+            worker = self.workers[name]
+            per_worker[name] = {**worker.stats(), "caches": cache}
+            totals["requests"] += worker.requests
+            totals["errors"] += worker.errors
+            all_latencies.extend(worker.latencies)
+            if cache and "predictions" in cache:
+                totals["cache_hits"] += cache["predictions"]["hits"]
+                totals["cache_misses"] += cache["predictions"]["misses"]
+
+        lookups = totals["cache_hits"] + totals["cache_misses"]
+        all_latencies.sort()
+        return {
+            "policy": self.policy,
+            "uptime_seconds": round(time.time() - self.started_at, 1),
+            "workers_total": len(self.workers),
+            "workers_healthy": len(self.available()),
+            "requests": totals["requests"],
+            "errors": totals["errors"],
+            "latency_p50_ms": (
+                round(1000 * all_latencies[len(all_latencies) // 2], 2) if all_latencies else None
+            ),
+            "latency_p95_ms": (
+                round(1000 * all_latencies[int(0.95 * (len(all_latencies) - 1))], 2)
+                if all_latencies
+                else None
+            ),
+            "prediction_cache_hit_rate": totals["cache_hits"] / lookups if lookups else None,
+            "workers": per_worker,
+        }
+
+
+def create_app(router: ClusterRouter) -> FastAPI:
+    """
+    Aplicación ASGI del router.
+
+    Args:
+        router: Router ya configurado con sus workers
+
+    Returns:
+        Aplicación FastAPI que reenvía todo a los workers salvo `/cluster/*`,
+        `/healthz` y `/readyz`
+    """
+    asgi_app = FastAPI(title="Router del cluster de inferencia", docs_url=None, redoc_url=None)
+    asgi_app.state.router = router
+
+    @asgi_app.on_event("startup")
+    async def _startup() -> None:
+        await router.start()
+
+    @asgi_app.on_event("shutdown")
+    async def _shutdown() -> None:
+        await router.stop()
+
+    @asgi_app.get("/healthz")
+    async def healthz() -> Response:
+        return Response(b'{"status":"ok"}', media_type="application/json")
+
+    @asgi_app.get("/readyz")
+    async def readyz() -> Response:
+        healthy = len(router.available())
+        return FastJSONResponse(
+            {"status": "ready" if healthy else "not_ready", "workers_healthy": healthy},
+            status_code=200 if healthy else 503,
+        )
+
+    @asgi_app.get("/cluster/stats")
+    async def cluster_stats() -> Response:
+        return FastJSONResponse(await router.stats())
+
+    @asgi_app.api_route(
+        "/{path:path}", methods=["GET", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"]
+    )
+    async def proxy(request: Request, path: str) -> Response:
+        headers = {
+            name: value
+            for name, value in request.headers.items()
+            if name != "host" and name not in _HOP_BY_HOP_HEADERS
+        }
+        # Las rutas de inferencia se leen completas (son pequeñas y hacen falta
+        # para la clave de enrutamiento), igual que los GET (sin body), que así
+        # se pueden reintentar; el resto se reenvía en streaming
+        keyed = request.method == "POST" and request.url.path in KEYED_PATHS
+        if keyed or request.method in IDEMPOTENT_METHODS:
+            body: Union[bytes, RequestBody] = await request.body()
+        else:
+            body = RequestBody(request.stream())
+        return await router.forward(
+            request.method,
+            request.url.path,
+            request.url.query.encode("latin-1"),
+            headers,
+            body,
+        )
+
+    return asgi_app
+
+
+# =============================================================================
+# Procesos worker locales
+# =============================================================================
+
+
+class LocalWorkerPool:
+    """
+    Lanza N procesos `API.main` independientes en sockets Unix o puertos locales.
+
+    Cada proceso carga y calienta su propio modelo. El pool reinicia un
+    worker si su proceso termina; mientras tanto el router lo mantiene fuera
+    del anillo porque su `/readyz` no responde.
+    """
+
+    def __init__(
+        self,
+        workers: int,
+        transport: str = "uds",
+        socket_dir: Optional[Path] = None,
+        base_port: int = 8101,
+        threads_per_worker: int = 1,
+        log_level: str = "warning",
+    ):
+        if transport not in ("uds", "tcp"):
+            raise ValueError(f"Transporte desconocido: {transport}")
+        self.transport = transport
+        self.socket_dir = socket_dir or Path(tempfile.mkdtemp(prefix="obesity-cluster-"))
+        self.base_port = base_port
+        self.threads_per_worker = threads_per_worker
+        self.log_level = log_level
+        self.names = [f"worker-{i}" for i in range(workers)]
+        self.processes: Dict[str, subprocess.Popen] = {}
+
+    def _address(self, index: int) -> List[str]:
+        if self.transport == "uds":
+            return ["--uds", str(self.socket_dir / f"worker-{index}.sock")]
+        return ["--host", "127.0.0.1", "--port", str(self.base_port + index)]
+
+    def spawn(self, index: int) -> None:
+        """Lanza (o relanza) el worker `index`."""
+        if self.transport == "uds":
+            (self.socket_dir / f"worker-{index}.sock").unlink(missing_ok=True)
+        env = {
+            **os.environ,
+            "OMP_NUM_THREADS": str(self.threads_per_worker),
+            "WEB_CONCURRENCY": "1",
+        }
+        command = [
+            sys.executable,
+            "-m",
+            "uvicorn",
+            "API.main:app",
+            *self._address(index),
+            "--log-level",
+            self.log_level,
+        ]
+        name = self.names[index]
+        self.processes[name] = subprocess.Popen(command, env=env)
+        logger.info(f"{name} iniciado (pid {self.processes[name].pid})")
+
+    def start(self) -> None:
+        """Lanza todos los workers."""
+        self.socket_dir.mkdir(parents=True, exist_ok=True)
+        for index in range(len(self.names)):
+            self.spawn(index)
+
+    def endpoints(self) -> List[WorkerEndpoint]:
+        """Clientes HTTP keep-alive hacia cada worker."""
+        endpoints = []
+        for index, name in enumerate(self.names):
+            if self.transport == "uds":
+                transport = httpx.AsyncHTTPTransport(uds=str(self.socket_dir / f"{name}.sock"))
+                base_url = "http://worker"
+            else:
+                transport = httpx.AsyncHTTPTransport()
+                base_url = f"http://127.0.0.1:{self.base_port + index}"
+            client = httpx.AsyncClient(
+                transport=transport, base_url=base_url, timeout=httpx.Timeout(30.0, connect=1.0)
+            )
+            endpoints.append(WorkerEndpoint(name=name, client=client))
+        return endpoints
+
+    async def supervise(self, interval: float = 1.0) -> None:
+        """Relanza los workers cuyo proceso terminó."""
+        while True:
+            await asyncio.sleep(interval)
+            for index, name in enumerate(self.names):
+                code = self.processes[name].poll()
+                if code is not None:
+                    logger.warning(f"{name} terminó con código {code}; relanzando")
+                    self.spawn(index)
+
+    def stop(self, timeout: float = 30.0) -> None:
+        """Detiene a todos los workers (SIGTERM y luego SIGKILL)."""
+        for process in self.processes.values():
+            if process.poll() is None:
+                process.terminate()
+        deadline = time.monotonic() + timeout
+        for process in self.processes.values():
+            try:
+                process.wait(timeout=max(deadline - time.monotonic(), 0.1))
+            except subprocess.TimeoutExpired:
+                process.kill()
+        if self.transport == "uds":
+            for name in self.names:
+                (self.socket_dir / f"{name}.sock").unlink(missing_ok=True)
+
+
+def serve(
+    host: str = "0.0.0.0",
+    port: int = 8000,
+    workers: int = 2,
+    transport: str = "uds",
+    base_port: int = 8101,
+    policy: str = "hash",
+    threads_per_worker: int = 1,
+    max_failures: int = 3,
+    health_interval: float = 1.0,
+    log_level: str = "info",
+) -> None:
+    """
+    Lanza los workers y el router delante de ellos.
+
+    Args:
+        host: Dirección de escucha del router
+        port: Puerto del router
+        workers: Número de procesos worker
+        transport: 'uds' (sockets Unix) o 'tcp' (puertos de localhost)
+        base_port: Primer puerto de los workers con transporte 'tcp'
+        policy: 'hash' o 'round_robin'
+        threads_per_worker: Hilos OpenMP de XGBoost por worker
+        max_failures: Errores de conexión consecutivos para expulsar un worker
+        health_interval: Segundos entre chequeos de `/readyz`
+        log_level: Nivel de log de uvicorn del router
+    """
+    import uvicorn
+
+    pool = LocalWorkerPool(
+        workers, transport=transport, base_port=base_port, threads_per_worker=threads_per_worker
+    )
+    pool.start()
+    router = ClusterRouter(
+        pool.endpoints(),
+        policy=policy,
+        max_failures=max_failures,
+        health_interval=health_interval,
+    )
+    asgi_app = create_app(router)
+
+    @asgi_app.on_event("startup")
+    async def _supervise() -> None:
+        asgi_app.state.supervisor = asyncio.create_task(pool.supervise())
+
+    @asgi_app.on_event("shutdown")
+    async def _stop_workers() -> None:
+        # uvicorn vuelve a emitir SIGTERM al terminar: los workers se detienen aquí
+        asgi_app.state.supervisor.cancel()
+        await asyncio.to_thread(pool.stop)
+
+    logger.info(
+        f"Router en {host}:{port} con {workers} workers ({transport}, política {policy})"
+    )
+    try:
+        uvicorn.run(asgi_app, host=host, port=port, log_level=log_level)
+    finally:
+        pool.stop()
+
+
+@app.command()
+def main(
+    host: str = typer.Option(os.getenv("HOST", "0.0.0.0"), help="Dirección de escucha"),
+    port: int = typer.Option(int(os.getenv("PORT", "8000")), help="Puerto del router"),
+    workers: int = typer.Option(
+        int(os.getenv("CLUSTER_WORKERS", str(os.cpu_count() or 1))), help="Procesos worker"
+    ),
+    transport: str = typer.Option("uds", help="uds (sockets Unix) o tcp (puertos locales)"),
+    base_port: int = typer.Option(8101, help="Primer puerto de los workers con --transport tcp"),
+    policy: str = typer.Option("hash", help="hash (consistente por request) o round_robin"),
+    threads_per_worker: int = typer.Option(1, help="Hilos OpenMP de XGBoost por worker"),
+    max_failures: int = typer.Option(3, help="Errores consecutivos para expulsar un worker"),
+    health_interval: float = typer.Option(1.0, help="Segundos entre chequeos de /readyz"),
+    log_level: str = "info",
+):
+    """Router local con hashing consistente sobre N workers de inferencia."""
+    serve(
+        host=host,
+        port=port,
+        workers=workers,
+        transport=transport,
+        base_port=base_port,
+        policy=policy,
+        threads_per_worker=threads_per_worker,
+        max_failures=max_failures,
+        health_interval=health_interval,
+        log_level=log_level,
+    )
+
+
+if __name__ == "__main__":
+    app()
@@ -0,0 +1,610 @@
+"""
+Jobs asíncronos de predicción para archivos grandes.
+
+Un archivo de millones de filas no se puede puntuar dentro del timeout de un
+request HTTP. `/api/v1/jobs` recibe el archivo (o la ruta a uno ya presente en
+el servidor), responde de inmediato con el id del job y lo procesa en segundo
+plano:
+
+- Los jobs corren en un pool de procesos propio (`JOBS_MAX_WORKERS`, un hilo de
+  XGBoost cada uno), separado de los hilos que atienden `/predict`.
+- Un solo proceso despacha los jobs: el que tiene el lock del despachador
+  (`JOBS_DIR/dispatcher.lock`). Los workers de la API solo escriben el job en
+  disco; el despachador revisa el directorio cada `JOBS_POLL_SECONDS` y envía
+  a su pool los jobs en cola o interrumpidos. Con el servidor prefork
+  (`API/server.py`) el despachador es un proceso dedicado del maestro, así que
+  reciclar un worker no toca los jobs en curso.
+- El archivo se lee por chunks de `JOBS_CHUNK_ROWS` filas (CSV, JSONL o
+  Parquet) y cada chunk se puntúa con una sola llamada al modelo.
+- Cada chunk se escribe como un miembro gzip (`results/part-NNNNN.csv.gz`); la
+  concatenación de los miembros es un único `.csv.gz` válido, así que la
+  descarga solo encadena los archivos.
+- El estado vive en disco (`job.json`): cualquier worker de la API puede
+  responder al polling, la cancelación es un archivo marca que el job revisa
+  entre chunks, y un job interrumpido (cancelado, fallido, o pausado al
+  detener el despachador) se reanuda desde el último chunk completo.
+"""
+
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime
+import gzip
+import json
+import multiprocessing
+import os
+from pathlib import Path
+import threading
+import time
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional
+import uuid
+import zlib
+
+from loguru import logger
+
+from mlops_obesidad.config import DATA_DIR, FEATURE_COLUMNS
+
+# Directorio de los jobs y directorio desde el que se aceptan rutas de entrada
+JOBS_DIR = Path(os.getenv("JOBS_DIR", str(DATA_DIR / "jobs")))
+JOBS_INPUT_DIR = Path(os.getenv("JOBS_INPUT_DIR", str(DATA_DIR)))
+
+# Filas por chunk, procesos del pool y tamaño máximo de un archivo subido
+JOBS_CHUNK_ROWS = int(os.getenv("JOBS_CHUNK_ROWS", "50000"))
+JOBS_MAX_WORKERS = int(os.getenv("JOBS_MAX_WORKERS", "1"))
+JOBS_MAX_UPLOAD_MB = float(os.getenv("JOBS_MAX_UPLOAD_MB", "2048"))
+
+# Si este proceso de la API compite por despachar los jobs ("0" con el servidor
+# prefork, que lo hace en un proceso dedicado) y cada cuánto revisa el directorio
+JOBS_DISPATCHER = os.getenv("JOBS_DISPATCHER", "1") != "0"
+JOBS_POLL_SECONDS = float(os.getenv("JOBS_POLL_SECONDS", "1.0"))
+
+# Nivel de compresión gzip de los resultados (1 = el más rápido)
+RESULT_COMPRESSLEVEL = 1
+
+# Formatos de entrada aceptados en la subida (Content-Type -> extensión)
+UPLOAD_FORMATS = {
+    "text/csv": ".csv",
+    "application/x-ndjson": ".jsonl",
+    "application/jsonl": ".jsonl",
+    "application/vnd.apache.parquet": ".parquet",
+}
+
+QUEUED, RUNNING, SUCCEEDED, FAILED, CANCELLED = (
+    "queued",
+    "running",
+    "succeeded",
+    "failed",
+    "cancelled",
+)
+FINAL_STATES = (SUCCEEDED, FAILED, CANCELLED)
+
+# Modelo cargado en cada proceso del pool
+_job_model: Optional[Dict[str, Any]] = None
+
+
+class JobError(Exception):
+    """Error de un job atribuible al cliente (job inexistente, estado inválido, entrada)."""
+
+    def __init__(self, message: str, status_code: int = 400):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+def _now() -> str:
+    return datetime.utcnow().isoformat() + "Z"
+
+
+# =============================================================================
+# Estado en disco
+# =============================================================================
+
+
+def read_job(job_dir: Path) -> Dict[str, Any]:
+    """Lee el estado de un job."""
+    with open(job_dir / "job.json", "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def write_job(job_dir: Path, job: Dict[str, Any]) -> None:
+    """Escribe el estado de un job de forma atómica (archivo temporal + rename)."""
+    tmp = job_dir / "job.json.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(job, f, indent=2)
+    os.replace(tmp, job_dir / "job.json")
+
+
+def _try_lock(f) -> bool:
+    """Intenta tomar un flock exclusivo sin bloquear."""
+    import fcntl
+
+    try:
+        fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        return False
+    return True
+
+
+@contextmanager
+def _job_lock(job_dir: Path) -> Iterator[bool]:
+    """
+    Lock exclusivo del job entre procesos (flock, no bloqueante).
+
+    Evita procesar dos veces el mismo job, por ejemplo mientras un despachador
+    que se está deteniendo termina su chunk y otro ya lo reenvió.
+    """
+    import fcntl
+
+    with open(job_dir / "lock", "w") as f:
+        if not _try_lock(f):
+            yield False
+            return
+        try:
+            yield True
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def _part_path(job_dir: Path, index: int) -> Path:
+    return job_dir / "results" / f"part-{index:05d}.csv.gz"
+
+
+# =============================================================================
+# Procesamiento (se ejecuta en el pool de procesos)
+# =============================================================================
+
+
+def _init_job_worker(n_threads: int = 1) -> None:
+    """Inicializador de cada proceso del pool: carga el modelo con `n_threads` hilos."""
+    global _job_model
+
+    from mlops_obesidad.inference.model_loader import load_model
+
+    _job_model = load_model()
+    classifier = _job_model["model"].named_steps["classifier"]
+    classifier.set_params(n_jobs=n_threads)
+    classifier.get_booster().set_param({"nthread": n_threads})
+
+
+def score_chunk(chunk, artifacts: Dict[str, Any], offset: int):
+    """
+    Puntúa un chunk con una sola llamada al modelo.
+
+    Args:
+        chunk: DataFrame con las columnas de FEATURE_COLUMNS (el resto se copia tal cual)
+        artifacts: Artefactos del modelo ({'model', 'label_encoder'})
+        offset: Número de fila global de la primera fila del chunk
+
+    Returns:
+        DataFrame con `row`, las columnas extra de la entrada, `prediction`,
+        `confidence` y una columna `proba_<clase>` por clase
+
+    Raises:
+        ValueError: Si faltan columnas del modelo
+    """
+    import numpy as np
+    import pandas as pd
+
+    from mlops_obesidad.modeling.predict import score_frame
+
+    scores = score_frame(chunk, artifacts).reset_index(drop=True)
+    extra = chunk.drop(columns=FEATURE_COLUMNS).reset_index(drop=True)
+    result = pd.DataFrame({"row": np.arange(offset, offset + len(chunk))})
+    return pd.concat([result, extra, scores], axis=1)
+
+
+def run_job(job_dir: str, stop_path: Optional[str] = None) -> str:
+    """
+    Procesa un job desde su último chunk completo.
+
+    Un chunk cuenta como completo cuando su archivo de resultados ya fue
+    renombrado y `job.json` lo registra; si el proceso muere entre ambos pasos
+    el chunk se vuelve a escribir al reanudar.
+
+    Args:
+        job_dir: Directorio del job
+        stop_path: Archivo marca del despachador; si existe, el job se pausa
+            (vuelve a la cola) antes de su siguiente chunk
+
+    Returns:
+        Estado del job al terminar ('locked' si otro proceso ya lo está procesando)
+    """
+    from mlops_obesidad.monitoring.drift_report import iter_chunks
+
+    path = Path(job_dir)
+    with _job_lock(path) as acquired:
+        if not acquired:
+            return "locked"
+
+        job = read_job(path)
+        if job["status"] in FINAL_STATES:
+            return job["status"]
+
+        job.update(status=RUNNING, started_at=job.get("started_at") or _now(), error=None)
+        write_job(path, job)
+        (path / "results").mkdir(exist_ok=True)
+        # Tiempo acumulado entre ejecuciones (cancelaciones, reinicios)
+        elapsed = job.get("seconds", 0.0)
+        start = time.perf_counter()
+
+        try:
+            if _job_model is None:
+                _init_job_worker()
+            done = job["chunks_completed"]
+            input_path = path / job["input"] if job["uploaded"] else Path(job["input"])
+            for index, chunk in enumerate(iter_chunks(input_path, job["chunk_rows"])):
+                if (path / "cancel").exists():
+                    job.update(status=CANCELLED, finished_at=_now())
+                    write_job(path, job)
+                    logger.info(f"Job {job['id']} cancelado tras {done} chunks")
+                    return CANCELLED
+                if stop_path is not None and Path(stop_path).exists():
+                    job.update(status=QUEUED, updated_at=_now())
+                    write_job(path, job)
+                    logger.info(f"Job {job['id']} pausado tras {done} chunks; se reanuda al volver a despacharlo")
+                    return QUEUED
+                if index < done:
+                    continue
+
+                result = score_chunk(chunk, _job_model, job["rows_processed"])
+                part = _part_path(path, index)
+                tmp = part.with_suffix(".tmp")
+                with gzip.open(tmp, "wt", compresslevel=RESULT_COMPRESSLEVEL, newline="") as f:
+                    result.to_csv(f, index=False, header=index == 0, float_format="%.6g")
+                os.replace(tmp, part)
+
+                done = index + 1
+                job.update(
+                    chunks_completed=done,
+                    rows_processed=job["rows_processed"] + len(chunk),
+                    seconds=round(elapsed + time.perf_counter() - start, 2),
+                    updated_at=_now(),
+                )
+                write_job(path, job)
+        except Exception as e:
+            job.update(status=FAILED, error=str(e), finished_at=_now())
+            write_job(path, job)
+            logger.error(f"Job {job['id']} falló en el chunk {job['chunks_completed']}: {e}")
+            return FAILED
+
+        job.update(
+            status=SUCCEEDED,
+            finished_at=_now(),
+            result_bytes=sum(
+                _part_path(path, i).stat().st_size for i in range(job["chunks_completed"])
+            ),
+        )
+        write_job(path, job)
+        logger.success(f"Job {job['id']} completado: {job['rows_processed']} filas")
+        return SUCCEEDED
+
+
+# =============================================================================
+# Gestor de jobs (proceso de la API)
+# =============================================================================
+
+
+class JobManager:
+    """
+    Crea jobs, expone su estado y, en el proceso despachador, los envía al pool.
+
+    Cualquier proceso crea, consulta y cancela jobs a través de `job.json`.
+    `start()` lanza un hilo que compite por el lock del despachador; solo el
+    proceso que lo obtiene crea el pool de procesos y envía los jobs.
+
+    Args:
+        jobs_dir: Directorio donde se guardan los jobs
+        input_dir: Único directorio desde el que se aceptan rutas de entrada
+        chunk_rows: Filas por chunk
+        max_workers: Procesos del pool
+        executor: Executor a usar en lugar del pool por defecto (tests)
+        poll_seconds: Intervalo de revisión del directorio de jobs
+    """
+
+    def __init__(
+        self,
+        jobs_dir: Path = JOBS_DIR,
+        input_dir: Path = JOBS_INPUT_DIR,
+        chunk_rows: int = JOBS_CHUNK_ROWS,
+        max_workers: int = JOBS_MAX_WORKERS,
+        executor: Optional[Executor] = None,
+        poll_seconds: float = JOBS_POLL_SECONDS,
+    ):
+        self.jobs_dir = Path(jobs_dir)
+        self.input_dir = Path(input_dir).resolve()
+        self.chunk_rows = chunk_rows
+        self.max_workers = max_workers
+        self.poll_seconds = poll_seconds
+        self._executor = executor
+        self._futures: Dict[str, Future] = {}
+        self._leader_file = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        # Marca que pausa los jobs de este despachador al detenerlo
+        self._stop_path = self.jobs_dir / f"stop-{uuid.uuid4().hex}"
+
+    @property
+    def executor(self) -> Executor:
+        """Pool de procesos (se crea con el primer job; 'spawn' para no heredar hilos)."""
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_job_worker,
+            )
+        return self._executor
+
+    def _dir(self, job_id: str) -> Path:
+        job_dir = self.jobs_dir / job_id
+        if not job_id.isalnum() or not (job_dir / "job.json").exists():
+            raise JobError(f"Job no encontrado: {job_id}", status_code=404)
+        return job_dir
+
+    def _create(self, job_id: str, input_name: str, uploaded: bool) -> Dict[str, Any]:
+        from API.services import MODEL_ID, MODEL_VERSION
+
+        job = {
+            "id": job_id,
+            "status": QUEUED,
+            "input": input_name,
+            "uploaded": uploaded,
+            "chunk_rows": self.chunk_rows,
+            "chunks_completed": 0,
+            "rows_processed": 0,
+            "seconds": 0.0,
+            "model_version": MODEL_VERSION,
+            "model_id": MODEL_ID,
+            "created_at": _now(),
+            "started_at": None,
+            "finished_at": None,
+            "error": None,
+        }
+        write_job(self.jobs_dir / job_id, job)
+        return job
+
+    @property
+    def is_dispatcher(self) -> bool:
+        """Si este proceso tiene el lock del despachador."""
+        return self._leader_file is not None
+
+    def _acquire_dispatcher(self) -> bool:
+        """Intenta tomar el lock del despachador (uno por `jobs_dir`)."""
+        if self._leader_file is None:
+            self.jobs_dir.mkdir(parents=True, exist_ok=True)
+            f = open(self.jobs_dir / "dispatcher.lock", "w")
+            if not _try_lock(f):
+                f.close()
+                return False
+            self._leader_file = f
+            logger.info(f"Proceso {os.getpid()} despacha los jobs de {self.jobs_dir}")
+        return True
+
+    def _release_dispatcher(self) -> None:
+        if self._leader_file is not None:
+            self._leader_file.close()
+            self._leader_file = None
+
+    def dispatch(self) -> int:
+        """
+        Envía al pool los jobs en cola o interrumpidos que no estén ya enviados.
+
+        Solo debe llamarla el proceso despachador.
+
+        Returns:
+            Número de jobs enviados
+        """
+        self._futures = {job_id: f for job_id, f in self._futures.items() if not f.done()}
+        pending = [
+            job["id"]
+            for job in self.list()
+            if job["status"] in (QUEUED, RUNNING) and job["id"] not in self._futures
+        ]
+        for job_id in pending:
+            future = self.executor.submit(run_job, str(self.jobs_dir / job_id), str(self._stop_path))
+            future.add_done_callback(lambda f, job_id=job_id: not f.cancelled() and f.exception() and logger.error(
+                f"Job {job_id} terminó con error inesperado: {f.exception()}"
+            ))
+            self._futures[job_id] = future
+        return len(pending)
+
+    def _dispatch_loop(self) -> None:
+        first = True
+        while not self._stop.is_set():
+            try:
+                if self._acquire_dispatcher():
+                    submitted = self.dispatch()
+                    if first and submitted:
+                        logger.info(f"Reanudando {submitted} jobs pendientes")
+                    first = False
+            except Exception as e:
+                logger.error(f"Error al despachar jobs: {e}")
+            self._wake.wait(self.poll_seconds)
+            self._wake.clear()
+
+    def start(self) -> None:
+        """Lanza el hilo que compite por despachar los jobs de `jobs_dir`."""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._dispatch_loop, name="job-dispatcher", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """
+        Detiene el despachador de este proceso.
+
+        Los jobs en curso se pausan antes de su siguiente chunk (sin matar
+        procesos) y vuelven a la cola; el próximo despachador los reanuda.
+        """
+        if self._thread is not None:
+            self._stop.set()
+            self._wake.set()
+            self._thread.join()
+            self._thread = None
+        if self._executor is not None:
+            self._stop_path.touch()
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+            self._stop_path.unlink(missing_ok=True)
+        self._futures = {}
+        self._release_dispatcher()
+
+    async def submit_upload(
+        self, body: AsyncIterator[bytes], content_type: str, content_encoding: str = ""
+    ) -> Dict[str, Any]:
+        """
+        Crea un job a partir de un archivo enviado como body del request.
+
+        El body se escribe a disco a medida que llega (descomprimiéndolo si
+        viene con `Content-Encoding: gzip`), sin cargarlo en memoria.
+
+        Args:
+            body: Stream de bytes del body
+            content_type: Tipo de la entrada (ver UPLOAD_FORMATS)
+            content_encoding: 'gzip' si el body viene comprimido
+
+        Returns:
+            Estado inicial del job
+
+        Raises:
+            JobError: Formato no soportado o archivo demasiado grande
+        """
+        suffix = UPLOAD_FORMATS.get(content_type.split(";")[0].strip().lower())
+        if suffix is None:
+            raise JobError(
+                f"Content-Type no soportado: {content_type!r}. "
+                f"Usar {', '.join(UPLOAD_FORMATS)} o JSON con 'input_path'",
+                status_code=415,
+            )
+
+        job_id = uuid.uuid4().hex
+        job_dir = self.jobs_dir / job_id
+        job_dir.mkdir(parents=True)
+        input_name = f"input{suffix}"
+        decompressor = zlib.decompressobj(wbits=31) if content_encoding == "gzip" else None
+        limit = JOBS_MAX_UPLOAD_MB * 1024 * 1024
+        written = 0
+
+        def write(f, data: bytes) -> None:
+            nonlocal written
+            written += len(data)
+            if written > limit:
+                raise JobError(
+                    f"El archivo supera JOBS_MAX_UPLOAD_MB ({JOBS_MAX_UPLOAD_MB:g} MB)",
+                    status_code=413,
+                )
+            f.write(data)
+
+        try:
+            with open(job_dir / input_name, "wb") as f:
+                async for data in body:
+                    write(f, decompressor.decompress(data) if decompressor is not None else data)
+                if decompressor is not None:
+                    write(f, decompressor.flush())
+        except BaseException:
+            # Límite superado, gzip inválido o cliente desconectado a mitad de la subida
+            _remove_tree(job_dir)
+            raise
+
+        job = self._create(job_id, input_name, uploaded=True)
+        job["input_bytes"] = written
+        write_job(job_dir, job)
+        self._wake.set()
+        logger.info(f"Job {job_id} creado con un archivo de {written / 1e6:.1f} MB")
+        return job
+
+    def submit_reference(self, input_path: str) -> Dict[str, Any]:
+        """
+        Crea un job sobre un archivo que ya está en el servidor.
+
+        Args:
+            input_path: Ruta relativa a `input_dir` (o absoluta dentro de él)
+
+        Raises:
+            JobError: Ruta fuera de `input_dir` o inexistente
+        """
+        path = (self.input_dir / input_path).resolve()
+        if self.input_dir not in path.parents:
+            raise JobError(f"input_path debe estar dentro de {self.input_dir}")
+        if not path.is_file():
+            raise JobError(f"No existe el archivo: {input_path}", status_code=404)
+
+        job_id = uuid.uuid4().hex
+        (self.jobs_dir / job_id).mkdir(parents=True)
+        job = self._create(job_id, str(path), uploaded=False)
+        self._wake.set()
+        logger.info(f"Job {job_id} creado sobre {path}")
+        return job
+
+    def get(self, job_id: str) -> Dict[str, Any]:
+        """Estado de un job (incluye si se pidió su cancelación)."""
+        job_dir = self._dir(job_id)
+        job = read_job(job_dir)
+        job["cancel_requested"] = (job_dir / "cancel").exists()
+        return job
+
+    def list(self) -> List[Dict[str, Any]]:
+        """Estado de todos los jobs, del más reciente al más antiguo."""
+        if not self.jobs_dir.exists():
+            return []
+        jobs = [read_job(p.parent) for p in self.jobs_dir.glob("*/job.json")]
+        return sorted(jobs, key=lambda job: job["created_at"], reverse=True)
+
+    def cancel(self, job_id: str) -> Dict[str, Any]:
+        """
+        Pide la cancelación de un job.
+
+        Un job en cola o en ejecución se detiene antes de su siguiente chunk;
+        los chunks ya escritos se conservan para poder reanudarlo.
+        """
+        job_dir = self._dir(job_id)
+        job = read_job(job_dir)
+        if job["status"] in FINAL_STATES:
+            raise JobError(f"El job ya terminó ({job['status']})", status_code=409)
+        (job_dir / "cancel").touch()
+        if job["status"] == QUEUED:
+            job.update(status=CANCELLED, finished_at=_now())
+            write_job(job_dir, job)
+        return self.get(job_id)
+
+    def resume(self, job_id: str) -> Dict[str, Any]:
+        """Reanuda un job cancelado o fallido desde su último chunk completo."""
+        job_dir = self._dir(job_id)
+        job = read_job(job_dir)
+        if job["status"] not in (CANCELLED, FAILED):
+            raise JobError(f"Solo se reanudan jobs cancelados o fallidos ({job['status']})", 409)
+        (job_dir / "cancel").unlink(missing_ok=True)
+        job.update(status=QUEUED, finished_at=None, error=None)
+        write_job(job_dir, job)
+        self._wake.set()
+        return self.get(job_id)
+
+    def result_parts(self, job_id: str) -> List[Path]:
+        """
+        Archivos de resultados de un job terminado, en orden.
+
+        Raises:
+            JobError: Si el job todavía no terminó con éxito
+        """
+        job_dir = self._dir(job_id)
+        job = read_job(job_dir)
+        if job["status"] != SUCCEEDED:
+            raise JobError(f"El job no terminó con éxito ({job['status']})", status_code=409)
+        return [_part_path(job_dir, i) for i in range(job["chunks_completed"])]
+
+
+def iter_result(parts: List[Path], block_size: int = 1 << 20) -> Iterator[bytes]:
+    """Encadena los miembros gzip de los resultados como un solo `.csv.gz`."""
+    for part in parts:
+        with open(part, "rb") as f:
+            while block := f.read(block_size):
+                yield block
+
+
+def _remove_tree(path: Path) -> None:
+    for child in path.iterdir():
+        child.unlink()
+    path.rmdir()
+
+
+# Gestor de jobs de este proceso de la API
+job_manager = JobManager()
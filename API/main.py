@@ -1,11 +1,22 @@
 """Aplicación principal FastAPI para la API de predicción de obesidad."""
 
+import asyncio
+import os
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from loguru import logger
+from starlette.responses import Response
 
+from API.admission import AdmissionController, AdmissionMiddleware
+from API import admin, profiling
+from API.responses import FastJSONResponse
 from API.routers import router
 from API import __version__
+from mlops_obesidad.config import load_env
+
+# Cargar variables de entorno (.env) antes de leer la configuración
+load_env()
 
 # Crear aplicación FastAPI
 app = FastAPI(
@@ -16,6 +27,27 @@ app = FastAPI(
     redoc_url="/redoc",
 )
 
+# Control de admisión de los endpoints de inferencia (ver API/admission.py).
+# Se agrega antes que CORS para que las respuestas 429/503 lleven sus headers.
+_deadline_ms = float(os.getenv("ADMISSION_DEFAULT_DEADLINE_MS", "0"))
+app.state.admission = AdmissionController(
+    max_concurrency=int(os.getenv("ADMISSION_MAX_CONCURRENCY", "2")),
+    max_queue=int(os.getenv("ADMISSION_MAX_QUEUE", "64")),
+    max_queue_wait=float(os.getenv("ADMISSION_MAX_QUEUE_WAIT_MS", "1000")) / 1000,
+    rate=float(os.getenv("RATE_LIMIT_PER_SECOND", "0")),
+    burst=float(os.getenv("RATE_LIMIT_BURST", "0")) or None,
+    default_deadline=_deadline_ms / 1000 if _deadline_ms > 0 else None,
+)
+app.add_middleware(
+    AdmissionMiddleware, controller=app.state.admission, paths=("/api/v1/predict",)
+)
+
+# Profiling bajo demanda (ver API/profiling.py): solo se instala si
+# PROFILING_ENABLED=1; desactivado no agrega middleware ni endpoints
+_profiler = profiling.profiler_from_env()
+if _profiler is not None:
+    profiling.install(app, _profiler)
+
 # Configurar CORS
 app.add_middleware(
     CORSMiddleware,
@@ -28,6 +60,44 @@ app.add_middleware(
 # Incluir routers
 app.include_router(router, prefix="/api/v1", tags=["predictions"])
 
+# Endpoints de admin siempre disponibles (memoria del worker; ver API/admin.py)
+app.state.admin_token = admin.admin_token_from_env()
+app.include_router(admin.router, prefix="/api/v1/admin", tags=["admin"])
+
+# Intervalo (segundos) entre cálculos del monitor de drift
+DRIFT_INTERVAL_SECONDS = float(os.getenv("DRIFT_INTERVAL_SECONDS", "300"))
+
+# Circuit breaker del modelo: fallos consecutivos para abrirlo y ventana inicial
+MODEL_BREAKER_FAILURES = int(os.getenv("MODEL_BREAKER_FAILURES", "3"))
+MODEL_BREAKER_BACKOFF_SECONDS = float(os.getenv("MODEL_BREAKER_BACKOFF_SECONDS", "30"))
+
+# Filas del lote de calentamiento antes de reportar ready (0 = sin calentamiento)
+WARMUP_ROWS = int(os.getenv("WARMUP_ROWS", "64"))
+
+# Predicción en cascada con la primera etapa de models/cascade_stage.json
+CASCADE_ENABLED = os.getenv("CASCADE_ENABLED", "0") == "1"
+
+# Evaluación del ensamble por etapas con los umbrales de models/early_exit.json
+EARLY_EXIT_ENABLED = os.getenv("EARLY_EXIT_ENABLED", "0") == "1"
+
+# Respuesta de liveness ya serializada: el probe no construye nada por request
+_HEALTHZ_BODY = b'{"status":"ok"}'
+
+
+async def _drift_monitor_loop():
+    """Calcula periódicamente los estadísticos de drift sobre el tráfico acumulado."""
+    from mlops_obesidad.monitoring import get_drift_monitor
+
+    while True:
+        await asyncio.sleep(DRIFT_INTERVAL_SECONDS)
+        monitor = get_drift_monitor()
+        if monitor is None:
+            continue
+        try:
+            await asyncio.to_thread(monitor.compute)
+        except Exception as e:
+            logger.error(f"Error al calcular drift: {e}")
+
 
 @app.on_event("startup")
 async def startup_event():
@@ -35,20 +105,82 @@ async def startup_event():
     logger.info("Iniciando API de Predicción de Niveles de Obesidad")
     logger.info(f"Versión: {__version__}")
     
-    # Cargar modelo al iniciar
+    # Cargar modelo al iniciar (aquí se importan pandas, sklearn y XGBoost)
+    from mlops_obesidad.inference import (
+        is_model_loaded,
+        load_fallback_table,
+        model_breaker,
+        warm_up,
+    )
+    
+    model_breaker.failure_threshold = MODEL_BREAKER_FAILURES
+    model_breaker.backoff = MODEL_BREAKER_BACKOFF_SECONDS
+    
     try:
         from mlops_obesidad.inference import load_model
         load_model()
         logger.success("Modelo cargado exitosamente")
     except Exception as e:
+        model_breaker.record_failure()
         logger.error(f"Error al cargar el modelo: {e}")
-        logger.warning("La API continuará usando función dummy como fallback")
+        logger.warning("La API responderá en modo degradado con la tabla de fallback")
+    
+    # Tabla precalculada para el modo degradado (se lee una sola vez)
+    load_fallback_table()
+
+    # Primera etapa de la cascada (solo con el modelo cargado: escala a él)
+    if CASCADE_ENABLED and is_model_loaded():
+        from mlops_obesidad.inference import get_model, load_cascade_stage
+
+        load_cascade_stage(classes=list(get_model()["label_encoder"].classes_))
+
+    # Salida temprana sobre las rondas del ensamble (también para lo que escala la cascada)
+    if EARLY_EXIT_ENABLED and is_model_loaded():
+        from mlops_obesidad.inference import load_early_exit
+
+        load_early_exit()
+
+    # Predicciones de calentamiento antes de aceptar tráfico (ver /readyz). Van
+    # después de cargar la cascada y la salida temprana para calentar también
+    # esos caminos, que son los que usarán los requests
+    if is_model_loaded():
+        await asyncio.to_thread(warm_up, WARMUP_ROWS)
+
+    # Inicializar monitor de drift con el perfil de referencia del modelo
+    try:
+        from mlops_obesidad.inference import get_model
+        from mlops_obesidad.monitoring import init_drift_monitor, load_reference_profile
+        
+        try:
+            artifacts = get_model()
+        except Exception:
+            artifacts = None
+        if init_drift_monitor(load_reference_profile(artifacts)) is not None:
+            app.state.drift_task = asyncio.create_task(_drift_monitor_loop())
+    except Exception as e:
+        logger.error(f"Error al inicializar el monitor de drift: {e}")
+    
+    # Despachador de jobs asíncronos: un solo proceso lo obtiene y reanuda los
+    # pendientes (con el servidor prefork corre en un proceso aparte; ver API/jobs.py)
+    from API.jobs import JOBS_DISPATCHER, job_manager
+    
+    if JOBS_DISPATCHER:
+        job_manager.start()
 
 
 @app.on_event("shutdown")
 async def shutdown_event():
     """Evento ejecutado al cerrar la aplicación."""
     logger.info("Cerrando API de Predicción de Niveles de Obesidad")
+    
+    drift_task = getattr(app.state, "drift_task", None)
+    if drift_task is not None:
+        drift_task.cancel()
+    
+    # Si este proceso despachaba jobs, los pausa entre chunks; otro los reanuda
+    from API.jobs import job_manager
+    
+    await asyncio.to_thread(job_manager.stop)
 
 
 @app.get("/")
@@ -62,6 +194,37 @@ async def root():
     }
 
 
+@app.get("/healthz", tags=["health"], summary="Liveness probe")
+async def healthz() -> Response:
+    """
+    Liveness: el proceso responde. No consulta el modelo ni ninguna dependencia.
+    """
+    return Response(_HEALTHZ_BODY, media_type="application/json")
+
+
+@app.get("/readyz", tags=["health"], summary="Readiness probe")
+async def readyz() -> FastJSONResponse:
+    """
+    Readiness: modelo cargado, calentamiento terminado y cola de inferencia no saturada.
+
+    Responde 200 si el worker puede recibir tráfico y 503 en caso contrario,
+    con el detalle de cada condición.
+    """
+    from mlops_obesidad.inference.model_loader import is_model_loaded
+    from mlops_obesidad.inference.warmup import warmup_status
+
+    checks = {
+        "model_loaded": is_model_loaded(),
+        "warmed_up": warmup_status()["done"],
+        "queue_available": not app.state.admission.saturated(),
+    }
+    ready = all(checks.values())
+    return FastJSONResponse(
+        {"status": "ready" if ready else "not_ready", "checks": checks},
+        status_code=200 if ready else 503,
+    )
+
+
 if __name__ == "__main__":
     import uvicorn
 
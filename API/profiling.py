@@ -0,0 +1,527 @@
+"""
+Profiling bajo demanda de requests de inferencia.
+
+Opcional (`PROFILING_ENABLED=1`): si está desactivado no se instala ningún
+middleware ni endpoint y la inferencia llama directamente al threadpool de
+FastAPI, por lo que no hay costo en el camino caliente.
+
+Con profiling activo se perfila:
+
+- un request que envía el header `X-Profile` con el token de administración
+  (`PROFILING_TOKEN`); la respuesta trae `X-Profile-Id`;
+- una fracción aleatoria de los requests (`PROFILING_SAMPLE_RATE`);
+- una ventana de los próximos N requests, agregados en un solo perfil
+  (`POST /api/v1/admin/profiles/window`).
+
+El profiler es por muestreo: un hilo toma la pila de los hilos del threadpool
+que ejecutan la inferencia del request perfilado cada `PROFILING_INTERVAL_MS`
+milisegundos (`sys._current_frames()`), sin instrumentar cada llamada como
+cProfile. Cada perfil se guarda localmente como pstats (`.prof`, para
+`python -m pstats` o snakeviz) y como pilas colapsadas (`.folded`, para
+flamegraph.pl o speedscope), y se descarga con `GET /api/v1/admin/profiles/{id}`.
+
+El reporte de memoria del worker (`GET /api/v1/admin/memory`) no depende del
+profiling: está en `API/admin.py` y se monta siempre.
+"""
+
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from datetime import datetime
+import asyncio
+import contextvars
+import hmac
+import io
+import json
+import os
+from pathlib import Path
+import random
+import sys
+import threading
+import time
+import uuid
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool as _run_in_threadpool
+from fastapi.responses import FileResponse, PlainTextResponse
+from loguru import logger
+
+from API.admin import ADMIN_TOKEN_HEADER
+from mlops_obesidad.config import REPORTS_DIR
+
+PROFILE_HEADER = b"x-profile"
+PROFILE_ID_HEADER = b"x-profile-id"
+
+# Profundidad máxima de las pilas muestreadas
+MAX_STACK_DEPTH = 128
+
+# Marco de pila: (archivo, línea de la definición, función), como las claves de pstats
+Frame = Tuple[str, int, str]
+
+_current_session: contextvars.ContextVar[Optional["ProfileSession"]] = contextvars.ContextVar(
+    "profile_session", default=None
+)
+
+
+# =============================================================================
+# Sesiones y muestreo
+# =============================================================================
+
+
+@dataclass
+class ProfileSession:
+    """Muestras de uno o varios requests que se guardan como un solo perfil."""
+
+    profile_id: str
+    trigger: str
+    interval: float
+    max_requests: int = 1
+    samples: Counter = field(default_factory=Counter)
+    requests: List[Dict[str, Any]] = field(default_factory=list)
+    started_at: str = field(default_factory=lambda: datetime.utcnow().isoformat() + "Z")
+
+    @property
+    def done(self) -> bool:
+        """True cuando ya terminaron todos los requests de la sesión."""
+        return len(self.requests) >= self.max_requests
+
+
+def _stack(frame: Any, stop_code: Any) -> Tuple[Frame, ...]:
+    """Pila desde la raíz hasta `frame`, sin los marcos del threadpool y del profiler."""
+    frames = []
+    while frame is not None and len(frames) < MAX_STACK_DEPTH:
+        code = frame.f_code
+        if code is stop_code:
+            break
+        frames.append((code.co_filename, code.co_firstlineno, code.co_name))
+        frame = frame.f_back
+    frames.reverse()
+    return tuple(frames)
+
+
+class Sampler:
+    """
+    Hilo que muestrea la pila de los hilos asociados a sesiones de profiling.
+
+    Solo corre mientras hay algún hilo asociado; el resto del tiempo espera en
+    una condición sin consumir CPU.
+    """
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._threads: Dict[int, ProfileSession] = {}
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+
+    def run_attached(self, session: ProfileSession, func: Callable, *args: Any) -> Any:
+        """Ejecuta `func` en el hilo actual mientras se muestrea para `session`."""
+        ident = threading.get_ident()
+        with self._cond:
+            self._threads[ident] = session
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._loop, name="profiler", daemon=True)
+                self._thread.start()
+            self._cond.notify()
+        try:
+            return func(*args)
+        finally:
+            with self._cond:
+                self._threads.pop(ident, None)
+
+    def _loop(self) -> None:
+        stop_code = self.run_attached.__func__.__code__
+        while True:
+            with self._cond:
+                while not self._threads:
+                    self._cond.wait()
+                attached = list(self._threads.items())
+            frames = sys._current_frames()
+            for ident, session in attached:
+                frame = frames.get(ident)
+                if frame is not None:
+                    session.samples[_stack(frame, stop_code)] += 1
+            del frames
+            time.sleep(self.interval)
+
+
+# =============================================================================
+# Exportación
+# =============================================================================
+
+
+class _SampledStats:
+    """Adaptador para que pstats.Stats cargue estadísticas construidas a partir de muestras."""
+
+    def __init__(self, stats: Dict[Frame, Tuple]):
+        self.stats = stats
+
+    def create_stats(self) -> None:
+        pass
+
+
+def to_pstats(samples: Counter, interval: float) -> Dict[Frame, Tuple]:
+    """
+    Convierte muestras de pilas al formato interno de pstats.
+
+    El tiempo propio (tt) de una función es el de las muestras en que está en
+    el tope de la pila y el acumulado (ct) el de las muestras en que aparece;
+    el número de "llamadas" es el número de muestras.
+
+    Args:
+        samples: Conteo de pilas (raíz primero)
+        interval: Segundos entre muestras
+
+    Returns:
+        Diccionario {función: (cc, nc, tt, ct, callers)}
+    """
+    totals: Dict[Frame, List[float]] = defaultdict(lambda: [0, 0.0, 0.0])
+    callers: Dict[Frame, Dict[Frame, List[float]]] = defaultdict(
+        lambda: defaultdict(lambda: [0, 0.0, 0.0])
+    )
+    for stack, count in samples.items():
+        if not stack:
+            continue
+        elapsed = count * interval
+        for func in set(stack):
+            totals[func][0] += count
+            totals[func][2] += elapsed
+        totals[stack[-1]][1] += elapsed
+        for caller, callee in set(zip(stack, stack[1:])):
+            entry = callers[callee][caller]
+            entry[0] += count
+            entry[2] += elapsed
+            if callee == stack[-1]:
+                entry[1] += elapsed
+
+    return {
+        func: (
+            nc,
+            nc,
+            tt,
+            ct,
+            {
+                caller: (c_nc, c_nc, c_tt, c_ct)
+                for caller, (c_nc, c_tt, c_ct) in callers[func].items()
+            },
+        )
+        for func, (nc, tt, ct) in totals.items()
+    }
+
+
+def _frame_label(func: Frame) -> str:
+    """Etiqueta de un marco para las pilas colapsadas."""
+    filename, line, name = func
+    for marker in ("site-packages/", "/API/", "/mlops_obesidad/"):
+        if marker in filename:
+            filename = filename.split(marker, 1)[1]
+            if marker != "site-packages/":
+                filename = marker.strip("/") + "/" + filename
+            break
+    return f"{name} ({filename}:{line})"
+
+
+def to_folded(samples: Counter) -> str:
+    """Pilas colapsadas ('marco;marco;... conteo' por línea), el formato de flamegraph.pl."""
+    lines = [
+        ";".join(_frame_label(func) for func in stack) + f" {count}"
+        for stack, count in samples.most_common()
+        if stack
+    ]
+    return "\n".join(lines) + "\n"
+
+
+class ProfileStore:
+    """Perfiles guardados en disco (pstats, pilas colapsadas y metadatos JSON)."""
+
+    FORMATS = {"pstats": ".prof", "folded": ".folded"}
+
+    def __init__(self, directory: Path, max_profiles: int = 100):
+        self.directory = Path(directory)
+        self.max_profiles = max_profiles
+
+    def save(self, session: ProfileSession) -> Dict[str, Any]:
+        """Escribe los archivos del perfil y descarta los más antiguos."""
+        import pstats
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        base = self.directory / session.profile_id
+
+        stats = pstats.Stats(_SampledStats(to_pstats(session.samples, session.interval)))
+        stats.dump_stats(str(base) + self.FORMATS["pstats"])
+        (base.with_suffix(self.FORMATS["folded"])).write_text(
+            to_folded(session.samples), encoding="utf-8"
+        )
+
+        meta = {
+            "profile_id": session.profile_id,
+            "trigger": session.trigger,
+            "started_at": session.started_at,
+            "interval_ms": session.interval * 1000,
+            "samples": sum(session.samples.values()),
+            "requests": session.requests,
+        }
+        base.with_suffix(".json").write_text(json.dumps(meta, indent=2), encoding="utf-8")
+        self._prune()
+        return meta
+
+    def _prune(self) -> None:
+        metas = sorted(self.directory.glob("*.json"), key=lambda p: p.stat().st_mtime)
+        for meta_path in metas[: max(0, len(metas) - self.max_profiles)]:
+            for suffix in (".json", *self.FORMATS.values()):
+                meta_path.with_suffix(suffix).unlink(missing_ok=True)
+
+    def list(self) -> List[Dict[str, Any]]:
+        """Metadatos de los perfiles guardados, del más reciente al más antiguo."""
+        metas = sorted(self.directory.glob("*.json"), key=lambda p: p.stat().st_mtime, reverse=True)
+        return [json.loads(path.read_text(encoding="utf-8")) for path in metas]
+
+    def path(self, profile_id: str, fmt: str) -> Optional[Path]:
+        """Archivo de un perfil en el formato pedido (None si no existe)."""
+        path = self.directory / f"{Path(profile_id).name}{self.FORMATS[fmt]}"
+        return path if path.exists() else None
+
+    def text_report(self, profile_id: str, limit: int = 40) -> Optional[str]:
+        """Resumen de pstats ordenado por tiempo acumulado."""
+        import pstats
+
+        path = self.path(profile_id, "pstats")
+        if path is None:
+            return None
+        out = io.StringIO()
+        pstats.Stats(str(path), stream=out).sort_stats("cumulative").print_stats(limit)
+        return out.getvalue()
+
+
+# =============================================================================
+# Profiler, middleware y punto de entrada al threadpool
+# =============================================================================
+
+
+class RequestProfiler:
+    """Decide qué requests se perfilan y guarda los perfiles al terminar."""
+
+    def __init__(
+        self,
+        store: ProfileStore,
+        token: Optional[str] = None,
+        sample_rate: float = 0.0,
+        interval: float = 0.002,
+    ):
+        """
+        Args:
+            store: Donde se guardan los perfiles
+            token: Token de administración (header X-Profile y endpoints de admin)
+            sample_rate: Fracción de requests perfilados al azar
+            interval: Segundos entre muestras
+        """
+        self.store = store
+        self.token = token
+        self.sample_rate = sample_rate
+        self.sampler = Sampler(interval)
+        self.window: Optional[ProfileSession] = None
+        self._window_started = 0
+
+    def _new_session(self, trigger: str, max_requests: int = 1) -> ProfileSession:
+        profile_id = f"{time.strftime('%Y%m%dT%H%M%S')}-{uuid.uuid4().hex[:8]}"
+        return ProfileSession(profile_id, trigger, self.sampler.interval, max_requests)
+
+    def check_token(self, token: Optional[str]) -> bool:
+        """True si el token coincide con el de administración."""
+        return bool(self.token) and token is not None and hmac.compare_digest(token, self.token)
+
+    def start_window(self, n_requests: int) -> ProfileSession:
+        """Agrega los próximos `n_requests` requests en un solo perfil."""
+        self.window = self._new_session("window", n_requests)
+        self._window_started = 0
+        return self.window
+
+    def session_for(self, headers: Sequence[Tuple[bytes, bytes]]) -> Optional[ProfileSession]:
+        """Sesión con la que se perfila un request (None si no se perfila)."""
+        if self.window is not None:
+            session = self.window
+            self._window_started += 1
+            if self._window_started >= session.max_requests:
+                self.window = None
+            return session
+        for name, value in headers:
+            if name == PROFILE_HEADER and self.check_token(value.decode("latin-1")):
+                return self._new_session("header")
+        if self.sample_rate > 0 and random.random() < self.sample_rate:
+            return self._new_session("sample")
+        return None
+
+    async def finish(self, session: ProfileSession, path: str, status: int, elapsed: float) -> None:
+        """Registra el fin de un request y guarda el perfil si la sesión terminó."""
+        session.requests.append(
+            {"path": path, "status": status, "duration_ms": round(elapsed * 1000, 2)}
+        )
+        if session.done:
+            try:
+                meta = await asyncio.to_thread(self.store.save, session)
+                logger.info(f"Perfil guardado: {meta['profile_id']} ({meta['samples']} muestras)")
+            except Exception as e:
+                logger.error(f"Error al guardar el perfil {session.profile_id}: {e}")
+
+
+class ProfilingMiddleware:
+    """Middleware ASGI que asocia los requests elegidos a una sesión de profiling."""
+
+    def __init__(self, app: Any, profiler: RequestProfiler,
+                 paths: Sequence[str] = ("/api/v1/predict",)):
+        self.app = app
+        self.profiler = profiler
+        self.paths = tuple(paths)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not scope["path"].startswith(self.paths):
+            await self.app(scope, receive, send)
+            return
+
+        session = self.profiler.session_for(scope["headers"])
+        if session is None:
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_with_id(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                message.setdefault("headers", [])
+                message["headers"] = [
+                    *message["headers"],
+                    (PROFILE_ID_HEADER, session.profile_id.encode("latin-1")),
+                ]
+            await send(message)
+
+        token = _current_session.set(session)
+        start = time.monotonic()
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            _current_session.reset(token)
+            await self.profiler.finish(session, scope["path"], status, time.monotonic() - start)
+
+
+_profiler: Optional[RequestProfiler] = None
+
+
+async def _profiled_run_in_threadpool(func: Callable, *args: Any) -> Any:
+    """run_in_threadpool que muestrea el hilo si el request actual se está perfilando."""
+    session = _current_session.get()
+    if session is None:
+        return await _run_in_threadpool(func, *args)
+    return await _run_in_threadpool(_profiler.sampler.run_attached, session, func, *args)
+
+
+# Punto de entrada de la inferencia al threadpool: sin profiling es directamente
+# el de FastAPI; install() lo reemplaza por la versión que perfila
+run_in_threadpool = _run_in_threadpool
+
+
+# =============================================================================
+# Endpoints de administración
+# =============================================================================
+
+
+def _require_admin(request: Request, x_admin_token: Optional[str] = Header(None)) -> RequestProfiler:
+    """Dependencia que valida el token de administración."""
+    profiler: RequestProfiler = request.app.state.profiler
+    if not profiler.check_token(x_admin_token):
+        raise HTTPException(
+            status_code=403,
+            detail={
+                "error": "Forbidden",
+                "message": f"A valid {ADMIN_TOKEN_HEADER} header is required",
+                "timestamp": datetime.utcnow().isoformat() + "Z",
+            },
+        )
+    return profiler
+
+
+admin_router = APIRouter()
+
+
+@admin_router.get("/profiles", summary="Perfiles guardados")
+async def list_profiles(profiler: RequestProfiler = Depends(_require_admin)) -> List[Dict[str, Any]]:
+    """Lista los perfiles guardados en el worker, del más reciente al más antiguo."""
+    return await asyncio.to_thread(profiler.store.list)
+
+
+@admin_router.post("/profiles/window", summary="Perfilar los próximos N requests")
+async def start_profile_window(
+    requests: int = Query(10, ge=1, le=10_000, description="Requests a agregar en el perfil"),
+    profiler: RequestProfiler = Depends(_require_admin),
+) -> Dict[str, Any]:
+    """Inicia una ventana de profiling que agrega los próximos requests de inferencia."""
+    session = profiler.start_window(requests)
+    return {"profile_id": session.profile_id, "requests": requests}
+
+
+@admin_router.get("/profiles/{profile_id}", summary="Descargar un perfil")
+async def get_profile(
+    profile_id: str,
+    format: str = Query("text", pattern="^(text|pstats|folded)$"),
+    profiler: RequestProfiler = Depends(_require_admin),
+):
+    """
+    Descarga un perfil: 'pstats' (.prof), 'folded' (flamegraph) o 'text' (resumen).
+    """
+    if format == "text":
+        report = await asyncio.to_thread(profiler.store.text_report, profile_id)
+        if report is not None:
+            return PlainTextResponse(report)
+    else:
+        path = profiler.store.path(profile_id, format)
+        if path is not None:
+            return FileResponse(path, filename=path.name)
+    raise HTTPException(
+        status_code=404,
+        detail={
+            "error": "NotFound",
+            "message": f"Profile {profile_id} not found",
+            "timestamp": datetime.utcnow().isoformat() + "Z",
+        },
+    )
+
+
+def install(app: Any, profiler: RequestProfiler, paths: Sequence[str] = ("/api/v1/predict",)) -> None:
+    """
+    Activa el profiling en la aplicación: middleware, endpoints de admin y
+    muestreo de los hilos del threadpool.
+
+    Args:
+        app: Aplicación FastAPI
+        profiler: Configuración del profiler
+        paths: Prefijos de los paths que se pueden perfilar
+    """
+    global _profiler, run_in_threadpool
+
+    _profiler = profiler
+    run_in_threadpool = _profiled_run_in_threadpool
+    app.state.profiler = profiler
+    app.add_middleware(ProfilingMiddleware, profiler=profiler, paths=paths)
+    app.include_router(admin_router, prefix="/api/v1/admin", tags=["admin"])
+
+    if not profiler.token:
+        logger.warning("PROFILING_TOKEN no configurado: el header X-Profile y /admin quedan deshabilitados")
+    logger.info(
+        f"Profiling activo (muestreo {profiler.sample_rate:.2%}, intervalo "
+        f"{profiler.sampler.interval * 1000:.1f} ms, perfiles en {profiler.store.directory})"
+    )
+
+
+def profiler_from_env() -> Optional[RequestProfiler]:
+    """RequestProfiler configurado con las variables de entorno (None si está desactivado)."""
+    if os.getenv("PROFILING_ENABLED", "0").lower() not in ("1", "true", "yes"):
+        return None
+    return RequestProfiler(
+        ProfileStore(
+            Path(os.getenv("PROFILING_DIR") or REPORTS_DIR / "profiles"),
+            max_profiles=int(os.getenv("PROFILING_MAX_PROFILES", "100")),
+        ),
+        token=os.getenv("PROFILING_TOKEN") or None,
+        sample_rate=float(os.getenv("PROFILING_SAMPLE_RATE", "0")),
+        interval=float(os.getenv("PROFILING_INTERVAL_MS", "2")) / 1000,
+    )
@@ -0,0 +1,62 @@
+"""
+Serialización rápida de las respuestas de predicción.
+
+Las respuestas de los endpoints de predicción se construyen como diccionarios
+a partir de la salida del modelo (datos de confianza, sin re-validar con
+Pydantic) y se serializan con orjson cuando está instalado, o con el módulo
+json estándar en caso contrario. Los schemas de `API.schemas` se siguen usando
+como `response_model` para documentar la API.
+
+Formato compacto: con `?format=compact` o `Accept: application/vnd.obesity.compact+json`
+las probabilidades se envían como un array en el orden de `OBESITY_CLASSES`.
+"""
+
+import json
+from typing import Any, Optional
+
+from fastapi import Request
+from starlette.responses import Response
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depende del entorno
+    orjson = None
+
+COMPACT_MEDIA_TYPE = "application/vnd.obesity.compact+json"
+
+
+def dumps(content: Any) -> bytes:
+    """Serializa a JSON (bytes) con orjson si está disponible."""
+    if orjson is not None:
+        return orjson.dumps(content, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class FastJSONResponse(Response):
+    """Respuesta JSON que se serializa sin pasar por `jsonable_encoder`."""
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def wants_compact(request: Request, format: Optional[str] = None) -> bool:
+    """
+    Indica si el cliente pidió el formato compacto.
+
+    Args:
+        request: Request HTTP (se revisa el header Accept)
+        format: Valor del query param `format` ('full' o 'compact')
+
+    Returns:
+        True si se debe responder en formato compacto
+    """
+    if format is not None:
+        return format == "compact"
+    return COMPACT_MEDIA_TYPE in request.headers.get("accept", "")
+
+
+def prediction_response(content: Any, compact: bool) -> FastJSONResponse:
+    """Respuesta con el media type correspondiente al formato elegido."""
+    return FastJSONResponse(content, media_type=COMPACT_MEDIA_TYPE if compact else None)
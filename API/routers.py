@@ -1,15 +1,54 @@
 """Routers para los endpoints de la API."""
 
-from fastapi import APIRouter, HTTPException, status
+import asyncio
+import time
+
+from fastapi import APIRouter, HTTPException, Query, Request, WebSocket, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from datetime import datetime
+from typing import Any, Dict, Optional
 
 from loguru import logger
 
-from API.schemas import PredictionRequest, PredictionResponse, ErrorResponse, ErrorDetail
-from API.services import real_predict
+from API.schemas import (
+    PredictionRequest,
+    PredictionResponse,
+    ErrorResponse,
+    ErrorDetail,
+    BatchPredictionRequest,
+    BatchPredictionResponse,
+    MAX_BATCH_SIZE,
+    ExplanationResponse,
+    BatchExplanationResponse,
+    MAX_GRID_SIZE,
+    SensitivityRequest,
+    SensitivityResponse,
+)
+from API import profiling
+from API.jobs import JobError, iter_result, job_manager
+from API.responses import prediction_response, wants_compact
+from API.services import (
+    OBESITY_CLASSES,
+    predict_records,
+    explain_predict,
+    explain_predict_batch,
+    sensitivity_predict,
+)
+from API.streaming import StreamConnection, stream_batcher
+from mlops_obesidad.inference.fallback import ModelUnavailableError, model_breaker
+from mlops_obesidad.monitoring import get_drift_monitor
 
 router = APIRouter()
 
+# Query param para elegir el formato de respuesta de los endpoints de predicción
+FORMAT_QUERY = Query(
+    None,
+    pattern="^(full|compact)$",
+    description="'compact' envía las probabilidades como lista en el orden de OBESITY_CLASSES "
+    "(equivale a Accept: application/vnd.obesity.compact+json)",
+)
+
 
 @router.post(
     "/predict",
@@ -25,12 +64,16 @@ router = APIRouter()
         500: {"model": ErrorResponse, "description": "Error interno del servidor"},
     },
 )
-async def predict(request: PredictionRequest) -> PredictionResponse:
+async def predict(
+    request: PredictionRequest, http_request: Request, format: Optional[str] = FORMAT_QUERY
+):
     """
     Endpoint para realizar predicciones de niveles de obesidad.
     
     Args:
         request: Datos del individuo para la predicción
+        http_request: Request HTTP (para negociar el formato de respuesta)
+        format: 'full' (por defecto) o 'compact'
         
     Returns:
         Respuesta con la predicción y probabilidades
@@ -41,15 +84,20 @@ async def predict(request: PredictionRequest) -> PredictionResponse:
     try:
         logger.info("Recibida solicitud de predicción")
         
-        # Realizar predicción
-        response = real_predict(request)
+        compact = wants_compact(http_request, format)
+        
+        # Realizar predicción en el threadpool para no bloquear el event loop
+        # (el control de admisión limita cuántas corren a la vez)
+        records = await profiling.run_in_threadpool(predict_records, [request], compact)
         
         logger.success(
-            f"Predicción completada exitosamente: {response.prediction}"
+            f"Predicción completada exitosamente: {records[0]['prediction']}"
         )
         
-        return response
+        return prediction_response(records[0], compact)
         
+    except ModelUnavailableError as e:
+        raise _model_unavailable(e)
     except ValueError as e:
         logger.error(f"Error de validación: {str(e)}")
         raise HTTPException(
@@ -72,3 +120,510 @@ async def predict(request: PredictionRequest) -> PredictionResponse:
             },
         )
 
+
+@router.post(
+    "/predict/batch",
+    response_model=BatchPredictionResponse,
+    status_code=status.HTTP_200_OK,
+    summary="Predicciones por lote",
+    description=f"Versión por lote de /predict: todas las instancias (máximo {MAX_BATCH_SIZE}) se procesan con una sola llamada al modelo. Con formato compacto la respuesta incluye además `classes` con el orden de las probabilidades.",
+    responses={
+        400: {"model": ErrorResponse, "description": "Error de validación"},
+        503: {"model": ErrorResponse, "description": "Modelo y tabla de fallback no disponibles"},
+        500: {"model": ErrorResponse, "description": "Error interno del servidor"},
+    },
+)
+async def predict_batch(
+    request: BatchPredictionRequest, http_request: Request, format: Optional[str] = FORMAT_QUERY
+):
+    """
+    Endpoint para predicciones por lote.
+    
+    Args:
+        request: Lista de individuos (campo `instances`)
+        http_request: Request HTTP (para negociar el formato de respuesta)
+        format: 'full' (por defecto) o 'compact'
+        
+    Returns:
+        Una predicción por instancia, en el mismo orden
+    """
+    start_time = time.time()
+    try:
+        compact = wants_compact(http_request, format)
+        records = await profiling.run_in_threadpool(predict_records, request.instances, compact)
+    except ModelUnavailableError as e:
+        raise _model_unavailable(e)
+    except ValueError as e:
+        logger.error(f"Error de validación: {str(e)}")
+        raise _http_error(
+            status.HTTP_400_BAD_REQUEST, "ValidationError", "Invalid input data", str(e)
+        )
+    except Exception as e:
+        logger.error(f"Error inesperado durante la predicción por lote: {str(e)}")
+        raise _http_error(
+            status.HTTP_500_INTERNAL_SERVER_ERROR,
+            "InternalServerError",
+            "An unexpected error occurred during prediction",
+        )
+    
+    logger.info(f"Predicciones por lote completadas: {len(records)} instancias")
+    
+    content = {
+        "predictions": records,
+        "count": len(records),
+        "processing_time_ms": round((time.time() - start_time) * 1000, 2),
+    }
+    if compact:
+        content["classes"] = OBESITY_CLASSES
+    return prediction_response(content, compact)
+
+
+@router.websocket("/predict/stream")
+async def predict_stream(websocket: WebSocket, format: Optional[str] = None):
+    """
+    Canal WebSocket de predicción para formularios interactivos.
+    
+    Cada mensaje trae campos parciales o completos de PredictionRequest que se
+    acumulan por conexión; con el estado completo se responde la predicción
+    (ver API/streaming.py). El rate limit por API key del control de admisión
+    se aplica a cada mensaje.
+    
+    Args:
+        websocket: Conexión WebSocket
+        format: 'compact' para recibir las probabilidades como lista
+    """
+    await websocket.accept()
+    client = websocket.headers.get("x-api-key") or (
+        websocket.client.host if websocket.client else "anonymous"
+    )
+    connection = StreamConnection(
+        websocket,
+        stream_batcher,
+        compact=format == "compact",
+        limiter=websocket.app.state.admission.limiter,
+        client=client,
+    )
+    await connection.run()
+
+
+def _http_error(status_code: int, error: str, message: str, issue: str = None) -> HTTPException:
+    """Construye una HTTPException con el formato de ErrorResponse."""
+    detail = {
+        "error": error,
+        "message": message,
+        "timestamp": datetime.utcnow().isoformat() + "Z",
+    }
+    if issue is not None:
+        detail["details"] = {"issue": issue}
+    return HTTPException(status_code=status_code, detail=detail)
+
+
+def _model_unavailable(e: Exception) -> HTTPException:
+    """503 cuando ni el modelo ni la tabla de fallback están disponibles."""
+    logger.error(f"Predicción no disponible: {str(e)}")
+    error = _http_error(
+        status.HTTP_503_SERVICE_UNAVAILABLE,
+        "ModelUnavailable",
+        "The model is not available and no fallback table is loaded",
+    )
+    error.headers = {"Retry-After": str(max(1, round(model_breaker.retry_after())))}
+    return error
+
+
+def _explanation_error(e: Exception) -> HTTPException:
+    """Traduce un error del explicador a la respuesta HTTP correspondiente."""
+    if isinstance(e, ValueError):
+        logger.error(f"Error de validación: {str(e)}")
+        return _http_error(
+            status.HTTP_400_BAD_REQUEST, "ValidationError", "Invalid input data", str(e)
+        )
+    if isinstance(e, (RuntimeError, FileNotFoundError)):
+        logger.error(f"Modelo no disponible para explicaciones: {str(e)}")
+        return _http_error(
+            status.HTTP_503_SERVICE_UNAVAILABLE,
+            "ModelUnavailable",
+            "The model is not available to compute explanations",
+        )
+    logger.error(f"Error inesperado durante la explicación: {str(e)}")
+    return _http_error(
+        status.HTTP_500_INTERNAL_SERVER_ERROR,
+        "InternalServerError",
+        "An unexpected error occurred during explanation",
+    )
+
+
+@router.post(
+    "/predict/explain",
+    response_model=ExplanationResponse,
+    status_code=status.HTTP_200_OK,
+    summary="Predicción con explicación por feature",
+    description="Retorna la predicción junto con la contribución de cada una de las 16 features originales al margen de cada clase, calculada con las contribuciones nativas del booster XGBoost.",
+    responses={
+        400: {"model": ErrorResponse, "description": "Error de validación"},
+        503: {"model": ErrorResponse, "description": "Modelo no disponible"},
+        500: {"model": ErrorResponse, "description": "Error interno del servidor"},
+    },
+)
+async def predict_explain(request: PredictionRequest) -> ExplanationResponse:
+    """
+    Endpoint para predicciones con explicación.
+    
+    Args:
+        request: Datos del individuo para la predicción
+        
+    Returns:
+        Predicción, probabilidades y contribuciones por clase y feature
+    """
+    try:
+        return await profiling.run_in_threadpool(explain_predict, request)
+    except Exception as e:
+        raise _explanation_error(e)
+
+
+@router.post(
+    "/predict/explain/batch",
+    response_model=BatchExplanationResponse,
+    status_code=status.HTTP_200_OK,
+    summary="Predicciones con explicación por lote",
+    description="Versión por lote de /predict/explain: todas las instancias se explican con una sola llamada al modelo.",
+    responses={
+        400: {"model": ErrorResponse, "description": "Error de validación"},
+        503: {"model": ErrorResponse, "description": "Modelo no disponible"},
+        500: {"model": ErrorResponse, "description": "Error interno del servidor"},
+    },
+)
+async def predict_explain_batch(request: BatchPredictionRequest) -> BatchExplanationResponse:
+    """
+    Endpoint para explicaciones por lote.
+    
+    Args:
+        request: Lista de individuos (campo `instances`)
+        
+    Returns:
+        Una explicación por instancia, en el mismo orden
+    """
+    try:
+        return await profiling.run_in_threadpool(explain_predict_batch, request.instances)
+    except Exception as e:
+        raise _explanation_error(e)
+
+
+@router.post(
+    "/predict/sensitivity",
+    response_model=SensitivityResponse,
+    status_code=status.HTTP_200_OK,
+    summary="Curvas what-if de una feature",
+    description=(
+        "Probabilidad de cada clase para un individuo al variar una feature sobre una grilla "
+        f"(máximo {MAX_GRID_SIZE} puntos, validados contra los rangos del schema). "
+        "Toda la grilla se evalúa con una sola llamada al modelo."
+    ),
+    responses={
+        422: {"model": ErrorResponse, "description": "Feature o grilla inválida"},
+        503: {"model": ErrorResponse, "description": "Modelo no disponible"},
+        500: {"model": ErrorResponse, "description": "Error interno del servidor"},
+    },
+)
+async def predict_sensitivity(request: SensitivityRequest) -> SensitivityResponse:
+    """
+    Endpoint para curvas what-if.
+    
+    Args:
+        request: Individuo, feature que varía y grilla
+        
+    Returns:
+        Curva de probabilidad de cada clase sobre la grilla
+    """
+    try:
+        return await profiling.run_in_threadpool(sensitivity_predict, request)
+    except Exception as e:
+        raise _explanation_error(e)
+
+
+def _job_error(e: JobError) -> HTTPException:
+    """Traduce un error de un job a la respuesta HTTP correspondiente."""
+    return _http_error(e.status_code, "JobError", str(e))
+
+
+@router.post(
+    "/jobs",
+    status_code=status.HTTP_202_ACCEPTED,
+    tags=["jobs"],
+    summary="Crear un job de predicción asíncrono",
+    description=(
+        "Puntúa un archivo grande en segundo plano. El archivo se envía como body "
+        "(Content-Type text/csv, application/x-ndjson o application/vnd.apache.parquet; "
+        "admite Content-Encoding: gzip) o se referencia con JSON {\"input_path\": ...} "
+        "relativo a JOBS_INPUT_DIR. Responde de inmediato con el id del job."
+    ),
+    responses={
+        400: {"model": ErrorResponse, "description": "Entrada inválida"},
+        413: {"model": ErrorResponse, "description": "Archivo demasiado grande"},
+        415: {"model": ErrorResponse, "description": "Formato no soportado"},
+    },
+)
+async def create_job(request: Request) -> Dict[str, Any]:
+    """
+    Endpoint para crear un job de predicción.
+    
+    Args:
+        request: Request HTTP con el archivo como body o un JSON con `input_path`
+        
+    Returns:
+        Estado inicial del job (incluye su `id`)
+    """
+    content_type = request.headers.get("content-type", "")
+    try:
+        if content_type.split(";")[0].strip().lower() == "application/json":
+            body = await request.json()
+            if not isinstance(body, dict) or not isinstance(body.get("input_path"), str):
+                raise JobError("El JSON debe tener el campo 'input_path'")
+            return await run_in_threadpool(job_manager.submit_reference, body["input_path"])
+        return await job_manager.submit_upload(
+            request.stream(), content_type, request.headers.get("content-encoding", "")
+        )
+    except JobError as e:
+        raise _job_error(e)
+    except ValueError as e:
+        raise _http_error(status.HTTP_400_BAD_REQUEST, "JobError", "Invalid job request", str(e))
+
+
+@router.get("/jobs", tags=["jobs"], summary="Listar los jobs de predicción")
+async def list_jobs() -> Dict[str, Any]:
+    """
+    Endpoint con el estado de todos los jobs.
+    
+    Returns:
+        Jobs del más reciente al más antiguo
+    """
+    return {"jobs": await run_in_threadpool(job_manager.list)}
+
+
+@router.get(
+    "/jobs/{job_id}",
+    tags=["jobs"],
+    summary="Estado y progreso de un job",
+    responses={404: {"model": ErrorResponse, "description": "Job no encontrado"}},
+)
+async def get_job(job_id: str) -> Dict[str, Any]:
+    """
+    Endpoint con el estado de un job.
+    
+    Args:
+        job_id: Id del job
+        
+    Returns:
+        Estado, chunks y filas procesadas del job
+    """
+    try:
+        return job_manager.get(job_id)
+    except JobError as e:
+        raise _job_error(e)
+
+
+@router.get(
+    "/jobs/{job_id}/results",
+    tags=["jobs"],
+    summary="Descargar los resultados de un job",
+    description="CSV comprimido con gzip: número de fila, columnas extra de la entrada, predicción, confianza y probabilidad por clase.",
+    responses={
+        404: {"model": ErrorResponse, "description": "Job no encontrado"},
+        409: {"model": ErrorResponse, "description": "El job no terminó con éxito"},
+    },
+)
+async def get_job_results(job_id: str) -> StreamingResponse:
+    """
+    Endpoint para descargar los resultados de un job terminado.
+    
+    Args:
+        job_id: Id del job
+        
+    Returns:
+        Los archivos de resultados concatenados (un único .csv.gz)
+    """
+    try:
+        parts = job_manager.result_parts(job_id)
+    except JobError as e:
+        raise _job_error(e)
+    return StreamingResponse(
+        iter_result(parts),
+        media_type="application/gzip",
+        headers={"Content-Disposition": f'attachment; filename="{job_id}.csv.gz"'},
+    )
+
+
+@router.post(
+    "/jobs/{job_id}/cancel",
+    tags=["jobs"],
+    summary="Cancelar un job",
+    description="El job se detiene antes de su siguiente chunk; los chunks completos se conservan para reanudarlo.",
+    responses={
+        404: {"model": ErrorResponse, "description": "Job no encontrado"},
+        409: {"model": ErrorResponse, "description": "El job ya terminó"},
+    },
+)
+async def cancel_job(job_id: str) -> Dict[str, Any]:
+    """
+    Endpoint para cancelar un job.
+    
+    Args:
+        job_id: Id del job
+        
+    Returns:
+        Estado del job con la cancelación registrada
+    """
+    try:
+        return job_manager.cancel(job_id)
+    except JobError as e:
+        raise _job_error(e)
+
+
+@router.post(
+    "/jobs/{job_id}/resume",
+    tags=["jobs"],
+    summary="Reanudar un job cancelado o fallido",
+    description="Vuelve a encolar el job; retoma desde el último chunk completo.",
+    responses={
+        404: {"model": ErrorResponse, "description": "Job no encontrado"},
+        409: {"model": ErrorResponse, "description": "El job no está cancelado ni fallido"},
+    },
+)
+async def resume_job(job_id: str) -> Dict[str, Any]:
+    """
+    Endpoint para reanudar un job.
+    
+    Args:
+        job_id: Id del job
+        
+    Returns:
+        Estado del job, otra vez en cola
+    """
+    try:
+        return job_manager.resume(job_id)
+    except JobError as e:
+        raise _job_error(e)
+
+
+@router.get(
+    "/monitoring/drift",
+    tags=["monitoring"],
+    summary="Estado del monitor de data drift",
+    description="Retorna el último reporte de drift calculado sobre el tráfico de predicción contra el perfil de referencia del entrenamiento.",
+    responses={503: {"model": ErrorResponse, "description": "Monitor no disponible"}},
+)
+async def drift_status(refresh: bool = False) -> Dict[str, Any]:
+    """
+    Endpoint con el estado del monitor de drift.
+    
+    Args:
+        refresh: Si es True, calcula los estadísticos sobre la ventana actual
+            sin reiniciarla (no espera al siguiente cálculo periódico)
+        
+    Returns:
+        Estado del monitor y último reporte de drift
+    """
+    monitor = get_drift_monitor()
+    if monitor is None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail={
+                "error": "ServiceUnavailable",
+                "message": "Drift monitor is not enabled (no reference profile)",
+                "timestamp": datetime.utcnow().isoformat() + "Z",
+            },
+        )
+    
+    if refresh:
+        # Los tests estadísticos por feature no deben bloquear el event loop
+        await asyncio.to_thread(monitor.compute, rotate=False)
+    
+    return monitor.status()
+
+
+@router.get(
+    "/monitoring/admission",
+    tags=["monitoring"],
+    summary="Estado del control de admisión",
+    description="Inferencias en curso, cola, tiempo de servicio estimado y contadores de requests admitidos y rechazados (por worker).",
+)
+async def admission_status(request: Request) -> Dict[str, Any]:
+    """
+    Endpoint con el estado del control de admisión.
+    
+    Args:
+        request: Request HTTP (para acceder al estado de la aplicación)
+        
+    Returns:
+        Estadísticas del control de admisión del proceso
+    """
+    return request.app.state.admission.stats()
+
+
+@router.get(
+    "/monitoring/stream",
+    tags=["monitoring"],
+    summary="Estado del canal WebSocket de predicción",
+    description="Conexiones activas, mensajes predichos, cancelados por un mensaje más nuevo y tamaño medio de los lotes del micro-batcher (por worker).",
+)
+async def stream_status() -> Dict[str, Any]:
+    """
+    Endpoint con las estadísticas del canal WebSocket.
+    
+    Returns:
+        Contadores del micro-batcher del proceso
+    """
+    return stream_batcher.stats()
+
+
+@router.get(
+    "/monitoring/cache",
+    tags=["monitoring"],
+    summary="Estadísticas de las caches de inferencia",
+    description="Tamaño, aciertos y fallos de las caches de predicciones y explicaciones de este worker (las usa el router del cluster).",
+)
+async def cache_status() -> Dict[str, Any]:
+    """
+    Endpoint con las estadísticas de las caches de inferencia.
+    
+    Returns:
+        Estadísticas por cache (sin estimar su tamaño en memoria)
+    """
+    from mlops_obesidad.inference.cache import cache_stats
+    
+    return cache_stats()
+
+
+@router.get(
+    "/monitoring/model",
+    tags=["monitoring"],
+    summary="Estado del modelo y del modo degradado",
+    description="Estado del circuit breaker del modelo (closed, open, half_open), de la tabla de fallback usada en modo degradado de la predicción en cascada (requests respondidos por la primera etapa y escalados) y de la salida temprana (fracción media de árboles evaluados y salidas por etapa).",
+)
+async def model_status() -> Dict[str, Any]:
+    """
+    Endpoint con el estado del circuit breaker del modelo.
+    
+    Returns:
+        Estado del circuit breaker, de la tabla de fallback, de la cascada y
+        de la salida temprana
+    """
+    from mlops_obesidad.inference import get_cascade_stage, get_early_exit, get_fallback_table
+    
+    table = get_fallback_table()
+    stage = get_cascade_stage()
+    early_exit = get_early_exit()
+    return {
+        "circuit_breaker": model_breaker.status(),
+        "fallback_table": {
+            "loaded": table is not None,
+            "built_at": table.built_at if table is not None else None,
+        },
+        "cascade": {
+            "enabled": stage is not None,
+            **(stage.stats() if stage is not None else {}),
+        },
+        "early_exit": {
+            "enabled": early_exit is not None,
+            **(early_exit.stats() if early_exit is not None else {}),
+        },
+    }
@@ -1,11 +1,21 @@
 """Schemas Pydantic para validación de request y response."""
 
 from enum import Enum
+import math
 from datetime import datetime
-from typing import Dict, Optional, Annotated
+from typing import Any, Dict, List, Optional, Annotated, Tuple, Union
 from uuid import uuid4
 
-from pydantic import BaseModel, Field, ConfigDict
+import annotated_types
+from pydantic import BaseModel, Field, ConfigDict, model_validator
+
+
+# Número máximo de instancias por request en los endpoints por lote
+MAX_BATCH_SIZE = 1000
+
+# Puntos máximos y por defecto de la grilla de /predict/sensitivity
+MAX_GRID_SIZE = 500
+DEFAULT_GRID_POINTS = 50
 
 
 # Enums para valores categóricos
@@ -138,6 +148,11 @@ class PredictionResponse(BaseModel):
     prediction_id: str = Field(..., description="UUID único para esta predicción")
     timestamp: str = Field(..., description="Timestamp ISO 8601")
     processing_time_ms: float = Field(..., ge=0.0, description="Tiempo de procesamiento")
+    degraded: bool = Field(
+        False,
+        description="True si el modelo no estaba disponible y la predicción viene de la "
+        "tabla precalculada por BMI (modo degradado)",
+    )
 
     model_config = ConfigDict(
         json_schema_extra={
@@ -158,11 +173,210 @@ class PredictionResponse(BaseModel):
                 "prediction_id": "550e8400-e29b-41d4-a716-446655440000",
                 "timestamp": "2024-01-15T10:30:00Z",
                 "processing_time_ms": 45.2,
+                "degraded": False,
             }
         }
     )
 
 
+class BatchPredictionRequest(BaseModel):
+    """Schema para requests por lote."""
+
+    instances: List[PredictionRequest] = Field(
+        ...,
+        min_length=1,
+        max_length=MAX_BATCH_SIZE,
+        description=f"Individuos a procesar (máximo {MAX_BATCH_SIZE})",
+    )
+
+
+class BatchPredictionResponse(BaseModel):
+    """Schema para la respuesta de predicciones por lote."""
+
+    predictions: List[PredictionResponse] = Field(
+        ..., description="Predicciones en el mismo orden que las instancias"
+    )
+    count: int = Field(..., ge=0, description="Número de predicciones")
+    processing_time_ms: float = Field(..., ge=0.0, description="Tiempo de procesamiento")
+
+
+class ExplanationResponse(BaseModel):
+    """Schema para la respuesta de predicción con su explicación."""
+
+    prediction: str = Field(..., description="Clase predicha (la más probable)")
+    probabilities: PredictionProbabilities = Field(
+        ..., description="Probabilidades para cada clase"
+    )
+    confidence: float = Field(
+        ..., ge=0.0, le=1.0, description="Confianza de la predicción"
+    )
+    contributions: Dict[str, Dict[str, float]] = Field(
+        ...,
+        description="Contribución de cada feature original al margen (log-odds) de cada clase",
+    )
+    base_values: Dict[str, float] = Field(
+        ..., description="Margen base (sesgo) de cada clase"
+    )
+    model_version: str = Field(..., description="Versión del modelo utilizado")
+    model_id: str = Field(..., description="Identificador del modelo")
+    prediction_id: str = Field(..., description="UUID único para esta predicción")
+    timestamp: str = Field(..., description="Timestamp ISO 8601")
+    processing_time_ms: float = Field(..., ge=0.0, description="Tiempo de procesamiento")
+
+
+class BatchExplanationResponse(BaseModel):
+    """Schema para la respuesta de explicaciones por lote."""
+
+    explanations: List[ExplanationResponse] = Field(
+        ..., description="Explicaciones en el mismo orden que las instancias"
+    )
+    count: int = Field(..., ge=0, description="Número de explicaciones")
+    processing_time_ms: float = Field(..., ge=0.0, description="Tiempo de procesamiento")
+
+
+def feature_domain(feature: str) -> Tuple[str, Any]:
+    """
+    Dominio de una feature según los rangos de PredictionRequest.
+
+    Args:
+        feature: Nombre de la feature
+
+    Returns:
+        ('numeric', (mínimo, máximo, mínimo_inclusivo)) o ('categorical', valores)
+
+    Raises:
+        ValueError: Si la feature no existe
+    """
+    field = PredictionRequest.model_fields.get(feature)
+    if field is None:
+        raise ValueError(
+            f"Feature desconocida: {feature!r}. Opciones: {list(PredictionRequest.model_fields)}"
+        )
+    if isinstance(field.annotation, type) and issubclass(field.annotation, Enum):
+        return "categorical", [member.value for member in field.annotation]
+
+    low, high, inclusive = None, None, True
+    for constraint in field.metadata:
+        if isinstance(constraint, annotated_types.Ge):
+            low = float(constraint.ge)
+        elif isinstance(constraint, annotated_types.Gt):
+            low, inclusive = float(constraint.gt), False
+        elif isinstance(constraint, annotated_types.Le):
+            high = float(constraint.le)
+    return "numeric", (low, high, inclusive)
+
+
+class SensitivityRequest(BaseModel):
+    """
+    Schema para curvas what-if: un individuo y una grilla de valores de una feature.
+
+    La grilla es `values` explícitos o, para features numéricas, `points`
+    valores equiespaciados entre `start` y `stop` (por defecto, el rango del
+    schema). Para features categóricas la grilla por defecto son todas las
+    categorías.
+    """
+
+    instance: PredictionRequest = Field(..., description="Individuo de referencia")
+    feature: str = Field(..., description="Feature que varía (nombre de un campo de PredictionRequest)")
+    values: Optional[List[Union[float, str]]] = Field(
+        None,
+        min_length=1,
+        max_length=MAX_GRID_SIZE,
+        description=f"Valores explícitos de la grilla (máximo {MAX_GRID_SIZE})",
+    )
+    start: Optional[float] = Field(None, description="Inicio de la grilla numérica")
+    stop: Optional[float] = Field(None, description="Fin de la grilla numérica")
+    points: int = Field(
+        DEFAULT_GRID_POINTS,
+        ge=2,
+        le=MAX_GRID_SIZE,
+        description=f"Puntos de la grilla numérica entre start y stop (máximo {MAX_GRID_SIZE})",
+    )
+
+    @model_validator(mode="after")
+    def _check_grid(self) -> "SensitivityRequest":
+        """Valida la grilla contra el dominio de la feature en el schema."""
+        self.grid()
+        return self
+
+    def grid(self) -> List[Union[float, str]]:
+        """
+        Valores de la grilla, validados contra el schema.
+
+        Raises:
+            ValueError: Si la feature no existe o algún valor está fuera de su dominio
+        """
+        kind, domain = feature_domain(self.feature)
+
+        if kind == "categorical":
+            if self.start is not None or self.stop is not None:
+                raise ValueError(f"{self.feature} es categórica: usar 'values', no start/stop")
+            values = self.values if self.values is not None else domain
+            invalid = [v for v in values if v not in domain]
+            if invalid:
+                raise ValueError(f"Valores inválidos para {self.feature}: {invalid}. Opciones: {domain}")
+            return list(values)
+
+        low, high, inclusive = domain
+        if self.values is not None:
+            if self.start is not None or self.stop is not None:
+                raise ValueError("Usar 'values' o start/stop, no ambos")
+            if any(isinstance(v, str) for v in self.values):
+                raise ValueError(f"{self.feature} es numérica: los valores deben ser números")
+            values = [float(v) for v in self.values]
+        else:
+            start = self.start if self.start is not None else low
+            stop = self.stop if self.stop is not None else high
+            if not inclusive and self.start is None:
+                # Rango abierto (p. ej. Weight > 0): se empieza en el primer paso
+                start = low + (stop - low) / self.points
+            values = [start + (stop - start) * i / (self.points - 1) for i in range(self.points)]
+
+        # NaN no falla ninguna comparación de rango: se rechaza antes
+        non_finite = [v for v in values if not math.isfinite(v)]
+        if non_finite:
+            raise ValueError(f"Valores no finitos para {self.feature}: {non_finite[:5]}")
+
+        outside = [
+            v for v in values
+            if (low is not None and (v < low or (v == low and not inclusive)))
+            or (high is not None and v > high)
+        ]
+        if outside:
+            bound = f"{'[' if inclusive else '('}{low:g}, {high:g}]"
+            raise ValueError(f"Valores fuera del rango de {self.feature} {bound}: {outside[:5]}")
+        return values
+
+    model_config = ConfigDict(
+        json_schema_extra={
+            "example": {
+                "instance": PredictionRequest.model_config["json_schema_extra"]["example"],
+                "feature": "Weight",
+                "start": 50,
+                "stop": 150,
+                "points": 101,
+            }
+        }
+    )
+
+
+class SensitivityResponse(BaseModel):
+    """Schema para la respuesta de curvas what-if."""
+
+    feature: str = Field(..., description="Feature que varía")
+    grid: List[Union[float, str]] = Field(..., description="Valores evaluados, en orden")
+    baseline: Union[float, str] = Field(..., description="Valor de la feature en el individuo")
+    classes: List[str] = Field(..., description="Orden de las clases")
+    probabilities: Dict[str, List[float]] = Field(
+        ..., description="Curva de probabilidad de cada clase (un valor por punto de la grilla)"
+    )
+    predictions: List[str] = Field(..., description="Clase más probable en cada punto de la grilla")
+    model_version: str = Field(..., description="Versión del modelo utilizado")
+    model_id: str = Field(..., description="Identificador del modelo")
+    timestamp: str = Field(..., description="Timestamp ISO 8601")
+    processing_time_ms: float = Field(..., ge=0.0, description="Tiempo de procesamiento")
+
+
 # Error Schemas
 class ErrorDetail(BaseModel):
     """Detalle de error."""
@@ -0,0 +1,357 @@
+"""
+Servidor de producción multi-worker con el modelo precargado (prefork).
+
+El proceso maestro importa la aplicación, carga y calienta el modelo una sola
+vez, abre el socket de escucha y luego hace fork de N workers uvicorn que
+comparten ese socket. Las páginas del modelo se comparten copy-on-write entre
+los workers, por lo que el modelo no se duplica en memoria por cada worker.
+
+El maestro supervisa a los workers: si uno termina (por ejemplo al alcanzar
+`--max-requests`, lo que permite reciclarlos periódicamente) se crea otro en
+su lugar, también por fork desde el estado ya cargado. Un proceso más, también
+supervisado, despacha los jobs asíncronos (`API/jobs.py`).
+
+Uso:
+    python -m API.server --host 0.0.0.0 --port 8000 --workers 4 --threads-per-worker 1
+"""
+
+import gc
+import os
+import random
+import signal
+import socket
+import sys
+import time
+from typing import Dict
+
+from loguru import logger
+import typer
+
+app = typer.Typer()
+
+# Índice con el que el maestro identifica al proceso de jobs
+JOBS_PROCESS = -1
+
+
+def _bind_socket(host: str, port: int, backlog: int) -> socket.socket:
+    """Abre el socket de escucha compartido por todos los workers."""
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+def set_model_threads(n_threads: int) -> None:
+    """
+    Fija el número de hilos de XGBoost del modelo cargado.
+
+    Args:
+        n_threads: Hilos OpenMP que usará el booster en cada predicción
+    """
+    from mlops_obesidad.inference import get_model
+
+    classifier = get_model()["model"].named_steps["classifier"]
+    classifier.set_params(n_jobs=n_threads)
+    classifier.get_booster().set_param({"nthread": n_threads})
+
+
+def preload_model(warmup_rows: int = 64) -> None:
+    """
+    Carga el modelo en el proceso maestro y ejecuta predicciones de calentamiento.
+
+    El calentamiento usa un solo hilo: el runtime de OpenMP no es seguro ante
+    fork si el proceso padre ya creó su pool de hilos. Cada worker vuelve a
+    calentar el modelo en su arranque, ya con sus propios hilos.
+
+    Args:
+        warmup_rows: Filas representativas a puntuar para calentar el pipeline
+    """
+    from mlops_obesidad.inference import load_model, warm_up
+
+    load_model()
+    set_model_threads(1)
+    warm_up(warmup_rows)
+
+
+def _configure_worker(index: int, threads_per_worker: int, pin_cpus: bool) -> None:
+    """Configuración del proceso worker recién creado (hilos y afinidad de CPU)."""
+    if pin_cpus and hasattr(os, "sched_setaffinity"):
+        cpus = sorted(os.sched_getaffinity(0))
+        start = (index * threads_per_worker) % len(cpus)
+        assigned = {cpus[(start + i) % len(cpus)] for i in range(threads_per_worker)}
+        os.sched_setaffinity(0, assigned)
+        logger.info(f"Worker {index} fijado a las CPUs {sorted(assigned)}")
+
+    from mlops_obesidad.inference import is_model_loaded
+
+    # Sin modelo precargado el worker sirve igual: el startup de la app
+    # reintenta la carga y, si falla, queda en modo degradado
+    if is_model_loaded():
+        set_model_threads(threads_per_worker)
+    else:
+        logger.warning(f"Worker {index} sin modelo precargado; no se fijan los hilos de XGBoost")
+
+
+def _run_worker(
+    index: int,
+    sock: socket.socket,
+    threads_per_worker: int,
+    pin_cpus: bool,
+    max_requests: int,
+    max_requests_jitter: int,
+    log_level: str,
+) -> None:
+    """Cuerpo del proceso worker: sirve la aplicación sobre el socket heredado."""
+    import uvicorn
+
+    from API.main import app as asgi_app
+
+    # Restaurar señales por defecto; uvicorn instala sus propios handlers
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    random.seed()
+
+    _configure_worker(index, threads_per_worker, pin_cpus)
+
+    limit = None
+    if max_requests > 0:
+        limit = max_requests + random.randint(0, max(max_requests_jitter, 0))
+
+    config = uvicorn.Config(
+        asgi_app,
+        log_level=log_level,
+        limit_max_requests=limit,
+        timeout_graceful_shutdown=30,
+    )
+    server = uvicorn.Server(config)
+    server.run(sockets=[sock])
+
+
+def _process_name(index: int) -> str:
+    return "Proceso de jobs" if index == JOBS_PROCESS else f"Worker {index}"
+
+
+def _run_jobs_process() -> None:
+    """Cuerpo del proceso de jobs: despacha los jobs asíncronos hasta recibir SIGTERM."""
+    import threading
+
+    from API.jobs import job_manager
+
+    stop = threading.Event()
+    signal.signal(signal.SIGTERM, lambda signum, frame: stop.set())
+    signal.signal(signal.SIGINT, lambda signum, frame: stop.set())
+
+    job_manager.start()
+    while not stop.wait(1.0):
+        pass
+    job_manager.stop()
+
+
+class PreforkMaster:
+    """
+    Proceso maestro que crea, supervisa y recicla a los workers.
+
+    Además de los workers mantiene un proceso de jobs (`JOBS_PROCESS`) que es el
+    único dueño del pool de jobs asíncronos, para que reciclar un worker no
+    interrumpa los jobs en curso.
+    """
+
+    def __init__(
+        self,
+        sock: socket.socket,
+        workers: int,
+        threads_per_worker: int = 1,
+        pin_cpus: bool = False,
+        max_requests: int = 0,
+        max_requests_jitter: int = 0,
+        log_level: str = "info",
+        jobs_process: bool = True,
+    ):
+        self.sock = sock
+        self.workers = workers
+        self.threads_per_worker = threads_per_worker
+        self.pin_cpus = pin_cpus
+        self.max_requests = max_requests
+        self.max_requests_jitter = max_requests_jitter
+        self.log_level = log_level
+        self.jobs_process = jobs_process
+        self.children: Dict[int, int] = {}  # pid -> índice del worker
+        self.shutting_down = False
+
+    def spawn(self, index: int) -> int:
+        """Crea el worker `index` (o el proceso de jobs) por fork y retorna su pid."""
+        pid = os.fork()
+        if pid == 0:
+            exit_code = 0
+            try:
+                if index == JOBS_PROCESS:
+                    self.sock.close()
+                    _run_jobs_process()
+                else:
+                    _run_worker(
+                        index,
+                        self.sock,
+                        self.threads_per_worker,
+                        self.pin_cpus,
+                        self.max_requests,
+                        self.max_requests_jitter,
+                        self.log_level,
+                    )
+            except Exception as e:
+                logger.error(f"{_process_name(index)} terminó con error: {e}")
+                exit_code = 1
+            finally:
+                os._exit(exit_code)
+        self.children[pid] = index
+        logger.info(f"{_process_name(index)} iniciado (pid {pid})")
+        return pid
+
+    def _handle_stop(self, signum, frame) -> None:
+        """Handler de SIGTERM/SIGINT: detiene a los workers y deja de reciclarlos."""
+        self.shutting_down = True
+        for pid in list(self.children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    def run(self) -> None:
+        """Crea los workers y los supervisa hasta recibir una señal de parada."""
+        signal.signal(signal.SIGTERM, self._handle_stop)
+        signal.signal(signal.SIGINT, self._handle_stop)
+
+        if self.jobs_process:
+            self.spawn(JOBS_PROCESS)
+        for index in range(self.workers):
+            self.spawn(index)
+
+        while self.children:
+            try:
+                pid, status = os.wait()
+            except ChildProcessError:
+                break
+            except InterruptedError:
+                continue
+            index = self.children.pop(pid, None)
+            if index is None:
+                continue
+            code = os.waitstatus_to_exitcode(status)
+            if self.shutting_down:
+                logger.info(f"{_process_name(index)} (pid {pid}) detenido")
+                continue
+            logger.info(f"{_process_name(index)} (pid {pid}) terminó con código {code}; reciclando")
+            if code != 0:
+                # Evitar un ciclo de reinicios inmediato si el worker falla al arrancar
+                time.sleep(1)
+            self.spawn(index)
+
+        self.sock.close()
+        logger.info("Servidor detenido")
+
+
+def serve(
+    host: str = "0.0.0.0",
+    port: int = 8000,
+    workers: int = 1,
+    threads_per_worker: int = 1,
+    pin_cpus: bool = False,
+    max_requests: int = 0,
+    max_requests_jitter: int = 0,
+    backlog: int = 2048,
+    log_level: str = "info",
+) -> None:
+    """
+    Carga el modelo, abre el socket y ejecuta el maestro prefork.
+
+    Args:
+        host: Dirección de escucha
+        port: Puerto de escucha
+        workers: Número de procesos worker
+        threads_per_worker: Hilos OpenMP de XGBoost por worker
+        pin_cpus: Fijar cada worker a un subconjunto disjunto de CPUs
+        max_requests: Requests tras los cuales se recicla un worker (0 = nunca)
+        max_requests_jitter: Aleatoriedad añadida a `max_requests` por worker
+        backlog: Tamaño de la cola de conexiones del socket
+        log_level: Nivel de log de uvicorn
+    """
+    from mlops_obesidad.config import load_env
+
+    load_env()
+
+    # Los workers no despachan jobs: lo hace el proceso de jobs del maestro
+    os.environ["JOBS_DISPATCHER"] = "0"
+
+    # Importar la app en el maestro para que los workers hereden todo el código cargado
+    import API.main  # noqa: F401
+
+    start = time.perf_counter()
+    try:
+        preload_model()
+        logger.success(f"Modelo precargado y calentado en {time.perf_counter() - start:.2f} s")
+    except Exception as e:
+        logger.error(f"Error al precargar el modelo: {e}")
+        logger.warning("Cada worker reintentará la carga al arrancar y, si falla, servirá en modo degradado")
+
+    # Mover los objetos ya creados a la generación permanente del GC para que las
+    # recolecciones en los workers no escriban en sus páginas (rompiendo el COW)
+    gc.collect()
+    gc.freeze()
+
+    sock = _bind_socket(host, port, backlog)
+    logger.info(
+        f"Escuchando en {host}:{port} con {workers} workers "
+        f"({threads_per_worker} hilos XGBoost por worker)"
+    )
+    PreforkMaster(
+        sock,
+        workers=workers,
+        threads_per_worker=threads_per_worker,
+        pin_cpus=pin_cpus,
+        max_requests=max_requests,
+        max_requests_jitter=max_requests_jitter,
+        log_level=log_level,
+    ).run()
+
+
+@app.command()
+def main(
+    host: str = typer.Option(os.getenv("HOST", "0.0.0.0"), help="Dirección de escucha"),
+    port: int = typer.Option(int(os.getenv("PORT", "8000")), help="Puerto de escucha"),
+    workers: int = typer.Option(
+        int(os.getenv("WEB_CONCURRENCY", str(os.cpu_count() or 1))), help="Procesos worker"
+    ),
+    threads_per_worker: int = typer.Option(
+        int(os.getenv("THREADS_PER_WORKER", "1")), help="Hilos OpenMP de XGBoost por worker"
+    ),
+    pin_cpus: bool = typer.Option(False, help="Fijar cada worker a CPUs dedicadas"),
+    max_requests: int = typer.Option(
+        int(os.getenv("MAX_REQUESTS", "0")), help="Reciclar el worker tras N requests (0 = nunca)"
+    ),
+    max_requests_jitter: int = typer.Option(
+        int(os.getenv("MAX_REQUESTS_JITTER", "0")), help="Aleatoriedad añadida a max-requests"
+    ),
+    backlog: int = 2048,
+    log_level: str = "info",
+):
+    """Servidor de producción: modelo precargado y N workers por fork."""
+    if sys.platform == "win32":
+        raise typer.BadParameter("El modo prefork requiere os.fork (Linux/macOS)")
+
+    serve(
+        host=host,
+        port=port,
+        workers=workers,
+        threads_per_worker=threads_per_worker,
+        pin_cpus=pin_cpus,
+        max_requests=max_requests,
+        max_requests_jitter=max_requests_jitter,
+        backlog=backlog,
+        log_level=log_level,
+    )
+
+
+if __name__ == "__main__":
+    app()
@@ -1,14 +1,26 @@
 """Servicios de predicción del modelo."""
 
 import time
-import random
-from typing import Dict
+from typing import Any, Dict, List, Sequence, Tuple
 from uuid import uuid4
 from datetime import datetime
 
 from loguru import logger
 
-from API.schemas import PredictionRequest, PredictionResponse, PredictionProbabilities
+from API.schemas import (
+    PredictionRequest,
+    PredictionProbabilities,
+    ExplanationResponse,
+    BatchExplanationResponse,
+    SensitivityRequest,
+    SensitivityResponse,
+)
+from mlops_obesidad.inference.fallback import (
+    ModelUnavailableError,
+    get_fallback_table,
+    model_breaker,
+)
+from mlops_obesidad.monitoring import get_drift_monitor
 
 
 # Clases de predicción posibles
@@ -30,190 +42,275 @@ MODEL_VERSION = "1.0.0"
 MODEL_ID = "obesity-classifier-v1"
 
 
-def dummy_predict(request: PredictionRequest) -> PredictionResponse:
+def degraded_predict(request: PredictionRequest) -> Tuple[str, Dict[str, float]]:
     """
-    Función dummy que simula una predicción del modelo.
+    Predicción en modo degradado con la tabla precalculada en entrenamiento.
     
-    Esta función genera predicciones aleatorias pero realistas mientras
-    el modelo real está en desarrollo. Será reemplazada cuando el modelo
-    esté listo.
+    Es determinista y no toca el artefacto del modelo (ver
+    `mlops_obesidad.inference.fallback`).
     
     Args:
         request: Datos de entrada para la predicción
         
     Returns:
-        Respuesta con la predicción y probabilidades
+        Tupla (clase más probable, probabilidades por clase)
+        
+    Raises:
+        ModelUnavailableError: Si tampoco hay tabla de fallback
+    """
+    table = get_fallback_table()
+    if table is None:
+        raise ModelUnavailableError("Modelo no disponible y sin tabla de fallback")
+    return table.lookup(request)
+
+
+def _model_failed(e: Exception) -> None:
+    """Registra un fallo del modelo en el circuit breaker (sin stack trace)."""
+    if isinstance(e, ModelUnavailableError):
+        # Carga fallida (ya registrada) o circuito abierto: no es un fallo nuevo
+        logger.warning(f"{e}; respondiendo en modo degradado")
+    else:
+        model_breaker.record_failure()
+        logger.error(f"Error durante predicción real: {e}; respondiendo en modo degradado")
+
+
+def prediction_record(
+    prediction: str,
+    probabilities: Dict[str, float],
+    timestamp: str,
+    processing_time: float,
+    compact: bool = False,
+    degraded: bool = False,
+) -> Dict[str, Any]:
+    """
+    Construye una respuesta de predicción como diccionario, sin validación.
+    
+    Tiene los mismos campos que `PredictionResponse`; se usa con la salida del
+    modelo, que ya cumple el schema, para no pagar la validación de Pydantic
+    en cada respuesta.
+    
+    Args:
+        prediction: Clase predicha
+        probabilities: Probabilidad por clase
+        timestamp: Timestamp ISO 8601
+        processing_time: Tiempo de procesamiento en milisegundos
+        compact: Si es True, las probabilidades van como lista en el orden
+            de OBESITY_CLASSES
+        degraded: Si la predicción viene de la tabla de fallback
+        
+    Returns:
+        Diccionario listo para serializar
+    """
+    if compact:
+        probs = [float(probabilities.get(cls, 0.0)) for cls in OBESITY_CLASSES]
+    else:
+        probs = {cls: float(probabilities.get(cls, 0.0)) for cls in OBESITY_CLASSES}
+    
+    return {
+        "prediction": prediction,
+        "probabilities": probs,
+        "confidence": round(float(probabilities[prediction]), 4),
+        "model_version": MODEL_VERSION,
+        "model_id": MODEL_ID,
+        "prediction_id": str(uuid4()),
+        "timestamp": timestamp,
+        "processing_time_ms": round(processing_time, 2),
+        "degraded": degraded,
+    }
+
+
+def predict_records(
+    requests: Sequence[PredictionRequest], compact: bool = False
+) -> List[Dict[str, Any]]:
+    """
+    Predicciones para uno o más requests en el formato de respuesta de la API.
+    
+    Camino rápido de `/predict` y `/predict/batch`: una sola llamada al modelo
+    para todo el lote y respuestas construidas como diccionarios. Si el modelo
+    no está disponible responde en modo degradado con la tabla de fallback.
+    
+    Args:
+        requests: Datos de entrada
+        compact: Si es True, probabilidades como lista (ver `prediction_record`)
+        
+    Returns:
+        Una respuesta por request, en el mismo orden
+        
+    Raises:
+        ModelUnavailableError: Si el modelo falla y no hay tabla de fallback
     """
     start_time = time.time()
     
-    logger.info(f"Procesando predicción para: Age={request.Age}, Weight={request.Weight}")
+    drift_monitor = get_drift_monitor()
+    if drift_monitor is not None:
+        for request in requests:
+            drift_monitor.observe(request)
     
-    # Generar probabilidades dummy basadas en algunas características
-    # Esto es solo para simulación - el modelo real usará todas las features
-    probabilities = _generate_dummy_probabilities(request)
+    degraded = False
+    try:
+        from mlops_obesidad.inference import predict_batch
+        
+        results = [(label, probs) for label, _, probs in predict_batch(requests)]
+        model_breaker.record_success()
+    except Exception as e:
+        _model_failed(e)
+        results = [degraded_predict(request) for request in requests]
+        degraded = True
     
-    # Obtener la clase con mayor probabilidad
-    prediction = max(probabilities.items(), key=lambda x: x[1])[0]
-    confidence = probabilities[prediction]
+    timestamp = datetime.utcnow().isoformat() + "Z"
+    elapsed = (time.time() - start_time) * 1000 / len(results)
     
-    # Calcular tiempo de procesamiento
-    processing_time = (time.time() - start_time) * 1000  # en milisegundos
+    return [
+        prediction_record(label, probs, timestamp, elapsed, compact, degraded)
+        for label, probs in results
+    ]
+
+
+def _build_explanation(
+    probabilities, contributions, bias, class_names, timestamp: str, processing_time: float
+) -> ExplanationResponse:
+    """Construye la respuesta de explicación a partir de los arrays del explicador."""
+    from mlops_obesidad.config import FEATURE_COLUMNS
     
-    # Crear respuesta
-    response = PredictionResponse(
-        prediction=prediction,
-        probabilities=PredictionProbabilities(**probabilities),
-        confidence=round(confidence, 2),
+    probabilities_dict = {cls: 0.0 for cls in OBESITY_CLASSES}
+    probabilities_dict.update(
+        {name: float(prob) for name, prob in zip(class_names, probabilities)}
+    )
+    best = int(probabilities.argmax())
+    
+    return ExplanationResponse(
+        prediction=class_names[best],
+        probabilities=PredictionProbabilities(**probabilities_dict),
+        confidence=round(float(probabilities[best]), 4),
+        contributions={
+            name: {
+                feature: float(value)
+                for feature, value in zip(FEATURE_COLUMNS, contributions[k])
+            }
+            for k, name in enumerate(class_names)
+        },
+        base_values={name: float(bias[k]) for k, name in enumerate(class_names)},
         model_version=MODEL_VERSION,
         model_id=MODEL_ID,
         prediction_id=str(uuid4()),
-        timestamp=datetime.utcnow().isoformat() + "Z",
+        timestamp=timestamp,
         processing_time_ms=round(processing_time, 2),
     )
+
+
+def explain_predict(request: PredictionRequest) -> ExplanationResponse:
+    """
+    Predicción con explicación por feature usando el modelo entrenado.
+    
+    A diferencia de `predict_records`, no hay modo degradado: una explicación
+    solo tiene sentido sobre el modelo real.
+    
+    Args:
+        request: Datos de entrada para la predicción
+        
+    Returns:
+        Respuesta con la predicción y las contribuciones por clase y feature
+        
+    Raises:
+        RuntimeError: Si el modelo no está disponible
+    """
+    start_time = time.time()
+    
+    from mlops_obesidad.inference import explain_single, get_model
     
-    logger.info(
-        f"Predicción completada: {prediction} (confianza: {confidence:.2f})"
+    class_names = list(get_model()['label_encoder'].classes_)
+    probabilities, contributions, bias = explain_single(request)
+    
+    response = _build_explanation(
+        probabilities,
+        contributions,
+        bias,
+        class_names,
+        timestamp=datetime.utcnow().isoformat() + "Z",
+        processing_time=(time.time() - start_time) * 1000,
     )
     
+    logger.info(f"Explicación completada: {response.prediction}")
+    
     return response
 
 
-def _generate_dummy_probabilities(request: PredictionRequest) -> Dict[str, float]:
+def explain_predict_batch(requests: List[PredictionRequest]) -> BatchExplanationResponse:
     """
-    Genera probabilidades dummy basadas en características básicas.
+    Predicciones con explicación para un lote, con una sola llamada al modelo.
     
-    Esta función simula un modelo que considera BMI y algunas características
-    para generar probabilidades realistas.
+    Args:
+        requests: Lista de datos de entrada
+        
+    Returns:
+        Respuesta con una explicación por instancia, en el mismo orden
+        
+    Raises:
+        RuntimeError: Si el modelo no está disponible
     """
-    # Calcular BMI aproximado
-    bmi = request.Weight / (request.Height ** 2)
-    
-    # Inicializar probabilidades base
-    probs = {cls: 0.0 for cls in OBESITY_CLASSES}
-    
-    # Asignar probabilidades basadas en BMI (simplificado)
-    if bmi < 18.5:
-        probs["Insufficient_Weight"] = 0.7
-        probs["Normal_Weight"] = 0.2
-        probs["Overweight_Level_I"] = 0.05
-        probs["Overweight_Level_II"] = 0.03
-        probs["Obesity_Type_I"] = 0.01
-        probs["Obesity_Type_II"] = 0.01
-        probs["Obesity_Type_III"] = 0.00
-    elif bmi < 25:
-        probs["Insufficient_Weight"] = 0.05
-        probs["Normal_Weight"] = 0.75
-        probs["Overweight_Level_I"] = 0.12
-        probs["Overweight_Level_II"] = 0.05
-        probs["Obesity_Type_I"] = 0.02
-        probs["Obesity_Type_II"] = 0.01
-        probs["Obesity_Type_III"] = 0.00
-    elif bmi < 30:
-        probs["Insufficient_Weight"] = 0.02
-        probs["Normal_Weight"] = 0.15
-        probs["Overweight_Level_I"] = 0.50
-        probs["Overweight_Level_II"] = 0.25
-        probs["Obesity_Type_I"] = 0.05
-        probs["Obesity_Type_II"] = 0.02
-        probs["Obesity_Type_III"] = 0.01
-    elif bmi < 35:
-        probs["Insufficient_Weight"] = 0.00
-        probs["Normal_Weight"] = 0.05
-        probs["Overweight_Level_I"] = 0.15
-        probs["Overweight_Level_II"] = 0.20
-        probs["Obesity_Type_I"] = 0.45
-        probs["Obesity_Type_II"] = 0.10
-        probs["Obesity_Type_III"] = 0.05
-    elif bmi < 40:
-        probs["Insufficient_Weight"] = 0.00
-        probs["Normal_Weight"] = 0.02
-        probs["Overweight_Level_I"] = 0.05
-        probs["Overweight_Level_II"] = 0.10
-        probs["Obesity_Type_I"] = 0.20
-        probs["Obesity_Type_II"] = 0.45
-        probs["Obesity_Type_III"] = 0.18
-    else:
-        probs["Insufficient_Weight"] = 0.00
-        probs["Normal_Weight"] = 0.00
-        probs["Overweight_Level_I"] = 0.02
-        probs["Overweight_Level_II"] = 0.05
-        probs["Obesity_Type_I"] = 0.10
-        probs["Obesity_Type_II"] = 0.20
-        probs["Obesity_Type_III"] = 0.63
+    start_time = time.time()
     
-    # Añadir algo de variabilidad aleatoria para simular incertidumbre del modelo
-    for cls in probs:
-        noise = random.uniform(-0.05, 0.05)
-        probs[cls] = max(0.0, min(1.0, probs[cls] + noise))
+    from mlops_obesidad.inference import explain_batch, get_model
     
-    # Normalizar para que sumen 1.0
-    total = sum(probs.values())
-    if total > 0:
-        probs = {k: v / total for k, v in probs.items()}
+    class_names = list(get_model()['label_encoder'].classes_)
+    results = explain_batch(requests)
     
-    return probs
+    timestamp = datetime.utcnow().isoformat() + "Z"
+    elapsed = (time.time() - start_time) * 1000
+    explanations = [
+        _build_explanation(
+            probabilities, contributions, bias, class_names, timestamp, elapsed / len(results)
+        )
+        for probabilities, contributions, bias in results
+    ]
+    
+    logger.info(f"Explicaciones por lote completadas: {len(explanations)} instancias")
+    
+    return BatchExplanationResponse(
+        explanations=explanations,
+        count=len(explanations),
+        processing_time_ms=round((time.time() - start_time) * 1000, 2),
+    )
 
 
-def real_predict(request: PredictionRequest) -> PredictionResponse:
+def sensitivity_predict(request: SensitivityRequest) -> SensitivityResponse:
     """
-    Función para predicción real con el modelo entrenado.
+    Curvas what-if: probabilidades de cada clase al variar una feature.
+    
+    Toda la grilla se evalúa con una sola llamada al modelo. Como las
+    explicaciones, no tiene modo degradado.
     
     Args:
-        request: Datos de entrada para la predicción
+        request: Individuo, feature y grilla (ya validada contra el schema)
         
     Returns:
-        Respuesta con la predicción y probabilidades
+        Respuesta con una curva de probabilidad por clase
         
     Raises:
-        RuntimeError: Si el modelo no está cargado
-        Exception: Si hay error durante la predicción
+        RuntimeError: Si el modelo no está disponible
     """
     start_time = time.time()
     
-    logger.info(f"Procesando predicción real para: Age={request.Age}, Weight={request.Weight}")
+    from mlops_obesidad.inference import predict_grid
     
-    try:
-        # Importar funciones de inferencia
-        from mlops_obesidad.inference import predict_single
-        
-        # Realizar predicción
-        prediction_label, probabilities_array, probabilities_dict = predict_single(request)
-        
-        # Obtener confianza (probabilidad máxima)
-        confidence = max(probabilities_dict.values())
-        
-        # Asegurar que todas las clases estén en el diccionario
-        # (por si el modelo tiene un orden diferente)
-        complete_probabilities = {cls: 0.0 for cls in OBESITY_CLASSES}
-        complete_probabilities.update(probabilities_dict)
-        
-        # Calcular tiempo de procesamiento
-        processing_time = (time.time() - start_time) * 1000  # en milisegundos
-        
-        # Crear respuesta
-        response = PredictionResponse(
-            prediction=prediction_label,
-            probabilities=PredictionProbabilities(**complete_probabilities),
-            confidence=round(confidence, 4),
-            model_version=MODEL_VERSION,
-            model_id=MODEL_ID,
-            prediction_id=str(uuid4()),
-            timestamp=datetime.utcnow().isoformat() + "Z",
-            processing_time_ms=round(processing_time, 2),
-        )
-        
-        logger.success(
-            f"Predicción real completada: {prediction_label} (confianza: {confidence:.4f})"
-        )
-        
-        return response
-        
-    except RuntimeError as e:
-        logger.error(f"Error: Modelo no disponible - {e}")
-        logger.warning("Usando función dummy como fallback")
-        return dummy_predict(request)
-    except Exception as e:
-        logger.error(f"Error durante predicción real: {e}")
-        logger.warning("Usando función dummy como fallback")
-        return dummy_predict(request)
-
+    grid = request.grid()
+    pred_proba, class_names = predict_grid(request.instance, request.feature, grid)
+    
+    baseline = getattr(request.instance, request.feature)
+    curves = pred_proba.T.round(6)
+    response = SensitivityResponse(
+        feature=request.feature,
+        grid=grid,
+        baseline=getattr(baseline, "value", baseline),
+        classes=class_names,
+        probabilities={name: curves[k].tolist() for k, name in enumerate(class_names)},
+        predictions=[class_names[k] for k in pred_proba.argmax(axis=1)],
+        model_version=MODEL_VERSION,
+        model_id=MODEL_ID,
+        timestamp=datetime.utcnow().isoformat() + "Z",
+        processing_time_ms=round((time.time() - start_time) * 1000, 2),
+    )
+    
+    logger.info(f"Curvas what-if de {request.feature}: {len(grid)} puntos")
+    
+    return response
@@ -0,0 +1,266 @@
+"""
+Canal WebSocket de predicción para clientes interactivos.
+
+Un formulario que re-evalúa en cada cambio de campo abre una sola conexión a
+`/api/v1/predict/stream` y envía solo los campos que cambiaron:
+
+- Cada mensaje es un objeto JSON con campos de `PredictionRequest` (parciales
+  o completos), que se acumulan en el estado de la conexión. Claves de
+  control opcionales: `id` (se devuelve en la respuesta) y `reset` (vacía el
+  estado antes de aplicar los campos).
+- Mientras faltan campos se responde `{"type": "partial", "missing": [...]}`;
+  con el estado completo, `{"type": "prediction", "result": {...}}` con el
+  mismo contenido que `/predict` (o el formato compacto con `?format=compact`).
+- Un mensaje que cambia el estado cancela la predicción pendiente de la misma
+  conexión: el cliente nunca recibe resultados de un estado ya reemplazado.
+  Un mensaje inválido no cambia el estado (se responde `{"type": "error"}`).
+
+Las predicciones de todas las conexiones pasan por un `MicroBatcher`: los
+requests que llegan mientras se ejecuta un lote (o durante `max_wait`) se
+evalúan juntos con una sola llamada a `predict_records`.
+"""
+
+from collections import Counter
+import asyncio
+from typing import Any, Dict, List, Optional, Tuple
+
+from fastapi import WebSocket, WebSocketDisconnect
+from loguru import logger
+from pydantic import ValidationError
+
+from API import profiling
+from API.responses import dumps
+from API.schemas import MAX_BATCH_SIZE, PredictionRequest
+from API.services import predict_records
+from mlops_obesidad.inference.fallback import ModelUnavailableError
+
+# Claves de control de los mensajes (no son campos del request)
+CONTROL_KEYS = {"id", "reset"}
+
+# Espera máxima para juntar un lote cuando no hay otro en ejecución
+DEFAULT_MAX_WAIT = 0.002
+
+_PendingItem = Tuple[PredictionRequest, bool, asyncio.Future]
+
+
+class MicroBatcher:
+    """
+    Agrupa predicciones concurrentes en lotes para `predict_records`.
+
+    Se ejecuta un solo lote a la vez: lo que llega mientras tanto forma el
+    siguiente, por lo que el tamaño de los lotes crece con la carga. Los
+    requests cancelados antes de que su lote se ejecute no llegan al modelo.
+    """
+
+    def __init__(self, max_batch: int = MAX_BATCH_SIZE, max_wait: float = DEFAULT_MAX_WAIT):
+        """
+        Args:
+            max_batch: Requests máximos por lote
+            max_wait: Segundos que se espera a más requests antes de un lote
+        """
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self._pending: List[_PendingItem] = []
+        self._task: Optional[asyncio.Task] = None
+        self.counters: Counter = Counter(
+            dict.fromkeys(
+                ["connections_opened", "connections_closed", "submitted", "predicted", "batches",
+                 "cancelled", "superseded", "disconnected"],
+                0,
+            )
+        )
+
+    async def predict(self, request: PredictionRequest, compact: bool = False) -> Dict[str, Any]:
+        """
+        Encola un request y espera su predicción.
+
+        Raises:
+            ModelUnavailableError: Si el modelo falla y no hay tabla de fallback
+        """
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((request, compact, future))
+        self.counters["submitted"] += 1
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._drain())
+        return await future
+
+    async def _drain(self) -> None:
+        """Ejecuta lotes hasta vaciar la cola."""
+        while self._pending:
+            if len(self._pending) < self.max_batch:
+                await asyncio.sleep(self.max_wait)
+            batch, self._pending = self._pending[: self.max_batch], self._pending[self.max_batch:]
+            live = [item for item in batch if not item[2].done()]
+            self.counters["cancelled"] += len(batch) - len(live)
+            for compact in (False, True):
+                group = [item for item in live if item[1] == compact]
+                if group:
+                    await self._run(group, compact)
+
+    async def _run(self, group: List[_PendingItem], compact: bool) -> None:
+        """Evalúa un lote y resuelve los futures que siguen esperando."""
+        self.counters["batches"] += 1
+        self.counters["predicted"] += len(group)
+        try:
+            records = await profiling.run_in_threadpool(
+                predict_records, [request for request, _, _ in group], compact
+            )
+        except Exception as e:
+            for _, _, future in group:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (_, _, future), record in zip(group, records):
+            if not future.done():
+                future.set_result(record)
+
+    def stats(self) -> Dict[str, Any]:
+        """Contadores del batcher y tamaño medio de los lotes."""
+        batches = self.counters["batches"]
+        return {
+            **self.counters,
+            "active_connections": (
+                self.counters["connections_opened"] - self.counters["connections_closed"]
+            ),
+            "pending": len(self._pending),
+            "mean_batch_size": self.counters["predicted"] / batches if batches else 0.0,
+        }
+
+
+# Batcher compartido por todas las conexiones del proceso
+stream_batcher = MicroBatcher()
+
+
+def missing_fields(state: Dict[str, Any]) -> List[str]:
+    """Campos de PredictionRequest que aún no se enviaron."""
+    return [name for name in PredictionRequest.model_fields if name not in state]
+
+
+def merge_fields(
+    state: Dict[str, Any], fields: Dict[str, Any]
+) -> Tuple[Optional[PredictionRequest], List[Dict[str, Any]]]:
+    """
+    Aplica campos parciales al estado de la conexión.
+
+    Los campos se validan antes de aplicarse; si alguno es inválido el estado
+    no cambia.
+
+    Args:
+        state: Campos acumulados (se modifica si no hay errores)
+        fields: Campos nuevos
+
+    Returns:
+        Tupla (request completo validado o None si faltan campos, errores)
+    """
+    unknown = sorted(set(fields) - set(PredictionRequest.model_fields))
+    if unknown:
+        return None, [
+            {"loc": [name], "msg": "Unknown field", "type": "extra_forbidden"} for name in unknown
+        ]
+
+    candidate = {**state, **fields}
+    try:
+        request = PredictionRequest(**candidate)
+    except ValidationError as e:
+        errors = [
+            {"loc": list(err["loc"]), "msg": err["msg"], "type": err["type"]}
+            for err in e.errors()
+            if err["type"] != "missing"
+        ]
+        if errors:
+            return None, errors
+        request = None
+
+    state.update(fields)
+    return request, []
+
+
+class StreamConnection:
+    """Estado de una conexión WebSocket: campos acumulados y predicción pendiente."""
+
+    def __init__(self, websocket: WebSocket, batcher: MicroBatcher, compact: bool = False,
+                 limiter: Any = None, client: str = "anonymous"):
+        self.websocket = websocket
+        self.batcher = batcher
+        self.compact = compact
+        self.limiter = limiter
+        self.client = client
+        self.state: Dict[str, Any] = {}
+        self._pending: Optional[asyncio.Task] = None
+        self._send_lock = asyncio.Lock()
+
+    async def send(self, message: Dict[str, Any]) -> None:
+        """Envía un mensaje (un solo escritor a la vez)."""
+        async with self._send_lock:
+            await self.websocket.send_text(dumps(message).decode("utf-8"))
+
+    def _cancel_pending(self, reason: str = "superseded") -> None:
+        if self._pending is not None and not self._pending.done():
+            self._pending.cancel()
+            self.batcher.counters[reason] += 1
+
+    async def _predict(self, request: PredictionRequest, message_id: Any) -> None:
+        try:
+            record = await self.batcher.predict(request, self.compact)
+        except ModelUnavailableError:
+            await self.send({"type": "error", "id": message_id, "error": "ModelUnavailable",
+                             "message": "The model is not available"})
+            return
+        except Exception as e:
+            logger.error(f"Error en predicción por WebSocket: {e}")
+            await self.send({"type": "error", "id": message_id, "error": "InternalServerError",
+                             "message": "An unexpected error occurred during prediction"})
+            return
+        await self.send({"type": "prediction", "id": message_id, "result": record})
+
+    async def handle(self, message: Any) -> None:
+        """Procesa un mensaje del cliente."""
+        if not isinstance(message, dict):
+            await self.send({"type": "error", "error": "ValidationError",
+                             "message": "Messages must be JSON objects"})
+            return
+        message_id = message.get("id")
+
+        if self.limiter is not None:
+            wait = self.limiter.check(self.client)
+            if wait > 0:
+                await self.send({"type": "error", "id": message_id, "error": "RateLimitExceeded",
+                                 "message": "Rate limit exceeded for this API key",
+                                 "retry_after_seconds": round(wait, 3)})
+                return
+
+        fields = {k: v for k, v in message.items() if k not in CONTROL_KEYS}
+        state = {} if message.get("reset") else self.state
+        request, errors = merge_fields(state, fields)
+        if errors:
+            # El estado no cambia: la predicción pendiente sigue siendo válida
+            await self.send({"type": "error", "id": message_id, "error": "ValidationError",
+                             "message": "Invalid input data", "details": errors})
+            return
+
+        # El estado cambió: la predicción pendiente quedó obsoleta
+        self.state = state
+        self._cancel_pending()
+        if request is None:
+            await self.send({"type": "partial", "id": message_id,
+                             "missing": missing_fields(self.state)})
+        else:
+            self._pending = asyncio.create_task(self._predict(request, message_id))
+
+    async def run(self) -> None:
+        """Atiende la conexión hasta que el cliente la cierra."""
+        self.batcher.counters["connections_opened"] += 1
+        try:
+            while True:
+                try:
+                    message = await self.websocket.receive_json()
+                except ValueError:
+                    await self.send({"type": "error", "error": "ValidationError",
+                                     "message": "Messages must be valid JSON"})
+                    continue
+                await self.handle(message)
+        except WebSocketDisconnect:
+            pass
+        finally:
+            self._cancel_pending("disconnected")
+            self.batcher.counters["connections_closed"] += 1
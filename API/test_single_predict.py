@@ -1,9 +1,12 @@
 """Script para probar el endpoint de predicción de la API."""
 
-import requests
 import json
 from typing import Dict, Any
 
+import httpx
+
+from API.client import ObesityClient, PredictionAPIError
+
 
 def test_predict_endpoint(base_url: str = "http://localhost:8000") -> None:
     """
@@ -43,53 +46,40 @@ def test_predict_endpoint(base_url: str = "http://localhost:8000") -> None:
     print("\n" + "-" * 60)
     
     try:
-        # Realizar la petición POST
+        # El cliente reutiliza la conexión y reintenta ante 429/503
         print("\nEnviando petición...")
-        response = requests.post(
-            endpoint,
-            json=dummy_data,
-            headers={"Content-Type": "application/json"},
-            timeout=10
-        )
+        with ObesityClient(base_url, timeout=10) as client:
+            result = client.predict(dummy_data).model_dump()
         
-        # Mostrar resultados
-        print(f"\nStatus Code: {response.status_code}")
-        print(f"Response Headers: {dict(response.headers)}")
+        print("\n✅ Predicción exitosa!")
+        print("\nRespuesta:")
+        print(json.dumps(result, indent=2, ensure_ascii=False))
         
-        if response.status_code == 200:
-            print("\n✅ Predicción exitosa!")
-            result = response.json()
-            print("\nRespuesta:")
-            print(json.dumps(result, indent=2, ensure_ascii=False))
-            
-            # Mostrar información clave
-            print("\n" + "=" * 60)
-            print("Resumen de la Predicción:")
-            print("=" * 60)
-            print(f"Predicción: {result.get('prediction')}")
-            print(f"Confianza: {result.get('confidence')}")
-            print(f"Versión del Modelo: {result.get('model_version')}")
-            print(f"ID de Predicción: {result.get('prediction_id')}")
-            print(f"Tiempo de Procesamiento: {result.get('processing_time_ms')} ms")
-            print("\nProbabilidades:")
-            if 'probabilities' in result:
-                for class_name, prob in result['probabilities'].items():
-                    print(f"  - {class_name}: {prob:.4f}")
-        else:
-            print(f"\n❌ Error en la petición")
-            print(f"Respuesta: {response.text}")
+        # Mostrar información clave
+        print("\n" + "=" * 60)
+        print("Resumen de la Predicción:")
+        print("=" * 60)
+        print(f"Predicción: {result.get('prediction')}")
+        print(f"Confianza: {result.get('confidence')}")
+        print(f"Versión del Modelo: {result.get('model_version')}")
+        print(f"ID de Predicción: {result.get('prediction_id')}")
+        print(f"Tiempo de Procesamiento: {result.get('processing_time_ms')} ms")
+        print("\nProbabilidades:")
+        if 'probabilities' in result:
+            for class_name, prob in result['probabilities'].items():
+                print(f"  - {class_name}: {prob:.4f}")
             
-    except requests.exceptions.ConnectionError:
+    except PredictionAPIError as e:
+        print(f"\n❌ Error en la petición")
+        print(f"Respuesta: {e}")
+    except httpx.ConnectError:
         print("\n❌ Error: No se pudo conectar a la API")
         print(f"Asegúrate de que la API esté ejecutándose en {base_url}")
         print("Ejecuta: python run_api.py")
-    except requests.exceptions.Timeout:
+    except httpx.TimeoutException:
         print("\n❌ Error: La petición tardó demasiado tiempo")
-    except requests.exceptions.RequestException as e:
+    except httpx.HTTPError as e:
         print(f"\n❌ Error en la petición: {str(e)}")
-    except json.JSONDecodeError:
-        print("\n❌ Error: La respuesta no es un JSON válido")
-        print(f"Respuesta: {response.text}")
     except Exception as e:
         print(f"\n❌ Error inesperado: {str(e)}")
         import traceback
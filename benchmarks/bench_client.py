@@ -0,0 +1,103 @@
+"""
+Benchmark del cliente Python (`API/client.py`) frente a `requests.post` suelto.
+
+Cada modo puntúa las mismas instancias con otra edad (sin aciertos de cache):
+
+- requests: un `requests.post` a /predict por instancia (conexión nueva).
+- predict: `ObesityClient.predict` por instancia (conexión keep-alive).
+- predict-many: `ObesityClient.predict_many` (lotes a /predict/batch).
+- async: `AsyncObesityClient.predict` concurrente (lotes agrupados en el
+  cliente).
+
+Uso:
+    python benchmarks/bench_client.py --instances 300
+"""
+
+import asyncio
+import os
+from pathlib import Path
+import signal
+import subprocess
+import sys
+import time
+from typing import Any, Dict, List
+
+import typer
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from API.client import AsyncObesityClient, ObesityClient  # noqa: E402
+from benchmarks.bench_startup import EXAMPLE_REQUEST, _free_port  # noqa: E402
+from benchmarks.bench_throughput import _wait_ready  # noqa: E402
+
+app = typer.Typer()
+
+MODES = ["requests", "predict", "predict-many", "async"]
+
+
+def _instances(n: int, mode: str) -> List[Dict[str, Any]]:
+    """Instancias distintas por modo (sin aciertos de cache)."""
+    age = 18 + MODES.index(mode) * 0.1
+    return [{**EXAMPLE_REQUEST, "Weight": 40 + i * 0.37, "Age": age + i % 40} for i in range(n)]
+
+
+def _run_mode(base_url: str, mode: str, n: int) -> float:
+    """Segundos para puntuar `n` instancias con el modo dado."""
+    instances = _instances(n, mode)
+    if mode == "requests":
+        import requests
+
+        start = time.perf_counter()
+        for instance in instances:
+            requests.post(f"{base_url}/api/v1/predict", json=instance, timeout=30).raise_for_status()
+        return time.perf_counter() - start
+
+    if mode == "async":
+        async def run() -> float:
+            async with AsyncObesityClient(base_url) as client:
+                await client.predict(EXAMPLE_REQUEST)  # abre la conexión
+                start = time.perf_counter()
+                await asyncio.gather(*(client.predict(instance) for instance in instances))
+                return time.perf_counter() - start
+
+        return asyncio.run(run())
+
+    with ObesityClient(base_url) as client:
+        client.predict(EXAMPLE_REQUEST)  # abre la conexión
+        start = time.perf_counter()
+        if mode == "predict":
+            for instance in instances:
+                client.predict(instance)
+        else:
+            client.predict_many(instances)
+        return time.perf_counter() - start
+
+
+@app.command()
+def main(instances: int = typer.Option(300, help="Instancias por modo")):
+    """Compara las formas de llamar a la API contra un servidor uvicorn."""
+    port = _free_port()
+    env = {**os.environ, "PYTHONUNBUFFERED": "1"}
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "API.main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=PROJECT_ROOT,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        _wait_ready(port)
+        base_url = f"http://127.0.0.1:{port}"
+        print(f"\n{instances} instancias por modo (1 worker)")
+        print(f"{'modo':<14} {'ms/instancia':>13} {'inst/s':>9}")
+        for mode in MODES:
+            elapsed = _run_mode(base_url, mode, instances)
+            print(f"{mode:<14} {elapsed * 1000 / instances:>13.2f} {instances / elapsed:>9.1f}")
+    finally:
+        server.send_signal(signal.SIGINT)
+        server.wait(timeout=30)
+
+
+if __name__ == "__main__":
+    app()
@@ -0,0 +1,75 @@
+"""
+Benchmark de latencia de las explicaciones por predicción.
+
+Mide el tiempo de `explain_batch` con lotes de 1 y 1000 filas tomadas de los
+datos de entrenamiento, sin cache (la cache se vacía en cada repetición) y
+con cache caliente, y lo compara con la predicción simple.
+
+Uso:
+    python benchmarks/bench_explain.py --repeats 20
+"""
+
+from pathlib import Path
+import statistics
+import sys
+import time
+from types import SimpleNamespace
+
+import pandas as pd
+import typer
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from mlops_obesidad.config import FEATURE_COLUMNS, INTERIM_DATA_DIR  # noqa: E402
+from mlops_obesidad.inference import explain_batch, load_model, predict_batch  # noqa: E402
+from mlops_obesidad.inference.cache import clear_caches  # noqa: E402
+
+app = typer.Typer()
+
+
+def _timeit(fn, repeats: int, clear: bool) -> list:
+    """Ejecuta `fn` varias veces y retorna las latencias en milisegundos."""
+    times = []
+    for _ in range(repeats):
+        if clear:
+            clear_caches()
+        start = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - start) * 1000)
+    return times
+
+
+def _summary(times: list) -> str:
+    """Resumen p50 / p95 de una lista de latencias."""
+    ordered = sorted(times)
+    p95 = ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))]
+    return f"p50={statistics.median(ordered):8.2f} ms  p95={p95:8.2f} ms"
+
+
+@app.command()
+def main(
+    data_path: Path = INTERIM_DATA_DIR / "obesity_clean_raw.csv",
+    repeats: int = 20,
+):
+    """Ejecuta el benchmark e imprime la tabla de resultados."""
+    load_model()
+    df = pd.read_csv(data_path)[FEATURE_COLUMNS]
+    rows = [SimpleNamespace(**row) for row in df.to_dict(orient="records")]
+    batch_1k = (rows * (1000 // len(rows) + 1))[:1000]
+
+    print(f"{'operación':<28}{'lote':>6}   latencia")
+    for size, batch in ((1, rows[:1]), (1000, batch_1k)):
+        cases = [
+            ("predict_batch (sin cache)", lambda: predict_batch(batch), True),
+            ("explain_batch (sin cache)", lambda: explain_batch(batch), True),
+            ("explain_batch (con cache)", lambda: explain_batch(batch), False),
+        ]
+        for name, fn, clear in cases:
+            times = _timeit(fn, repeats, clear)
+            print(f"{name:<28}{size:>6}   {_summary(times)}")
+
+
+if __name__ == "__main__":
+    app()
@@ -0,0 +1,94 @@
+"""
+Benchmark de construcción y serialización de respuestas de predicción.
+
+Compara el camino anterior (construir `PredictionResponse` con validación,
+re-validarlo contra el `response_model` y serializarlo con el encoder JSON
+estándar, como hace FastAPI) con el camino rápido de `API.responses`
+(diccionarios sin validación + orjson), en formato completo y compacto.
+No usa el modelo: las probabilidades son fijas.
+
+Uso:
+    python benchmarks/bench_serialization.py --repeats 50
+"""
+
+import json
+from pathlib import Path
+import statistics
+import sys
+import time
+from typing import Callable, List
+from uuid import uuid4
+
+import typer
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from pydantic import TypeAdapter  # noqa: E402
+
+from API.responses import dumps, orjson  # noqa: E402
+from API.schemas import PredictionProbabilities, PredictionResponse  # noqa: E402
+from API.services import MODEL_ID, MODEL_VERSION, OBESITY_CLASSES, prediction_record  # noqa: E402
+
+app = typer.Typer()
+
+PROBABILITIES = dict(zip(OBESITY_CLASSES, [0.01, 0.9, 0.02, 0.01, 0.01, 0.03, 0.02]))
+
+
+def validated_path(n: int) -> bytes:
+    """Camino anterior: modelos validados + re-validación + json estándar."""
+    responses = [
+        PredictionResponse(
+            prediction="Normal_Weight",
+            probabilities=PredictionProbabilities(**PROBABILITIES),
+            confidence=0.9,
+            model_version=MODEL_VERSION,
+            model_id=MODEL_ID,
+            prediction_id=str(uuid4()),
+            timestamp="2024-01-15T10:30:00Z",
+            processing_time_ms=1.0,
+        )
+        for _ in range(n)
+    ]
+    adapter = TypeAdapter(List[PredictionResponse])
+    value = adapter.validate_python(responses, from_attributes=True)
+    content = adapter.dump_python(value, mode="json")
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode()
+
+
+def fast_path(n: int, compact: bool) -> bytes:
+    """Camino rápido: diccionarios sin validación + orjson."""
+    records = [
+        prediction_record("Normal_Weight", PROBABILITIES, "2024-01-15T10:30:00Z", 1.0, compact)
+        for _ in range(n)
+    ]
+    return dumps(records)
+
+
+def _time_ms(fn: Callable[[], bytes], repeats: int) -> tuple:
+    """Mediana en ms y tamaño de la salida."""
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        body = fn()
+        times.append((time.perf_counter() - start) * 1000)
+    return statistics.median(times), len(body)
+
+
+@app.command()
+def main(repeats: int = 50):
+    """Mide construcción + serialización para 1 y 1000 predicciones."""
+    print(f"Encoder rápido: {'orjson' if orjson is not None else 'json (orjson no instalado)'}")
+    print(f"{'camino':<28} {'n':>5} {'p50 ms':>9} {'bytes':>8}")
+    for n in (1, 1000):
+        for name, fn in [
+            ("validado + json", lambda: validated_path(n)),
+            ("dict + orjson (completo)", lambda: fast_path(n, compact=False)),
+            ("dict + orjson (compacto)", lambda: fast_path(n, compact=True)),
+        ]:
+            ms, size = _time_ms(fn, repeats)
+            print(f"{name:<28} {n:>5} {ms:>9.3f} {size:>8}")
+
+
+if __name__ == "__main__":
+    app()
@@ -0,0 +1,120 @@
+"""
+Benchmark de arranque en frío: tiempo hasta la primera predicción exitosa.
+
+Lanza la API con uvicorn en un proceso nuevo y mide el tiempo de pared desde
+el arranque del proceso hasta que `POST /api/v1/predict` responde 200, que es
+lo que percibe un balanceador tras un reinicio o un evento de autoescalado.
+
+Uso:
+    python benchmarks/bench_startup.py --repeats 5
+"""
+
+import json
+import os
+from pathlib import Path
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+
+import typer
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+
+EXAMPLE_REQUEST = {
+    "Gender": "Female",
+    "Age": 21.0,
+    "Height": 1.62,
+    "Weight": 64.0,
+    "family_history_with_overweight": "yes",
+    "FAVC": "no",
+    "FCVC": 2.0,
+    "NCP": 3.0,
+    "CAEC": "Sometimes",
+    "SMOKE": "no",
+    "CH2O": 2.0,
+    "SCC": "no",
+    "FAF": 0.0,
+    "TUE": 1.0,
+    "CALC": "no",
+    "MTRANS": "Public_Transportation",
+}
+
+app = typer.Typer()
+
+
+def _free_port() -> int:
+    """Obtiene un puerto TCP libre en localhost."""
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _try_predict(url: str) -> bool:
+    """Intenta una predicción; True si la API respondió 200."""
+    request = urllib.request.Request(
+        url,
+        data=json.dumps(EXAMPLE_REQUEST).encode(),
+        headers={"Content-Type": "application/json"},
+    )
+    try:
+        with urllib.request.urlopen(request, timeout=5) as response:
+            return response.status == 200
+    except (urllib.error.URLError, ConnectionError, socket.timeout):
+        return False
+
+
+def time_to_first_prediction(timeout: float = 60.0) -> float:
+    """
+    Arranca la API y mide los segundos hasta la primera predicción exitosa.
+
+    Raises:
+        TimeoutError: Si la API no responde dentro de `timeout`
+    """
+    port = _free_port()
+    url = f"http://127.0.0.1:{port}/api/v1/predict"
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "API.main:app", "--port", str(port),
+         "--log-level", "warning"],
+        cwd=PROJECT_ROOT,
+        env={**os.environ, "PYTHONDONTWRITEBYTECODE": "1"},
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        while time.perf_counter() - start < timeout:
+            if _try_predict(url):
+                return time.perf_counter() - start
+            time.sleep(0.01)
+        raise TimeoutError("La API no respondió a tiempo")
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def time_import(module: str) -> float:
+    """Segundos para importar un módulo en un intérprete limpio."""
+    start = time.perf_counter()
+    subprocess.run([sys.executable, "-c", f"import {module}"], cwd=PROJECT_ROOT, check=True,
+                   capture_output=True)
+    return time.perf_counter() - start
+
+
+@app.command()
+def main(repeats: int = 5):
+    """Ejecuta el benchmark de arranque e imprime los resultados."""
+    imports = [time_import("API.main") for _ in range(repeats)]
+    ttfp = [time_to_first_prediction() for _ in range(repeats)]
+
+    print(f"import API.main (proceso completo):   p50={statistics.median(imports):.3f} s  "
+          f"min={min(imports):.3f} s")
+    print(f"tiempo hasta primera predicción:      p50={statistics.median(ttfp):.3f} s  "
+          f"min={min(ttfp):.3f} s")
+
+
+if __name__ == "__main__":
+    app()
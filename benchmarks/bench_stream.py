@@ -0,0 +1,172 @@
+"""
+Benchmark del canal WebSocket de predicción frente a requests HTTP.
+
+Simula formularios interactivos: cada cliente modifica un campo (el peso)
+muchas veces seguidas y necesita la predicción del último estado.
+
+- http: un POST /predict keep-alive con el request completo por cambio.
+- ws: un mensaje con solo el campo modificado por cambio, esperando cada
+  predicción.
+- ws-burst: ráfagas de cambios (como al tipear) esperando solo la
+  predicción del último; las intermedias se cancelan en el servidor.
+
+Reporta latencia por actualización, predicciones que llegaron al modelo y
+tiempo de CPU del servidor por actualización.
+
+Uso:
+    python benchmarks/bench_stream.py --clients 4 --updates 200
+"""
+
+import http.client
+import json
+import os
+from pathlib import Path
+import signal
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from typing import Dict, List
+
+import typer
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from benchmarks.bench_startup import EXAMPLE_REQUEST, _free_port  # noqa: E402
+from benchmarks.bench_throughput import _wait_ready  # noqa: E402
+
+app = typer.Typer()
+
+MODES = ["http", "ws", "ws-burst"]
+
+
+def _cpu_seconds(pid: int) -> float:
+    """Tiempo de CPU (user + system) de un proceso."""
+    with open(f"/proc/{pid}/stat") as f:
+        fields = f.read().rsplit(")", 1)[1].split()
+    return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+
+
+def _stream_stats(port: int) -> Dict[str, float]:
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+    conn.request("GET", "/api/v1/monitoring/stream")
+    stats = json.loads(conn.getresponse().read())
+    conn.close()
+    return stats
+
+
+def _weights(client_id: int, updates: int, mode: str) -> List[float]:
+    """Pesos distintos por modo, cliente y actualización (sin aciertos de cache)."""
+    base = 40 + MODES.index(mode) * 0.0005 + client_id * 13.7
+    return [round(base + i * 0.013, 4) for i in range(updates)]
+
+
+def _http_client(port: int, client_id: int, updates: int, latencies: List[float]) -> None:
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+    headers = {"Content-Type": "application/json"}
+    for weight in _weights(client_id, updates, "http"):
+        body = json.dumps({**EXAMPLE_REQUEST, "Weight": weight})
+        start = time.perf_counter()
+        conn.request("POST", "/api/v1/predict", body=body, headers=headers)
+        response = conn.getresponse()
+        response.read()
+        assert response.status == 200
+        latencies.append(time.perf_counter() - start)
+    conn.close()
+
+
+def _ws_client(
+    port: int, client_id: int, updates: int, latencies: List[float], mode: str, burst: int
+) -> None:
+    from websockets.sync.client import connect
+
+    with connect(f"ws://127.0.0.1:{port}/api/v1/predict/stream?format=compact") as ws:
+        ws.send(json.dumps({**EXAMPLE_REQUEST, "id": -1}))
+        json.loads(ws.recv())
+
+        weights = _weights(client_id, updates, mode)
+        for i in range(0, updates, burst):
+            start = time.perf_counter()
+            chunk = weights[i:i + burst]
+            for offset, weight in enumerate(chunk):
+                ws.send(json.dumps({"id": i + offset, "Weight": weight}))
+            last_id = i + len(chunk) - 1
+            while True:
+                message = json.loads(ws.recv())
+                if message.get("id") == last_id:
+                    assert message["type"] == "prediction", message
+                    break
+            latencies.append((time.perf_counter() - start) / len(chunk))
+
+
+def _run_mode(port: int, pid: int, mode: str, clients: int, updates: int, burst: int) -> Dict[str, float]:
+    latencies: List[float] = []
+    before_stats = _stream_stats(port)
+    before_cpu = _cpu_seconds(pid)
+    threads = []
+    for client_id in range(clients):
+        if mode == "http":
+            target, args = _http_client, (port, client_id, updates, latencies)
+        else:
+            target = _ws_client
+            args = (port, client_id, updates, latencies, mode, burst if mode == "ws-burst" else 1)
+        threads.append(threading.Thread(target=target, args=args))
+
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    total_updates = clients * updates
+    after_stats = _stream_stats(port)
+    predicted = (
+        total_updates if mode == "http" else after_stats["predicted"] - before_stats["predicted"]
+    )
+    latencies.sort()
+    return {
+        "updates_per_s": total_updates / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p95_ms": latencies[int(0.95 * (len(latencies) - 1))] * 1000,
+        "model_predictions": predicted,
+        "cpu_ms_per_update": (_cpu_seconds(pid) - before_cpu) * 1000 / total_updates,
+    }
+
+
+@app.command()
+def main(
+    clients: int = typer.Option(4, help="Clientes concurrentes"),
+    updates: int = typer.Option(200, help="Actualizaciones por cliente"),
+    burst: int = typer.Option(5, help="Cambios por ráfaga en el modo ws-burst"),
+):
+    """Compara actualizaciones por HTTP y por WebSocket contra un servidor uvicorn."""
+    port = _free_port()
+    env = {**os.environ, "PYTHONUNBUFFERED": "1"}
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "API.main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=PROJECT_ROOT,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        _wait_ready(port)
+        print(f"\n{clients} clientes × {updates} actualizaciones (1 worker)")
+        print(f"{'modo':<10} {'upd/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'predicciones':>13} {'CPU ms/upd':>11}")
+        for mode in MODES:
+            result = _run_mode(port, server.pid, mode, clients, updates, burst)
+            print(
+                f"{mode:<10} {result['updates_per_s']:>8.1f} {result['p50_ms']:>8.2f} "
+                f"{result['p95_ms']:>8.2f} {result['model_predictions']:>13} "
+                f"{result['cpu_ms_per_update']:>11.2f}"
+            )
+    finally:
+        server.send_signal(signal.SIGINT)
+        server.wait(timeout=30)
+
+
+if __name__ == "__main__":
+    app()
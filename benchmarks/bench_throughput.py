@@ -0,0 +1,188 @@
+"""
+Benchmark de throughput del servidor multi-worker (`python -m API.server`).
+
+Para cada número de workers arranca el servidor, lanza clientes concurrentes
+con conexiones keep-alive que envían requests distintos (para no medir la
+cache de predicciones) durante un tiempo fijo, y reporta requests/s,
+latencias y la memoria de los workers. El PSS (proportional set size) reparte
+las páginas compartidas entre los procesos que las comparten, por lo que la
+diferencia entre RSS y PSS muestra cuánto del modelo se comparte por COW.
+
+Uso:
+    python benchmarks/bench_throughput.py --workers 1 --workers 2 --workers 4
+"""
+
+import http.client
+import json
+import os
+from pathlib import Path
+import random
+import signal
+import socket
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from typing import Dict, List
+
+import typer
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from benchmarks.bench_startup import EXAMPLE_REQUEST, _free_port  # noqa: E402
+
+app = typer.Typer()
+
+
+def _random_body(rng: random.Random) -> bytes:
+    """Request válido con Age/Height/Weight aleatorios (evita aciertos de cache)."""
+    body = {
+        **EXAMPLE_REQUEST,
+        "Age": round(rng.uniform(14, 61), 3),
+        "Height": round(rng.uniform(1.45, 1.98), 3),
+        "Weight": round(rng.uniform(39, 173), 3),
+    }
+    return json.dumps(body).encode()
+
+
+def _wait_ready(port: int, timeout: float = 60.0) -> None:
+    """Espera a que el servidor acepte conexiones y responda a /."""
+    start = time.perf_counter()
+    while time.perf_counter() - start < timeout:
+        try:
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=2)
+            conn.request("GET", "/")
+            if conn.getresponse().status == 200:
+                conn.close()
+                return
+        except (ConnectionError, socket.timeout, OSError):
+            pass
+        time.sleep(0.1)
+    raise TimeoutError("El servidor no arrancó a tiempo")
+
+
+def _client(port: int, deadline: float, seed: int, latencies: List[float], errors: List[int]):
+    """Cliente keep-alive que envía predicciones hasta `deadline`."""
+    rng = random.Random(seed)
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+    headers = {"Content-Type": "application/json"}
+    while time.perf_counter() < deadline:
+        body = _random_body(rng)
+        start = time.perf_counter()
+        try:
+            conn.request("POST", "/api/v1/predict", body=body, headers=headers)
+            response = conn.getresponse()
+            response.read()
+            ok = response.status == 200
+        except (ConnectionError, http.client.HTTPException, socket.timeout):
+            conn.close()
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+            ok = False
+        if ok:
+            latencies.append(time.perf_counter() - start)
+        else:
+            errors.append(1)
+    conn.close()
+
+
+def _memory_kb(pid: int) -> Dict[str, int]:
+    """RSS y PSS de un proceso en kB (Linux, /proc/<pid>/smaps_rollup)."""
+    values = {"rss": 0, "pss": 0}
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            for line in f:
+                key, _, rest = line.partition(":")
+                if key in ("Rss", "Pss"):
+                    values[key.lower()] = int(rest.split()[0])
+    except OSError:
+        pass
+    return values
+
+
+def _children(pid: int) -> List[int]:
+    """Pids de los procesos hijos directos (workers del maestro)."""
+    try:
+        with open(f"/proc/{pid}/task/{pid}/children") as f:
+            return [int(child) for child in f.read().split()]
+    except OSError:
+        return []
+
+
+def measure(workers: int, clients: int, duration: float, threads_per_worker: int) -> Dict:
+    """
+    Arranca el servidor con `workers` procesos y mide throughput y memoria.
+
+    Returns:
+        Diccionario con requests/s, latencias p50/p95/p99 (ms), errores y
+        memoria de los workers
+    """
+    port = _free_port()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "API.server", "--host", "127.0.0.1", "--port", str(port),
+         "--workers", str(workers), "--threads-per-worker", str(threads_per_worker),
+         "--log-level", "warning"],
+        cwd=PROJECT_ROOT,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        _wait_ready(port)
+        time.sleep(1.0)  # que todos los workers terminen su arranque
+
+        latencies: List[float] = []
+        errors: List[int] = []
+        deadline = time.perf_counter() + duration
+        threads = [
+            threading.Thread(target=_client, args=(port, deadline, seed, latencies, errors))
+            for seed in range(clients)
+        ]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+
+        memory = [_memory_kb(pid) for pid in _children(process.pid)]
+    finally:
+        process.send_signal(signal.SIGTERM)
+        process.wait(timeout=60)
+
+    latencies.sort()
+    quantile = lambda q: latencies[min(int(q * len(latencies)), len(latencies) - 1)] * 1000  # noqa: E731
+    return {
+        "workers": workers,
+        "requests": len(latencies),
+        "errors": len(errors),
+        "rps": len(latencies) / elapsed,
+        "p50_ms": quantile(0.50) if latencies else None,
+        "p95_ms": quantile(0.95) if latencies else None,
+        "p99_ms": quantile(0.99) if latencies else None,
+        "worker_rss_mb": statistics.mean(m["rss"] for m in memory) / 1024 if memory else None,
+        "worker_pss_mb": statistics.mean(m["pss"] for m in memory) / 1024 if memory else None,
+    }
+
+
+@app.command()
+def main(
+    workers: List[int] = typer.Option([1, 2], help="Números de workers a medir"),
+    clients: int = typer.Option(8, help="Clientes concurrentes"),
+    duration: float = typer.Option(10.0, help="Segundos de carga por configuración"),
+    threads_per_worker: int = typer.Option(1, help="Hilos XGBoost por worker"),
+):
+    """Mide throughput y memoria para distintos números de workers."""
+    print(f"CPUs disponibles: {len(os.sched_getaffinity(0))}  clientes: {clients}  "
+          f"duración: {duration:.0f} s")
+    print(f"{'workers':>7} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} "
+          f"{'errores':>8} {'RSS MB':>8} {'PSS MB':>8}")
+    for n in workers:
+        r = measure(n, clients, duration, threads_per_worker)
+        print(f"{r['workers']:>7} {r['rps']:>8.1f} {r['p50_ms']:>8.1f} {r['p95_ms']:>8.1f} "
+              f"{r['p99_ms']:>8.1f} {r['errors']:>8} {r['worker_rss_mb']:>8.1f} "
+              f"{r['worker_pss_mb']:>8.1f}")
+
+
+if __name__ == "__main__":
+    app()
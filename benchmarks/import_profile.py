@@ -0,0 +1,85 @@
+"""
+Reporte de tiempos de importación (python -X importtime).
+
+Importa un módulo en un intérprete limpio y resume qué paquetes dominan el
+tiempo de importación, para detectar trabajo pesado hecho al importar.
+
+Uso:
+    python benchmarks/import_profile.py --module API.main --top 20
+"""
+
+from collections import defaultdict
+from pathlib import Path
+import subprocess
+import sys
+from typing import List, Optional, Tuple
+
+import typer
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+
+app = typer.Typer()
+
+
+def profile_import(module: str) -> List[Tuple[int, int, int, str]]:
+    """
+    Ejecuta `python -X importtime -c "import <module>"` y parsea la salida.
+
+    Returns:
+        Lista de tuplas (self_us, cumulative_us, nivel, nombre) en orden de salida
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=PROJECT_ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        level = (len(name) - len(name.lstrip())) // 2
+        rows.append((int(self_us), int(cumulative_us), level, name.strip()))
+    return rows
+
+
+def render_report(module: str, rows: List[Tuple[int, int, int, str]], top: int) -> str:
+    """Arma el reporte en texto plano."""
+    target = next((r for r in rows if r[3] == module), None)
+    total_ms = target[1] / 1000 if target else sum(r[0] for r in rows) / 1000
+
+    by_package = defaultdict(int)
+    for self_us, _, _, name in rows:
+        by_package[name.split(".")[0]] += self_us
+
+    lines = [f"Tiempo de importación de {module}: {total_ms:.1f} ms", ""]
+    lines.append(f"Paquetes con mayor tiempo propio (top {top}):")
+    for package, self_us in sorted(by_package.items(), key=lambda x: -x[1])[:top]:
+        lines.append(f"  {package:<40}{self_us / 1000:>9.1f} ms")
+
+    lines.append("")
+    lines.append(f"Módulos del proyecto (tiempo acumulado):")
+    for _, cumulative_us, level, name in rows:
+        if name.split(".")[0] in ("API", "mlops_obesidad"):
+            lines.append(f"  {'  ' * level}{name:<{40 - 2 * level}}{cumulative_us / 1000:>9.1f} ms")
+
+    return "\n".join(lines)
+
+
+@app.command()
+def main(
+    module: str = "API.main",
+    top: int = 20,
+    output_path: Optional[Path] = None,
+):
+    """Genera el reporte de tiempos de importación de un módulo."""
+    report = render_report(module, profile_import(module), top)
+    print(report)
+    if output_path is not None:
+        output_path.write_text(report + "\n", encoding="utf-8")
+
+
+if __name__ == "__main__":
+    app()
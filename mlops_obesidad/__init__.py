@@ -1 +1,5 @@
-from mlops_obesidad import config  # noqa: F401
+"""Paquete del proyecto de estimación de niveles de obesidad.
+
+Los submódulos se importan bajo demanda: importar el paquete no carga pandas,
+scikit-learn ni XGBoost.
+"""
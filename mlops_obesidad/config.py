@@ -1,14 +1,10 @@
 from pathlib import Path
 
-from dotenv import load_dotenv
-from loguru import logger
-
-# Load environment variables from .env file if it exists
-load_dotenv()
+# This module must not do any work at import time (the API imports it on
+# startup); entry points call load_env() and configure_logging() explicitly.
 
 # Paths
 PROJ_ROOT = Path(__file__).resolve().parents[1]
-logger.info(f"PROJ_ROOT path is: {PROJ_ROOT}")
 
 DATA_DIR = PROJ_ROOT / "data"
 RAW_DATA_DIR = DATA_DIR / "raw"
@@ -21,12 +17,71 @@ MODELS_DIR = PROJ_ROOT / "models"
 REPORTS_DIR = PROJ_ROOT / "reports"
 FIGURES_DIR = REPORTS_DIR / "figures"
 
-# If tqdm is installed, configure loguru with tqdm.write
-# https://github.com/Delgan/loguru/issues/135
-try:
-    from tqdm import tqdm
+# Columnas del dataset (mismo orden que PredictionRequest)
+TARGET = "NObeyesdad"
+NUMERIC_FEATURES = ["Age", "Height", "Weight", "FCVC", "NCP", "CH2O", "FAF", "TUE"]
+CATEGORICAL_FEATURES = [
+    "Gender",
+    "family_history_with_overweight",
+    "FAVC",
+    "CAEC",
+    "SMOKE",
+    "SCC",
+    "CALC",
+    "MTRANS",
+]
+FEATURE_COLUMNS = [
+    "Gender",
+    "Age",
+    "Height",
+    "Weight",
+    "family_history_with_overweight",
+    "FAVC",
+    "FCVC",
+    "NCP",
+    "CAEC",
+    "SMOKE",
+    "CH2O",
+    "SCC",
+    "FAF",
+    "TUE",
+    "CALC",
+    "MTRANS",
+]
+
+_env_loaded = False
+_logging_configured = False
+
+
+def load_env() -> None:
+    """Load environment variables from the .env file, if it exists (only once)."""
+    global _env_loaded
+
+    if _env_loaded:
+        return
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    _env_loaded = True
+
+
+def configure_logging() -> None:
+    """Configure loguru for the command line scripts (only once)."""
+    global _logging_configured
+
+    if _logging_configured:
+        return
+    from loguru import logger
+
+    # If tqdm is installed, configure loguru with tqdm.write
+    # https://github.com/Delgan/loguru/issues/135
+    try:
+        from tqdm import tqdm
+
+        logger.remove(0)
+        logger.add(lambda msg: tqdm.write(msg, end=""), colorize=True)
+    except (ModuleNotFoundError, ValueError):
+        pass
 
-    logger.remove(0)
-    logger.add(lambda msg: tqdm.write(msg, end=""), colorize=True)
-except ModuleNotFoundError:
-    pass
+    logger.info(f"PROJ_ROOT path is: {PROJ_ROOT}")
+    _logging_configured = True
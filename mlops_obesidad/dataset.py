@@ -1,29 +1,367 @@
+"""
+Eliminación de duplicados del dataset crudo por streaming (memoria acotada).
+
+El notebook 6.0 hace `df_raw.drop_duplicates()` con todo el CSV en memoria
+antes de la partición train/test. Esta etapa hace lo mismo en dos pasadas
+sobre el archivo, leyendo por chunks:
+
+1. Cada fila se reduce a un fingerprint de 128 bits (dos hashes de 64 bits de
+   `pd.util.hash_array` con claves distintas, combinados columna a columna).
+   El fingerprint se calcula sobre la fila normalizada igual que
+   `DataCleanerTransformer` (recorte de espacios, strings vacíos y alias
+   'na', 'n/a', 'nan' como nulos) y, aparte, sobre la fila tal como la lee
+   `pd.read_csv`, para reportar el mismo conteo que `df.duplicated()`.
+   Los fingerprints se reparten en particiones por sus primeros bits; cuando
+   el buffer supera `--memory-limit-mb` se vuelcan a disco.
+2. Cada partición se carga sola, se ordena y se marca la primera aparición de
+   cada fingerprint (`keep='first'`). Una segunda lectura del CSV escribe las
+   filas conservadas sin modificar sus valores.
+
+La memoria queda acotada por el límite del buffer, la partición más grande y
+un byte por fila para la máscara de filas conservadas.
+
+Uso:
+    python -m mlops_obesidad.dataset --input-path data/raw/encuestas.csv --memory-limit-mb 256
+"""
+
+import csv
+import json
 from pathlib import Path
+import shutil
+import tempfile
+import time
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
 from loguru import logger
-from tqdm import tqdm
+import numpy as np
+import pandas as pd
 import typer
 
-from mlops_obesidad.config import PROCESSED_DATA_DIR, RAW_DATA_DIR
+from mlops_obesidad.config import INTERIM_DATA_DIR, RAW_DATA_DIR, REPORTS_DIR, configure_logging
 
 app = typer.Typer()
 
+# Valores que `pd.read_csv` interpreta como nulos por defecto
+PANDAS_NA_VALUES = frozenset({
+    "", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan", "1.#IND",
+    "1.#QNAN", "<NA>", "N/A", "NA", "NULL", "NaN", "None", "n/a", "nan", "null",
+})
+
+# Alias de nulos de DataCleanerTransformer (sin distinguir mayúsculas)
+NULL_ALIASES = frozenset({"na", "n/a", "nan"})
+
+# Claves de los dos hashes de 64 bits que forman el fingerprint
+_HASH_KEYS = ("0123456789123456", "mlops-obesidad-2")
+
+# Constantes para distinguir nulos, números y strings y combinar columnas
+_NULL_HASH = np.uint64(0x9E3779B97F4A7C15)
+_STRING_TAG = np.uint64(0xC2B2AE3D27D4EB4F)
+_COMBINE_MULT = np.uint64(0x100000001B3)
+
+_RECORD = np.dtype([("row", "<u8"), ("n1", "<u8"), ("n2", "<u8"), ("e1", "<u8"), ("e2", "<u8")])
+
+
+# =============================================================================
+# Fingerprints
+# =============================================================================
+
+
+def detect_separator(path: Path, sample_bytes: int = 64 * 1024) -> str:
+    """Detecta el separador del CSV (como `sep=None` de pandas) con una muestra inicial."""
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        sample = f.read(sample_bytes)
+    try:
+        return csv.Sniffer().sniff(sample, delimiters=",;\t|").delimiter
+    except csv.Error:
+        return ","
+
+
+def iter_raw_chunks(path: Path, sep: str, chunksize: int) -> Iterator[pd.DataFrame]:
+    """Lee el CSV por chunks con todos los valores como texto sin interpretar."""
+    yield from pd.read_csv(
+        path, sep=sep, dtype=str, keep_default_na=False, chunksize=chunksize, encoding="utf-8"
+    )
+
+
+def _canonical_hashes(values: np.ndarray, normalize: bool) -> Tuple[np.ndarray, np.ndarray]:
+    """Hashes de 64 bits de valores de texto según su valor canónico (nulo, número o string)."""
+    values = pd.Series(values, dtype=object)
+    if normalize:
+        values = values.str.strip()
+        null = (values.isin(PANDAS_NA_VALUES) | values.str.lower().isin(NULL_ALIASES)).to_numpy()
+    else:
+        null = values.isin(PANDAS_NA_VALUES).to_numpy()
+
+    numbers = pd.to_numeric(values.where(~null), errors="coerce").to_numpy(dtype=np.float64)
+    is_number = ~np.isnan(numbers)
+    is_string = ~null & ~is_number
+    strings = values.to_numpy(dtype=object)[is_string]
+
+    hashes = []
+    for key in _HASH_KEYS:
+        h = np.full(len(values), _NULL_HASH, dtype=np.uint64)
+        # + 0.0 unifica -0.0 y 0.0, que pandas considera iguales
+        h[is_number] = pd.util.hash_array(numbers[is_number] + 0.0, hash_key=key)
+        h[is_string] = pd.util.hash_array(strings, hash_key=key) ^ _STRING_TAG
+        hashes.append(h)
+    return hashes[0], hashes[1]
+
+
+def column_hashes(values: pd.Series) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Hashes de 64 bits de una columna leída como texto, normalizada y exacta.
+
+    El valor canónico reproduce lo que vería `df.duplicated()`: los nulos de
+    `read_csv` son iguales entre sí y los valores numéricos se comparan como
+    float (`"21"` y `"21.0"` son el mismo valor). La versión normalizada
+    aplica antes la limpieza de `DataCleanerTransformer`. La canonicalización
+    se hace sobre los valores distintos del chunk (`pd.factorize`), que en
+    columnas categóricas son unos pocos.
+
+    Una columna ya tipada (leída con `read_csv` por defecto) se compara por el
+    texto de cada valor, convertido solo para los valores distintos; los NaN
+    quedan como `"nan"`, que es un nulo.
+
+    Args:
+        values: Columna con los valores crudos como strings
+
+    Returns:
+        Tupla (n1, n2, e1, e2): dos hashes normalizados y dos exactos (uint64)
+    """
+    codes, uniques = pd.factorize(values, use_na_sentinel=False)
+    uniques = np.array([u if isinstance(u, str) else str(u) for u in uniques], dtype=object)
+    n1, n2 = _canonical_hashes(uniques, normalize=True)
+    e1, e2 = _canonical_hashes(uniques, normalize=False)
+    return n1[codes], n2[codes], e1[codes], e2[codes]
+
+
+def row_fingerprints(chunk: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Fingerprints de 128 bits (dos uint64) por fila, normalizado y exacto.
+
+    Los hashes de las columnas se combinan en orden, de modo que el mismo
+    valor en columnas distintas no produce el mismo fingerprint.
+
+    Returns:
+        Tupla (n1, n2, e1, e2)
+    """
+    fingerprints = [np.zeros(len(chunk), dtype=np.uint64) for _ in range(4)]
+    for column in chunk.columns:
+        for i, h in enumerate(column_hashes(chunk[column])):
+            fingerprints[i] = (fingerprints[i] ^ h) * _COMBINE_MULT
+    return tuple(fingerprints)
+
+
+# =============================================================================
+# Particiones con volcado a disco
+# =============================================================================
+
+
+class FingerprintPartitions:
+    """
+    Fingerprints repartidos por sus primeros bits, en memoria hasta un límite.
+
+    Cuando los buffers superan `memory_limit` bytes se agregan a un archivo
+    por partición en `spill_dir`. Dos filas iguales (normalizadas) siempre
+    caen en la misma partición, por lo que cada una se deduplica por separado.
+    """
+
+    def __init__(self, n_partitions: int, memory_limit: int, spill_dir: Path):
+        """
+        Args:
+            n_partitions: Número de particiones (potencia de 2)
+            memory_limit: Bytes máximos en buffers antes de volcar a disco
+            spill_dir: Directorio de los archivos de partición
+        """
+        if n_partitions < 1 or n_partitions & (n_partitions - 1):
+            raise ValueError("n_partitions debe ser una potencia de 2")
+        self.n_partitions = n_partitions
+        self.memory_limit = memory_limit
+        self.spill_dir = spill_dir
+        self._shift = np.uint64(64 - max(n_partitions.bit_length() - 1, 0))
+        self._buffers: List[List[np.ndarray]] = [[] for _ in range(n_partitions)]
+        self.buffered_bytes = 0
+        self.peak_buffered_bytes = 0
+        self.spills = 0
+
+    def _path(self, partition: int) -> Path:
+        return self.spill_dir / f"partition_{partition:04d}.bin"
+
+    def add(self, records: np.ndarray) -> None:
+        """Agrega registros (`_RECORD`) repartiéndolos por el primer hash normalizado."""
+        if self.n_partitions == 1:
+            parts = np.zeros(len(records), dtype=np.int64)
+        else:
+            parts = (records["n1"] >> self._shift).astype(np.int64)
+        order = np.argsort(parts, kind="stable")
+        bounds = np.searchsorted(parts[order], np.arange(self.n_partitions + 1))
+        for p in range(self.n_partitions):
+            if bounds[p] < bounds[p + 1]:
+                self._buffers[p].append(records[order[bounds[p]:bounds[p + 1]]])
+        self.buffered_bytes += records.nbytes
+        self.peak_buffered_bytes = max(self.peak_buffered_bytes, self.buffered_bytes)
+        if self.buffered_bytes > self.memory_limit:
+            self.spill()
+
+    def spill(self) -> None:
+        """Vuelca todos los buffers a sus archivos de partición."""
+        for p, buffers in enumerate(self._buffers):
+            if buffers:
+                with open(self._path(p), "ab") as f:
+                    np.concatenate(buffers).tofile(f)
+        self._buffers = [[] for _ in range(self.n_partitions)]
+        self.buffered_bytes = 0
+        self.spills += 1
+
+    def __iter__(self) -> Iterator[np.ndarray]:
+        """Registros de cada partición (disco + buffer), una partición a la vez."""
+        for p in range(self.n_partitions):
+            parts = list(self._buffers[p])
+            path = self._path(p)
+            if path.exists():
+                parts.insert(0, np.fromfile(path, dtype=_RECORD))
+            if parts:
+                yield np.concatenate(parts)
+
+
+def _group_starts(first: np.ndarray, second: np.ndarray) -> np.ndarray:
+    """Máscara de inicio de grupo en arrays ya ordenados por (first, second)."""
+    starts = np.ones(len(first), dtype=bool)
+    starts[1:] = (first[1:] != first[:-1]) | (second[1:] != second[:-1])
+    return starts
+
+
+def first_occurrences(records: np.ndarray, normalize: bool) -> Tuple[np.ndarray, int]:
+    """
+    Filas que son la primera aparición de su fingerprint dentro de una partición.
+
+    Args:
+        records: Registros de una partición
+        normalize: Deduplicar por el fingerprint normalizado (o el exacto)
+
+    Returns:
+        Tupla (índices de fila a conservar, filas únicas según el fingerprint exacto)
+    """
+    k1, k2 = ("n1", "n2") if normalize else ("e1", "e2")
+    ordered = records[np.lexsort((records["row"], records[k2], records[k1]))]
+    keep = ordered["row"][_group_starts(ordered[k1], ordered[k2])]
+
+    exact = records[np.lexsort((records["e2"], records["e1"]))]
+    unique_exact = int(_group_starts(exact["e1"], exact["e2"]).sum())
+    return keep, unique_exact
+
+
+# =============================================================================
+# Etapa completa
+# =============================================================================
+
+
+def deduplicate_csv(
+    input_path: Path,
+    output_path: Path,
+    chunksize: int = 100_000,
+    memory_limit_mb: float = 256,
+    n_partitions: int = 64,
+    normalize: bool = True,
+    spill_dir: Optional[Path] = None,
+) -> Dict[str, Any]:
+    """
+    Elimina filas duplicadas de un CSV en memoria acotada, conservando la primera aparición.
+
+    Args:
+        input_path: CSV crudo (separador autodetectado)
+        output_path: CSV de salida (separador ',', valores sin modificar)
+        chunksize: Filas por chunk de lectura
+        memory_limit_mb: Memoria máxima de los buffers de fingerprints
+        n_partitions: Particiones de los fingerprints (potencia de 2)
+        normalize: Si dos filas que solo difieren en espacios o alias de nulos
+            cuentan como duplicadas (normalización de DataCleanerTransformer)
+        spill_dir: Directorio para los volcados (por defecto, uno temporal)
+
+    Returns:
+        Reporte con filas leídas, escritas y duplicados (exactos y normalizados)
+    """
+    start = time.perf_counter()
+    sep = detect_separator(input_path)
+    tmp_dir = Path(tempfile.mkdtemp(prefix="dedup_", dir=spill_dir))
+    try:
+        partitions = FingerprintPartitions(n_partitions, int(memory_limit_mb * 2**20), tmp_dir)
+        n_rows = 0
+        for chunk in iter_raw_chunks(input_path, sep, chunksize):
+            records = np.empty(len(chunk), dtype=_RECORD)
+            records["row"] = np.arange(n_rows, n_rows + len(chunk), dtype=np.uint64)
+            records["n1"], records["n2"], records["e1"], records["e2"] = row_fingerprints(chunk)
+            partitions.add(records)
+            n_rows += len(chunk)
+
+        keep_mask = np.zeros(n_rows, dtype=bool)
+        unique_exact = 0
+        largest_partition = 0
+        for records in partitions:
+            keep, partition_unique = first_occurrences(records, normalize)
+            keep_mask[keep.astype(np.int64)] = True
+            unique_exact += partition_unique
+            largest_partition = max(largest_partition, records.nbytes)
+        hash_seconds = time.perf_counter() - start
+
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        offset = 0
+        with open(output_path, "w", encoding="utf-8", newline="") as f:
+            for chunk in iter_raw_chunks(input_path, sep, chunksize):
+                kept = chunk[keep_mask[offset:offset + len(chunk)]]
+                kept.to_csv(f, index=False, header=offset == 0)
+                offset += len(chunk)
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    kept_rows = int(keep_mask.sum())
+    exact_duplicates = n_rows - unique_exact
+    return {
+        "input_path": str(input_path),
+        "output_path": str(output_path),
+        "separator": sep,
+        "normalize": normalize,
+        "rows": n_rows,
+        "rows_written": kept_rows,
+        "duplicates_dropped": n_rows - kept_rows,
+        # Igual a df.duplicated().sum() sobre el CSV leído con pd.read_csv
+        "exact_duplicates": exact_duplicates,
+        "normalized_duplicates": (n_rows - kept_rows) if normalize else None,
+        "partitions": n_partitions,
+        "spills": partitions.spills,
+        "peak_buffer_mb": round(partitions.peak_buffered_bytes / 2**20, 2),
+        "largest_partition_mb": round(largest_partition / 2**20, 2),
+        "hash_seconds": round(hash_seconds, 3),
+        "total_seconds": round(time.perf_counter() - start, 3),
+    }
+
 
 @app.command()
 def main(
-    # ---- REPLACE DEFAULT PATHS AS APPROPRIATE ----
-    input_path: Path = RAW_DATA_DIR / "dataset.csv",
-    output_path: Path = PROCESSED_DATA_DIR / "dataset.csv",
-    # ----------------------------------------------
+    input_path: Path = RAW_DATA_DIR / "obesity_estimation_original.csv",
+    output_path: Path = INTERIM_DATA_DIR / "obesity_dedup.csv",
+    report_path: Path = REPORTS_DIR / "data" / "dedup_report.json",
+    chunksize: int = typer.Option(100_000, help="Filas por chunk de lectura"),
+    memory_limit_mb: float = typer.Option(256, help="Memoria máxima de los fingerprints antes de volcar a disco"),
+    partitions: int = typer.Option(64, help="Particiones de los fingerprints (potencia de 2)"),
+    normalize: bool = typer.Option(True, help="Comparar filas con la normalización de DataCleanerTransformer"),
+    spill_dir: Optional[Path] = typer.Option(None, help="Directorio para los volcados a disco"),
 ):
-    # ---- REPLACE THIS WITH YOUR OWN CODE ----
-    logger.info("Processing dataset...")
-    for i in tqdm(range(10), total=10):
-        if i == 5:
-            logger.info("Something happened for iteration 5.")
-    logger.success("Processing dataset complete.")
-    # -----------------------------------------
+    """Elimina filas duplicadas del CSV crudo por streaming y guarda el reporte."""
+    report = deduplicate_csv(
+        input_path, output_path, chunksize, memory_limit_mb, partitions, normalize, spill_dir
+    )
+    logger.info(
+        f"{report['rows']} filas: {report['exact_duplicates']} duplicados exactos, "
+        f"{report['duplicates_dropped']} eliminados; {report['spills']} volcados a disco"
+    )
+
+    report_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(report_path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    logger.success(f"Dataset sin duplicados guardado en: {output_path} ({report['total_seconds']:.1f} s)")
 
 
 if __name__ == "__main__":
+    configure_logging()
     app()
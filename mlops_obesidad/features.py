@@ -4,7 +4,7 @@ from loguru import logger
 from tqdm import tqdm
 import typer
 
-from mlops_obesidad.config import PROCESSED_DATA_DIR
+from mlops_obesidad.config import PROCESSED_DATA_DIR, configure_logging
 
 app = typer.Typer()
 
@@ -26,4 +26,5 @@ def main(
 
 
 if __name__ == "__main__":
+    configure_logging()
     app()
@@ -1,7 +1,45 @@
-"""Módulo de inferencia para hacer predicciones con el modelo entrenado."""
+"""Módulo de inferencia para hacer predicciones con el modelo entrenado.
 
-from mlops_obesidad.inference.model_loader import load_model, get_model
-from mlops_obesidad.inference.predictor import predict_single, request_to_dataframe
+Los nombres públicos se resuelven bajo demanda (PEP 562): pandas, scikit-learn
+y XGBoost solo se importan cuando se usa la función correspondiente.
+"""
 
-__all__ = ["load_model", "get_model", "predict_single", "request_to_dataframe"]
+import importlib
+from typing import Any
 
+_EXPORTS = {
+    "load_model": "mlops_obesidad.inference.model_loader",
+    "get_model": "mlops_obesidad.inference.model_loader",
+    "is_model_loaded": "mlops_obesidad.inference.model_loader",
+    "predict_single": "mlops_obesidad.inference.predictor",
+    "predict_batch": "mlops_obesidad.inference.predictor",
+    "predict_grid": "mlops_obesidad.inference.predictor",
+    "request_to_dataframe": "mlops_obesidad.inference.predictor",
+    "requests_to_dataframe": "mlops_obesidad.inference.predictor",
+    "explain_single": "mlops_obesidad.inference.explainer",
+    "explain_batch": "mlops_obesidad.inference.explainer",
+    "ModelUnavailableError": "mlops_obesidad.inference.fallback",
+    "model_breaker": "mlops_obesidad.inference.fallback",
+    "get_fallback_table": "mlops_obesidad.inference.fallback",
+    "load_fallback_table": "mlops_obesidad.inference.fallback",
+    "load_cascade_stage": "mlops_obesidad.inference.cascade",
+    "get_cascade_stage": "mlops_obesidad.inference.cascade",
+    "load_early_exit": "mlops_obesidad.inference.early_exit",
+    "get_early_exit": "mlops_obesidad.inference.early_exit",
+    "warm_up": "mlops_obesidad.inference.warmup",
+    "warmup_status": "mlops_obesidad.inference.warmup",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str) -> Any:
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_EXPORTS[name]), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
@@ -0,0 +1,168 @@
+"""
+Cache en memoria para resultados de inferencia.
+
+Las predicciones y explicaciones son deterministas para un mismo modelo, por
+lo que se pueden reutilizar entre requests idénticos. Todas las caches usan la
+misma clave canónica del request y se vacían al cargar un modelo nuevo.
+"""
+
+from collections import OrderedDict
+import itertools
+import sys
+import threading
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+from mlops_obesidad.config import FEATURE_COLUMNS
+
+# Tamaño máximo por defecto de cada cache (número de entradas)
+DEFAULT_CACHE_SIZE = 10_000
+
+# Entradas que se miden para estimar los bytes ocupados por una cache
+NBYTES_SAMPLE = 32
+
+
+def deep_sizeof(obj: Any) -> int:
+    """
+    Tamaño aproximado en bytes de un objeto y de lo que contiene.
+
+    Recorre tuplas, listas y diccionarios; para los arrays de numpy suma el
+    buffer de datos (`nbytes`), que sys.getsizeof no incluye en las vistas.
+    """
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(deep_sizeof(k) + deep_sizeof(v) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple)):
+        size += sum(deep_sizeof(item) for item in obj)
+    elif hasattr(obj, "nbytes") and getattr(obj, "base", None) is not None:
+        size += obj.nbytes
+    return size
+
+
+def request_key(request: Any) -> Tuple:
+    """
+    Clave canónica de un request de predicción.
+
+    Es la tupla de los 16 valores en el orden de FEATURE_COLUMNS, con los
+    enums convertidos a su valor string, de modo que dos requests con los
+    mismos datos producen la misma clave.
+
+    Args:
+        request: PredictionRequest (u objeto con los mismos atributos)
+
+    Returns:
+        Tupla hashable con los valores del request
+    """
+    return tuple(
+        getattr(value, "value", value)
+        for value in (getattr(request, col) for col in FEATURE_COLUMNS)
+    )
+
+
+class LRUCache:
+    """Cache LRU thread-safe con estadísticas de aciertos."""
+
+    def __init__(self, maxsize: int = DEFAULT_CACHE_SIZE):
+        self.maxsize = maxsize
+        self._data: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Obtiene un valor y lo marca como usado recientemente."""
+        with self._lock:
+            try:
+                value = self._data[key]
+            except KeyError:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Hashable, value: Any) -> None:
+        """Guarda un valor, descartando el menos usado si se excede el tamaño."""
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        """Vacía la cache y reinicia las estadísticas."""
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def approx_nbytes(self, sample: int = NBYTES_SAMPLE) -> int:
+        """
+        Estimación de la memoria ocupada por las entradas de la cache.
+
+        Mide las `sample` entradas más recientes (clave y valor) y extrapola
+        al tamaño actual, para no recorrer toda la cache en cada consulta.
+        """
+        with self._lock:
+            n = len(self._data)
+            items = list(itertools.islice(reversed(self._data.items()), sample))
+        if not items:
+            return 0
+        measured = sum(deep_sizeof(key) + deep_sizeof(value) for key, value in items)
+        return int(measured * n / len(items))
+
+    def stats(self, include_bytes: bool = False) -> Dict[str, Any]:
+        """Estadísticas de uso de la cache (opcionalmente con su tamaño estimado)."""
+        total = self.hits + self.misses
+        stats = {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
+        if include_bytes:
+            stats["approx_kb"] = self.approx_nbytes() // 1024
+        return stats
+
+
+# Caches globales (una por tipo de resultado)
+prediction_cache = LRUCache()
+explanation_cache = LRUCache()
+
+_CACHES: Dict[str, LRUCache] = {
+    "predictions": prediction_cache,
+    "explanations": explanation_cache,
+}
+
+
+def clear_caches() -> None:
+    """Vacía todas las caches (se llama al cargar un modelo nuevo)."""
+    for cache in _CACHES.values():
+        cache.clear()
+
+
+def cache_stats(include_bytes: bool = False) -> Dict[str, Dict[str, Any]]:
+    """Estadísticas de todas las caches."""
+    return {name: cache.stats(include_bytes) for name, cache in _CACHES.items()}
+
+
+def split_cached(cache: LRUCache, keys: List[Tuple]) -> Tuple[List[Any], List[int]]:
+    """
+    Separa un lote en resultados ya cacheados y posiciones pendientes.
+
+    Args:
+        cache: Cache a consultar
+        keys: Claves canónicas del lote
+
+    Returns:
+        Tupla con la lista de resultados (None donde falta) y los índices
+        que hay que calcular
+    """
+    results = [cache.get(key) for key in keys]
+    missing = [i for i, result in enumerate(results) if result is None]
+    return results, missing
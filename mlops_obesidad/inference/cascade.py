@@ -0,0 +1,173 @@
+"""
+Predicción en cascada: primera etapa barata y escalamiento al modelo completo.
+
+Para la mayoría de los requests la clase es evidente (casi siempre por el
+BMI). La primera etapa es una regresión logística multinomial entrenada con
+el modelo (`mlops_obesidad.modeling.cascade_stage`) y guardada como JSON:
+se evalúa con numpy, sin pasar por el pipeline de scikit-learn. Si su
+probabilidad máxima alcanza el umbral calibrado, responde ella; si no, el
+request escala al pipeline de XGBoost.
+
+La cascada es opcional (`CASCADE_ENABLED=1` en la API) y devuelve las
+probabilidades de la primera etapa para los requests que responde.
+"""
+
+import json
+from pathlib import Path
+import threading
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from loguru import logger
+import numpy as np
+
+from mlops_obesidad.config import FEATURE_COLUMNS, MODELS_DIR
+
+CASCADE_STAGE_PATH = MODELS_DIR / "cascade_stage.json"
+
+
+class CascadeStage:
+    """
+    Regresión logística multinomial sobre features calculadas con numpy.
+
+    Las features son las numéricas, el BMI y su logaritmo (con la
+    estandarización ya incorporada en los coeficientes) y un one-hot de las
+    categóricas; un nivel desconocido no suma nada.
+    """
+
+    def __init__(self, stage: Dict[str, Any]):
+        self.classes: List[str] = stage["classes"]
+        self.threshold: float = stage["threshold"]
+        self.numeric: List[str] = stage["numeric"]
+        self.categories: Dict[str, List[str]] = stage["categories"]
+        self.built_at: Optional[str] = stage.get("built_at")
+
+        self._numeric_idx = [FEATURE_COLUMNS.index(col) for col in self.numeric]
+        self._height = FEATURE_COLUMNS.index("Height")
+        self._weight = FEATURE_COLUMNS.index("Weight")
+        self._intercept = np.asarray(stage["intercept"], dtype=np.float64)
+        self._numeric_coef = np.asarray(stage["numeric_coef"], dtype=np.float64)
+        # Coeficientes de cada nivel como columnas; la última (ceros) es el nivel desconocido
+        self._categorical = [
+            (
+                FEATURE_COLUMNS.index(col),
+                {level: i for i, level in enumerate(levels)},
+                np.column_stack(
+                    [np.asarray(stage["categorical_coef"][col], dtype=np.float64),
+                     np.zeros(len(self.classes))]
+                ),
+            )
+            for col, levels in self.categories.items()
+        ]
+
+        self._lock = threading.Lock()
+        self._answered = 0
+        self._escalated = 0
+
+    def predict_proba_rows(self, rows: Sequence[Sequence[Any]]) -> np.ndarray:
+        """
+        Probabilidades de la primera etapa.
+
+        Args:
+            rows: Filas con los 16 valores en el orden de FEATURE_COLUMNS
+                (como `request_key`)
+
+        Returns:
+            Array [n, n_clases] en el orden de `classes`
+        """
+        values = np.asarray(rows, dtype=object).reshape(len(rows), len(FEATURE_COLUMNS))
+        height = values[:, self._height].astype(np.float64)
+        weight = values[:, self._weight].astype(np.float64)
+        bmi = weight / height**2
+        numeric = np.column_stack(
+            [values[:, self._numeric_idx].astype(np.float64), bmi, np.log(bmi)]
+        )
+
+        logits = numeric @ self._numeric_coef.T + self._intercept
+        for column, levels, coef in self._categorical:
+            unknown = coef.shape[1] - 1
+            index = [levels.get(str(value).strip(), unknown) for value in values[:, column]]
+            logits += coef[:, index].T
+
+        logits -= logits.max(axis=1, keepdims=True)
+        proba = np.exp(logits)
+        return proba / proba.sum(axis=1, keepdims=True)
+
+    def accept(self, proba: np.ndarray) -> np.ndarray:
+        """Máscara de filas que la primera etapa responde (confianza >= umbral)."""
+        return proba.max(axis=1) >= self.threshold
+
+    def record(self, answered: int, escalated: int) -> None:
+        """Suma requests respondidos y escalados a las estadísticas."""
+        with self._lock:
+            self._answered += answered
+            self._escalated += escalated
+
+    def stats(self) -> Dict[str, Any]:
+        """Requests respondidos por la primera etapa y escalados al modelo completo."""
+        total = self._answered + self._escalated
+        return {
+            "threshold": self.threshold,
+            "answered": self._answered,
+            "escalated": self._escalated,
+            "escalation_rate": round(self._escalated / total, 4) if total else None,
+        }
+
+
+# Primera etapa cargada (None = cascada desactivada)
+_cascade_stage: Optional[CascadeStage] = None
+
+
+def load_cascade_stage(
+    path: Optional[Path] = None, classes: Optional[Sequence[str]] = None
+) -> Optional[CascadeStage]:
+    """
+    Carga la primera etapa desde JSON y activa la cascada.
+
+    Args:
+        path: Ruta del JSON. Si es None, usa el path por defecto.
+        classes: Clases del modelo cargado, en orden; si no coinciden con
+            las de la etapa, la cascada queda desactivada
+
+    Returns:
+        La primera etapa, o None si no existe, no se puede leer o no
+        corresponde al modelo
+    """
+    global _cascade_stage
+
+    if path is None:
+        path = CASCADE_STAGE_PATH
+
+    _cascade_stage = None
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            stage = CascadeStage(json.load(f))
+    except (OSError, ValueError, KeyError) as e:
+        logger.warning(f"Primera etapa de la cascada no disponible ({path}): {e}")
+        return None
+    if classes is not None and list(classes) != stage.classes:
+        logger.warning(f"La primera etapa ({path}) tiene otras clases que el modelo; cascada desactivada")
+        return None
+
+    _cascade_stage = stage
+    logger.info(f"Cascada activada: primera etapa con umbral {_cascade_stage.threshold:.3f}")
+    return _cascade_stage
+
+
+def get_cascade_stage() -> Optional[CascadeStage]:
+    """Obtiene la primera etapa si la cascada está activada."""
+    return _cascade_stage
+
+
+def split_by_stage(
+    stage: CascadeStage, rows: Sequence[Sequence[Any]]
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Evalúa la primera etapa sobre un lote y registra cuántas filas escalan.
+
+    Returns:
+        Tupla (probabilidades de la primera etapa, máscara de filas respondidas)
+    """
+    proba = stage.predict_proba_rows(rows)
+    accepted = stage.accept(proba)
+    stage.record(int(accepted.sum()), int(len(accepted) - accepted.sum()))
+    return proba, accepted
@@ -0,0 +1,199 @@
+"""
+Predicción con salida temprana sobre las rondas del ensamble de XGBoost.
+
+El booster se evalúa por etapas: las primeras K rondas, las K siguientes y
+así sucesivamente, acumulando el margen de cada fila (`base_margin`). Una
+fila sale en cuanto la clase con mayor margen ya no puede cambiar:
+
+- De forma demostrable: aunque los árboles restantes sumen a la clase líder
+  su hoja mínima y a cada rival su hoja máxima, la líder sigue adelante.
+- De forma empírica: la ventaja sobre la segunda clase supera el umbral de
+  la etapa, calibrado en el train (`mlops_obesidad.modeling.early_exit_calibration`)
+  como la reducción de la ventaja que se observa hasta el modelo completo.
+
+La salida temprana es opcional (`EARLY_EXIT_ENABLED=1` en la API). Las
+probabilidades que devuelve son el softmax del margen parcial, no las del
+ensamble completo.
+"""
+
+import json
+from pathlib import Path
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from loguru import logger
+import numpy as np
+import pandas as pd
+
+from mlops_obesidad.config import MODELS_DIR
+
+EARLY_EXIT_PATH = MODELS_DIR / "early_exit.json"
+
+
+class EarlyExitBooster:
+    """
+    Evaluación por etapas del pipeline con los umbrales de salida calibrados.
+
+    Las cotas de los árboles restantes y los umbrales se indexan por etapa;
+    la última etapa completa el ensamble y no tiene umbral.
+    """
+
+    def __init__(self, config: Dict[str, Any], model: Any):
+        self.classes: List[str] = config["classes"]
+        self.n_rounds: int = config["n_rounds"]
+        self.stage_rounds: List[int] = config["stage_rounds"]
+        self.tolerance: float = config["tolerance"]
+        self.built_at: Optional[str] = config.get("built_at")
+
+        # Umbral None: en esa etapa ninguna fila sale por la vía empírica
+        self._thresholds = np.array(
+            [np.inf if t is None else t for t in config["thresholds"]], dtype=np.float32
+        )
+        self._lower = np.asarray(config["lower"], dtype=np.float32)
+        self._upper = np.asarray(config["upper"], dtype=np.float32)
+        self._preprocess = model[:-1]
+        self._booster = model[-1].get_booster()
+
+        self._lock = threading.Lock()
+        self._rows = 0
+        self._rounds = 0
+        self._exits = [0] * len(self.stage_rounds)
+
+    def _stable(self, stage: int, margin: np.ndarray) -> np.ndarray:
+        """Máscara de filas cuya clase líder ya no cambia con el resto de las rondas."""
+        rows = np.arange(len(margin))
+        top = margin.argmax(axis=1)
+        ordered = np.sort(margin, axis=1)
+        empirical = ordered[:, -1] - ordered[:, -2] > self._thresholds[stage]
+
+        rivals = margin + self._upper[stage]
+        rivals[rows, top] = -np.inf
+        provable = margin[rows, top] + self._lower[stage][top] > rivals.max(axis=1)
+        return empirical | provable
+
+    def predict_margin(self, features: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Márgenes por etapas sobre features ya transformadas.
+
+        Args:
+            features: Salida del preprocesamiento del pipeline [n, d]
+
+        Returns:
+            Tupla (márgenes en la etapa de salida [n, n_clases], rondas
+            evaluadas por fila)
+        """
+        features = np.ascontiguousarray(features, dtype=np.float32)
+        margin = np.empty((len(features), len(self.classes)), dtype=np.float32)
+        rounds = np.full(len(features), self.n_rounds)
+        active = np.arange(len(features))
+        current, start = None, 0
+        last = len(self.stage_rounds) - 1
+
+        for stage, end in enumerate(self.stage_rounds):
+            kwargs = {} if current is None else {"base_margin": current}
+            current = self._booster.inplace_predict(
+                features[active], iteration_range=(start, end), predict_type="margin", **kwargs
+            ).reshape(len(active), -1)
+            start = end
+
+            done = np.ones(len(active), dtype=bool) if stage == last else self._stable(stage, current)
+            margin[active[done]] = current[done]
+            rounds[active[done]] = end
+            active, current = active[~done], current[~done]
+            if not len(active):
+                break
+
+        return margin, rounds
+
+    def predict_proba(self, X: pd.DataFrame) -> np.ndarray:
+        """
+        Probabilidades del pipeline con salida temprana (softmax del margen parcial).
+
+        Args:
+            X: Features crudas, como las recibe el pipeline
+
+        Returns:
+            Array [n, n_clases] en el orden de `classes`
+        """
+        margin, rounds = self.predict_margin(self._preprocess.transform(X))
+        self.record(rounds)
+
+        margin -= margin.max(axis=1, keepdims=True)
+        proba = np.exp(margin)
+        return proba / proba.sum(axis=1, keepdims=True)
+
+    def record(self, rounds: np.ndarray) -> None:
+        """Suma filas, rondas evaluadas y salidas por etapa a las estadísticas."""
+        stages = np.searchsorted(self.stage_rounds, rounds)
+        with self._lock:
+            self._rows += len(rounds)
+            self._rounds += int(rounds.sum())
+            for stage, count in zip(*np.unique(stages, return_counts=True)):
+                self._exits[int(stage)] += int(count)
+
+    def stats(self) -> Dict[str, Any]:
+        """Filas evaluadas, fracción media de árboles usados y salidas por etapa."""
+        return {
+            "stage_rounds": self.stage_rounds,
+            "tolerance": self.tolerance,
+            "rows": self._rows,
+            "mean_tree_fraction": round(self._rounds / (self._rows * self.n_rounds), 4)
+            if self._rows else None,
+            "exits_by_stage": list(self._exits),
+        }
+
+
+# Evaluación por etapas cargada (None = salida temprana desactivada)
+_early_exit: Optional[EarlyExitBooster] = None
+
+
+def load_early_exit(
+    artifacts: Optional[Dict[str, Any]] = None, path: Optional[Path] = None
+) -> Optional[EarlyExitBooster]:
+    """
+    Carga los umbrales de salida temprana desde JSON y activa el modo.
+
+    Args:
+        artifacts: Artefactos del modelo ('model', 'label_encoder'). Si es
+            None, usa el modelo cargado.
+        path: Ruta del JSON. Si es None, usa el path por defecto.
+
+    Returns:
+        La evaluación por etapas, o None si el JSON no existe, no se puede
+        leer o fue calibrado para otro modelo (otras clases o rondas)
+    """
+    global _early_exit
+
+    if path is None:
+        path = EARLY_EXIT_PATH
+    if artifacts is None:
+        from mlops_obesidad.inference.model_loader import get_model
+
+        artifacts = get_model()
+
+    _early_exit = None
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            early_exit = EarlyExitBooster(json.load(f), artifacts["model"])
+    except (OSError, ValueError, KeyError) as e:
+        logger.warning(f"Umbrales de salida temprana no disponibles ({path}): {e}")
+        return None
+    classes = [str(c) for c in artifacts["label_encoder"].classes_]
+    if (
+        classes != early_exit.classes
+        or early_exit._booster.num_boosted_rounds() != early_exit.n_rounds
+    ):
+        logger.warning(f"Los umbrales de salida temprana ({path}) son de otro modelo; modo desactivado")
+        return None
+
+    _early_exit = early_exit
+    logger.info(
+        f"Salida temprana activada: etapas de {early_exit.stage_rounds[0]} rondas "
+        f"(tolerancia {early_exit.tolerance})"
+    )
+    return _early_exit
+
+
+def get_early_exit() -> Optional[EarlyExitBooster]:
+    """Obtiene la evaluación por etapas si la salida temprana está activada."""
+    return _early_exit
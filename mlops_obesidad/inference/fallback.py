@@ -0,0 +1,236 @@
+"""
+Modo degradado: circuit breaker del modelo y tabla de probabilidades precalculada.
+
+Si el modelo no se puede cargar o falla al predecir, el circuit breaker se abre
+tras `failure_threshold` fallos consecutivos y durante una ventana de backoff
+(que se duplica en cada apertura) nadie vuelve a intentar cargar el artefacto.
+Mientras tanto la API responde con una tabla determinista construida en
+entrenamiento (`mlops_obesidad.modeling.fallback_table`): probabilidades por
+bin de BMI y algunas features clave, con respaldo jerárquico cuando una celda
+tiene pocos datos. Las respuestas se marcan como degradadas.
+
+Este módulo no importa pandas ni scikit-learn: debe funcionar justamente
+cuando el artefacto del modelo no se puede usar.
+"""
+
+from bisect import bisect_right
+import json
+from pathlib import Path
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from loguru import logger
+
+from mlops_obesidad.config import MODELS_DIR
+
+FALLBACK_TABLE_PATH = MODELS_DIR / "fallback_table.json"
+
+
+class ModelUnavailableError(RuntimeError):
+    """El modelo no está disponible (carga fallida o circuito abierto)."""
+
+
+# =============================================================================
+# Circuit breaker
+# =============================================================================
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker de tres estados (cerrado, abierto, semiabierto).
+
+    - Cerrado: se usa el modelo; los fallos consecutivos se cuentan.
+    - Abierto: tras `failure_threshold` fallos no se usa el modelo durante la
+      ventana de backoff.
+    - Semiabierto: vencida la ventana se permite un solo intento; si funciona
+      el circuito se cierra, si falla se abre con el doble de backoff.
+    """
+
+    def __init__(
+        self, failure_threshold: int = 3, backoff: float = 30.0, max_backoff: float = 600.0
+    ):
+        self.failure_threshold = failure_threshold
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._trips = 0
+        self._opened_at: Optional[float] = None
+        self._trial_started: Optional[float] = None
+
+    def _current_backoff(self) -> float:
+        return min(self.backoff * 2 ** max(self._trips - 1, 0), self.max_backoff)
+
+    @property
+    def state(self) -> str:
+        """'closed', 'open' o 'half_open'."""
+        if self._opened_at is None:
+            return "closed"
+        if time.monotonic() - self._opened_at < self._current_backoff():
+            return "open"
+        return "half_open"
+
+    def allow(self) -> bool:
+        """Indica si se puede usar (o intentar cargar) el modelo."""
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            now = time.monotonic()
+            backoff = self._current_backoff()
+            if now - self._opened_at < backoff:
+                return False
+            # Semiabierto: un solo intento a la vez; un intento que nunca
+            # reportó su resultado vence después de otra ventana
+            if self._trial_started is None or now - self._trial_started >= backoff:
+                self._trial_started = now
+                return True
+            return False
+
+    def record_success(self) -> None:
+        """Registra un uso exitoso del modelo (cierra el circuito)."""
+        if self._opened_at is None and self._failures == 0:
+            return
+        with self._lock:
+            if self._opened_at is not None:
+                logger.success("Circuit breaker del modelo cerrado: el modelo volvió a responder")
+            self._failures = 0
+            self._trips = 0
+            self._opened_at = None
+            self._trial_started = None
+
+    def record_failure(self) -> None:
+        """Registra un fallo del modelo; abre el circuito al llegar al umbral."""
+        with self._lock:
+            self._failures += 1
+            was_trial = self._trial_started is not None
+            self._trial_started = None
+            if self._opened_at is None:
+                should_open = self._failures >= self.failure_threshold
+            else:
+                # Con el circuito abierto solo el intento semiabierto reabre la
+                # ventana; los fallos de requests que ya estaban en curso no
+                should_open = was_trial
+            if should_open:
+                self._trips += 1
+                self._opened_at = time.monotonic()
+                logger.warning(
+                    f"Circuit breaker del modelo abierto tras {self._failures} fallos; "
+                    f"sin reintentos durante {self._current_backoff():.0f} s"
+                )
+
+    def retry_after(self) -> float:
+        """Segundos hasta el próximo intento permitido (0 si el circuito está cerrado)."""
+        if self._opened_at is None:
+            return 0.0
+        return max(0.0, self._opened_at + self._current_backoff() - time.monotonic())
+
+    def status(self) -> Dict[str, Any]:
+        """Estado del circuit breaker."""
+        return {
+            "state": self.state,
+            "consecutive_failures": self._failures,
+            "failure_threshold": self.failure_threshold,
+            "backoff_seconds": self._current_backoff(),
+            "retry_after_seconds": round(self.retry_after(), 1),
+        }
+
+
+# Circuit breaker global del modelo
+model_breaker = CircuitBreaker()
+
+
+# =============================================================================
+# Tabla de probabilidades precalculada
+# =============================================================================
+
+
+class FallbackTable:
+    """
+    Tabla determinista de probabilidades por bin de BMI y features clave.
+
+    Se busca primero la celda (bin de BMI, features clave); si no existe o
+    tiene menos de `min_count` filas se usa la del bin de BMI y, en último
+    caso, la distribución global de clases.
+    """
+
+    def __init__(self, table: Dict[str, Any]):
+        self.classes: List[str] = table["classes"]
+        self.bmi_edges: List[float] = table["bmi_edges"]
+        self.key_features: List[str] = table["key_features"]
+        self.cells: Dict[str, List[float]] = table["cells"]
+        self.bmi_only: Dict[str, List[float]] = table["bmi_only"]
+        self.prior: List[float] = table["prior"]
+        self.built_at: Optional[str] = table.get("built_at")
+
+    @staticmethod
+    def cell_key(bmi_bin: int, values: List[str]) -> str:
+        """Clave de una celda de la tabla."""
+        return "|".join([str(bmi_bin), *values])
+
+    def lookup(self, request: Any) -> Tuple[str, Dict[str, float]]:
+        """
+        Probabilidades precalculadas para un request.
+
+        Args:
+            request: PredictionRequest (u objeto con los mismos atributos)
+
+        Returns:
+            Tupla (clase más probable, probabilidades por clase)
+        """
+        bmi = request.Weight / (request.Height ** 2)
+        bmi_bin = bisect_right(self.bmi_edges, bmi)
+        values = [
+            str(getattr(value, "value", value))
+            for value in (getattr(request, col) for col in self.key_features)
+        ]
+
+        probs = (
+            self.cells.get(self.cell_key(bmi_bin, values))
+            or self.bmi_only.get(str(bmi_bin))
+            or self.prior
+        )
+        probabilities = dict(zip(self.classes, probs))
+        best = max(range(len(probs)), key=probs.__getitem__)
+        return self.classes[best], probabilities
+
+
+# Tabla cargada (None si no existe); se lee del disco una sola vez
+_fallback_table: Optional[FallbackTable] = None
+_fallback_loaded = False
+
+
+def load_fallback_table(path: Optional[Path] = None) -> Optional[FallbackTable]:
+    """
+    Carga la tabla de fallback desde JSON.
+
+    Args:
+        path: Ruta del JSON. Si es None, usa el path por defecto.
+
+    Returns:
+        La tabla, o None si no existe o no se puede leer
+    """
+    global _fallback_table, _fallback_loaded
+
+    if path is None:
+        path = FALLBACK_TABLE_PATH
+
+    _fallback_loaded = True
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            _fallback_table = FallbackTable(json.load(f))
+    except (OSError, ValueError, KeyError) as e:
+        logger.warning(f"Tabla de fallback no disponible ({path}): {e}")
+        _fallback_table = None
+        return None
+
+    logger.info(f"Tabla de fallback cargada: {len(_fallback_table.cells)} celdas")
+    return _fallback_table
+
+
+def get_fallback_table() -> Optional[FallbackTable]:
+    """Obtiene la tabla de fallback, cargándola la primera vez."""
+    if not _fallback_loaded:
+        load_fallback_table()
+    return _fallback_table
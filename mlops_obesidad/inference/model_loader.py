@@ -2,25 +2,57 @@
 Módulo para cargar y gestionar el modelo entrenado.
 """
 
+import os
 import pickle
-import sys
 from pathlib import Path
 from typing import Dict, Optional, Any
 from loguru import logger
 
 from mlops_obesidad.config import MODELS_DIR
+from mlops_obesidad.inference.cache import clear_caches
+from mlops_obesidad.inference.fallback import ModelUnavailableError, model_breaker
 
-# Importar DataCleanerTransformer para que pickle pueda cargar el modelo
-# Esta importación debe estar aquí antes de cargar el modelo
-from mlops_obesidad.preprocessing.transformers import DataCleanerTransformer
+# Clases que el notebook guardó desde __main__ y su ubicación real en el paquete
+_MAIN_CLASSES = {
+    "DataCleanerTransformer": "mlops_obesidad.preprocessing.transformers",
+}
 
-# Registrar la clase en sys.modules para que pickle la encuentre
-# Esto es necesario porque el modelo fue guardado desde un notebook donde
-# la clase estaba en __main__
-if '__main__' not in sys.modules:
-    import types
-    sys.modules['__main__'] = types.ModuleType('__main__')
-sys.modules['__main__'].DataCleanerTransformer = DataCleanerTransformer
+
+class ArtifactUnpickler(pickle.Unpickler):
+    """
+    Unpickler que resuelve las clases personalizadas guardadas desde el notebook.
+    
+    El modelo fue guardado desde un notebook donde DataCleanerTransformer estaba
+    definido en __main__; en lugar de modificar sys.modules['__main__'] al
+    importar, la referencia se redirige al módulo del paquete solo durante la
+    carga (y la importación de sklearn ocurre recién aquí).
+    """
+    
+    def find_class(self, module: str, name: str) -> Any:
+        if module == "__main__" and name in _MAIN_CLASSES:
+            module = _MAIN_CLASSES[name]
+        return super().find_class(module, name)
+
+
+def load_artifacts(model_path: Path) -> Dict[str, Any]:
+    """
+    Lee un artefacto del disco con ArtifactUnpickler.
+
+    A diferencia de load_model, no guarda el resultado como modelo servido ni
+    limpia los caches: lo usan los scripts que cargan artefactos por su cuenta.
+
+    Args:
+        model_path: Ruta al pickle del artefacto
+
+    Returns:
+        Diccionario con 'model', 'label_encoder' y los metadatos guardados
+    """
+    with open(model_path, "rb") as f:
+        return ArtifactUnpickler(f).load()
+
+
+# Artefacto por defecto; MODEL_PATH permite servir otro (p. ej. el export slim)
+DEFAULT_MODEL_PATH = MODELS_DIR / "xgboost_model_artifacts.pkl"
 
 # Variable global para almacenar el modelo cargado
 _model_artifacts: Optional[Dict[str, Any]] = None
@@ -31,7 +63,8 @@ def load_model(model_path: Optional[Path] = None) -> Dict[str, Any]:
     Carga el modelo y sus artefactos desde un archivo pickle.
     
     Args:
-        model_path: Ruta al archivo del modelo. Si es None, usa el path por defecto.
+        model_path: Ruta al archivo del modelo. Si es None, usa la variable de
+            entorno MODEL_PATH o el path por defecto.
         
     Returns:
         Diccionario con 'model' y 'label_encoder'
@@ -47,7 +80,7 @@ def load_model(model_path: Optional[Path] = None) -> Dict[str, Any]:
         return _model_artifacts
     
     if model_path is None:
-        model_path = MODELS_DIR / "xgboost_model_artifacts.pkl"
+        model_path = Path(os.getenv("MODEL_PATH") or DEFAULT_MODEL_PATH)
     
     if not model_path.exists():
         raise FileNotFoundError(f"El archivo del modelo no existe: {model_path}")
@@ -55,8 +88,10 @@ def load_model(model_path: Optional[Path] = None) -> Dict[str, Any]:
     logger.info(f"Cargando modelo desde: {model_path}")
     
     try:
-        with open(model_path, 'rb') as f:
-            _model_artifacts = pickle.load(f)
+        _model_artifacts = load_artifacts(model_path)
+        
+        # Los resultados cacheados corresponden al modelo anterior
+        clear_caches()
         
         logger.success("Modelo cargado exitosamente")
         logger.info(f"Label encoder con {len(_model_artifacts['label_encoder'].classes_)} clases")
@@ -73,20 +108,37 @@ def get_model() -> Dict[str, Any]:
     """
     Obtiene el modelo cargado. Si no está cargado, lo carga primero.
     
+    La carga pasa por el circuit breaker del modelo: tras varios fallos
+    consecutivos no se vuelve a leer el artefacto del disco hasta que vence la
+    ventana de backoff, y mientras tanto se lanza ModelUnavailableError de
+    inmediato.
+    
     Returns:
         Diccionario con 'model' y 'label_encoder'
         
     Raises:
-        RuntimeError: Si el modelo no está cargado y no se puede cargar
+        ModelUnavailableError: Si el circuito está abierto o la carga falla
+            (subclase de RuntimeError)
     """
     global _model_artifacts
     
-    if _model_artifacts is None:
-        logger.warning("Modelo no está cargado, cargando ahora...")
-        load_model()
+    if not model_breaker.allow():
+        raise ModelUnavailableError(
+            f"Modelo no disponible (circuit breaker abierto, próximo intento en "
+            f"{model_breaker.retry_after():.0f} s)"
+        )
     
     if _model_artifacts is None:
-        raise RuntimeError("No se pudo cargar el modelo")
+        logger.warning("Modelo no está cargado, cargando ahora...")
+        try:
+            load_model()
+        except Exception as e:
+            model_breaker.record_failure()
+            raise ModelUnavailableError(f"No se pudo cargar el modelo: {e}") from e
     
     return _model_artifacts
 
+
+def is_model_loaded() -> bool:
+    """Indica si el modelo ya está en memoria (sin intentar cargarlo)."""
+    return _model_artifacts is not None
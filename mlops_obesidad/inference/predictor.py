@@ -4,13 +4,20 @@ Módulo para realizar predicciones con el modelo entrenado.
 
 import pandas as pd
 import numpy as np
-from typing import Dict, Tuple
+from typing import Dict, List, Sequence, Tuple
 
 from loguru import logger
 
 from API.schemas import PredictionRequest
+from mlops_obesidad.config import FEATURE_COLUMNS
+from mlops_obesidad.inference.cache import prediction_cache, request_key, split_cached
+from mlops_obesidad.inference.cascade import get_cascade_stage, split_by_stage
+from mlops_obesidad.inference.early_exit import get_early_exit
 from mlops_obesidad.inference.model_loader import get_model
 
+# Resultado de una predicción: (etiqueta, probabilidades, probabilidades por clase)
+PredictionResult = Tuple[str, np.ndarray, Dict[str, float]]
+
 
 def request_to_dataframe(request: PredictionRequest) -> pd.DataFrame:
     """
@@ -52,10 +59,97 @@ def request_to_dataframe(request: PredictionRequest) -> pd.DataFrame:
     return df
 
 
+def requests_to_dataframe(requests: Sequence[PredictionRequest]) -> pd.DataFrame:
+    """
+    Convierte una lista de PredictionRequest a un DataFrame (una fila por request).
+    
+    Args:
+        requests: Requests de predicción
+        
+    Returns:
+        DataFrame con las 16 columnas en el orden esperado por el modelo
+    """
+    rows = [request_key(request) for request in requests]
+    return pd.DataFrame(rows, columns=FEATURE_COLUMNS)
+
+
+def predict_batch(requests: Sequence[PredictionRequest]) -> List[PredictionResult]:
+    """
+    Realiza predicciones para un lote de requests con una sola llamada al modelo.
+    
+    Los requests ya vistos se sirven desde la cache de predicciones y solo
+    los restantes se envían al modelo. Con la cascada activada, la primera
+    etapa responde las filas que superan su umbral y solo el resto escala al
+    pipeline; con la salida temprana activada, el pipeline evalúa el
+    ensamble por etapas.
+    
+    Args:
+        requests: Requests de predicción
+        
+    Returns:
+        Lista de tuplas (etiqueta, probabilidades, probabilidades por clase),
+        en el mismo orden que los requests
+        
+    Raises:
+        RuntimeError: Si el modelo no está cargado
+        Exception: Si hay error durante la predicción
+    """
+    artifacts = get_model()
+    model = artifacts['model']
+    label_encoder = artifacts['label_encoder']
+    
+    keys = [request_key(request) for request in requests]
+    results, missing = split_cached(prediction_cache, keys)
+    if not missing:
+        return results
+    
+    rows = [keys[i] for i in missing]
+    stage = get_cascade_stage()
+    if stage is not None:
+        # Cascada: el modelo completo solo puntúa las filas bajo el umbral
+        pred_proba, answered = split_by_stage(stage, rows)
+        escalated = np.flatnonzero(~answered)
+    else:
+        pred_proba, escalated = None, np.arange(len(rows))
+    
+    if len(escalated):
+        df_input = pd.DataFrame([rows[i] for i in escalated], columns=FEATURE_COLUMNS)
+        early_exit = get_early_exit()
+        try:
+            if early_exit is not None:
+                model_proba = early_exit.predict_proba(df_input)
+            else:
+                model_proba = model.predict_proba(df_input)
+        except Exception as e:
+            logger.error(f"Error durante la predicción por lote: {e}")
+            raise Exception(f"Error durante la predicción: {e}")
+        if pred_proba is None:
+            pred_proba = model_proba
+        else:
+            pred_proba[escalated] = model_proba
+    
+    class_names = label_encoder.classes_
+    pred_labels = label_encoder.inverse_transform(pred_proba.argmax(axis=1))
+    for row, i in enumerate(missing):
+        result = (
+            pred_labels[row],
+            pred_proba[row],
+            {name: float(prob) for name, prob in zip(class_names, pred_proba[row])},
+        )
+        prediction_cache.put(keys[i], result)
+        results[i] = result
+    
+    return results
+
+
 def predict_single(request: PredictionRequest) -> Tuple[str, np.ndarray, Dict[str, float]]:
     """
     Realiza una predicción individual con el modelo entrenado.
     
+    Con la cascada activada, el pipeline solo se usa si la primera etapa no
+    alcanza su umbral de confianza. Con la salida temprana activada, el
+    ensamble se evalúa por etapas hasta que la clase predicha es estable.
+    
     Args:
         request: Request de predicción con los datos del individuo
         
@@ -74,6 +168,23 @@ def predict_single(request: PredictionRequest) -> Tuple[str, np.ndarray, Dict[st
     model = artifacts['model']
     label_encoder = artifacts['label_encoder']
     
+    # Requests idénticos producen la misma predicción
+    key = request_key(request)
+    cached = prediction_cache.get(key)
+    if cached is not None:
+        return cached
+    
+    # Cascada: la primera etapa responde si supera su umbral de confianza
+    stage = get_cascade_stage()
+    if stage is not None:
+        stage_proba, answered = split_by_stage(stage, [key])
+        if answered[0]:
+            proba = stage_proba[0]
+            pred_label = stage.classes[int(proba.argmax())]
+            result = (pred_label, proba, dict(zip(stage.classes, proba.tolist())))
+            prediction_cache.put(key, result)
+            return result
+    
     # Convertir request a DataFrame
     df_input = request_to_dataframe(request)
     
@@ -82,8 +193,13 @@ def predict_single(request: PredictionRequest) -> Tuple[str, np.ndarray, Dict[st
     try:
         # El modelo tiene un pipeline completo que hace limpieza y preprocesamiento
         # Por lo tanto, podemos pasarle los datos crudos directamente
-        pred_numeric = model.predict(df_input)
-        pred_proba = model.predict_proba(df_input)
+        early_exit = get_early_exit()
+        if early_exit is not None:
+            pred_proba = early_exit.predict_proba(df_input)
+            pred_numeric = pred_proba.argmax(axis=1)
+        else:
+            pred_numeric = model.predict(df_input)
+            pred_proba = model.predict_proba(df_input)
         
         # Decodificar etiqueta
         pred_label = label_encoder.inverse_transform(pred_numeric)[0]
@@ -98,9 +214,41 @@ def predict_single(request: PredictionRequest) -> Tuple[str, np.ndarray, Dict[st
         
         logger.debug(f"Predicción: {pred_label}, Confianza: {max(pred_proba[0]):.4f}")
         
-        return pred_label, pred_proba[0], probabilities_dict
+        result = (pred_label, pred_proba[0], probabilities_dict)
+        prediction_cache.put(key, result)
+        
+        return result
         
     except Exception as e:
         logger.error(f"Error durante la predicción: {e}")
         raise Exception(f"Error durante la predicción: {e}")
 
+
+
+def predict_grid(
+    request: PredictionRequest, feature: str, values: Sequence
+) -> Tuple[np.ndarray, List[str]]:
+    """
+    Probabilidades de un individuo variando una feature sobre una grilla.
+    
+    La grilla completa se arma como un solo lote (una fila por valor, el
+    resto de las features fijas) y se puntúa con una sola llamada al modelo.
+    
+    Args:
+        request: Individuo de referencia
+        feature: Columna que varía
+        values: Valores de la grilla
+        
+    Returns:
+        Tupla (probabilidades de forma (len(values), n_clases), nombres de las clases)
+        
+    Raises:
+        RuntimeError: Si el modelo no está cargado
+    """
+    artifacts = get_model()
+    
+    df_input = pd.DataFrame([request_key(request)] * len(values), columns=FEATURE_COLUMNS)
+    df_input[feature] = list(values)
+    
+    pred_proba = artifacts['model'].predict_proba(df_input)
+    return pred_proba, list(artifacts['label_encoder'].classes_)
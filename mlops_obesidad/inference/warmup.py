@@ -0,0 +1,128 @@
+"""
+Calentamiento del modelo antes de aceptar tráfico.
+
+Cargar el artefacto no basta para que el primer request sea rápido: la primera
+predicción paga la inicialización perezosa de scikit-learn y XGBoost (pool de
+hilos, buffers del predictor, caminos de pandas) y la primera explicación la
+de `pred_contribs`. `warm_up()` ejecuta esos caminos con un lote
+representativo de los datos de entrenamiento y deja registrado el resultado
+para el endpoint de readiness.
+
+El lote se genera a partir del perfil de referencia que acompaña al modelo
+(`models/reference_profile.json`): los datos crudos no se incluyen en la
+imagen de Docker, pero el perfil conserva los histogramas de las variables
+numéricas y las frecuencias de las categóricas del entrenamiento.
+"""
+
+import random
+import time
+from typing import Any, Dict, List, Optional
+
+from API.schemas import PredictionRequest
+from loguru import logger
+
+from mlops_obesidad.config import CATEGORICAL_FEATURES, NUMERIC_FEATURES
+
+# Filas del lote de calentamiento por defecto
+WARMUP_ROWS = 64
+
+# Estado del calentamiento en este proceso
+_warmup_state: Dict[str, Any] = {"done": False, "rows": 0, "seconds": None, "error": None}
+
+
+def _sample_numeric(rng: random.Random, edges: List[float], counts: List[int]) -> float:
+    """Muestrea un valor del histograma: bin según su frecuencia y uniforme dentro del bin."""
+    index = rng.choices(range(len(counts)), weights=counts)[0]
+    # Los bins de los extremos no tienen límite: se usa el borde más cercano
+    low = edges[max(index - 1, 0)]
+    high = edges[min(index, len(edges) - 1)]
+    return rng.uniform(low, high)
+
+
+def representative_requests(
+    n_rows: int = WARMUP_ROWS, profile: Optional[Dict[str, Any]] = None, seed: int = 0
+) -> List[PredictionRequest]:
+    """
+    Genera requests con la distribución marginal de los datos de entrenamiento.
+
+    Args:
+        n_rows: Número de requests
+        profile: Perfil de referencia. Si es None, se lee el que acompaña al modelo.
+        seed: Semilla del generador (el lote es determinista)
+
+    Returns:
+        Lista de requests válidos; si no hay perfil, variaciones del ejemplo del schema
+    """
+    if profile is None:
+        from mlops_obesidad.monitoring import load_reference_profile
+
+        profile = load_reference_profile()
+
+    rng = random.Random(seed)
+    example = PredictionRequest.model_json_schema()["example"]
+    if profile is None:
+        return [
+            PredictionRequest(**{**example, "Age": rng.uniform(14, 61), "Weight": rng.uniform(39, 173)})
+            for _ in range(n_rows)
+        ]
+
+    requests = []
+    for _ in range(n_rows):
+        row = dict(example)
+        for feature in NUMERIC_FEATURES:
+            spec = profile["numeric"].get(feature)
+            if spec:
+                row[feature] = round(_sample_numeric(rng, spec["edges"], spec["counts"]), 4)
+        for feature in CATEGORICAL_FEATURES:
+            frequencies = profile["categorical"].get(feature)
+            if frequencies:
+                values = list(frequencies)
+                row[feature] = rng.choices(values, weights=[frequencies[v] for v in values])[0]
+        requests.append(PredictionRequest(**row))
+    return requests
+
+
+def warm_up(n_rows: int = WARMUP_ROWS, explain: bool = True) -> Dict[str, Any]:
+    """
+    Ejecuta los caminos de inferencia con un lote representativo.
+
+    Cubre la predicción por lote, la individual y (opcionalmente) la
+    explicación. Al terminar vacía las caches para no servir resultados del
+    lote sintético ni contarlos en las estadísticas.
+
+    Args:
+        n_rows: Filas del lote (0 = no calentar; se marca como hecho)
+        explain: Si también se calienta el camino de explicaciones
+
+    Returns:
+        Estado del calentamiento (ver `warmup_status`)
+    """
+    from mlops_obesidad.inference.cache import clear_caches
+    from mlops_obesidad.inference.predictor import predict_batch, predict_single
+
+    start = time.perf_counter()
+    try:
+        if n_rows > 0:
+            requests = representative_requests(n_rows)
+            predict_batch(requests)
+            predict_single(requests[0])
+            if explain:
+                from mlops_obesidad.inference.explainer import explain_single
+
+                explain_single(requests[-1])
+    except Exception as e:
+        _warmup_state.update(done=False, error=str(e))
+        logger.error(f"Error en el calentamiento del modelo: {e}")
+        return warmup_status()
+    finally:
+        clear_caches()
+
+    seconds = time.perf_counter() - start
+    _warmup_state.update(done=True, rows=n_rows, seconds=round(seconds, 4), error=None)
+    logger.info(f"Modelo calentado con {n_rows} filas en {seconds * 1000:.1f} ms")
+    return warmup_status()
+
+
+def warmup_status() -> Dict[str, Any]:
+    """Estado del calentamiento en este proceso."""
+    return dict(_warmup_state)
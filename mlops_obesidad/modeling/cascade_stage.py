@@ -0,0 +1,307 @@
+"""
+Entrenamiento y evaluación de la primera etapa de la predicción en cascada.
+
+Se entrena junto con el modelo, sobre la misma partición de train
+(`modeling/split.py`): una regresión logística multinomial sobre las
+features numéricas, el BMI y un one-hot de las categóricas. El umbral de
+confianza se calibra con predicciones out-of-fold del train: es el menor
+umbral con el que las filas que la etapa respondería tienen al menos
+`--min-accuracy` de exactitud. La regularización se elige por la misma
+cobertura.
+
+Sobre el test reservado se reporta la tasa de escalamiento, la exactitud
+del modelo completo y de la cascada, el acuerdo entre ambos y la latencia y
+el CPU por request (una fila a la vez, como `/predict`) y por lote.
+
+Uso:
+    python -m mlops_obesidad.modeling.cascade_stage --min-accuracy 0.98
+"""
+
+from datetime import datetime
+import json
+from pathlib import Path
+import time
+from typing import Any, Dict, List, Sequence, Tuple
+
+from loguru import logger
+import numpy as np
+import pandas as pd
+import typer
+
+from mlops_obesidad.config import (
+    CATEGORICAL_FEATURES,
+    FEATURE_COLUMNS,
+    NUMERIC_FEATURES,
+    REPORTS_DIR,
+    configure_logging,
+)
+from mlops_obesidad.inference.cascade import CASCADE_STAGE_PATH, CascadeStage
+from mlops_obesidad.inference.model_loader import DEFAULT_MODEL_PATH
+from mlops_obesidad.modeling.predict import load_signed_artifacts
+from mlops_obesidad.modeling.split import RAW_DATA_PATH, load_raw_dataset, train_test_raw
+
+app = typer.Typer()
+
+# Inversas de la regularización evaluadas
+DEFAULT_C_GRID = [1.0, 10.0, 100.0]
+
+# Umbral mínimo: por debajo la etapa respondería filas en las que duda entre clases
+MIN_THRESHOLD = 0.5
+
+
+def stage_features(X: pd.DataFrame, categories: Dict[str, List[str]]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Features de la primera etapa (mismas que calcula `CascadeStage`).
+
+    Returns:
+        Tupla (numéricas + BMI + log(BMI) [n, 10], one-hot de las categóricas)
+    """
+    bmi = (X["Weight"] / X["Height"] ** 2).to_numpy(dtype=np.float64)
+    numeric = np.column_stack([X[NUMERIC_FEATURES].to_numpy(dtype=np.float64), bmi, np.log(bmi)])
+    onehot = np.column_stack(
+        [
+            (X[col].astype(str).str.strip().to_numpy()[:, None] == np.array(levels)[None, :])
+            for col, levels in categories.items()
+        ]
+    ).astype(np.float64)
+    return numeric, onehot
+
+
+def choose_threshold(confidence: np.ndarray, correct: np.ndarray, min_accuracy: float) -> float:
+    """
+    Menor umbral con el que las filas aceptadas tienen al menos `min_accuracy`.
+
+    Las filas se ordenan por confianza decreciente y se toma el prefijo más
+    largo cuya exactitud acumulada alcanza el objetivo.
+
+    Returns:
+        Umbral de confianza (1.0 si ningún prefijo alcanza el objetivo)
+    """
+    order = np.argsort(-confidence, kind="stable")
+    cumulative = np.cumsum(correct[order]) / np.arange(1, len(order) + 1)
+    ok = np.flatnonzero(cumulative >= min_accuracy)
+    if len(ok) == 0:
+        return 1.0
+    return float(max(confidence[order][ok[-1]], MIN_THRESHOLD))
+
+
+def fit_stage(
+    X: pd.DataFrame,
+    y: pd.Series,
+    classes: Sequence[str],
+    min_accuracy: float = 0.98,
+    c_grid: Sequence[float] = DEFAULT_C_GRID,
+    folds: int = 5,
+    random_state: int = 42,
+) -> Dict[str, Any]:
+    """
+    Entrena la regresión logística y calibra su umbral con predicciones out-of-fold.
+
+    Args:
+        X: Features crudas de train
+        y: Etiquetas de train (texto)
+        classes: Orden de las clases (el del LabelEncoder del modelo)
+        min_accuracy: Exactitud mínima de las filas que responde la etapa
+        c_grid: Valores de C a evaluar
+        folds: Folds de la validación cruzada
+        random_state: Semilla de los folds
+
+    Returns:
+        Diccionario serializable a JSON con la etapa (ver `CascadeStage`)
+    """
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.model_selection import StratifiedKFold, cross_val_predict
+
+    classes = list(classes)
+    categories = {col: sorted(X[col].astype(str).str.strip().unique()) for col in CATEGORICAL_FEATURES}
+    numeric, onehot = stage_features(X, categories)
+    mean, scale = numeric.mean(axis=0), numeric.std(axis=0) + 1e-12
+    features = np.hstack([(numeric - mean) / scale, onehot])
+    target = np.array([classes.index(label) for label in y.astype(str).str.strip()])
+
+    cv = StratifiedKFold(folds, shuffle=True, random_state=random_state)
+    calibration = []
+    for C in c_grid:
+        estimator = LogisticRegression(C=C, max_iter=5000)
+        oof = cross_val_predict(estimator, features, target, cv=cv, method="predict_proba")
+        confidence = oof.max(axis=1)
+        correct = oof.argmax(axis=1) == target
+        threshold = choose_threshold(confidence, correct, min_accuracy)
+        accepted = confidence >= threshold
+        calibration.append(
+            {
+                "C": C,
+                "threshold": round(threshold, 6),
+                "oof_coverage": round(float(accepted.mean()), 4),
+                "oof_accuracy_accepted": round(float(correct[accepted].mean()), 4) if accepted.any() else None,
+                "oof_accuracy": round(float(correct.mean()), 4),
+            }
+        )
+        logger.info(
+            f"C={C:g}: umbral {threshold:.3f}, cobertura out-of-fold {accepted.mean():.3f}"
+        )
+
+    best = max(calibration, key=lambda c: (c["oof_coverage"], -c["C"]))
+    estimator = LogisticRegression(C=best["C"], max_iter=5000).fit(features, target)
+
+    # La estandarización de las numéricas se incorpora a los coeficientes
+    n_numeric = numeric.shape[1]
+    numeric_coef = estimator.coef_[:, :n_numeric] / scale
+    intercept = estimator.intercept_ - numeric_coef @ mean
+    categorical_coef, start = {}, n_numeric
+    for col, levels in categories.items():
+        categorical_coef[col] = estimator.coef_[:, start : start + len(levels)].tolist()
+        start += len(levels)
+
+    return {
+        "classes": classes,
+        "threshold": best["threshold"],
+        "numeric": list(NUMERIC_FEATURES),
+        "categories": categories,
+        "numeric_coef": numeric_coef.tolist(),
+        "intercept": intercept.tolist(),
+        "categorical_coef": categorical_coef,
+        "min_accuracy": min_accuracy,
+        "calibration": calibration,
+        "n_rows": int(len(X)),
+        "built_at": datetime.utcnow().isoformat() + "Z",
+    }
+
+
+def _timed(fn, *args) -> Tuple[Any, float, float]:
+    """Resultado, segundos de reloj y segundos de CPU de una llamada."""
+    wall, cpu = time.perf_counter(), time.process_time()
+    result = fn(*args)
+    return result, time.perf_counter() - wall, time.process_time() - cpu
+
+
+def evaluate_cascade(
+    stage: CascadeStage, artifacts: Dict[str, Any], X: pd.DataFrame, y: pd.Series
+) -> Dict[str, Any]:
+    """
+    Compara la cascada con el modelo completo sobre el test.
+
+    La latencia por request se mide una fila a la vez (como `/predict`): el
+    modelo completo puntúa cada fila; la cascada evalúa la primera etapa y
+    escala al modelo solo las filas bajo el umbral.
+
+    Returns:
+        Diccionario con escalamiento, exactitudes, acuerdo, latencias y CPU
+    """
+    model = artifacts["model"]
+    classes = np.asarray(stage.classes)
+    X = X[FEATURE_COLUMNS]
+    y = y.astype(str).str.strip().to_numpy()
+    rows = list(X.itertuples(index=False, name=None))
+
+    full_proba, full_wall, full_cpu = _timed(model.predict_proba, X)
+    full_pred = classes[full_proba.argmax(axis=1)]
+
+    def cascade_batch(frame: pd.DataFrame) -> np.ndarray:
+        proba = stage.predict_proba_rows(rows)
+        escalate = ~stage.accept(proba)
+        if escalate.any():
+            proba[escalate] = model.predict_proba(frame[escalate])
+        return proba
+
+    cascade_proba, cascade_wall, cascade_cpu = _timed(cascade_batch, X)
+    stage_proba = stage.predict_proba_rows(rows)
+    accepted = stage.accept(stage_proba)
+    cascade_pred = classes[cascade_proba.argmax(axis=1)]
+
+    # Una fila a la vez
+    frames = [X.iloc[[i]] for i in range(len(X))]
+    model.predict_proba(frames[0])  # calentamiento
+    full_times, cascade_times = [], []
+    for i, frame in enumerate(frames):
+        _, wall, cpu = _timed(model.predict_proba, frame)
+        full_times.append((wall, cpu))
+
+        wall, cpu = time.perf_counter(), time.process_time()
+        proba = stage.predict_proba_rows([rows[i]])
+        if not stage.accept(proba)[0]:
+            model.predict_proba(frame)
+        cascade_times.append((time.perf_counter() - wall, time.process_time() - cpu))
+    full_times, cascade_times = np.array(full_times) * 1e3, np.array(cascade_times) * 1e3
+
+    def latency(times: np.ndarray) -> Dict[str, float]:
+        return {
+            "mean_ms": round(float(times[:, 0].mean()), 3),
+            "p50_ms": round(float(np.percentile(times[:, 0], 50)), 3),
+            "p99_ms": round(float(np.percentile(times[:, 0], 99)), 3),
+            "cpu_mean_ms": round(float(times[:, 1].mean()), 3),
+        }
+
+    request = {"full": latency(full_times), "cascade": latency(cascade_times)}
+    request["latency_saved"] = round(
+        1 - request["cascade"]["mean_ms"] / request["full"]["mean_ms"], 4
+    )
+    request["cpu_saved"] = round(
+        1 - request["cascade"]["cpu_mean_ms"] / max(request["full"]["cpu_mean_ms"], 1e-9), 4
+    )
+
+    return {
+        "n_test": int(len(y)),
+        "threshold": stage.threshold,
+        "escalation_rate": round(float(1 - accepted.mean()), 4),
+        "escalation_by_class": {
+            name: round(float(1 - accepted[y == name].mean()), 4) for name in classes if (y == name).any()
+        },
+        "accuracy_full": round(float((full_pred == y).mean()), 4),
+        "accuracy_cascade": round(float((cascade_pred == y).mean()), 4),
+        "accuracy_stage_answered": round(float((cascade_pred[accepted] == y[accepted]).mean()), 4)
+        if accepted.any() else None,
+        "accuracy_full_on_answered": round(float((full_pred[accepted] == y[accepted]).mean()), 4)
+        if accepted.any() else None,
+        "agreement_with_full": round(float((cascade_pred == full_pred).mean()), 4),
+        "request": request,
+        "batch": {
+            "full_ms": round(full_wall * 1e3, 2),
+            "cascade_ms": round(cascade_wall * 1e3, 2),
+            "full_cpu_ms": round(full_cpu * 1e3, 2),
+            "cascade_cpu_ms": round(cascade_cpu * 1e3, 2),
+        },
+    }
+
+
+@app.command()
+def main(
+    model_path: Path = DEFAULT_MODEL_PATH,
+    data_path: Path = RAW_DATA_PATH,
+    output_path: Path = CASCADE_STAGE_PATH,
+    report_path: Path = REPORTS_DIR / "cascade" / "cascade_report.json",
+    min_accuracy: float = typer.Option(0.98, help="Exactitud mínima de las filas que responde la primera etapa"),
+    c_grid: List[float] = typer.Option(DEFAULT_C_GRID, "--c", help="Valores de C a evaluar"),
+):
+    """Entrena la primera etapa de la cascada, calibra su umbral y la evalúa en el test."""
+    artifacts, signature = load_signed_artifacts(model_path)
+    classes = [str(c) for c in artifacts["label_encoder"].classes_]
+    X_train, X_test, y_train, y_test = train_test_raw(load_raw_dataset(data_path))
+
+    stage = fit_stage(X_train, y_train, classes, min_accuracy, c_grid)
+    stage["model_sha256"] = signature["sha256"]
+    report = evaluate_cascade(CascadeStage(stage), artifacts, X_test, y_test)
+    report["calibration"] = stage["calibration"]
+
+    with open(output_path, "w", encoding="utf-8") as f:
+        json.dump(stage, f, indent=2)
+    report_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(report_path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+
+    logger.info(
+        f"Test ({report['n_test']} filas): escalamiento {report['escalation_rate']:.1%}, "
+        f"exactitud {report['accuracy_full']:.4f} -> {report['accuracy_cascade']:.4f}, "
+        f"acuerdo con el modelo completo {report['agreement_with_full']:.4f}"
+    )
+    logger.info(
+        f"Latencia media por request {report['request']['full']['mean_ms']:.2f} -> "
+        f"{report['request']['cascade']['mean_ms']:.2f} ms "
+        f"(CPU -{report['request']['cpu_saved']:.0%}); reporte en: {report_path}"
+    )
+    logger.success(f"Primera etapa guardada en: {output_path} (umbral {stage['threshold']:.3f})")
+
+
+if __name__ == "__main__":
+    configure_logging()
+    app()
@@ -0,0 +1,439 @@
+"""
+Compresión del modelo: truncado del ensamble y destilación a un presupuesto de latencia.
+
+Evalúa sobre el test del entrenamiento (ver `mlops_obesidad.modeling.split`):
+
+- Prefijos del ensamble: las primeras k rondas del booster (`iteration_range`),
+  sin reentrenar.
+- Destilación (opcional): ensambles más chicos y menos profundos entrenados
+  sobre las probabilidades del modelo original (cada fila se replica una vez
+  por clase con peso igual a la probabilidad del maestro).
+
+Para cada candidato mide exactitud, acuerdo con el modelo completo, latencia
+por fila del booster (fila individual y en lote) y tamaño del booster
+serializado; reporta la frontera de Pareto y guarda el candidato elegido como
+un artefacto con la misma estructura que `xgboost_model_artifacts.pkl`.
+
+Uso:
+    python -m mlops_obesidad.modeling.compress --max-accuracy-drop 0.005 --distill
+"""
+
+import copy
+import json
+from pathlib import Path
+import pickle
+import time
+from typing import Any, Dict, List, Optional, Sequence
+
+from loguru import logger
+import numpy as np
+import typer
+
+from mlops_obesidad.config import MODELS_DIR, REPORTS_DIR, configure_logging
+from mlops_obesidad.modeling.split import RAW_DATA_PATH, load_raw_dataset, train_test_raw
+
+app = typer.Typer()
+
+DEFAULT_PREFIXES = [10, 20, 30, 40, 50, 75, 100, 150, 200, 250]
+
+# Métricas de la frontera de Pareto: (clave, True si mayor es mejor)
+PARETO_METRICS = [("accuracy", True), ("row_latency_us", False), ("size_bytes", False)]
+
+
+# =============================================================================
+# Candidatos
+# =============================================================================
+
+
+def truncate_classifier(classifier: Any, n_rounds: int) -> Any:
+    """
+    Copia del XGBClassifier con solo las primeras `n_rounds` rondas del booster.
+
+    Args:
+        classifier: XGBClassifier entrenado
+        n_rounds: Rondas a conservar
+
+    Returns:
+        Nuevo XGBClassifier truncado (el original no se modifica)
+    """
+    truncated = copy.deepcopy(classifier)
+    truncated._Booster = classifier.get_booster()[:n_rounds]
+    truncated.set_params(n_estimators=n_rounds)
+    return truncated
+
+
+def softmax(margins: np.ndarray) -> np.ndarray:
+    """Softmax por fila de una matriz de márgenes [n, k]."""
+    shifted = margins - margins.max(axis=1, keepdims=True)
+    proba = np.exp(shifted)
+    return proba / proba.sum(axis=1, keepdims=True)
+
+
+def distill_classifier(
+    features: np.ndarray,
+    teacher_proba: np.ndarray,
+    max_depth: int,
+    n_estimators: int,
+    learning_rate: float = 0.3,
+    min_weight: float = 1e-4,
+    n_jobs: Optional[int] = None,
+) -> Any:
+    """
+    Entrena un XGBClassifier alumno sobre las probabilidades del maestro.
+
+    Cada fila se replica una vez por clase con etiqueta igual a la clase y
+    peso igual a la probabilidad asignada por el maestro, de modo que la
+    log-loss ponderada equivale a la entropía cruzada contra las etiquetas
+    suaves. Las réplicas con peso despreciable se descartan.
+
+    Args:
+        features: Features transformadas de entrenamiento [n, d]
+        teacher_proba: Probabilidades del maestro [n, k]
+        max_depth: Profundidad máxima de los árboles del alumno
+        n_estimators: Rondas del alumno
+        learning_rate: Tasa de aprendizaje del alumno
+        min_weight: Peso mínimo para conservar una réplica
+        n_jobs: Hilos de XGBoost
+
+    Returns:
+        XGBClassifier entrenado
+    """
+    from xgboost import XGBClassifier
+
+    n_rows, n_classes = teacher_proba.shape
+    X = np.repeat(features, n_classes, axis=0)
+    y = np.tile(np.arange(n_classes), n_rows)
+    weights = teacher_proba.ravel()
+    keep = weights >= min_weight
+
+    student = XGBClassifier(
+        objective="multi:softprob",
+        max_depth=max_depth,
+        n_estimators=n_estimators,
+        learning_rate=learning_rate,
+        eval_metric="mlogloss",
+        random_state=42,
+        n_jobs=n_jobs,
+    )
+    student.fit(X[keep], y[keep], sample_weight=weights[keep])
+    return student
+
+
+def booster_size(booster: Any) -> int:
+    """Tamaño en bytes del booster serializado (UBJSON)."""
+    return len(booster.save_raw(raw_format="ubj"))
+
+
+def measure_latency(
+    booster: Any, features: np.ndarray, n_rounds: int, n_rows: int = 200, repeats: int = 3
+) -> Dict[str, float]:
+    """
+    Latencia de predicción del booster en microsegundos por fila.
+
+    Args:
+        booster: Booster de XGBoost
+        features: Features transformadas [n, d]
+        n_rounds: Rondas a usar (`iteration_range=(0, n_rounds)`)
+        n_rows: Filas individuales a medir
+        repeats: Repeticiones (se toma la mejor)
+
+    Returns:
+        Diccionario con 'row_latency_us' (mediana de predicciones de una fila)
+        y 'batch_latency_us' (lote completo dividido por el número de filas)
+    """
+    rows = np.ascontiguousarray(features[:n_rows], dtype=np.float32)
+    batch = np.ascontiguousarray(features, dtype=np.float32)
+    kwargs = {"iteration_range": (0, n_rounds), "predict_type": "margin"}
+
+    booster.inplace_predict(rows[:1], **kwargs)  # calentamiento
+    single = []
+    for _ in range(repeats):
+        for i in range(len(rows)):
+            start = time.perf_counter()
+            booster.inplace_predict(rows[i : i + 1], **kwargs)
+            single.append(time.perf_counter() - start)
+
+    batch_times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        booster.inplace_predict(batch, **kwargs)
+        batch_times.append(time.perf_counter() - start)
+
+    return {
+        "row_latency_us": float(np.median(single) * 1e6),
+        "batch_latency_us": float(min(batch_times) / len(batch) * 1e6),
+    }
+
+
+def evaluate_candidate(
+    name: str,
+    booster: Any,
+    n_rounds: int,
+    features: np.ndarray,
+    y_true: np.ndarray,
+    reference_pred: np.ndarray,
+) -> Dict[str, Any]:
+    """
+    Métricas de un candidato sobre el test.
+
+    Args:
+        name: Nombre del candidato
+        booster: Booster del candidato
+        n_rounds: Rondas que usa el candidato
+        features: Features transformadas de test
+        y_true: Clases reales codificadas
+        reference_pred: Predicciones del modelo completo
+
+    Returns:
+        Diccionario con exactitud, acuerdo, latencias y tamaño
+    """
+    margins = booster.inplace_predict(
+        np.ascontiguousarray(features, dtype=np.float32),
+        iteration_range=(0, n_rounds),
+        predict_type="margin",
+    )
+    pred = margins.argmax(axis=1)
+    size_booster = booster[:n_rounds] if n_rounds < booster.num_boosted_rounds() else booster
+
+    return {
+        "name": name,
+        "n_rounds": int(n_rounds),
+        "n_trees": int(len(size_booster.get_dump())),
+        "accuracy": float((pred == y_true).mean()),
+        "agreement": float((pred == reference_pred).mean()),
+        "size_bytes": booster_size(size_booster),
+        **measure_latency(booster, features, n_rounds),
+    }
+
+
+# =============================================================================
+# Frontera de Pareto y selección
+# =============================================================================
+
+
+def _dominates(a: Dict[str, Any], b: Dict[str, Any]) -> bool:
+    """True si `a` es al menos tan bueno como `b` en todo y mejor en algo."""
+    better_or_equal = all(
+        (a[key] >= b[key]) if higher else (a[key] <= b[key]) for key, higher in PARETO_METRICS
+    )
+    strictly_better = any(
+        (a[key] > b[key]) if higher else (a[key] < b[key]) for key, higher in PARETO_METRICS
+    )
+    return better_or_equal and strictly_better
+
+
+def pareto_front(candidates: Sequence[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Candidatos no dominados en exactitud, latencia por fila y tamaño."""
+    return [
+        c for c in candidates if not any(_dominates(other, c) for other in candidates)
+    ]
+
+
+def choose_candidate(
+    candidates: Sequence[Dict[str, Any]],
+    baseline_accuracy: float,
+    max_accuracy_drop: float,
+    latency_budget_us: Optional[float] = None,
+) -> Optional[Dict[str, Any]]:
+    """
+    Elige el candidato de la frontera de Pareto con menor latencia por fila que
+    no pierde más de `max_accuracy_drop` de exactitud y cumple el presupuesto.
+
+    Returns:
+        El candidato elegido, o None si ninguno cumple las restricciones
+    """
+    eligible = [
+        c
+        for c in pareto_front(candidates)
+        if c["accuracy"] >= baseline_accuracy - max_accuracy_drop
+        and (latency_budget_us is None or c["row_latency_us"] <= latency_budget_us)
+    ]
+    if not eligible:
+        return None
+    return min(eligible, key=lambda c: (c["row_latency_us"], c["size_bytes"]))
+
+
+# =============================================================================
+# CLI
+# =============================================================================
+
+
+def run_compression(
+    model_path: Path,
+    data_path: Path,
+    prefixes: Sequence[int],
+    distill: bool,
+    distill_depths: Sequence[int],
+    distill_rounds: Sequence[int],
+    max_accuracy_drop: float,
+    latency_budget_us: Optional[float],
+) -> Dict[str, Any]:
+    """
+    Evalúa todos los candidatos y arma el reporte de compresión.
+
+    Returns:
+        Reporte con el modelo base, los candidatos, la frontera de Pareto, el
+        candidato elegido y los objetos para guardarlo ('_classifiers')
+    """
+    from mlops_obesidad.inference.model_loader import load_artifacts
+
+    artifacts = load_artifacts(model_path)
+    model = artifacts["model"]
+    label_encoder = artifacts["label_encoder"]
+    classifier = model.named_steps["classifier"]
+    booster = classifier.get_booster()
+    total_rounds = booster.num_boosted_rounds()
+
+    X_train, X_test, y_train, y_test = train_test_raw(load_raw_dataset(data_path))
+    train_features = np.asarray(model[:-1].transform(X_train), dtype=np.float32)
+    test_features = np.asarray(model[:-1].transform(X_test), dtype=np.float32)
+    y_test_codes = label_encoder.transform(y_test)
+
+    reference_pred = booster.inplace_predict(test_features, predict_type="margin").argmax(axis=1)
+
+    candidates = []
+    classifiers: Dict[str, Any] = {}
+
+    baseline = evaluate_candidate(
+        "original", booster, total_rounds, test_features, y_test_codes, reference_pred
+    )
+    candidates.append(baseline)
+    classifiers["original"] = classifier
+    logger.info(
+        f"Modelo original: {total_rounds} rondas, exactitud {baseline['accuracy']:.4f}, "
+        f"{baseline['row_latency_us']:.0f} µs/fila"
+    )
+
+    for k in sorted(p for p in set(prefixes) if 0 < p < total_rounds):
+        name = f"prefix_{k}"
+        candidates.append(
+            evaluate_candidate(name, booster, k, test_features, y_test_codes, reference_pred)
+        )
+        classifiers[name] = k  # se trunca solo si resulta elegido
+
+    if distill:
+        teacher = softmax(booster.inplace_predict(train_features, predict_type="margin"))
+        for depth in distill_depths:
+            for rounds in distill_rounds:
+                name = f"distilled_d{depth}_r{rounds}"
+                logger.info(f"Destilando {name}...")
+                student = distill_classifier(train_features, teacher, depth, rounds)
+                candidates.append(
+                    evaluate_candidate(
+                        name,
+                        student.get_booster(),
+                        rounds,
+                        test_features,
+                        y_test_codes,
+                        reference_pred,
+                    )
+                )
+                classifiers[name] = student
+
+    front = pareto_front(candidates)
+    chosen = choose_candidate(
+        candidates, baseline["accuracy"], max_accuracy_drop, latency_budget_us
+    )
+
+    return {
+        "model_path": str(model_path),
+        "n_test": int(len(y_test_codes)),
+        "baseline": baseline,
+        "max_accuracy_drop": max_accuracy_drop,
+        "latency_budget_us": latency_budget_us,
+        "candidates": candidates,
+        "pareto_front": [c["name"] for c in front],
+        "chosen": chosen["name"] if chosen else None,
+        "_artifacts": artifacts,
+        "_classifiers": classifiers,
+    }
+
+
+def build_compressed_artifacts(report: Dict[str, Any]) -> Dict[str, Any]:
+    """Artefacto con el mismo formato que el original y el clasificador elegido."""
+    from sklearn.pipeline import Pipeline
+
+    artifacts = report["_artifacts"]
+    model = artifacts["model"]
+    chosen = report["chosen"]
+    classifier = report["_classifiers"][chosen]
+    if isinstance(classifier, int):
+        classifier = truncate_classifier(model.named_steps["classifier"], classifier)
+
+    pipeline = Pipeline(model.steps[:-1] + [("classifier", classifier)])
+    metrics = next(c for c in report["candidates"] if c["name"] == chosen)
+    return {
+        **{k: v for k, v in artifacts.items() if k != "model"},
+        "model": pipeline,
+        "compression": {"source": report["model_path"], **metrics},
+    }
+
+
+def _log_table(report: Dict[str, Any]) -> None:
+    """Registra los candidatos marcando la frontera de Pareto y el elegido."""
+    front = set(report["pareto_front"])
+    lines = [
+        f"{'candidato':<24} {'rondas':>6} {'árboles':>7} {'exactitud':>9} {'acuerdo':>8} "
+        f"{'µs/fila':>8} {'µs/fila lote':>12} {'KB':>7}  pareto"
+    ]
+    for c in report["candidates"]:
+        mark = "*" if c["name"] in front else ""
+        if c["name"] == report["chosen"]:
+            mark += " <- elegido"
+        lines.append(
+            f"{c['name']:<24} {c['n_rounds']:>6} {c['n_trees']:>7} {c['accuracy']:>9.4f} "
+            f"{c['agreement']:>8.4f} {c['row_latency_us']:>8.1f} {c['batch_latency_us']:>12.2f} "
+            f"{c['size_bytes'] / 1024:>7.1f}  {mark}"
+        )
+    logger.info("Candidatos de compresión:\n" + "\n".join(lines))
+
+
+@app.command()
+def main(
+    model_path: Path = MODELS_DIR / "xgboost_model_artifacts.pkl",
+    data_path: Path = RAW_DATA_PATH,
+    output_path: Path = MODELS_DIR / "xgboost_model_artifacts_compressed.pkl",
+    report_path: Path = REPORTS_DIR / "compression" / "compression_report.json",
+    prefixes: List[int] = typer.Option(DEFAULT_PREFIXES, help="Rondas de los prefijos a evaluar"),
+    distill: bool = typer.Option(False, help="Evaluar también modelos destilados"),
+    distill_depths: List[int] = typer.Option([2, 3], help="Profundidades de los alumnos"),
+    distill_rounds: List[int] = typer.Option([50, 100], help="Rondas de los alumnos"),
+    max_accuracy_drop: float = typer.Option(0.005, help="Pérdida máxima de exactitud aceptada"),
+    latency_budget_us: Optional[float] = typer.Option(None, help="Presupuesto de µs por fila"),
+):
+    """Evalúa prefijos del ensamble (y alumnos destilados) y guarda el artefacto elegido."""
+    report = run_compression(
+        model_path,
+        data_path,
+        prefixes,
+        distill,
+        distill_depths,
+        distill_rounds,
+        max_accuracy_drop,
+        latency_budget_us,
+    )
+    _log_table(report)
+
+    report_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(report_path, "w", encoding="utf-8") as f:
+        json.dump({k: v for k, v in report.items() if not k.startswith("_")}, f, indent=2)
+    logger.info(f"Reporte de compresión guardado en: {report_path}")
+
+    if report["chosen"] is None:
+        logger.warning("Ningún candidato cumple las restricciones; no se escribe artefacto")
+        raise typer.Exit(code=1)
+    if report["chosen"] == "original":
+        logger.info("El modelo original ya es el mejor candidato; no se escribe artefacto")
+        return
+
+    with open(output_path, "wb") as f:
+        pickle.dump(build_compressed_artifacts(report), f)
+    logger.success(
+        f"Artefacto comprimido ({report['chosen']}) guardado en: {output_path} "
+        f"({output_path.stat().st_size / 1024:.0f} KB)"
+    )
+
+
+if __name__ == "__main__":
+    configure_logging()
+    app()
@@ -0,0 +1,275 @@
+"""
+Calibración y benchmark de la predicción con salida temprana.
+
+El ensamble se parte en etapas de `--stage-rounds` rondas (cada ronda tiene
+un árbol por clase). Con el train del modelo (`modeling/split.py`) se
+calculan, para cada etapa:
+
+- Las cotas de lo que pueden sumar los árboles restantes a cada clase (suma
+  de sus hojas mínimas y máximas), que dan la salida demostrable.
+- El umbral empírico: cuánto se reduce, de esa etapa al modelo completo, la
+  ventaja de la clase líder sobre cada rival. El umbral es el cuantil
+  `1 - tolerance` de esa reducción en el train (con tolerancia 0, la mayor
+  reducción observada).
+
+Sobre el test reservado se reporta la fracción media de árboles evaluados,
+las salidas por etapa, el acuerdo y la exactitud frente al modelo completo y
+la latencia del booster por fila y por lote.
+
+Uso:
+    python -m mlops_obesidad.modeling.early_exit_calibration --stage-rounds 40 --tolerance 0
+"""
+
+from datetime import datetime
+import json
+from pathlib import Path
+import time
+from typing import Any, Dict, List, Sequence, Tuple
+
+from loguru import logger
+import numpy as np
+import pandas as pd
+import typer
+
+from mlops_obesidad.config import FEATURE_COLUMNS, REPORTS_DIR, configure_logging
+from mlops_obesidad.inference.early_exit import EARLY_EXIT_PATH, EarlyExitBooster
+from mlops_obesidad.inference.model_loader import DEFAULT_MODEL_PATH
+from mlops_obesidad.modeling.predict import load_signed_artifacts
+from mlops_obesidad.modeling.split import RAW_DATA_PATH, load_raw_dataset, train_test_raw
+
+app = typer.Typer()
+
+# Rondas por etapa
+DEFAULT_STAGE_ROUNDS = 40
+
+
+def stage_boundaries(n_rounds: int, stage_rounds: int) -> List[int]:
+    """Ronda final (exclusiva) de cada etapa; la última completa el ensamble."""
+    return list(range(stage_rounds, n_rounds, stage_rounds)) + [n_rounds]
+
+
+def staged_margins(booster: Any, features: np.ndarray, boundaries: Sequence[int]) -> np.ndarray:
+    """
+    Márgenes acumulados al final de cada etapa.
+
+    Args:
+        booster: Booster de XGBoost
+        features: Features transformadas [n, d]
+        boundaries: Ronda final de cada etapa
+
+    Returns:
+        Array [n_etapas, n, n_clases]
+    """
+    features = np.ascontiguousarray(features, dtype=np.float32)
+    margins, current, start = [], None, 0
+    for end in boundaries:
+        kwargs = {} if current is None else {"base_margin": current}
+        current = booster.inplace_predict(
+            features, iteration_range=(start, end), predict_type="margin", **kwargs
+        ).reshape(len(features), -1)
+        margins.append(current)
+        start = end
+    return np.stack(margins)
+
+
+def remaining_leaf_bounds(
+    booster: Any, boundaries: Sequence[int], n_classes: int
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Cotas de la suma de los árboles posteriores a cada etapa, por clase.
+
+    El árbol `t` del booster corresponde a la ronda `t // n_classes` y a la
+    clase `t % n_classes`.
+
+    Returns:
+        Tupla (suma de hojas mínimas, suma de hojas máximas), cada una
+        [n_etapas - 1, n_clases]
+    """
+    trees = booster.trees_to_dataframe()
+    leaves = trees[trees["Feature"] == "Leaf"].groupby("Tree")["Gain"]
+    n_rounds = boundaries[-1]
+    lowest = leaves.min().to_numpy().reshape(n_rounds, n_classes)
+    highest = leaves.max().to_numpy().reshape(n_rounds, n_classes)
+
+    lower = np.array([lowest[end:].sum(axis=0) for end in boundaries[:-1]])
+    upper = np.array([highest[end:].sum(axis=0) for end in boundaries[:-1]])
+    return lower, upper
+
+
+def lead_shrinkage(margins: np.ndarray) -> np.ndarray:
+    """
+    Mayor reducción de la ventaja de la clase líder de cada etapa hasta el final.
+
+    Args:
+        margins: Márgenes por etapa [n_etapas, n, n_clases]
+
+    Returns:
+        Array [n_etapas - 1, n]: máximo sobre los rivales de (ventaja en la
+        etapa - ventaja en el modelo completo)
+    """
+    rows = np.arange(margins.shape[1])
+    final = margins[-1]
+    shrinkage = []
+    for margin in margins[:-1]:
+        top = margin.argmax(axis=1)
+        lead = margin[rows, top][:, None] - margin
+        final_lead = final[rows, top][:, None] - final
+        drop = lead - final_lead
+        drop[rows, top] = -np.inf
+        shrinkage.append(drop.max(axis=1))
+    return np.array(shrinkage)
+
+
+def calibrate_early_exit(
+    booster: Any,
+    features: np.ndarray,
+    classes: Sequence[str],
+    stage_rounds: int = DEFAULT_STAGE_ROUNDS,
+    tolerance: float = 0.0,
+) -> Dict[str, Any]:
+    """
+    Calcula las cotas y los umbrales de salida de cada etapa.
+
+    Args:
+        booster: Booster de XGBoost del pipeline
+        features: Features transformadas de train
+        classes: Orden de las clases (el del LabelEncoder del modelo)
+        stage_rounds: Rondas por etapa
+        tolerance: Fracción de filas de train cuya ventaja puede reducirse
+            más que el umbral (0 = la mayor reducción observada)
+
+    Returns:
+        Diccionario serializable a JSON (ver `EarlyExitBooster`)
+    """
+    n_rounds = booster.num_boosted_rounds()
+    boundaries = stage_boundaries(n_rounds, stage_rounds)
+    lower, upper = remaining_leaf_bounds(booster, boundaries, len(classes))
+    shrinkage = lead_shrinkage(staged_margins(booster, features, boundaries))
+
+    # La ventaja debe superar la reducción observada; nunca un umbral negativo
+    thresholds = np.maximum(np.quantile(shrinkage, 1 - tolerance, axis=1, method="higher"), 0.0)
+
+    return {
+        "classes": list(classes),
+        "n_rounds": int(n_rounds),
+        "stage_rounds": boundaries,
+        "tolerance": tolerance,
+        "thresholds": [round(float(t), 6) for t in thresholds],
+        "lower": lower.tolist(),
+        "upper": upper.tolist(),
+        "n_rows": int(len(features)),
+        "built_at": datetime.utcnow().isoformat() + "Z",
+    }
+
+
+def _best_time(fn, repeats: int = 3) -> float:
+    """Mejor tiempo de reloj (segundos) de varias llamadas."""
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def evaluate_early_exit(
+    early_exit: EarlyExitBooster, artifacts: Dict[str, Any], X: pd.DataFrame, y: pd.Series
+) -> Dict[str, Any]:
+    """
+    Compara la salida temprana con el modelo completo sobre el test.
+
+    Returns:
+        Diccionario con fracción de árboles, salidas por etapa, acuerdo,
+        exactitudes y latencias del booster
+    """
+    model = artifacts["model"]
+    booster = model[-1].get_booster()
+    classes = np.asarray(early_exit.classes)
+    y = y.astype(str).str.strip().to_numpy()
+
+    start = time.perf_counter()
+    features = np.ascontiguousarray(model[:-1].transform(X[FEATURE_COLUMNS]), dtype=np.float32)
+    preprocess_ms = (time.perf_counter() - start) * 1e3
+
+    full_pred = classes[booster.inplace_predict(features, predict_type="margin").argmax(axis=1)]
+    margin, rounds = early_exit.predict_margin(features)
+    early_pred = classes[margin.argmax(axis=1)]
+    stages = np.searchsorted(early_exit.stage_rounds, rounds)
+
+    # Booster solo: el preprocesamiento es el mismo en ambos modos
+    full_batch = _best_time(lambda: booster.inplace_predict(features, predict_type="margin"))
+    early_batch = _best_time(lambda: early_exit.predict_margin(features))
+    full_rows, early_rows = [], []
+    for i in range(len(features)):
+        row = features[i : i + 1]
+        start = time.perf_counter()
+        booster.inplace_predict(row, predict_type="margin")
+        full_rows.append(time.perf_counter() - start)
+        start = time.perf_counter()
+        early_exit.predict_margin(row)
+        early_rows.append(time.perf_counter() - start)
+
+    return {
+        "n_test": int(len(y)),
+        "stage_rounds": early_exit.stage_rounds,
+        "tolerance": early_exit.tolerance,
+        "mean_tree_fraction": round(float(rounds.mean() / early_exit.n_rounds), 4),
+        "mean_rounds": round(float(rounds.mean()), 2),
+        "exits_by_stage": np.bincount(stages, minlength=len(early_exit.stage_rounds)).tolist(),
+        "agreement_with_full": round(float((early_pred == full_pred).mean()), 4),
+        "disagreements": int((early_pred != full_pred).sum()),
+        "accuracy_full": round(float((full_pred == y).mean()), 4),
+        "accuracy_early_exit": round(float((early_pred == y).mean()), 4),
+        "booster_latency": {
+            "full_row_us": round(float(np.median(full_rows) * 1e6), 1),
+            "early_exit_row_us": round(float(np.median(early_rows) * 1e6), 1),
+            "full_batch_ms": round(full_batch * 1e3, 2),
+            "early_exit_batch_ms": round(early_batch * 1e3, 2),
+        },
+        "preprocess_batch_ms": round(preprocess_ms, 2),
+    }
+
+
+@app.command()
+def main(
+    model_path: Path = DEFAULT_MODEL_PATH,
+    data_path: Path = RAW_DATA_PATH,
+    output_path: Path = EARLY_EXIT_PATH,
+    report_path: Path = REPORTS_DIR / "early_exit" / "early_exit_report.json",
+    stage_rounds: int = typer.Option(DEFAULT_STAGE_ROUNDS, help="Rondas del ensamble por etapa"),
+    tolerance: float = typer.Option(0.0, help="Fracción de filas de train que pueden superar el umbral de su etapa"),
+):
+    """Calibra los umbrales de salida temprana en el train y los evalúa en el test."""
+    artifacts, signature = load_signed_artifacts(model_path)
+    model = artifacts["model"]
+    classes = [str(c) for c in artifacts["label_encoder"].classes_]
+    X_train, X_test, _, y_test = train_test_raw(load_raw_dataset(data_path))
+
+    features = model[:-1].transform(X_train[FEATURE_COLUMNS])
+    config = calibrate_early_exit(model[-1].get_booster(), features, classes, stage_rounds, tolerance)
+    config["model_sha256"] = signature["sha256"]
+    report = evaluate_early_exit(EarlyExitBooster(config, model), artifacts, X_test, y_test)
+    report["thresholds"] = config["thresholds"]
+
+    with open(output_path, "w", encoding="utf-8") as f:
+        json.dump(config, f, indent=2)
+    report_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(report_path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+
+    latency = report["booster_latency"]
+    logger.info(
+        f"Test ({report['n_test']} filas): {report['mean_tree_fraction']:.1%} de los árboles en promedio, "
+        f"acuerdo con el modelo completo {report['agreement_with_full']:.4f}"
+    )
+    logger.info(
+        f"Booster por lote {latency['full_batch_ms']:.2f} -> {latency['early_exit_batch_ms']:.2f} ms, "
+        f"por fila {latency['full_row_us']:.0f} -> {latency['early_exit_row_us']:.0f} us; "
+        f"reporte en: {report_path}"
+    )
+    logger.success(f"Umbrales de salida temprana guardados en: {output_path}")
+
+
+if __name__ == "__main__":
+    configure_logging()
+    app()
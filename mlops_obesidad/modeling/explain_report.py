@@ -0,0 +1,647 @@
+"""
+Reporte global de explicaciones del modelo sobre un dataset completo.
+
+El notebook 4.0 usa `PartialDependenceDisplay` y gráficos de importancia ad
+hoc, que vuelven a evaluar el modelo sobre todo el dataset por cada feature y
+cada punto de la grilla. Este comando recorre el dataset una sola vez, por
+chunks y en paralelo:
+
+- Contribuciones nativas del booster (`pred_contribs`, TreeSHAP exacto o
+  `--approx`) agregadas a las 16 features originales, como en
+  `/predict/explain`. Se acumulan la media de |contribución| y la media con
+  signo por feature y clase (en log-odds).
+- Las filas repetidas dentro de un chunk se explican una sola vez y pesan por
+  su número de apariciones.
+- Conteo de filas por nodo de cada árbol (`pred_leaf`) e histogramas de las
+  features numéricas.
+
+Con esos agregados, la dependencia parcial se calcula sin volver a evaluar el
+modelo: el método "recursion" de Friedman recorre cada árbol una vez por
+punto de la grilla, siguiendo el valor fijo en los splits de la feature y
+repartiendo el peso según la fracción de filas del dataset en los demás.
+El resultado se da en log-odds (donde los árboles son aditivos). Como en
+scikit-learn, si la feature está correlacionada con otras, la curva puede
+diferir de promediar las predicciones con la feature reemplazada.
+
+El reporte se cachea por hash del modelo, hash del dataset y parámetros: una
+segunda corrida sobre los mismos archivos solo lee el JSON.
+
+Uso:
+    python -m mlops_obesidad.modeling.explain_report data/interim/obesity_clean_raw.csv --n-jobs 4
+"""
+
+from collections import Counter
+from concurrent.futures import Executor, ProcessPoolExecutor
+import hashlib
+import json
+from pathlib import Path
+import time
+from typing import Any, Dict, List, Optional
+
+from loguru import logger
+import numpy as np
+import pandas as pd
+import typer
+
+from mlops_obesidad.config import (
+    CATEGORICAL_FEATURES,
+    FEATURE_COLUMNS,
+    NUMERIC_FEATURES,
+    REPORTS_DIR,
+    configure_logging,
+)
+from mlops_obesidad.inference.explainer import aggregation_matrix, explain_dataframe
+from mlops_obesidad.inference.model_loader import DEFAULT_MODEL_PATH
+from mlops_obesidad.modeling.incremental import file_sha256
+from mlops_obesidad.monitoring.drift_report import NUMERIC_DOMAINS, iter_chunks
+
+app = typer.Typer()
+
+OUTPUT_DIR = REPORTS_DIR / "explanations"
+
+# Bins de los histogramas numéricos (resolución de los percentiles de la grilla)
+HISTOGRAM_BINS = 1000
+
+# Percentiles extremos de la grilla numérica (como scikit-learn)
+GRID_PERCENTILES = (0.05, 0.95)
+
+# Árboles por bloque en el recorrido vectorizado de la dependencia parcial
+TREE_BLOCK = 256
+
+# Alias de nulos (mismos que DataCleanerTransformer)
+_NULL_ALIASES = {"", "na", "n/a", "nan"}
+
+# Artefactos cargados en cada proceso worker
+_worker_artifacts: Optional[Dict[str, Any]] = None
+
+
+def _init_worker(model_path: str) -> None:
+    """Inicializador de cada proceso: carga el artefacto una sola vez."""
+    global _worker_artifacts
+
+    from mlops_obesidad.inference.model_loader import load_artifacts
+
+    _worker_artifacts = load_artifacts(model_path)
+
+
+# =============================================================================
+# Árboles
+# =============================================================================
+
+
+def tree_arrays(booster: Any) -> Dict[str, np.ndarray]:
+    """
+    Estructura de todos los árboles como arrays [n_árboles, n_nodos_max].
+
+    Returns:
+        Diccionario con `feature` (índice de la columna transformada, -1 en
+        las hojas), `split`, `yes`, `no`, `value` (valor de las hojas) y
+        `cover`
+    """
+    df = booster.trees_to_dataframe()
+    n_trees, n_nodes = df["Tree"].max() + 1, df["Node"].max() + 1
+    tree, node = df["Tree"].to_numpy(), df["Node"].to_numpy()
+    leaf = (df["Feature"] == "Leaf").to_numpy()
+
+    def child(column: str) -> np.ndarray:
+        ids = df[column].where(~leaf, "0-0").str.split("-", n=1).str[1].astype(int)
+        return ids.to_numpy()
+
+    arrays = {
+        "feature": np.full((n_trees, n_nodes), -1, dtype=np.int64),
+        "split": np.zeros((n_trees, n_nodes), dtype=np.float32),
+        "yes": np.zeros((n_trees, n_nodes), dtype=np.int64),
+        "no": np.zeros((n_trees, n_nodes), dtype=np.int64),
+        "value": np.zeros((n_trees, n_nodes)),
+        "cover": np.zeros((n_trees, n_nodes)),
+    }
+    arrays["feature"][tree[~leaf], node[~leaf]] = (
+        df.loc[~leaf, "Feature"].str[1:].astype(int).to_numpy()
+    )
+    arrays["split"][tree[~leaf], node[~leaf]] = df.loc[~leaf, "Split"].to_numpy()
+    arrays["yes"][tree, node] = child("Yes")
+    arrays["no"][tree, node] = child("No")
+    arrays["value"][tree[leaf], node[leaf]] = df.loc[leaf, "Gain"].to_numpy()
+    arrays["cover"][tree, node] = df["Cover"].to_numpy()
+    return arrays
+
+
+def node_counts(leaf_counts: np.ndarray, trees: Dict[str, np.ndarray]) -> np.ndarray:
+    """
+    Filas que pasan por cada nodo a partir de las filas que llegan a cada hoja.
+
+    En XGBoost los hijos tienen ids mayores que su padre, así que basta con
+    recorrer los nodos de mayor a menor id.
+    """
+    counts = leaf_counts.astype(np.float64).copy()
+    rows = np.arange(counts.shape[0])
+    for node in range(counts.shape[1] - 1, -1, -1):
+        internal = trees["feature"][:, node] >= 0
+        r = rows[internal]
+        counts[r, node] = (
+            counts[r, trees["yes"][r, node]] + counts[r, trees["no"][r, node]]
+        )
+    return counts
+
+
+def recursion_pd(
+    trees: Dict[str, np.ndarray],
+    counts: np.ndarray,
+    values: np.ndarray,
+    fixed: np.ndarray,
+    n_classes: int,
+) -> np.ndarray:
+    """
+    Dependencia parcial por recorrido de los árboles (método "recursion").
+
+    Cada entrada fija un conjunto de columnas transformadas en un valor. En
+    un split sobre una columna fija el peso sigue la rama que corresponde;
+    en los demás splits se reparte según la fracción de filas del dataset en
+    cada hijo (o según el cover del entrenamiento si el nodo no recibió filas).
+
+    Args:
+        trees: Resultado de `tree_arrays`
+        counts: Filas por nodo [n_árboles, n_nodos]
+        values: Valores de las columnas transformadas por entrada [n_entradas, n_columnas]
+        fixed: Columnas fijas por entrada [n_entradas, n_columnas]
+        n_classes: Clases del modelo (el árbol t suma al margen de la clase t % n_clases)
+
+    Returns:
+        Suma de las hojas ponderadas por clase y entrada [n_clases, n_entradas],
+        sin el margen base
+    """
+    n_trees, n_nodes = trees["feature"].shape
+    result = np.zeros((n_classes, values.shape[0]))
+
+    for start in range(0, n_trees, TREE_BLOCK):
+        block = slice(start, min(start + TREE_BLOCK, n_trees))
+        feature, split = trees["feature"][block], trees["split"][block]
+        yes, no = trees["yes"][block], trees["no"][block]
+        n_block = feature.shape[0]
+        rows = np.arange(n_block)
+
+        count = counts[block]
+        cover = trees["cover"][block]
+        # Fracción de cada nodo hacia su hijo "yes"
+        yes_count, node_count = np.take_along_axis(count, yes, axis=1), count
+        yes_cover = np.take_along_axis(cover, yes, axis=1)
+        fraction = np.where(
+            node_count > 0,
+            yes_count / np.maximum(node_count, 1e-12),
+            yes_cover / np.maximum(cover, 1e-12),
+        )
+
+        weights = np.zeros((n_block, n_nodes, values.shape[0]))
+        weights[:, 0, :] = 1.0
+        for node in range(n_nodes):
+            internal = feature[:, node] >= 0
+            if not internal.any():
+                continue
+            r = rows[internal]
+            column = feature[r, node]
+            w = weights[r, node, :]
+            go_yes = values[:, column].T < split[r, node][:, None]
+            is_fixed = fixed[:, column].T
+            frac = fraction[r, node][:, None]
+            weights[r, yes[r, node], :] += np.where(is_fixed, w * go_yes, w * frac)
+            weights[r, no[r, node], :] += np.where(is_fixed, w * ~go_yes, w * (1 - frac))
+
+        leaf_sum = np.einsum("tn,tne->te", trees["value"][block] * (feature < 0), weights)
+        np.add.at(result, np.arange(start, start + n_block) % n_classes, leaf_sum)
+
+    return result
+
+
+def base_margin(booster: Any, features: np.ndarray, trees: Dict[str, np.ndarray], n_classes: int) -> np.ndarray:
+    """Margen base por clase: margen del modelo menos la suma de sus hojas."""
+    import xgboost as xgb
+
+    dmatrix = xgb.DMatrix(features[:1])
+    margin = booster.predict(dmatrix, output_margin=True).reshape(-1)
+    leaves = booster.predict(dmatrix, pred_leaf=True).reshape(-1).astype(int)
+    leaf_values = trees["value"][np.arange(len(leaves)), leaves]
+    return margin - np.bincount(np.arange(len(leaves)) % n_classes, leaf_values, n_classes)
+
+
+# =============================================================================
+# Agregados por chunk
+# =============================================================================
+
+
+def empty_partial(n_classes: int = 0, n_trees: int = 0, n_nodes: int = 0) -> Dict[str, Any]:
+    """Acumulador vacío."""
+    return {
+        "n_rows": 0,
+        "n_unique": 0,
+        "abs_sum": np.zeros((n_classes, len(FEATURE_COLUMNS))),
+        "signed_sum": np.zeros((n_classes, len(FEATURE_COLUMNS))),
+        "predicted": np.zeros(n_classes, dtype=np.int64),
+        "leaf_counts": np.zeros((n_trees, n_nodes), dtype=np.int64),
+        "numeric": {col: np.zeros(HISTOGRAM_BINS, dtype=np.int64) for col in NUMERIC_FEATURES},
+        "categorical": {col: Counter() for col in CATEGORICAL_FEATURES},
+    }
+
+
+def merge_partials(total: Dict[str, Any], partial: Dict[str, Any]) -> Dict[str, Any]:
+    """Suma un acumulador parcial al total (in place)."""
+    for key in ("n_rows", "n_unique"):
+        total[key] += partial[key]
+    for key in ("abs_sum", "signed_sum", "predicted", "leaf_counts"):
+        total[key] = partial[key] if total[key].size == 0 else total[key] + partial[key]
+    for col in NUMERIC_FEATURES:
+        total["numeric"][col] += partial["numeric"][col]
+    for col in CATEGORICAL_FEATURES:
+        total["categorical"][col].update(partial["categorical"][col])
+    return total
+
+
+def _histogram(values: pd.Series, low: float, high: float) -> np.ndarray:
+    numbers = pd.to_numeric(values, errors="coerce").to_numpy(dtype=np.float64)
+    numbers = numbers[~np.isnan(numbers)]
+    bins = ((numbers - low) / (high - low) * HISTOGRAM_BINS).astype(np.int64)
+    return np.bincount(np.clip(bins, 0, HISTOGRAM_BINS - 1), minlength=HISTOGRAM_BINS)
+
+
+def _clean_counts(values: pd.Series) -> Counter:
+    """Frecuencias de una columna categórica, limpiando solo los valores distintos."""
+    counts: Counter = Counter()
+    for value, count in values.value_counts().items():
+        if isinstance(value, str):
+            value = value.strip()
+            if value.lower() in _NULL_ALIASES:
+                continue
+        counts[str(value)] += int(count)
+    return counts
+
+
+def process_chunk(chunk: pd.DataFrame, approx: bool = False) -> Dict[str, Any]:
+    """
+    Agregados de un chunk con el modelo cargado en el worker.
+
+    Args:
+        chunk: Filas crudas con las columnas de FEATURE_COLUMNS
+        approx: Contribuciones aproximadas (Saabas) en lugar de TreeSHAP
+
+    Returns:
+        Acumulador parcial del chunk
+    """
+    import xgboost as xgb
+
+    model = _worker_artifacts["model"]
+    booster = model.named_steps["classifier"].get_booster()
+
+    # Filas repetidas: se explican una vez y pesan por sus apariciones
+    rows = chunk[FEATURE_COLUMNS].value_counts(dropna=False, sort=False).reset_index()
+    weights = rows.pop("count").to_numpy(dtype=np.float64)
+
+    proba, contribs, _ = explain_dataframe(model, rows, approx=approx)
+    leaves = booster.predict(
+        xgb.DMatrix(np.asarray(model[:-1].transform(rows))), pred_leaf=True
+    ).astype(np.int64)
+    n_trees = leaves.shape[1]
+    n_nodes = int(leaves.max()) + 1
+
+    partial = empty_partial()
+    partial["n_rows"] = len(chunk)
+    partial["n_unique"] = len(rows)
+    partial["abs_sum"] = np.einsum("n,nkf->kf", weights, np.abs(contribs))
+    partial["signed_sum"] = np.einsum("n,nkf->kf", weights, contribs)
+    partial["predicted"] = np.bincount(
+        proba.argmax(axis=1), weights=weights, minlength=proba.shape[1]
+    ).astype(np.int64)
+    flat = (leaves + np.arange(n_trees) * n_nodes).ravel()
+    partial["leaf_counts"] = np.bincount(
+        flat, weights=np.repeat(weights, n_trees), minlength=n_trees * n_nodes
+    ).astype(np.int64).reshape(n_trees, n_nodes)
+    for col in NUMERIC_FEATURES:
+        partial["numeric"][col] = _histogram(chunk[col], *NUMERIC_DOMAINS[col])
+    for col in CATEGORICAL_FEATURES:
+        partial["categorical"][col] = _clean_counts(chunk[col])
+    return partial
+
+
+def _pad_leaf_counts(total: Dict[str, Any], partial: Dict[str, Any]) -> None:
+    """Iguala el ancho de los conteos de hojas (cada chunk ve hasta su hoja de mayor id)."""
+    width = max(total["leaf_counts"].shape[1], partial["leaf_counts"].shape[1])
+    for acc in (total, partial):
+        counts = acc["leaf_counts"]
+        if counts.size and counts.shape[1] < width:
+            acc["leaf_counts"] = np.pad(counts, ((0, 0), (0, width - counts.shape[1])))
+
+
+def accumulate(
+    path: Path,
+    chunksize: int,
+    approx: bool = False,
+    executor: Optional[Executor] = None,
+    max_in_flight: int = 4,
+) -> Dict[str, Any]:
+    """
+    Recorre un dataset por chunks y devuelve su acumulador total.
+
+    Con un executor, los chunks se procesan en paralelo manteniendo como
+    máximo `max_in_flight` chunks pendientes para acotar la memoria.
+    """
+    total = empty_partial()
+
+    def merge(partial: Dict[str, Any]) -> None:
+        _pad_leaf_counts(total, partial)
+        merge_partials(total, partial)
+
+    if executor is None:
+        for chunk in iter_chunks(path, chunksize):
+            merge(process_chunk(chunk, approx))
+        return total
+
+    pending: List[Any] = []
+    for chunk in iter_chunks(path, chunksize):
+        pending.append(executor.submit(process_chunk, chunk, approx))
+        if len(pending) >= max_in_flight:
+            merge(pending.pop(0).result())
+    for future in pending:
+        merge(future.result())
+
+    return total
+
+
+# =============================================================================
+# Reporte
+# =============================================================================
+
+
+def _percentile(histogram: np.ndarray, low: float, high: float, q: float) -> float:
+    cumulative = np.cumsum(histogram)
+    index = int(np.searchsorted(cumulative, q * cumulative[-1]))
+    return low + (high - low) * (index + 0.5) / HISTOGRAM_BINS
+
+
+def feature_grids(total: Dict[str, Any], grid_points: int) -> Dict[str, List[Any]]:
+    """
+    Grilla de cada feature: `grid_points` valores equiespaciados entre los
+    percentiles 5 y 95 (numéricas, menos si la feature es discreta) o todas
+    las categorías observadas.
+    """
+    grids: Dict[str, List[Any]] = {}
+    for col in NUMERIC_FEATURES:
+        histogram = total["numeric"][col]
+        if histogram.sum() == 0:
+            continue
+        low, high = NUMERIC_DOMAINS[col]
+        start, stop = (_percentile(histogram, low, high, q) for q in GRID_PERCENTILES)
+        grids[col] = np.unique(np.linspace(start, stop, grid_points).round(4)).tolist()
+    for col in CATEGORICAL_FEATURES:
+        if total["categorical"][col]:
+            grids[col] = sorted(total["categorical"][col])
+    return grids
+
+
+def partial_dependence(
+    artifacts: Dict[str, Any], total: Dict[str, Any], grids: Dict[str, List[Any]]
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Dependencia parcial (log-odds por clase) de cada feature sobre su grilla.
+
+    Returns:
+        {feature: {'grid': [...], 'margin': {clase: [...]}}}
+    """
+    model = artifacts["model"]
+    classes = list(artifacts["label_encoder"].classes_)
+    booster = model.named_steps["classifier"].get_booster()
+    aggregation = aggregation_matrix(model.named_steps["preprocessor"])
+
+    # Una fila por (feature, valor); solo importan las columnas de esa feature,
+    # el resto (mediana o moda) solo evita valores desconocidos para el encoder
+    template = {
+        col: _percentile(total["numeric"][col], *NUMERIC_DOMAINS[col], 0.5)
+        for col in NUMERIC_FEATURES
+    }
+    template.update(
+        {col: total["categorical"][col].most_common(1)[0][0] for col in CATEGORICAL_FEATURES}
+    )
+    entries = [(col, value) for col, grid in grids.items() for value in grid]
+    frame = pd.DataFrame([{**template, col: value} for col, value in entries], columns=FEATURE_COLUMNS)
+    # float32 como en el DMatrix: los umbrales coinciden con valores de los datos
+    values = np.asarray(model[:-1].transform(frame), dtype=np.float32)
+    fixed = np.stack([aggregation[:, FEATURE_COLUMNS.index(col)] > 0 for col, _ in entries])
+
+    trees = tree_arrays(booster)
+    width = max(trees["feature"].shape[1], total["leaf_counts"].shape[1])
+    trees = {k: np.pad(v, ((0, 0), (0, width - v.shape[1]))) for k, v in trees.items()}
+    leaf_counts = np.pad(total["leaf_counts"], ((0, 0), (0, width - total["leaf_counts"].shape[1])))
+    counts = node_counts(leaf_counts, trees)
+
+    margins = recursion_pd(trees, counts, values, fixed, len(classes))
+    margins += base_margin(booster, values, trees, len(classes))[:, None]
+
+    result: Dict[str, Dict[str, Any]] = {}
+    position = 0
+    for col, grid in grids.items():
+        block = margins[:, position : position + len(grid)]
+        result[col] = {
+            "grid": grid,
+            "margin": {name: block[k].round(5).tolist() for k, name in enumerate(classes)},
+        }
+        position += len(grid)
+    return result
+
+
+def build_report(
+    artifacts: Dict[str, Any], total: Dict[str, Any], grid_points: int
+) -> Dict[str, Any]:
+    """Reporte a partir del acumulador total."""
+    classes = list(artifacts["label_encoder"].classes_)
+    n_rows = max(total["n_rows"], 1)
+    mean_abs = total["abs_sum"] / n_rows
+    mean_signed = total["signed_sum"] / n_rows
+
+    overall = mean_abs.mean(axis=0)
+    order = np.argsort(overall)[::-1]
+    importance = {
+        FEATURE_COLUMNS[j]: {
+            "mean_abs": round(float(overall[j]), 6),
+            "mean_abs_by_class": {
+                name: round(float(mean_abs[k, j]), 6) for k, name in enumerate(classes)
+            },
+            "mean_by_class": {
+                name: round(float(mean_signed[k, j]), 6) for k, name in enumerate(classes)
+            },
+        }
+        for j in order
+    }
+
+    grids = feature_grids(total, grid_points)
+    return {
+        "rows": int(total["n_rows"]),
+        "unique_rows_explained": int(total["n_unique"]),
+        "classes": classes,
+        "predicted_class_counts": {
+            name: int(total["predicted"][k]) for k, name in enumerate(classes)
+        },
+        "importance": importance,
+        "partial_dependence": partial_dependence(artifacts, total, grids),
+    }
+
+
+def plot_report(report: Dict[str, Any], output_dir: Path, dpi: int = 100) -> List[str]:
+    """
+    Figuras del reporte: importancia por clase (barras apiladas) y
+    dependencia parcial de cada feature (un panel por feature).
+
+    Returns:
+        Nombres de los archivos escritos
+    """
+    import matplotlib
+
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    classes = report["classes"]
+    features = list(report["importance"])[::-1]
+
+    fig, ax = plt.subplots(figsize=(9, 7))
+    left = np.zeros(len(features))
+    for name in classes:
+        widths = np.array([report["importance"][f]["mean_abs_by_class"][name] for f in features])
+        ax.barh(features, widths / len(classes), left=left, label=name)
+        left += widths / len(classes)
+    ax.set_xlabel("Media de |contribución| (log-odds), promedio sobre clases")
+    ax.set_title(f"Importancia global ({report['rows']:,} filas)")
+    ax.legend(fontsize=8, loc="lower right")
+    fig.tight_layout()
+    fig.savefig(output_dir / "importance.png", dpi=dpi)
+    plt.close(fig)
+
+    pd_report = report["partial_dependence"]
+    n_cols = 4
+    n_rows = int(np.ceil(len(pd_report) / n_cols))
+    fig, axes = plt.subplots(n_rows, n_cols, figsize=(4 * n_cols, 3 * n_rows), squeeze=False)
+    for ax, (col, curve) in zip(axes.ravel(), pd_report.items()):
+        grid = curve["grid"]
+        numeric = col in NUMERIC_FEATURES
+        x = grid if numeric else np.arange(len(grid))
+        for name in classes:
+            ax.plot(x, curve["margin"][name], marker=None if numeric else "o", label=name)
+        if not numeric:
+            ax.set_xticks(x)
+            ax.set_xticklabels(grid, rotation=30, fontsize=7)
+        ax.set_title(col)
+    for ax in axes.ravel()[len(pd_report):]:
+        ax.axis("off")
+    axes[0, 0].set_ylabel("log-odds")
+    handles, labels = axes[0, 0].get_legend_handles_labels()
+    fig.legend(handles, labels, loc="lower center", ncol=len(classes), fontsize=8)
+    fig.tight_layout(rect=(0, 0.04, 1, 1))
+    fig.savefig(output_dir / "partial_dependence.png", dpi=dpi)
+    plt.close(fig)
+
+    return ["importance.png", "partial_dependence.png"]
+
+
+def cache_key(model_hash: str, data_hash: str, approx: bool, grid_points: int) -> str:
+    """Nombre del reporte cacheado para un modelo, un dataset y unos parámetros."""
+    params = hashlib.sha256(json.dumps([approx, grid_points, HISTOGRAM_BINS]).encode()).hexdigest()
+    return f"{model_hash[:16]}_{data_hash[:16]}_{params[:8]}.json"
+
+
+def explain_dataset(
+    input_path: Path,
+    output_dir: Path = OUTPUT_DIR,
+    model_path: Path = DEFAULT_MODEL_PATH,
+    chunksize: int = 20_000,
+    n_jobs: int = 1,
+    approx: bool = False,
+    grid_points: int = 20,
+    use_cache: bool = True,
+) -> Dict[str, Any]:
+    """
+    Calcula (o lee de la cache) el reporte global de explicaciones.
+
+    Args:
+        input_path: Dataset crudo (CSV, Parquet o JSONL)
+        output_dir: Directorio del reporte, las figuras y la cache
+        model_path: Artefacto del modelo
+        chunksize: Filas por chunk
+        n_jobs: Procesos en paralelo (1 = todo en el proceso actual)
+        approx: Contribuciones aproximadas (Saabas) en lugar de TreeSHAP
+        grid_points: Puntos de la grilla de las features numéricas
+        use_cache: Reutilizar un reporte con los mismos hashes y parámetros
+
+    Returns:
+        Reporte (incluye `cached` y los tiempos)
+    """
+    global _worker_artifacts
+
+    start = time.perf_counter()
+    output_dir.mkdir(parents=True, exist_ok=True)
+    cache_dir = output_dir / "cache"
+    model_hash, data_hash = file_sha256(model_path), file_sha256(input_path)
+    cache_path = cache_dir / cache_key(model_hash, data_hash, approx, grid_points)
+
+    if use_cache and cache_path.exists():
+        with open(cache_path, "r", encoding="utf-8") as f:
+            report = json.load(f)
+        report["cached"] = True
+        if not all((output_dir / name).exists() for name in report["figures"]):
+            plot_report(report, output_dir)
+        logger.info(f"Reporte leído de la cache: {cache_path.name}")
+    else:
+        _init_worker(str(model_path))
+        executor = None
+        if n_jobs > 1:
+            executor = ProcessPoolExecutor(
+                max_workers=n_jobs, initializer=_init_worker, initargs=(str(model_path),)
+            )
+        try:
+            total = accumulate(input_path, chunksize, approx, executor, 2 * n_jobs)
+        finally:
+            if executor is not None:
+                executor.shutdown()
+        aggregate_seconds = time.perf_counter() - start
+
+        report = {
+            "input_path": str(input_path),
+            "model_sha256": model_hash,
+            "data_sha256": data_hash,
+            "contributions": "approx" if approx else "exact",
+            **build_report(_worker_artifacts, total, grid_points),
+        }
+        report["figures"] = plot_report(report, output_dir)
+        report["seconds"] = {
+            "aggregate": round(aggregate_seconds, 2),
+            "total": round(time.perf_counter() - start, 2),
+        }
+        cache_dir.mkdir(exist_ok=True)
+        with open(cache_path, "w", encoding="utf-8") as f:
+            json.dump(report, f)
+        report["cached"] = False
+
+    with open(output_dir / "global_explanations.json", "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    report["elapsed_seconds"] = round(time.perf_counter() - start, 3)
+    return report
+
+
+@app.command()
+def main(
+    input_path: Path = typer.Argument(..., help="Dataset crudo (CSV, Parquet o JSONL)"),
+    output_dir: Path = typer.Option(OUTPUT_DIR, help="Directorio del reporte y las figuras"),
+    model_path: Path = typer.Option(DEFAULT_MODEL_PATH, help="Artefacto del modelo"),
+    chunksize: int = typer.Option(20_000, help="Filas por chunk"),
+    n_jobs: int = typer.Option(1, help="Procesos en paralelo"),
+    approx: bool = typer.Option(False, "--approx", help="Contribuciones de Saabas (~9x más rápidas)"),
+    grid_points: int = typer.Option(20, help="Puntos de la grilla de dependencia parcial"),
+    no_cache: bool = typer.Option(False, "--no-cache", help="Recalcular aunque exista el reporte"),
+):
+    """Importancia global por feature y clase y dependencia parcial del modelo sobre un dataset."""
+    report = explain_dataset(
+        input_path, output_dir, model_path, chunksize, n_jobs, approx, grid_points, not no_cache
+    )
+    top = ", ".join(f"{name} {v['mean_abs']:.3f}" for name, v in list(report["importance"].items())[:5])
+    logger.info(f"Features más importantes (media |contribución|): {top}")
+    source = "cache" if report["cached"] else f"{report['seconds']['total']:.1f} s"
+    logger.success(f"Reporte de {report['rows']} filas ({source}) en: {output_dir}")
+
+
+if __name__ == "__main__":
+    configure_logging()
+    app()
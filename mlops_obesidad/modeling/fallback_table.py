@@ -0,0 +1,141 @@
+"""
+Construcción de la tabla de fallback para el modo degradado de la API.
+
+Se ejecuta en entrenamiento, junto con el modelo: agrupa los datos de
+entrenamiento por bin de BMI y algunas features clave y guarda la
+distribución de clases (con suavizado de Laplace) de cada grupo en
+`models/fallback_table.json`. En tiempo de inferencia la tabla se consulta
+con `mlops_obesidad.inference.fallback.FallbackTable`.
+
+Uso:
+    python -m mlops_obesidad.modeling.fallback_table
+"""
+
+from datetime import datetime
+import json
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from loguru import logger
+import numpy as np
+import pandas as pd
+import typer
+
+from mlops_obesidad.config import INTERIM_DATA_DIR, TARGET, configure_logging
+from mlops_obesidad.inference.fallback import FALLBACK_TABLE_PATH, FallbackTable
+
+app = typer.Typer()
+
+# Features categóricas que, junto con el BMI, definen las celdas de la tabla
+DEFAULT_KEY_FEATURES = ["Gender", "family_history_with_overweight"]
+
+
+def _distribution(labels: pd.Series, classes: List[str], alpha: float) -> List[float]:
+    """Distribución de clases con suavizado de Laplace, redondeada a 6 decimales."""
+    counts = labels.value_counts().reindex(classes, fill_value=0).to_numpy(dtype=float)
+    probs = (counts + alpha) / (counts.sum() + alpha * len(classes))
+    return [round(float(p), 6) for p in probs]
+
+
+def build_fallback_table(
+    df: pd.DataFrame,
+    classes: Optional[List[str]] = None,
+    key_features: Optional[List[str]] = None,
+    n_bmi_bins: int = 20,
+    min_count: int = 10,
+    alpha: float = 1.0,
+) -> Dict[str, Any]:
+    """
+    Construye la tabla de probabilidades por bin de BMI y features clave.
+
+    Args:
+        df: Datos de entrenamiento con las features crudas y la columna objetivo
+        classes: Orden de las clases (por defecto, orden alfabético como el
+            LabelEncoder del modelo)
+        key_features: Features categóricas que definen las celdas
+        n_bmi_bins: Número de bins de BMI (bordes en cuantiles)
+        min_count: Filas mínimas para guardar una celda; las celdas con menos
+            datos recurren a la distribución del bin de BMI
+        alpha: Suavizado de Laplace
+
+    Returns:
+        Diccionario serializable a JSON con la tabla
+    """
+    if key_features is None:
+        key_features = list(DEFAULT_KEY_FEATURES)
+
+    df = df.dropna(subset=["Height", "Weight", TARGET, *key_features])
+    labels = df[TARGET].astype(str).str.strip()
+    if classes is None:
+        classes = sorted(labels.unique())
+
+    bmi = (df["Weight"] / df["Height"] ** 2).to_numpy(dtype=float)
+    quantiles = np.linspace(0.0, 1.0, n_bmi_bins + 1)[1:-1]
+    edges = [round(float(e), 4) for e in np.unique(np.quantile(bmi, quantiles))]
+    # side="right" reproduce bisect_right usado en FallbackTable.lookup
+    bins = pd.Series(np.searchsorted(edges, bmi, side="right"), index=df.index)
+
+    keys = df[key_features].astype(str).apply(lambda col: col.str.strip())
+
+    bmi_only = {
+        str(b): _distribution(labels[group.index], classes, alpha)
+        for b, group in bins.groupby(bins)
+    }
+    cells = {}
+    for (b, *values), group in pd.concat([bins.rename("bin"), keys], axis=1).groupby(
+        ["bin", *key_features]
+    ):
+        if len(group) >= min_count:
+            cells[FallbackTable.cell_key(b, list(values))] = _distribution(
+                labels[group.index], classes, alpha
+            )
+
+    return {
+        "classes": classes,
+        "bmi_edges": edges,
+        "key_features": key_features,
+        "cells": cells,
+        "bmi_only": bmi_only,
+        "prior": _distribution(labels, classes, alpha),
+        "min_count": min_count,
+        "n_rows": int(len(df)),
+        "built_at": datetime.utcnow().isoformat() + "Z",
+    }
+
+
+def table_accuracy(table: Dict[str, Any], df: pd.DataFrame) -> float:
+    """Exactitud de la tabla sobre un DataFrame con la columna objetivo."""
+    lookup = FallbackTable(table)
+    rows = df.dropna(subset=["Height", "Weight", TARGET]).itertuples(index=False)
+    hits = [lookup.lookup(row)[0] == str(getattr(row, TARGET)).strip() for row in rows]
+    return float(np.mean(hits))
+
+
+@app.command()
+def main(
+    data_path: Path = INTERIM_DATA_DIR / "obesity_clean_raw.csv",
+    output_path: Path = FALLBACK_TABLE_PATH,
+    key_features: List[str] = typer.Option(DEFAULT_KEY_FEATURES, help="Features clave"),
+    n_bmi_bins: int = 20,
+    min_count: int = 10,
+):
+    """Construye la tabla de fallback del modo degradado a partir de los datos de entrenamiento."""
+    logger.info(f"Construyendo tabla de fallback desde: {data_path}")
+    df = pd.read_csv(data_path)
+    table = build_fallback_table(
+        df, key_features=list(key_features), n_bmi_bins=n_bmi_bins, min_count=min_count
+    )
+
+    with open(output_path, "w", encoding="utf-8") as f:
+        json.dump(table, f, indent=2)
+
+    logger.info(
+        f"{len(table['cells'])} celdas, {len(table['bmi_edges']) + 1} bins de BMI; "
+        f"exactitud en entrenamiento: {table_accuracy(table, df):.3f}"
+    )
+    logger.success(f"Tabla de fallback guardada en: {output_path}")
+
+
+if __name__ == "__main__":
+    configure_logging()
+    app()
@@ -0,0 +1,426 @@
+"""
+Actualización incremental del modelo con nuevos datos etiquetados.
+
+Reentrenar desde cero repite la búsqueda aleatoria del notebook 6.0
+(`RandomizedSearchCV` con 50 combinaciones × 5 folds más el ajuste final).
+Este comando, en cambio, continúa el boosting del XGBoost del artefacto sobre
+los lotes nuevos:
+
+- El cleaner y el preprocesador ajustados del artefacto se reutilizan
+  congelados (solo `transform`), así que las features nuevas quedan en el
+  mismo espacio que las del entrenamiento.
+- Se agregan `--rounds` rondas al booster existente (`xgb.train` con
+  `xgb_model`); los árboles previos no cambian.
+- El candidato se valida contra un holdout (por defecto, el test de la
+  partición del entrenamiento) y solo se escribe un artefacto nuevo,
+  versionado, si la exactitud y la log-loss se mantienen dentro de las
+  tolerancias.
+
+El reporte incluye el tiempo de la actualización y una estimación del tiempo
+de la reconstrucción completa (un ajuste desde cero medido × número de ajustes
+de la búsqueda).
+
+Uso:
+    python -m mlops_obesidad.modeling.incremental data/nuevos_lotes/2026-10-18.csv --rounds 20
+"""
+
+import copy
+from datetime import datetime
+import hashlib
+import json
+from pathlib import Path
+import pickle
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from loguru import logger
+import numpy as np
+import pandas as pd
+import typer
+
+from mlops_obesidad.config import MODELS_DIR, REPORTS_DIR, TARGET, configure_logging
+from mlops_obesidad.modeling.split import RAW_DATA_PATH, load_raw_dataset, train_test_raw
+
+app = typer.Typer()
+
+# Configuración de la búsqueda del notebook 6.0 (reconstrucción completa)
+SEARCH_ITERATIONS = 50
+SEARCH_FOLDS = 5
+
+# Clave de metadatos de la actualización dentro del artefacto
+METADATA_KEY = "incremental"
+
+ARTIFACT_PREFIX = "xgboost_model_artifacts"
+
+
+# =============================================================================
+# Datos
+# =============================================================================
+
+
+def file_sha256(path: Path) -> str:
+    """Hash SHA-256 del contenido de un archivo."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def load_labeled_batches(paths: Sequence[Path], classes: Sequence[str]) -> pd.DataFrame:
+    """
+    Carga los lotes nuevos en formato crudo con su etiqueta.
+
+    Las filas con etiquetas desconocidas para el label encoder del artefacto
+    se descartan (el booster tiene un número fijo de clases).
+
+    Args:
+        paths: CSVs crudos con la columna objetivo
+        classes: Clases del label encoder
+
+    Returns:
+        DataFrame con los lotes concatenados y sin duplicados
+
+    Raises:
+        ValueError: Si algún lote no trae la columna objetivo
+    """
+    frames = []
+    for path in paths:
+        df = load_raw_dataset(path)
+        if TARGET not in df.columns:
+            raise ValueError(f"El lote {path} no tiene la columna objetivo '{TARGET}'")
+        frames.append(df)
+    data = pd.concat(frames, ignore_index=True).drop_duplicates()
+
+    known = data[TARGET].isin(classes)
+    if not known.all():
+        logger.warning(f"Se descartan {int((~known).sum())} filas con etiquetas desconocidas")
+    return data[known].reset_index(drop=True)
+
+
+def drop_holdout_rows(data: pd.DataFrame, holdout: pd.DataFrame) -> Tuple[pd.DataFrame, int]:
+    """
+    Quita de los lotes nuevos las filas que también están en el holdout.
+
+    Returns:
+        Tupla (lotes sin filas del holdout, filas quitadas)
+    """
+    columns = list(holdout.columns)
+    holdout_hashes = set(pd.util.hash_pandas_object(holdout[columns], index=False))
+    overlap = pd.util.hash_pandas_object(data[columns], index=False).isin(holdout_hashes)
+    return data[~overlap.to_numpy()].reset_index(drop=True), int(overlap.sum())
+
+
+# =============================================================================
+# Entrenamiento y validación
+# =============================================================================
+
+
+def booster_params(classifier: Any, n_classes: int, learning_rate: Optional[float] = None) -> Dict[str, Any]:
+    """Parámetros de `xgb.train` equivalentes a los del XGBClassifier entrenado."""
+    params = {
+        key: value
+        for key, value in classifier.get_xgb_params().items()
+        if value is not None and key not in ("n_jobs", "use_label_encoder")
+    }
+    params["num_class"] = n_classes
+    if learning_rate is not None:
+        params["learning_rate"] = learning_rate
+    return params
+
+
+def continue_boosting(
+    classifier: Any,
+    features: np.ndarray,
+    labels: np.ndarray,
+    rounds: int,
+    learning_rate: Optional[float] = None,
+) -> Any:
+    """
+    Copia del XGBClassifier con `rounds` rondas más entrenadas sobre los datos nuevos.
+
+    Args:
+        classifier: XGBClassifier entrenado (no se modifica)
+        features: Features transformadas con el preprocesador congelado
+        labels: Clases codificadas
+        rounds: Rondas a agregar
+        learning_rate: Tasa de aprendizaje de las rondas nuevas (None = la original)
+
+    Returns:
+        Nuevo XGBClassifier con el booster extendido
+    """
+    import xgboost as xgb
+
+    n_classes = len(classifier.classes_)
+    booster = xgb.train(
+        booster_params(classifier, n_classes, learning_rate),
+        xgb.DMatrix(features, label=labels),
+        num_boost_round=rounds,
+        xgb_model=classifier.get_booster(),
+    )
+    updated = copy.deepcopy(classifier)
+    updated._Booster = booster
+    updated.set_params(n_estimators=booster.num_boosted_rounds())
+    return updated
+
+
+def holdout_metrics(classifier: Any, features: np.ndarray, labels: np.ndarray) -> Dict[str, float]:
+    """Exactitud, F1 macro y log-loss del clasificador sobre el holdout."""
+    from sklearn.metrics import accuracy_score, f1_score, log_loss
+
+    proba = classifier.predict_proba(features)
+    pred = proba.argmax(axis=1)
+    return {
+        "accuracy": float(accuracy_score(labels, pred)),
+        "f1_macro": float(f1_score(labels, pred, average="macro")),
+        "log_loss": float(log_loss(labels, proba, labels=np.arange(proba.shape[1]))),
+    }
+
+
+def passes_gate(
+    baseline: Dict[str, float],
+    candidate: Dict[str, float],
+    max_accuracy_drop: float,
+    max_log_loss_increase: float,
+) -> Tuple[bool, List[str]]:
+    """
+    Decide si el modelo actualizado mantiene las métricas del holdout.
+
+    Args:
+        baseline: Métricas del modelo actual
+        candidate: Métricas del modelo actualizado
+        max_accuracy_drop: Pérdida máxima de exactitud (absoluta)
+        max_log_loss_increase: Aumento máximo de log-loss (relativo)
+
+    Returns:
+        Tupla (aprobado, motivos del rechazo)
+    """
+    reasons = []
+    if candidate["accuracy"] < baseline["accuracy"] - max_accuracy_drop:
+        reasons.append(
+            f"exactitud {candidate['accuracy']:.4f} < {baseline['accuracy']:.4f} - {max_accuracy_drop}"
+        )
+    if candidate["log_loss"] > baseline["log_loss"] * (1 + max_log_loss_increase):
+        reasons.append(
+            f"log-loss {candidate['log_loss']:.4f} > {baseline['log_loss']:.4f} × {1 + max_log_loss_increase}"
+        )
+    return not reasons, reasons
+
+
+def time_full_fit(classifier: Any, features: np.ndarray, labels: np.ndarray) -> float:
+    """Segundos de un ajuste desde cero del clasificador con sus hiperparámetros actuales."""
+    fresh = copy.deepcopy(classifier)
+    start = time.perf_counter()
+    fresh.fit(features, labels)
+    return time.perf_counter() - start
+
+
+# =============================================================================
+# Artefacto versionado
+# =============================================================================
+
+
+def next_version_path(artifacts: Dict[str, Any], output_dir: Path) -> Tuple[int, Path]:
+    """
+    Versión y ruta del artefacto actualizado.
+
+    La versión es la del artefacto padre más uno (el artefacto original, sin
+    metadatos de actualización, es la versión 1); si la ruta ya existe se
+    avanza a la siguiente versión libre en lugar de sobrescribirla.
+    """
+    version = artifacts.get(METADATA_KEY, {}).get("version", 1) + 1
+    while (output_dir / f"{ARTIFACT_PREFIX}_v{version}.pkl").exists():
+        version += 1
+    return version, output_dir / f"{ARTIFACT_PREFIX}_v{version}.pkl"
+
+
+def build_updated_artifacts(
+    artifacts: Dict[str, Any], classifier: Any, metadata: Dict[str, Any]
+) -> Dict[str, Any]:
+    """Artefacto con el mismo formato que el original y el clasificador actualizado."""
+    from sklearn.pipeline import Pipeline
+
+    model = artifacts["model"]
+    pipeline = Pipeline(model.steps[:-1] + [("classifier", classifier)])
+    return {
+        **{k: v for k, v in artifacts.items() if k not in ("model", METADATA_KEY)},
+        "model": pipeline,
+        METADATA_KEY: metadata,
+    }
+
+
+# =============================================================================
+# CLI
+# =============================================================================
+
+
+def run_update(
+    model_path: Path,
+    new_data: Sequence[Path],
+    data_path: Path,
+    holdout_path: Optional[Path],
+    rounds: int,
+    learning_rate: Optional[float],
+    max_accuracy_drop: float,
+    max_log_loss_increase: float,
+    measure_full_fit: bool,
+) -> Dict[str, Any]:
+    """
+    Actualiza el modelo con los lotes nuevos y arma el reporte.
+
+    Returns:
+        Reporte con métricas, decisión y tiempos, y los objetos para guardar
+        el artefacto ('_artifacts', '_classifier')
+    """
+    from mlops_obesidad.inference.model_loader import load_artifacts
+
+    artifacts = load_artifacts(model_path)
+    model = artifacts["model"]
+    label_encoder = artifacts["label_encoder"]
+    classifier = model.named_steps["classifier"]
+    frozen = model[:-1]
+
+    # Partición del entrenamiento: su test es el holdout por defecto y su train
+    # forma parte de la reconstrucción completa con la que se compara el tiempo
+    X_train = y_train = None
+    if data_path.exists():
+        X_train, X_holdout, y_train, y_holdout = train_test_raw(load_raw_dataset(data_path))
+    elif holdout_path is None:
+        raise FileNotFoundError(f"No existe el dataset del entrenamiento: {data_path}")
+    if holdout_path is not None:
+        holdout = load_raw_dataset(holdout_path)
+        X_holdout, y_holdout = holdout.drop(columns=[TARGET]), holdout[TARGET]
+
+    batches = load_labeled_batches(new_data, label_encoder.classes_)
+    batches, overlap = drop_holdout_rows(batches, pd.concat([X_holdout, y_holdout], axis=1))
+    if overlap:
+        logger.warning(f"Se descartan {overlap} filas de los lotes que también están en el holdout")
+    if batches.empty:
+        raise ValueError("Los lotes nuevos no tienen filas utilizables")
+
+    start = time.perf_counter()
+    new_features = np.asarray(frozen.transform(batches.drop(columns=[TARGET])), dtype=np.float32)
+    new_labels = label_encoder.transform(batches[TARGET])
+    updated = continue_boosting(classifier, new_features, new_labels, rounds, learning_rate)
+    update_seconds = time.perf_counter() - start
+
+    holdout_features = np.asarray(frozen.transform(X_holdout), dtype=np.float32)
+    holdout_labels = label_encoder.transform(y_holdout)
+    baseline = holdout_metrics(classifier, holdout_features, holdout_labels)
+    candidate = holdout_metrics(updated, holdout_features, holdout_labels)
+    accepted, reasons = passes_gate(baseline, candidate, max_accuracy_drop, max_log_loss_increase)
+
+    timing: Dict[str, Any] = {"update_seconds": round(update_seconds, 3)}
+    if measure_full_fit:
+        # Reconstrucción completa: datos del entrenamiento original + lotes nuevos
+        full_features, full_labels = new_features, new_labels
+        if X_train is not None:
+            full_features = np.vstack([np.asarray(frozen.transform(X_train), dtype=np.float32), new_features])
+            full_labels = np.concatenate([label_encoder.transform(y_train), new_labels])
+        fit_seconds = time_full_fit(classifier, full_features, full_labels)
+        n_fits = SEARCH_ITERATIONS * SEARCH_FOLDS + 1
+        rebuild_seconds = fit_seconds * n_fits
+        timing.update(
+            full_fit_seconds=round(fit_seconds, 3),
+            search_fits=n_fits,
+            estimated_full_rebuild_seconds=round(rebuild_seconds, 1),
+            estimated_time_saved_seconds=round(rebuild_seconds - update_seconds, 1),
+            speedup=round(rebuild_seconds / update_seconds, 1),
+        )
+
+    return {
+        "model_path": str(model_path),
+        "parent_version": artifacts.get(METADATA_KEY, {}).get("version", 1),
+        "new_data": [{"path": str(p), "sha256": file_sha256(p)} for p in new_data],
+        "new_rows": int(len(batches)),
+        "rows_in_holdout_dropped": overlap,
+        "holdout_rows": int(len(holdout_labels)),
+        "base_rounds": int(classifier.get_booster().num_boosted_rounds()),
+        "added_rounds": rounds,
+        "learning_rate": float(booster_params(classifier, 0, learning_rate)["learning_rate"]),
+        "baseline": baseline,
+        "candidate": candidate,
+        "accepted": accepted,
+        "rejection_reasons": reasons,
+        "timing": timing,
+        "_artifacts": artifacts,
+        "_classifier": updated,
+    }
+
+
+@app.command()
+def main(
+    new_data: List[Path] = typer.Argument(..., help="CSVs crudos con los nuevos datos etiquetados"),
+    model_path: Path = MODELS_DIR / "xgboost_model_artifacts.pkl",
+    data_path: Path = RAW_DATA_PATH,
+    holdout_path: Optional[Path] = typer.Option(
+        None, help="CSV crudo del holdout (por defecto, el test de la partición del entrenamiento)"
+    ),
+    output_dir: Path = MODELS_DIR,
+    report_dir: Path = REPORTS_DIR / "incremental",
+    rounds: int = typer.Option(20, min=1, help="Rondas de boosting a agregar"),
+    learning_rate: Optional[float] = typer.Option(None, help="Tasa de aprendizaje de las rondas nuevas"),
+    max_accuracy_drop: float = typer.Option(0.005, help="Pérdida máxima de exactitud en el holdout"),
+    max_log_loss_increase: float = typer.Option(0.02, help="Aumento relativo máximo de log-loss"),
+    measure_full_fit: bool = typer.Option(True, help="Medir un ajuste desde cero para estimar el ahorro"),
+):
+    """Continúa el boosting del modelo con nuevos datos y guarda una versión nueva si valida."""
+    report = run_update(
+        model_path,
+        new_data,
+        data_path,
+        holdout_path,
+        rounds,
+        learning_rate,
+        max_accuracy_drop,
+        max_log_loss_increase,
+        measure_full_fit,
+    )
+    version, output_path = next_version_path(report["_artifacts"], output_dir)
+    report["version"] = version
+
+    baseline, candidate = report["baseline"], report["candidate"]
+    logger.info(
+        f"Holdout ({report['holdout_rows']} filas): exactitud {baseline['accuracy']:.4f} -> "
+        f"{candidate['accuracy']:.4f}, log-loss {baseline['log_loss']:.4f} -> {candidate['log_loss']:.4f}"
+    )
+    timing = report["timing"]
+    if "estimated_full_rebuild_seconds" in timing:
+        logger.info(
+            f"Actualización: {timing['update_seconds']:.2f} s; reconstrucción completa estimada: "
+            f"{timing['estimated_full_rebuild_seconds']:.0f} s ({timing['search_fits']} ajustes de "
+            f"{timing['full_fit_seconds']:.2f} s); ahorro ~{timing['estimated_time_saved_seconds']:.0f} s"
+        )
+
+    report_dir.mkdir(parents=True, exist_ok=True)
+    report_path = report_dir / f"update_v{version}.json"
+    with open(report_path, "w", encoding="utf-8") as f:
+        json.dump({k: v for k, v in report.items() if not k.startswith("_")}, f, indent=2)
+    logger.info(f"Reporte de actualización guardado en: {report_path}")
+
+    if not report["accepted"]:
+        logger.warning(
+            "El modelo actualizado no mantiene las métricas; no se escribe artefacto: "
+            + "; ".join(report["rejection_reasons"])
+        )
+        raise typer.Exit(code=1)
+
+    metadata = {
+        "version": version,
+        "parent": report["model_path"],
+        "parent_version": report["parent_version"],
+        "created_at": datetime.utcnow().isoformat() + "Z",
+        "new_data": report["new_data"],
+        "new_rows": report["new_rows"],
+        "added_rounds": report["added_rounds"],
+        "holdout": candidate,
+    }
+    output_dir.mkdir(parents=True, exist_ok=True)
+    with open(output_path, "wb") as f:
+        pickle.dump(build_updated_artifacts(report["_artifacts"], report["_classifier"], metadata), f)
+    logger.success(f"Artefacto v{version} guardado en: {output_path}")
+
+
+if __name__ == "__main__":
+    configure_logging()
+    app()
@@ -0,0 +1,395 @@
+"""
+Auditoría de memoria del artefacto del modelo y exportación "slim".
+
+Mide, en un proceso recién iniciado, cuánta memoria residente agrega cada
+parte de lo que carga un worker de la API:
+
+- Importaciones (numpy/pandas, scikit-learn, XGBoost).
+- El artefacto completo y cada uno de sus componentes (cleaner,
+  preprocessor, classifier, label encoder). Cada componente se mide
+  deserializando una segunda copia con el artefacto ya cargado.
+- El working set de una predicción por lote.
+
+De cada medición se reporta la memoria trazada por tracemalloc (objetos de
+Python y buffers de numpy) y el delta de RSS (incluye la memoria nativa de
+XGBoost, que tracemalloc no ve).
+
+Con `--slim-output` además exporta una copia del artefacto sin el estado que
+solo se usa en entrenamiento (ver `slim_artifacts`), verifica que sus
+predicciones sean idénticas a las del original y la audita en un proceso
+nuevo (en el mismo proceso los deltas de RSS saldrían subestimados porque el
+allocator reutiliza la memoria liberada).
+
+Uso:
+    python -m mlops_obesidad.modeling.memory_audit --slim-output models/xgboost_model_artifacts_slim.pkl
+"""
+
+import copy
+import gc
+import io
+import json
+from pathlib import Path
+import pickle
+import subprocess
+import sys
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from loguru import logger
+import typer
+
+from mlops_obesidad.config import FEATURE_COLUMNS, MODELS_DIR, REPORTS_DIR, configure_logging
+from mlops_obesidad.monitoring.memory import rss_kb
+
+app = typer.Typer()
+
+# Importaciones que hace un worker antes de tener el modelo en memoria, en orden
+IMPORT_GROUPS = [
+    ("numpy+pandas", ["numpy", "pandas"]),
+    ("scikit-learn", ["sklearn.pipeline", "sklearn.compose", "sklearn.preprocessing", "sklearn.impute"]),
+    ("xgboost", ["xgboost"]),
+]
+
+# Claves del artefacto que son metadatos de exportación y no se miden
+_METADATA_KEYS = {"slim", "compression", "incremental"}
+
+# Parámetros del XGBClassifier que solo se usan al entrenar
+_TRAINING_ONLY_PARAMS = {"callbacks": None, "early_stopping_rounds": None, "eval_metric": None}
+
+
+# =============================================================================
+# Medición
+# =============================================================================
+
+
+def measure(fn: Callable[[], Any]) -> Tuple[Any, Dict[str, int]]:
+    """
+    Ejecuta `fn` y mide la memoria que deja asignada.
+
+    tracemalloc debe estar activo. Se fuerza una recolección antes y después
+    para que el delta refleje solo lo que `fn` mantiene vivo.
+
+    Args:
+        fn: Función a medir; su resultado se mantiene vivo durante la medición
+
+    Returns:
+        Tupla (resultado de fn, métricas en kB: traced_kb, traced_peak_kb, rss_kb)
+    """
+    gc.collect()
+    tracemalloc.reset_peak()
+    traced_before = tracemalloc.get_traced_memory()[0]
+    rss_before = rss_kb()
+
+    result = fn()
+
+    gc.collect()
+    traced_after, traced_peak = tracemalloc.get_traced_memory()
+    return result, {
+        "traced_kb": (traced_after - traced_before) // 1024,
+        "traced_peak_kb": (traced_peak - traced_before) // 1024,
+        "rss_kb": rss_kb() - rss_before,
+    }
+
+
+def audit_imports() -> List[Dict[str, Any]]:
+    """Memoria agregada por cada grupo de importaciones (0 si ya estaban importadas)."""
+    import importlib
+
+    rows = []
+    for name, modules in IMPORT_GROUPS:
+        _, metrics = measure(lambda: [importlib.import_module(m) for m in modules])
+        rows.append({"component": name, **metrics})
+    return rows
+
+
+def artifact_components(artifacts: Dict[str, Any]) -> Dict[str, Any]:
+    """Componentes del artefacto a medir por separado."""
+    components = dict(artifacts["model"].named_steps)
+    components.update(
+        {
+            key: value
+            for key, value in artifacts.items()
+            if key != "model" and key not in _METADATA_KEYS
+        }
+    )
+    return components
+
+
+def audit_components(artifacts: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Memoria de cada componente del artefacto ya cargado.
+
+    Cada componente se serializa y se deserializa una segunda vez; el delta
+    de esa copia es lo que el componente ocupa en memoria.
+    """
+    rows = []
+    for name, component in artifact_components(artifacts).items():
+        blob = pickle.dumps(component)
+        copy_, metrics = measure(lambda: pickle.loads(blob))
+        rows.append({"component": name, "pickle_kb": len(blob) // 1024, **metrics})
+        del copy_
+    return rows
+
+
+def audit_inference(artifacts: Dict[str, Any], X: Any) -> Dict[str, Any]:
+    """Working set de predict_proba sobre un lote (pico trazado y delta de RSS)."""
+    model = artifacts["model"]
+    model.predict_proba(X.iloc[:1])  # primeras asignaciones de XGBoost fuera de la medición
+    _, metrics = measure(lambda: model.predict_proba(X))
+    return {"rows": len(X), **metrics}
+
+
+def audit_artifact_bytes(raw: bytes, X: Any) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """
+    Audita un artefacto serializado: carga completa, componentes e inferencia.
+
+    Args:
+        raw: Contenido del pickle del artefacto
+        X: Lote de features crudas para medir la inferencia
+
+    Returns:
+        Tupla (reporte con 'load', 'components' e 'inference', artefactos cargados)
+    """
+    from mlops_obesidad.inference.model_loader import ArtifactUnpickler
+
+    # Se deserializa desde memoria (no con load_artifacts) para que la medición
+    # de la carga no incluya la lectura del disco
+    start = time.perf_counter()
+    artifacts, load_metrics = measure(lambda: ArtifactUnpickler(io.BytesIO(raw)).load())
+    load_metrics["seconds"] = round(time.perf_counter() - start, 3)
+    load_metrics["file_kb"] = len(raw) // 1024
+
+    report = {
+        "load": load_metrics,
+        "components": audit_components(artifacts),
+        "inference": audit_inference(artifacts, X),
+    }
+    return report, artifacts
+
+
+# =============================================================================
+# Exportación slim
+# =============================================================================
+
+
+def _compact_array(array: Any) -> Any:
+    """
+    Devuelve el array con el dtype más chico que representa sus valores exactamente.
+
+    float64 pasa a float32 y los enteros al tipo entero más chico que cubre
+    su rango, solo si la conversión no cambia ningún valor; los demás dtypes
+    (p. ej. object con categorías) se devuelven tal cual.
+    """
+    import numpy as np
+
+    if array.dtype == np.float64:
+        compact = array.astype(np.float32)
+        equal = np.array_equal(compact.astype(np.float64), array, equal_nan=True)
+        return compact if equal else array
+    if array.dtype.kind in "iu" and array.size:
+        for dtype in (np.int8, np.int16, np.int32):
+            info = np.iinfo(dtype)
+            if info.min <= array.min() and array.max() <= info.max:
+                return array.astype(dtype)
+    return array
+
+
+def _estimators(artifacts: Dict[str, Any]) -> List[Tuple[str, Any]]:
+    """Estimadores ajustados del artefacto (incluidos los pasos de los sub-pipelines)."""
+    model = artifacts["model"]
+    estimators = [("label_encoder", artifacts["label_encoder"])]
+    for name, step in model.named_steps.items():
+        estimators.append((name, step))
+        for sub_name, transformer, _ in getattr(step, "transformers_", []):
+            for step_name, sub_step in getattr(transformer, "steps", []):
+                estimators.append((f"{name}.{sub_name}.{step_name}", sub_step))
+    return estimators
+
+
+def slim_artifacts(artifacts: Dict[str, Any]) -> Tuple[Dict[str, Any], List[str]]:
+    """
+    Copia del artefacto sin el estado que la inferencia no usa.
+
+    - ColumnTransformer: las plantillas sin ajustar de `transformers` (solo
+      se clonan en fit) se reemplazan por los transformadores ajustados, y
+      las listas de columnas pasan de pandas.Index a listas de str.
+    - XGBClassifier: se descartan los parámetros de entrenamiento
+      (callbacks, early stopping, métrica de evaluación, kwargs) y los
+      atributos guardados en el booster; el booster se vuelve a serializar
+      con la versión instalada de XGBoost.
+    - Arrays ajustados: se guardan en el dtype más chico que representa sus
+      valores exactamente (ver `_compact_array`), por lo que las
+      predicciones no cambian.
+
+    Los nodos del booster conservan sus estadísticas (cover): las usa
+    `pred_contribs` para las explicaciones.
+
+    Args:
+        artifacts: Artefactos cargados ({'model', 'label_encoder', ...})
+
+    Returns:
+        Tupla (artefactos slim, lista de cambios aplicados)
+    """
+    import numpy as np
+    import pandas as pd
+
+    slim = copy.deepcopy(artifacts)
+    changes = []
+    model = slim["model"]
+
+    preprocessor = model.named_steps["preprocessor"]
+    fitted = {name: transformer for name, transformer, _ in preprocessor.transformers_}
+
+    def plain_columns(columns: Any) -> Any:
+        return [str(c) for c in columns] if isinstance(columns, pd.Index) else columns
+
+    preprocessor.transformers = [
+        (name, fitted.get(name, transformer), plain_columns(columns))
+        for name, transformer, columns in preprocessor.transformers
+    ]
+    preprocessor.transformers_ = [
+        (name, transformer, plain_columns(columns))
+        for name, transformer, columns in preprocessor.transformers_
+    ]
+    preprocessor._columns = [plain_columns(columns) for columns in preprocessor._columns]
+    changes.append("preprocessor: plantillas sin ajustar y pandas.Index de columnas")
+
+    classifier = model.named_steps["classifier"]
+    for param, value in _TRAINING_ONLY_PARAMS.items():
+        setattr(classifier, param, value)
+    classifier.kwargs = {}
+    booster = classifier.get_booster()
+    attributes = list(booster.attributes())
+    for key in attributes:
+        booster.set_attr(**{key: None})
+    changes.append(
+        f"classifier: parámetros de entrenamiento y {len(attributes)} atributos del booster"
+    )
+
+    for name, estimator in _estimators(slim):
+        for attr, value in list(vars(estimator).items()):
+            if isinstance(value, np.ndarray):
+                compact = _compact_array(value)
+                if compact.dtype != value.dtype:
+                    setattr(estimator, attr, compact)
+                    changes.append(f"{name}.{attr}: {value.dtype} -> {compact.dtype}")
+
+    slim["slim"] = {"created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()), "changes": changes}
+    return slim, changes
+
+
+def sample_features(data_path: Optional[Path], n_rows: int) -> Any:
+    """
+    Lote de features crudas para medir la inferencia y comparar artefactos.
+
+    Usa el dataset crudo si existe; si no, repite el ejemplo del schema de la API.
+    """
+    import pandas as pd
+
+    if data_path is not None and data_path.exists():
+        from mlops_obesidad.modeling.split import load_raw_dataset
+
+        df = load_raw_dataset(data_path)[FEATURE_COLUMNS]
+        return df.sample(n=n_rows, replace=len(df) < n_rows, random_state=0).reset_index(drop=True)
+
+    from API.schemas import PredictionRequest
+
+    example = PredictionRequest.model_json_schema()["example"]
+    return pd.DataFrame([example] * n_rows, columns=FEATURE_COLUMNS)
+
+
+# =============================================================================
+# CLI
+# =============================================================================
+
+
+def _log_audit(title: str, report: Dict[str, Any]) -> None:
+    """Registra una auditoría como tabla."""
+    load = report["load"]
+    lines = [
+        title,
+        f"  archivo {load['file_kb']} KB, carga {load['seconds']:.2f} s",
+        f"  {'componente':<16} {'pickle KB':>10} {'traced KB':>10} {'RSS KB':>10}",
+        # La primera carga incluye la inicialización nativa de XGBoost
+        f"  {'(artefacto)':<16} {load['file_kb']:>10} {load['traced_kb']:>10} {load['rss_kb']:>10}",
+    ]
+    for row in report["components"]:
+        lines.append(
+            f"  {row['component']:<16} {row['pickle_kb']:>10} {row['traced_kb']:>10} {row['rss_kb']:>10}"
+        )
+    inference = report["inference"]
+    lines.append(
+        f"  predict_proba de {inference['rows']} filas: pico trazado "
+        f"{inference['traced_peak_kb']} KB, RSS +{inference['rss_kb']} KB"
+    )
+    logger.info("\n".join(lines))
+
+
+@app.command()
+def main(
+    model_path: Path = MODELS_DIR / "xgboost_model_artifacts.pkl",
+    data_path: Path = typer.Option(None, help="CSV crudo para el lote de inferencia"),
+    slim_output: Optional[Path] = typer.Option(None, help="Ruta para exportar el artefacto slim"),
+    report_path: Path = REPORTS_DIR / "memory" / "memory_audit.json",
+    batch_rows: int = typer.Option(1000, help="Filas del lote para medir la inferencia"),
+):
+    """Reporta la memoria del artefacto por componente y, opcionalmente, exporta la versión slim."""
+    tracemalloc.start()
+    baseline = rss_kb()
+    imports = audit_imports()
+
+    from mlops_obesidad.modeling.split import RAW_DATA_PATH  # importa pandas
+    lines = [f"Proceso: RSS inicial {baseline} KB", f"  {'importación':<16} {'traced KB':>10} {'RSS KB':>10}"]
+    lines += [f"  {row['component']:<16} {row['traced_kb']:>10} {row['rss_kb']:>10}" for row in imports]
+    logger.info("\n".join(lines))
+
+    X = sample_features(data_path or RAW_DATA_PATH, batch_rows)
+    raw = model_path.read_bytes()
+    report: Dict[str, Any] = {"model_path": str(model_path), "baseline_rss_kb": baseline, "imports": imports}
+    report["artifact"], artifacts = audit_artifact_bytes(raw, X)
+    _log_audit(f"Artefacto: {model_path}", report["artifact"])
+
+    report["final_rss_kb"] = rss_kb()
+    report_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(report_path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    logger.info(f"Reporte de memoria guardado en: {report_path}")
+
+    if slim_output is None:
+        return
+
+    import numpy as np
+
+    slim, changes = slim_artifacts(artifacts)
+    original_proba = artifacts["model"].predict_proba(X)
+    slim_proba = slim["model"].predict_proba(X)
+    if not np.array_equal(original_proba, slim_proba):
+        max_diff = float(np.abs(original_proba - slim_proba).max())
+        logger.error(f"El artefacto slim cambia las predicciones (máx. diferencia {max_diff})")
+        raise typer.Exit(code=1)
+
+    with open(slim_output, "wb") as f:
+        pickle.dump(slim, f)
+    logger.success(
+        f"Artefacto slim guardado en: {slim_output} ({slim_output.stat().st_size // 1024} KB); "
+        f"cambios: {len(changes)}"
+    )
+    for change in changes:
+        logger.info(f"  {change}")
+
+    # Auditoría del artefacto slim en un proceso limpio
+    slim_report = report_path.with_name(f"{report_path.stem}_slim{report_path.suffix}")
+    command = [
+        sys.executable, "-m", "mlops_obesidad.modeling.memory_audit",
+        "--model-path", str(slim_output), "--report-path", str(slim_report),
+        "--batch-rows", str(batch_rows),
+    ]
+    if data_path is not None:
+        command += ["--data-path", str(data_path)]
+    subprocess.run(command, check=True)
+
+
+if __name__ == "__main__":
+    configure_logging()
+    app()
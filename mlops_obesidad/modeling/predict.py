@@ -1,30 +1,548 @@
+"""
+Scoring por lotes incremental con watermark.
+
+`models/deployment.py` vuelve a puntuar todo el dataset en cada corrida,
+aunque solo una fracción pequeña de las filas sea nueva. Este comando guarda
+un watermark en el store de predicciones y puntúa solo lo no visto:
+
+- `hash`: fingerprint de 64 bits de las features de cada fila (la misma
+  canonicalización que la deduplicación de `mlops_obesidad.dataset`, así que
+  dos filas que el cleaner deja iguales tienen el mismo hash). Se puntúan las
+  filas cuyo fingerprint no está en el store; con `--key-column` además se
+  guarda el fingerprint vigente de cada clave (el de su última fila), así que
+  una clave que vuelve a un contenido anterior (A -> B -> A) también se
+  vuelve a puntuar y reemplaza a la predicción anterior.
+- `offset`: byte hasta el que se leyó el archivo (para archivos a los que solo
+  se agregan filas al final). Es el único modo que no relee el historial.
+- `timestamp`: máximo de `--timestamp-column` ya puntuado; se puntúan las
+  filas posteriores. Las filas que llegan tarde con un timestamp anterior no
+  se ven.
+
+Cada corrida agrega un archivo `part-NNNNN.csv.gz` al directorio de partes
+vigente (`parts-GGGGG/`) y actualiza `state.json` al final, de modo que una
+corrida interrumpida se repite sin dejar el store a medias. `load_predictions`
+resuelve el store completo (la predicción más reciente por clave). Si cambia
+el modelo (hash del artefacto) o la configuración del watermark, se puntúa
+todo en un directorio de partes nuevo; el anterior se borra recién después de
+que `state.json` apunte al nuevo.
+
+Uso:
+    python -m mlops_obesidad.modeling.predict data/raw/obesity_estimation_original.csv \\
+        --watermark hash --key-column patient_id
+"""
+
+from datetime import datetime
+import gzip
+import io
+import json
+import os
 from pathlib import Path
+import shutil
+import time
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
 from loguru import logger
-from tqdm import tqdm
+import numpy as np
+import pandas as pd
 import typer
 
-from mlops_obesidad.config import MODELS_DIR, PROCESSED_DATA_DIR
+from mlops_obesidad.config import FEATURE_COLUMNS, PROCESSED_DATA_DIR, configure_logging
+from mlops_obesidad.dataset import row_fingerprints
+from mlops_obesidad.inference.model_loader import DEFAULT_MODEL_PATH
+from mlops_obesidad.modeling.incremental import METADATA_KEY, file_sha256
+from mlops_obesidad.modeling.split import RAW_DATA_PATH
 
 app = typer.Typer()
 
+WATERMARKS = ("hash", "offset", "timestamp")
+
+# Columna con el fingerprint de la fila cuando no hay columna clave
+ROW_HASH = "row_hash"
+
+
+# =============================================================================
+# Scoring
+# =============================================================================
+
+
+def score_frame(frame: pd.DataFrame, artifacts: Dict[str, Any]) -> pd.DataFrame:
+    """
+    Puntúa un DataFrame crudo con una sola llamada al modelo.
+
+    Args:
+        frame: Filas con las columnas de FEATURE_COLUMNS
+        artifacts: Artefactos del modelo ({'model', 'label_encoder'})
+
+    Returns:
+        DataFrame con el índice de `frame` y las columnas `prediction`,
+        `confidence` y `proba_<clase>`
+
+    Raises:
+        ValueError: Si faltan columnas del modelo
+    """
+    missing = [col for col in FEATURE_COLUMNS if col not in frame.columns]
+    if missing:
+        raise ValueError(f"Faltan columnas en la entrada: {missing}")
+
+    classes = artifacts["label_encoder"].classes_
+    proba = artifacts["model"].predict_proba(frame[FEATURE_COLUMNS])
+    best = proba.argmax(axis=1)
+
+    result = pd.DataFrame(
+        {"prediction": classes[best], "confidence": proba[np.arange(len(best)), best]},
+        index=frame.index,
+    )
+    for k, name in enumerate(classes):
+        result[f"proba_{name}"] = proba[:, k]
+    return result
+
+
+def row_hashes(frame: pd.DataFrame, key_column: Optional[str] = None) -> np.ndarray:
+    """
+    Fingerprint de 64 bits de cada fila (features y, si se indica, la clave).
+
+    Los valores se comparan como texto canónico (`"21"` y `21.0` son iguales;
+    espacios y alias de nulos se normalizan como en `DataCleanerTransformer`),
+    de modo que el hash no depende de los tipos que `read_csv` infiera en
+    cada chunk.
+
+    Args:
+        frame: Filas a hashear
+        key_column: Columna clave a incluir en el hash
+
+    Returns:
+        Array uint64 con un hash por fila
+    """
+    columns = ([key_column] if key_column else []) + FEATURE_COLUMNS
+    return row_fingerprints(frame[columns])[0]
+
+
+class KeyVersions:
+    """
+    Última aparición de cada clave en una corrida con `--key-column`.
+
+    La predicción vigente de una clave es la de su última fila en el archivo.
+    Las filas con un fingerprint no visto se puntúan al leerlas; al terminar,
+    `stale_rows` indica las últimas filas que quedaron sin puntuar pero no
+    coinciden con la predicción vigente del store: la clave volvió a un
+    contenido anterior (A -> B -> A) o una versión vieja quedó después de una
+    nueva dentro del archivo.
+
+    Args:
+        keys: Fingerprints de las claves del store, ordenados y sin repetir
+        hashes: Fingerprint de la fila vigente de cada clave de `keys`
+    """
+
+    def __init__(self, keys: np.ndarray, hashes: np.ndarray):
+        self.known_keys = keys
+        self.known_hashes = hashes
+        self.keys = np.empty(0, dtype=np.uint64)
+        self.rows = np.empty(0, dtype=np.int64)
+        self.hashes = np.empty(0, dtype=np.uint64)
+        self.scored = np.empty(0, dtype=bool)
+        self.touched = np.empty(0, dtype=bool)
+
+    def update(self, keys: np.ndarray, rows: np.ndarray, hashes: np.ndarray, scored: np.ndarray) -> None:
+        """
+        Registra un chunk.
+
+        Args:
+            keys: Fingerprint de la clave de cada fila
+            rows: Número de fila global de cada fila
+            hashes: Fingerprint de cada fila (ver `row_hashes`)
+            scored: Filas que se puntuaron en esta corrida
+        """
+        if not len(keys):
+            return
+        order = np.argsort(keys, kind="stable")
+        k = keys[order]
+        starts = np.flatnonzero(np.r_[True, k[1:] != k[:-1]])
+        last = order[np.r_[starts[1:] - 1, len(k) - 1]]
+        touched = np.logical_or.reduceat(scored[order], starts)
+
+        # La última aparición del chunk reemplaza a la anterior; `touched` se acumula
+        all_keys = np.concatenate([keys[last], self.keys])
+        all_touched = np.concatenate([touched, self.touched])
+        self.keys, index, inverse = np.unique(all_keys, return_index=True, return_inverse=True)
+        self.rows = np.concatenate([rows[last], self.rows])[index]
+        self.hashes = np.concatenate([hashes[last], self.hashes])[index]
+        self.scored = np.concatenate([scored[last], self.scored])[index]
+        self.touched = np.zeros(len(self.keys), dtype=bool)
+        np.logical_or.at(self.touched, inverse.ravel(), all_touched)
+
+    def stale_rows(self) -> np.ndarray:
+        """
+        Filas globales (ordenadas) que hay que puntuar para que la última fila
+        de cada clave sea su predicción vigente.
+        """
+        position = np.searchsorted(self.known_keys, self.keys)
+        found = position < len(self.known_keys)
+        found[found] = self.known_keys[position[found]] == self.keys[found]
+        current = np.zeros(len(self.keys), dtype=bool)
+        current[found] = self.known_hashes[position[found]] == self.hashes[found]
+        # Sin puntuar y distinta de la vigente, o detrás de otra fila puntuada
+        stale = ~self.scored & (~current | self.touched)
+        return np.sort(self.rows[stale])
+
+    def current(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Claves y fingerprints vigentes tras la corrida (para guardar en el store)."""
+        keys, index = np.unique(np.concatenate([self.keys, self.known_keys]), return_index=True)
+        return keys, np.concatenate([self.hashes, self.known_hashes])[index]
+
+
+# =============================================================================
+# Lectura del delta
+# =============================================================================
+
+
+class _BoundedReader(io.RawIOBase):
+    """Vista de solo lectura de un archivo entre dos offsets."""
+
+    def __init__(self, f, start: int, end: int):
+        f.seek(start)
+        self._f = f
+        self._remaining = end - start
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        n = min(len(buffer), self._remaining)
+        if n <= 0:
+            return 0
+        data = self._f.read(n)
+        buffer[: len(data)] = data
+        self._remaining -= len(data)
+        return len(data)
+
+
+def _complete_end(path: Path) -> int:
+    """Offset justo después del último salto de línea (una línea a medio escribir se ignora)."""
+    size = path.stat().st_size
+    with open(path, "rb") as f:
+        position = size
+        while position > 0:
+            start = max(0, position - 65536)
+            f.seek(start)
+            block = f.read(position - start)
+            newline = block.rfind(b"\n")
+            if newline >= 0:
+                return start + newline + 1
+            position = start
+    return 0
+
+
+def iter_from_offset(
+    path: Path, offset: int, header: Optional[List[str]], chunksize: int
+) -> Iterator[pd.DataFrame]:
+    """
+    Lee por chunks las líneas completas de un CSV a partir de `offset`.
+
+    Args:
+        path: CSV al que solo se agregan filas
+        offset: Byte desde el que leer (0 = incluye el encabezado)
+        header: Columnas del archivo (None si se lee desde el principio)
+        chunksize: Filas por chunk
+
+    Yields:
+        DataFrames con a lo sumo `chunksize` filas
+    """
+    end = _complete_end(path)
+    if end <= offset:
+        return
+    with open(path, "rb") as f:
+        reader = io.BufferedReader(_BoundedReader(f, offset, end))
+        kwargs = {"names": header, "header": None} if offset else {}
+        yield from pd.read_csv(reader, chunksize=chunksize, **kwargs)
+
+
+# =============================================================================
+# Store de predicciones
+# =============================================================================
+
+
+def read_state(store_dir: Path) -> Optional[Dict[str, Any]]:
+    """Estado del store (None si todavía no existe)."""
+    path = store_dir / "state.json"
+    if not path.exists():
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _write_state(store_dir: Path, state: Dict[str, Any]) -> None:
+    tmp = store_dir / "state.json.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(state, f, indent=2)
+    os.replace(tmp, store_dir / "state.json")
+
+
+def load_signed_artifacts(model_path: Path) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """
+    Carga el artefacto y calcula su firma.
+
+    Returns:
+        Tupla (artefactos, firma): la firma tiene el hash del archivo y la
+        versión de la actualización incremental que lo produjo
+    """
+    from mlops_obesidad.inference.model_loader import load_artifacts
+
+    artifacts = load_artifacts(model_path)
+    signature = {
+        "sha256": file_sha256(model_path),
+        "version": artifacts.get(METADATA_KEY, {}).get("version", 1),
+    }
+    return artifacts, signature
+
+
+def load_predictions(store_dir: Path) -> pd.DataFrame:
+    """
+    Predicciones vigentes del store: la más reciente por clave.
+
+    Args:
+        store_dir: Directorio del store
+
+    Returns:
+        DataFrame con una fila por clave (o por fingerprint si no hay clave)
+    """
+    state = read_state(store_dir)
+    if state is None:
+        raise FileNotFoundError(f"No existe el store de predicciones: {store_dir}")
+    key = state["key_column"] or ROW_HASH
+    parts_dir = store_dir / state.get("parts_dir", "parts")
+    parts = [pd.read_csv(parts_dir / name) for name in state["parts"]]
+    if not parts:
+        return pd.DataFrame()
+    predictions = pd.concat(parts, ignore_index=True)
+    return predictions.drop_duplicates(subset=key, keep="last").reset_index(drop=True)
+
+
+def score_incremental(
+    input_path: Path,
+    store_dir: Path,
+    model_path: Path = DEFAULT_MODEL_PATH,
+    watermark: str = "hash",
+    key_column: Optional[str] = None,
+    timestamp_column: Optional[str] = None,
+    chunksize: int = 100_000,
+    full: bool = False,
+) -> Dict[str, Any]:
+    """
+    Puntúa las filas nuevas o modificadas de `input_path` y las agrega al store.
+
+    Args:
+        input_path: CSV crudo con el historial completo
+        store_dir: Directorio del store de predicciones
+        model_path: Artefacto del modelo
+        watermark: 'hash', 'offset' o 'timestamp'
+        key_column: Columna que identifica cada fila (opcional)
+        timestamp_column: Columna de tiempo (obligatoria con watermark='timestamp')
+        chunksize: Filas por chunk de lectura
+        full: Forzar la re-puntuación completa
+
+    Returns:
+        Reporte de la corrida
+
+    Raises:
+        ValueError: Configuración inválida o columnas faltantes
+    """
+    if watermark not in WATERMARKS:
+        raise ValueError(f"watermark debe ser uno de {WATERMARKS}")
+    if watermark == "timestamp" and not timestamp_column:
+        raise ValueError("watermark='timestamp' requiere timestamp_column")
+
+    start = time.perf_counter()
+    store_dir = Path(store_dir)
+    artifacts, signature = load_signed_artifacts(model_path)
+    config = {"watermark": watermark, "key_column": key_column, "timestamp_column": timestamp_column}
+
+    state = read_state(store_dir)
+    if state is not None:
+        state.setdefault("parts_dir", "parts")
+    reason = None
+    if full:
+        reason = "forzada"
+    elif state is None:
+        reason = "store nuevo"
+    elif state["model"]["sha256"] != signature["sha256"]:
+        previous = state["model"]
+        reason = (
+            f"cambió el modelo ({previous['sha256'][:12]} v{previous['version']} -> "
+            f"{signature['sha256'][:12]} v{signature['version']})"
+        )
+    elif {k: state[k] for k in config} != config:
+        reason = "cambió la configuración del watermark"
+    elif watermark == "offset" and input_path.stat().st_size < state["offset"]:
+        reason = "el archivo es más corto que el offset guardado"
+
+    previous_dir = None
+    if reason is not None:
+        logger.info(f"Re-puntuación completa: {reason}")
+        # Generación nueva: el store vigente queda intacto hasta escribir state.json
+        generation = state.get("generation", 0) + 1 if state is not None else 0
+        previous_dir = state["parts_dir"] if state is not None else None
+        parts_dir = f"parts-{generation:05d}"
+        shutil.rmtree(store_dir / parts_dir, ignore_errors=True)
+        state = {
+            **config,
+            "generation": generation,
+            "parts_dir": parts_dir,
+            "model": signature,
+            "offset": 0,
+            "header": None,
+            "max_timestamp": None,
+            "rows_scored": 0,
+            "parts": [],
+            "runs": [],
+        }
+    parts_dir = store_dir / state["parts_dir"]
+    parts_dir.mkdir(parents=True, exist_ok=True)
+
+    seen = np.empty(0, dtype=np.uint64)
+    if watermark == "hash" and (parts_dir / "seen.npy").exists():
+        seen = np.load(parts_dir / "seen.npy")
+    # Con clave: fingerprint vigente de cada clave (ver `KeyVersions`)
+    versions = None
+    if watermark == "hash" and key_column:
+        versions = KeyVersions(np.empty(0, dtype=np.uint64), np.empty(0, dtype=np.uint64))
+        if (parts_dir / "keys.npz").exists():
+            with np.load(parts_dir / "keys.npz") as saved:
+                versions = KeyVersions(saved["keys"], saved["hashes"])
+    max_timestamp = pd.Timestamp(state["max_timestamp"]) if state["max_timestamp"] else None
+
+    if watermark == "offset":
+        end = _complete_end(input_path)
+        if state["header"] is None:
+            state["header"] = pd.read_csv(input_path, nrows=0).columns.tolist()
+        header = state["header"] if state["offset"] else None
+        chunks = iter_from_offset(input_path, state["offset"], header, chunksize)
+    else:
+        chunks = pd.read_csv(input_path, chunksize=chunksize)
+
+    part_name = f"part-{len(state['runs']):05d}.csv.gz"
+    part_path = parts_dir / part_name
+    tmp_path = part_path.with_suffix(".tmp")
+    rows_read = rows_scored = 0
+    latest = None
+    new_hashes = []
+    scored_at = datetime.utcnow().isoformat() + "Z"
+
+    def write(delta: pd.DataFrame, delta_hashes: np.ndarray) -> None:
+        nonlocal rows_scored
+        result = score_frame(delta, artifacts)
+        if key_column:
+            ids = delta[[key_column]]
+        else:
+            ids = pd.DataFrame({ROW_HASH: delta_hashes}, index=delta.index)
+        if timestamp_column:
+            ids = ids.join(delta[[timestamp_column]])
+        result = pd.concat([ids, result], axis=1)
+        result["scored_at"] = scored_at
+        result.to_csv(out, index=False, header=rows_scored == 0, float_format="%.6g")
+        rows_scored += len(result)
+
+    with gzip.open(tmp_path, "wt", compresslevel=1, newline="") as out:
+        for chunk in chunks:
+            offset = rows_read
+            rows_read += len(chunk)
+            hashes = row_hashes(chunk, key_column)
+
+            if watermark == "hash":
+                # Filas no vistas, sin repetir las que se repiten dentro de esta corrida
+                fresh = ~np.isin(hashes, seen)
+                fresh &= ~pd.Series(hashes).duplicated().to_numpy()
+                if new_hashes:
+                    fresh &= ~np.isin(hashes, np.concatenate(new_hashes))
+                new_hashes.append(hashes[fresh])
+                if versions is not None:
+                    versions.update(
+                        row_fingerprints(chunk[[key_column]])[0],
+                        np.arange(offset, rows_read),
+                        hashes,
+                        fresh,
+                    )
+            elif watermark == "timestamp":
+                times = pd.to_datetime(chunk[timestamp_column], errors="coerce")
+                fresh = times.notna().to_numpy()
+                if max_timestamp is not None:
+                    fresh &= (times > max_timestamp).to_numpy()
+                if fresh.any():
+                    latest = max(latest, times[fresh].max()) if latest is not None else times[fresh].max()
+            else:
+                fresh = np.ones(len(chunk), dtype=bool)
+
+            if fresh.any():
+                write(chunk[fresh], hashes[fresh])
+
+        # Claves cuya última fila ya se había visto pero no es la vigente: una
+        # segunda lectura puntúa solo esas filas (después, para que ganen)
+        stale = versions.stale_rows() if versions is not None else np.empty(0, dtype=np.int64)
+        if len(stale):
+            logger.info(f"{len(stale)} claves volvieron a un contenido anterior; re-puntuando sus filas")
+            offset = 0
+            for chunk in pd.read_csv(input_path, chunksize=chunksize):
+                rows = np.arange(offset, offset + len(chunk))
+                offset += len(chunk)
+                mask = np.isin(rows, stale)
+                if mask.any():
+                    write(chunk[mask], row_hashes(chunk[mask], key_column))
+
+    if rows_scored:
+        os.replace(tmp_path, part_path)
+        state["parts"].append(part_name)
+    else:
+        tmp_path.unlink()
+
+    if watermark == "offset":
+        state["offset"] = max(state["offset"], end)
+    if latest is not None:
+        state["max_timestamp"] = latest.isoformat()
+
+    run = {
+        "run": len(state["runs"]),
+        "at": scored_at,
+        "full_rescore": reason,
+        "rows_read": rows_read,
+        "rows_scored": rows_scored,
+        "seconds": round(time.perf_counter() - start, 3),
+    }
+    state["runs"].append(run)
+    state["rows_scored"] += rows_scored
+    _write_state(store_dir, state)
+    if previous_dir is not None:
+        shutil.rmtree(store_dir / previous_dir, ignore_errors=True)
+    # Después del estado: si se corta antes, la corrida siguiente repite estas
+    # filas y la predicción más reciente reemplaza a la duplicada
+    if watermark == "hash" and new_hashes:
+        np.save(parts_dir / "seen.npy", np.union1d(seen, np.concatenate(new_hashes)))
+    if versions is not None and (rows_scored or not (parts_dir / "keys.npz").exists()):
+        keys, current = versions.current()
+        np.savez(parts_dir / "keys.npz", keys=keys, hashes=current)
+    return {**run, "model": signature, "watermark": watermark, "store": str(store_dir)}
+
 
 @app.command()
 def main(
-    # ---- REPLACE DEFAULT PATHS AS APPROPRIATE ----
-    features_path: Path = PROCESSED_DATA_DIR / "test_features.csv",
-    model_path: Path = MODELS_DIR / "model.pkl",
-    predictions_path: Path = PROCESSED_DATA_DIR / "test_predictions.csv",
-    # -----------------------------------------
+    input_path: Path = typer.Argument(RAW_DATA_PATH, help="CSV crudo con el historial completo"),
+    store_dir: Path = typer.Option(PROCESSED_DATA_DIR / "predictions", help="Directorio del store de predicciones"),
+    model_path: Path = typer.Option(DEFAULT_MODEL_PATH, help="Artefacto del modelo"),
+    watermark: str = typer.Option("hash", help="Watermark: hash, offset o timestamp"),
+    key_column: Optional[str] = typer.Option(None, help="Columna que identifica cada fila"),
+    timestamp_column: Optional[str] = typer.Option(None, help="Columna de tiempo (watermark=timestamp)"),
+    chunksize: int = typer.Option(100_000, help="Filas por chunk de lectura"),
+    full: bool = typer.Option(False, "--full", help="Re-puntuar todo aunque el modelo no haya cambiado"),
 ):
-    # ---- REPLACE THIS WITH YOUR OWN CODE ----
-    logger.info("Performing inference for model...")
-    for i in tqdm(range(10), total=10):
-        if i == 5:
-            logger.info("Something happened for iteration 5.")
-    logger.success("Inference complete.")
-    # -----------------------------------------
+    """Puntúa solo las filas nuevas o modificadas y las agrega al store de predicciones."""
+    report = score_incremental(
+        input_path, store_dir, model_path, watermark, key_column, timestamp_column, chunksize, full
+    )
+    mode = f"completa ({report['full_rescore']})" if report["full_rescore"] else "incremental"
+    logger.success(
+        f"Corrida {mode}: {report['rows_scored']} de {report['rows_read']} filas puntuadas "
+        f"en {report['seconds']:.2f} s -> {store_dir}"
+    )
 
 
 if __name__ == "__main__":
+    configure_logging()
     app()
@@ -0,0 +1,436 @@
+"""
+Replay offline de tráfico grabado contra uno o más artefactos candidatos.
+
+Compara modelos antes de desplegarlos sin tocar el tráfico productivo: lee
+el log de predicciones (JSONL con las features bajo 'request', como lo lee
+`drift_report`) o cualquier dataset crudo (CSV, Parquet, JSONL), y puntúa
+cada chunk con todos los modelos por el camino vectorizado (un
+`predict_proba` por chunk y modelo, con las filas repetidas del chunk
+puntuadas una sola vez). Reporta:
+
+- Matriz de acuerdo entre todos los pares de modelos (y contra la predicción
+  grabada en el log, si existe) y la matriz de confusión de cada candidato
+  contra el de referencia (el primero).
+- Deltas de probabilidad contra la referencia: media y media absoluta por
+  clase, y la distribución del máximo |delta| por fila.
+- Latencias por modelo: la distribución de una request individual (un
+  `predict_proba` de una fila, como `/predict`) sobre una muestra del
+  tráfico, y el costo por fila del camino por lotes en cada chunk.
+
+Uso:
+    python -m mlops_obesidad.modeling.replay logs/predictions.jsonl \\
+        --model models/xgboost_model_artifacts.pkl \\
+        --model models/xgboost_model_artifacts_compressed.pkl
+"""
+
+from concurrent.futures import Executor, ProcessPoolExecutor
+import json
+from pathlib import Path
+import time
+from typing import Any, Dict, List, Optional, Sequence
+
+from loguru import logger
+import numpy as np
+import pandas as pd
+import typer
+
+from mlops_obesidad.config import FEATURE_COLUMNS, REPORTS_DIR, configure_logging
+from mlops_obesidad.dataset import row_fingerprints
+from mlops_obesidad.inference.model_loader import DEFAULT_MODEL_PATH
+from mlops_obesidad.monitoring.drift_report import iter_chunks
+
+app = typer.Typer()
+
+# Nombre de la predicción grabada en el log dentro de la matriz de acuerdo
+RECORDED = "recorded"
+
+# Bins del histograma del máximo |delta| de probabilidad por fila (más uno
+# para los deltas exactamente nulos)
+DELTA_BINS = 1000
+
+# Percentiles reportados en las distribuciones
+PERCENTILES = (50, 90, 95, 99)
+
+# Artefactos cargados en cada proceso worker: [(nombre, artefactos)]
+_worker_models: Optional[List[Any]] = None
+
+
+def model_names(model_paths: Sequence[Path]) -> List[str]:
+    """Nombres de los modelos: el nombre del archivo, con el directorio si se repite."""
+    stems = [Path(p).stem for p in model_paths]
+    return [
+        f"{Path(p).parent.name}/{stem}" if stems.count(stem) > 1 else stem
+        for p, stem in zip(model_paths, stems)
+    ]
+
+
+def _init_worker(model_paths: Sequence[str]) -> None:
+    """Inicializador de cada proceso: carga todos los artefactos una sola vez."""
+    global _worker_models
+
+    from mlops_obesidad.inference.model_loader import load_artifacts
+
+    _worker_models = [
+        (name, load_artifacts(path)) for name, path in zip(model_names(model_paths), model_paths)
+    ]
+
+
+def class_union(models: Sequence[Any]) -> List[str]:
+    """Clases de todos los modelos, en orden."""
+    return sorted({str(c) for _, artifacts in models for c in artifacts["label_encoder"].classes_})
+
+
+# =============================================================================
+# Agregados por chunk
+# =============================================================================
+
+
+def empty_partial(n_models: int, n_classes: int, recorded: bool) -> Dict[str, Any]:
+    """Acumulador vacío; `recorded` agrega la predicción grabada a la matriz de acuerdo."""
+    n_labels = n_models + int(recorded)
+    return {
+        "n_rows": 0,
+        "n_unique": 0,
+        "predicted": np.zeros((n_models, n_classes), dtype=np.int64),
+        "confusion": np.zeros((n_models, n_classes, n_classes), dtype=np.int64),
+        "agree": np.zeros((n_labels, n_labels), dtype=np.int64),
+        "compared": np.zeros((n_labels, n_labels), dtype=np.int64),
+        "delta_sum": np.zeros((n_models, n_classes)),
+        "abs_delta_sum": np.zeros((n_models, n_classes)),
+        "max_delta_hist": np.zeros((n_models, DELTA_BINS + 1), dtype=np.int64),
+        "max_delta": np.zeros(n_models),
+        "batch_seconds": np.zeros(n_models),
+        "batch_us_per_row": [[] for _ in range(n_models)],
+        "examples": [],
+    }
+
+
+def merge_partials(total: Dict[str, Any], partial: Dict[str, Any], max_examples: int) -> None:
+    """Suma un acumulador parcial al total (in place)."""
+    for key, value in partial.items():
+        if key == "batch_us_per_row":
+            for acc, times in zip(total[key], value):
+                acc.extend(times)
+        elif key == "examples":
+            total[key].extend(value[: max_examples - len(total[key])])
+        elif key == "max_delta":
+            np.maximum(total[key], value, out=total[key])
+        else:
+            total[key] += value
+
+
+def process_chunk(
+    chunk: pd.DataFrame, classes: List[str], recorded: bool, max_examples: int = 0
+) -> Dict[str, Any]:
+    """
+    Puntúa un chunk con todos los modelos cargados en el worker.
+
+    Args:
+        chunk: Filas del tráfico (features y, opcionalmente, 'prediction')
+        classes: Unión de las clases de los modelos
+        recorded: Comparar también contra la columna 'prediction' del log
+        max_examples: Filas con desacuerdo a guardar como ejemplo
+
+    Returns:
+        Acumulador parcial del chunk
+    """
+    models = _worker_models
+    n_classes = len(classes)
+    partial = empty_partial(len(models), n_classes, recorded)
+
+    frame = chunk[FEATURE_COLUMNS].reset_index(drop=True)
+    # Filas iguales para el cleaner: se puntúan una vez (mismo fingerprint que la deduplicación)
+    _, first, inverse = np.unique(
+        row_fingerprints(frame)[0], return_index=True, return_inverse=True
+    )
+    unique = frame.iloc[first]
+    partial["n_rows"] = len(frame)
+    partial["n_unique"] = len(unique)
+
+    labels, probas = [], []
+    for m, (_, artifacts) in enumerate(models):
+        columns = [classes.index(str(c)) for c in artifacts["label_encoder"].classes_]
+        start = time.perf_counter()
+        proba_unique = artifacts["model"].predict_proba(unique)
+        elapsed = time.perf_counter() - start
+        partial["batch_seconds"][m] = elapsed
+        partial["batch_us_per_row"][m].append(elapsed / len(frame) * 1e6)
+
+        proba = np.zeros((len(frame), n_classes))
+        proba[:, columns] = proba_unique[inverse]
+        probas.append(proba)
+        labels.append(proba.argmax(axis=1))
+        partial["predicted"][m] = np.bincount(labels[m], minlength=n_classes)
+
+    reference = probas[0]
+    for m, proba in enumerate(probas):
+        np.add.at(partial["confusion"][m], (labels[0], labels[m]), 1)
+        delta = proba - reference
+        partial["delta_sum"][m] = delta.sum(axis=0)
+        partial["abs_delta_sum"][m] = np.abs(delta).sum(axis=0)
+        max_delta = np.abs(delta).max(axis=1)
+        bins = np.ceil(max_delta * DELTA_BINS).astype(np.int64)
+        partial["max_delta_hist"][m] = np.bincount(bins, minlength=DELTA_BINS + 1)
+        partial["max_delta"][m] = max_delta.max(initial=0.0)
+
+    valid = [np.ones(len(frame), dtype=bool)] * len(models)
+    if recorded:
+        # Clases desconocidas o predicciones ausentes en el log no se comparan
+        lookup = {name: k for k, name in enumerate(classes)}
+        grabbed = chunk["prediction"].map(lookup).to_numpy(dtype=np.float64)
+        labels.append(np.nan_to_num(grabbed, nan=-1).astype(np.int64))
+        valid.append(~np.isnan(grabbed))
+    for i in range(len(labels)):
+        for j in range(len(labels)):
+            both = valid[i] & valid[j]
+            partial["compared"][i, j] = both.sum()
+            partial["agree"][i, j] = (both & (labels[i] == labels[j])).sum()
+
+    if max_examples:
+        disagree = np.flatnonzero((np.stack(labels[: len(models)]) != labels[0]).any(axis=0))
+        for row in disagree[:max_examples]:
+            partial["examples"].append(
+                {
+                    "request": frame.iloc[row].to_dict(),
+                    "predictions": {
+                        name: classes[labels[m][row]] for m, (name, _) in enumerate(models)
+                    },
+                }
+            )
+    return partial
+
+
+def accumulate(
+    path: Path,
+    chunksize: int,
+    classes: List[str],
+    recorded: bool,
+    max_examples: int = 20,
+    executor: Optional[Executor] = None,
+    max_in_flight: int = 4,
+) -> Dict[str, Any]:
+    """
+    Recorre el tráfico por chunks y devuelve su acumulador total.
+
+    Con un executor, los chunks se procesan en paralelo manteniendo como
+    máximo `max_in_flight` chunks pendientes para acotar la memoria.
+    """
+    total = empty_partial(len(_worker_models), len(classes), recorded)
+
+    if executor is None:
+        for chunk in iter_chunks(path, chunksize):
+            merge_partials(total, process_chunk(chunk, classes, recorded, max_examples), max_examples)
+        return total
+
+    pending: List[Any] = []
+    for chunk in iter_chunks(path, chunksize):
+        pending.append(executor.submit(process_chunk, chunk, classes, recorded, max_examples))
+        if len(pending) >= max_in_flight:
+            merge_partials(total, pending.pop(0).result(), max_examples)
+    for future in pending:
+        merge_partials(total, future.result(), max_examples)
+
+    return total
+
+
+# =============================================================================
+# Latencia y reporte
+# =============================================================================
+
+
+def _distribution(values: Sequence[float]) -> Dict[str, float]:
+    """Media, percentiles y máximo de una muestra."""
+    values = np.asarray(values, dtype=np.float64)
+    summary = {"mean": round(float(values.mean()), 3)}
+    for q in PERCENTILES:
+        summary[f"p{q}"] = round(float(np.percentile(values, q)), 3)
+    summary["max"] = round(float(values.max()), 3)
+    return summary
+
+
+def _histogram_distribution(histogram: np.ndarray, maximum: float) -> Dict[str, float]:
+    """Percentiles (cota superior del bin) a partir de un histograma en [0, 1] y el máximo exacto."""
+    cumulative = np.cumsum(histogram)
+    summary = {}
+    for q in PERCENTILES:
+        index = int(np.searchsorted(cumulative, q / 100 * cumulative[-1]))
+        summary[f"p{q}"] = round(index / DELTA_BINS, 3)
+    summary["max"] = round(float(maximum), 6)
+    return summary
+
+
+def request_latency(models: Sequence[Any], sample: pd.DataFrame) -> Dict[str, Dict[str, float]]:
+    """
+    Latencia de una request individual por modelo, en milisegundos.
+
+    Cada fila de la muestra se predice sola (como `/predict`) con todos los
+    modelos, rotando el orden para no favorecer a ninguno con la cache.
+    """
+    rows = [sample.iloc[[i]] for i in range(len(sample))]
+    for _, artifacts in models:
+        artifacts["model"].predict_proba(rows[0])  # calentamiento
+
+    times: List[List[float]] = [[] for _ in models]
+    for i, row in enumerate(rows):
+        for k in range(len(models)):
+            m = (i + k) % len(models)
+            start = time.perf_counter()
+            models[m][1]["model"].predict_proba(row)
+            times[m].append((time.perf_counter() - start) * 1e3)
+    return {name: _distribution(t) for (name, _), t in zip(models, times)}
+
+
+def build_report(
+    names: List[str], classes: List[str], total: Dict[str, Any], recorded: bool
+) -> Dict[str, Any]:
+    """Reporte a partir del acumulador total."""
+    n_rows = max(total["n_rows"], 1)
+    labels = names + ([RECORDED] if recorded else [])
+    agreement = total["agree"] / np.maximum(total["compared"], 1)
+
+    models = {}
+    for m, name in enumerate(names):
+        models[name] = {
+            "prediction_counts": dict(zip(classes, total["predicted"][m].tolist())),
+            "agreement_with_reference": round(float(agreement[0, m]), 6),
+            "confusion_vs_reference": {
+                ref: dict(zip(classes, row)) for ref, row in zip(classes, total["confusion"][m].tolist())
+            },
+            "probability_delta": {
+                "mean_by_class": dict(zip(classes, (total["delta_sum"][m] / n_rows).round(6).tolist())),
+                "mean_abs_by_class": dict(
+                    zip(classes, (total["abs_delta_sum"][m] / n_rows).round(6).tolist())
+                ),
+                "max_abs_per_row": _histogram_distribution(
+                    total["max_delta_hist"][m], total["max_delta"][m]
+                ),
+            },
+            "batch": {
+                "seconds": round(float(total["batch_seconds"][m]), 3),
+                "rows_per_second": round(n_rows / max(total["batch_seconds"][m], 1e-9)),
+                "us_per_row_by_chunk": _distribution(total["batch_us_per_row"][m]),
+            },
+        }
+    if recorded:
+        models[RECORDED] = {"rows_compared": int(total["compared"][-1, -1])}
+
+    return {
+        "rows": int(total["n_rows"]),
+        "unique_rows_scored": int(total["n_unique"]),
+        "reference": names[0],
+        "classes": classes,
+        "agreement_matrix": {
+            a: {b: round(float(agreement[i, j]), 6) for j, b in enumerate(labels)}
+            for i, a in enumerate(labels)
+        },
+        "models": models,
+        "disagreement_examples": total["examples"],
+    }
+
+
+def replay(
+    traffic_path: Path,
+    model_paths: Sequence[Path],
+    chunksize: int = 20_000,
+    n_jobs: int = 1,
+    latency_samples: int = 200,
+    max_examples: int = 20,
+) -> Dict[str, Any]:
+    """
+    Reproduce el tráfico grabado contra los modelos y arma el reporte.
+
+    Args:
+        traffic_path: Log de predicciones o dataset crudo
+        model_paths: Artefactos a comparar; el primero es la referencia
+        chunksize: Filas por chunk
+        n_jobs: Procesos en paralelo (1 = todo en el proceso actual)
+        latency_samples: Requests individuales a medir por modelo (0 = no medir)
+        max_examples: Ejemplos de filas con desacuerdo a incluir
+
+    Returns:
+        Reporte del replay
+    """
+    start = time.perf_counter()
+    paths = [str(p) for p in model_paths]
+    _init_worker(paths)
+    names = [name for name, _ in _worker_models]
+    classes = class_union(_worker_models)
+
+    sample = next(iter_chunks(traffic_path, max(latency_samples, 1)))
+    recorded = "prediction" in sample.columns
+
+    executor = None
+    if n_jobs > 1:
+        executor = ProcessPoolExecutor(max_workers=n_jobs, initializer=_init_worker, initargs=(paths,))
+    try:
+        total = accumulate(
+            traffic_path, chunksize, classes, recorded, max_examples, executor, 2 * n_jobs
+        )
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    report = {
+        "traffic_path": str(traffic_path),
+        "model_paths": dict(zip(names, paths)),
+        **build_report(names, classes, total, recorded),
+    }
+    if latency_samples:
+        latency = request_latency(_worker_models, sample[FEATURE_COLUMNS].head(latency_samples))
+        for name in names:
+            report["models"][name]["request_latency_ms"] = latency[name]
+    report["seconds"] = round(time.perf_counter() - start, 2)
+    return report
+
+
+def _log_summary(report: Dict[str, Any]) -> None:
+    """Registra la comparación de los modelos contra la referencia."""
+    lines = [
+        f"{'modelo':<36} {'acuerdo':>8} {'|Δp| p99':>9} {'|Δp| max':>9} "
+        f"{'ms p50':>7} {'ms p99':>7} {'filas/s lote':>12}"
+    ]
+    for name, stats in report["models"].items():
+        if name == RECORDED:
+            continue
+        delta = stats["probability_delta"]["max_abs_per_row"]
+        latency = stats.get("request_latency_ms", {})
+        lines.append(
+            f"{name:<36} {stats['agreement_with_reference']:>8.4f} {delta['p99']:>9.3f} "
+            f"{delta['max']:>9.3f} {latency.get('p50', float('nan')):>7.2f} "
+            f"{latency.get('p99', float('nan')):>7.2f} {stats['batch']['rows_per_second']:>12,}"
+        )
+    if RECORDED in report["agreement_matrix"]:
+        row = report["agreement_matrix"][RECORDED]
+        lines.append("acuerdo con la predicción grabada: " + ", ".join(
+            f"{name} {row[name]:.4f}" for name in row if name != RECORDED
+        ))
+    logger.info("Replay:\n" + "\n".join(lines))
+
+
+@app.command()
+def main(
+    traffic_path: Path = typer.Argument(..., help="Log de predicciones (JSONL) o dataset crudo"),
+    model: List[Path] = typer.Option(
+        [DEFAULT_MODEL_PATH], "--model", help="Artefacto a comparar (repetible; el primero es la referencia)"
+    ),
+    report_path: Path = typer.Option(REPORTS_DIR / "replay" / "replay_report.json", help="Reporte JSON"),
+    chunksize: int = typer.Option(20_000, help="Filas por chunk"),
+    n_jobs: int = typer.Option(1, help="Procesos en paralelo"),
+    latency_samples: int = typer.Option(200, help="Requests individuales a medir por modelo"),
+    max_examples: int = typer.Option(20, help="Ejemplos de desacuerdo en el reporte"),
+):
+    """Compara modelos candidatos reproduciendo tráfico grabado por el camino por lotes."""
+    report = replay(traffic_path, model, chunksize, n_jobs, latency_samples, max_examples)
+    _log_summary(report)
+
+    report_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(report_path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, default=str)
+    logger.success(
+        f"Replay de {report['rows']} requests en {report['seconds']:.1f} s; reporte en: {report_path}"
+    )
+
+
+if __name__ == "__main__":
+    configure_logging()
+    app()
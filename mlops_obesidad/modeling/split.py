@@ -0,0 +1,55 @@
+"""
+Carga del dataset crudo y partición train/test del entrenamiento.
+
+Reproduce la preparación del notebook 6.0 con el que se entrenó el artefacto
+(`xgboost_model_artifacts.pkl`): eliminar duplicados del CSV crudo y partir
+80/20 estratificado con `random_state=42`. Las herramientas que evalúan o
+modifican el modelo usan esta misma partición para medir sobre el test real.
+"""
+
+from pathlib import Path
+from typing import Tuple
+
+import pandas as pd
+
+from mlops_obesidad.config import RAW_DATA_DIR, TARGET
+
+RAW_DATA_PATH = RAW_DATA_DIR / "obesity_estimation_original.csv"
+
+TEST_SIZE = 0.2
+RANDOM_STATE = 42
+
+
+def load_raw_dataset(path: Path = RAW_DATA_PATH) -> pd.DataFrame:
+    """
+    Carga el CSV crudo (separador autodetectado) sin duplicados.
+
+    Args:
+        path: Ruta al CSV crudo
+
+    Returns:
+        DataFrame con las 16 features en formato crudo y la columna objetivo
+    """
+    df = pd.read_csv(path, sep=None, engine="python", encoding="utf-8")
+    return df.drop_duplicates()
+
+
+def train_test_raw(
+    df: pd.DataFrame, test_size: float = TEST_SIZE, random_state: int = RANDOM_STATE
+) -> Tuple[pd.DataFrame, pd.DataFrame, pd.Series, pd.Series]:
+    """
+    Partición estratificada igual a la del entrenamiento.
+
+    Args:
+        df: Dataset crudo con la columna objetivo
+        test_size: Proporción de test
+        random_state: Semilla de la partición
+
+    Returns:
+        Tupla (X_train, X_test, y_train, y_test) con etiquetas en texto
+    """
+    from sklearn.model_selection import train_test_split
+
+    X = df.drop(columns=[TARGET])
+    y = df[TARGET]
+    return train_test_split(X, y, test_size=test_size, random_state=random_state, stratify=y)
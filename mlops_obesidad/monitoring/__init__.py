@@ -0,0 +1,30 @@
+"""Módulo de monitoreo del modelo en producción.
+
+Los nombres públicos se resuelven bajo demanda para que importar el paquete
+no cargue pandas ni las dependencias de los CLIs.
+"""
+
+import importlib
+from typing import Any
+
+_EXPORTS = {
+    "DriftMonitor": "mlops_obesidad.monitoring.drift",
+    "get_drift_monitor": "mlops_obesidad.monitoring.drift",
+    "init_drift_monitor": "mlops_obesidad.monitoring.drift",
+    "load_reference_profile": "mlops_obesidad.monitoring.drift",
+    "build_reference_profile": "mlops_obesidad.monitoring.reference",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str) -> Any:
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_EXPORTS[name]), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
@@ -0,0 +1,360 @@
+"""
+Monitor de data drift en línea sobre el tráfico de predicción.
+
+Mantiene sketches de memoria constante por feature (histogramas con bordes
+fijos para las variables numéricas y contadores para las categóricas) que se
+actualizan con cada request, y periódicamente compara la ventana actual contra
+un perfil de referencia construido con los datos de entrenamiento usando
+KS / chi-cuadrado y PSI, igual que el análisis offline del notebook 5.0.
+
+El perfil se construye con `mlops_obesidad.monitoring.reference`; este módulo
+solo contiene el camino en línea y no importa pandas.
+"""
+
+from bisect import bisect_right
+from datetime import datetime
+import json
+import math
+from pathlib import Path
+import threading
+from typing import Any, Dict, List, Optional
+
+from loguru import logger
+import numpy as np
+
+from mlops_obesidad.config import CATEGORICAL_FEATURES, MODELS_DIR, NUMERIC_FEATURES
+
+REFERENCE_PROFILE_PATH = MODELS_DIR / "reference_profile.json"
+
+# Suavizado para evitar log(0) en el cálculo de PSI
+_PSI_EPS = 1e-4
+
+
+# =============================================================================
+# Perfil de referencia
+# =============================================================================
+
+
+def load_reference_profile(
+    artifacts: Optional[Dict[str, Any]] = None, path: Optional[Path] = None
+) -> Optional[Dict[str, Any]]:
+    """
+    Obtiene el perfil de referencia distribuido con el modelo.
+
+    Primero busca la clave 'reference_profile' dentro de los artefactos del
+    modelo y, si no existe, el archivo JSON que acompaña al artefacto.
+
+    Args:
+        artifacts: Artefactos del modelo ya cargados (opcional)
+        path: Ruta al JSON del perfil. Si es None, usa el path por defecto.
+
+    Returns:
+        Perfil de referencia o None si no hay ninguno disponible
+    """
+    if artifacts is not None and artifacts.get("reference_profile") is not None:
+        return artifacts["reference_profile"]
+
+    if path is None:
+        path = REFERENCE_PROFILE_PATH
+
+    if not path.exists():
+        logger.warning(f"No se encontró perfil de referencia para drift: {path}")
+        return None
+
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+# =============================================================================
+# Sketches de memoria constante
+# =============================================================================
+
+
+class NumericSketch:
+    """Histograma con bordes fijos (los de la referencia) para una variable numérica."""
+
+    __slots__ = ("edges", "counts", "n")
+
+    def __init__(self, edges: List[float]):
+        self.edges = list(edges)
+        self.counts = [0] * (len(self.edges) + 1)
+        self.n = 0
+
+    def update(self, value: float) -> None:
+        """Registra un valor: una búsqueda binaria y dos incrementos."""
+        self.counts[bisect_right(self.edges, value)] += 1
+        self.n += 1
+
+    def quantile(self, q: float) -> Optional[float]:
+        """
+        Cuantil aproximado a partir del histograma.
+
+        La resolución está limitada por los bordes de la referencia; para los
+        bins abiertos de los extremos se devuelve el borde más cercano.
+        """
+        if self.n == 0:
+            return None
+        target = q * self.n
+        cumulative = 0
+        for i, count in enumerate(self.counts):
+            if count and cumulative + count >= target:
+                if i == 0:
+                    return self.edges[0]
+                if i == len(self.edges):
+                    return self.edges[-1]
+                frac = (target - cumulative) / count
+                return self.edges[i - 1] + frac * (self.edges[i] - self.edges[i - 1])
+            cumulative += count
+        return self.edges[-1]
+
+    def reset(self) -> None:
+        """Vacía el sketch conservando los bordes."""
+        self.counts = [0] * (len(self.edges) + 1)
+        self.n = 0
+
+
+class CategoricalSketch:
+    """Contador de frecuencias para una variable categórica."""
+
+    __slots__ = ("counts", "n")
+
+    def __init__(self):
+        self.counts: Dict[str, int] = {}
+        self.n = 0
+
+    def update(self, value: str) -> None:
+        """Registra una categoría."""
+        self.counts[value] = self.counts.get(value, 0) + 1
+        self.n += 1
+
+    def reset(self) -> None:
+        """Vacía el contador."""
+        self.counts = {}
+        self.n = 0
+
+
+# =============================================================================
+# Estadísticos de drift
+# =============================================================================
+
+
+def _psi(reference: np.ndarray, current: np.ndarray) -> float:
+    """Population Stability Index entre dos vectores de conteos alineados."""
+    ref = reference / max(reference.sum(), 1)
+    cur = current / max(current.sum(), 1)
+    ref = np.clip(ref, _PSI_EPS, None)
+    cur = np.clip(cur, _PSI_EPS, None)
+    return float(np.sum((cur - ref) * np.log(cur / ref)))
+
+
+def numeric_drift(ref_counts: List[int], cur_counts: List[int]) -> Dict[str, float]:
+    """
+    KS de dos muestras sobre los CDF discretizados y PSI.
+
+    Al trabajar con histogramas el estadístico D es una cota inferior del KS
+    exacto, por lo que el test resulta conservador.
+    """
+    from scipy.stats import kstwo
+
+    ref = np.asarray(ref_counts, dtype=float)
+    cur = np.asarray(cur_counts, dtype=float)
+    n_ref, n_cur = ref.sum(), cur.sum()
+
+    # Sin valores de un lado (p. ej. la columna falta en el dataset) no hay CDF que comparar
+    if n_ref == 0 or n_cur == 0:
+        return {"statistic": 0.0, "p_value": 1.0, "psi": _psi(ref, cur)}
+
+    d_stat = float(np.max(np.abs(np.cumsum(ref) / n_ref - np.cumsum(cur) / n_cur)))
+    n_eff = max(int(round(n_ref * n_cur / (n_ref + n_cur))), 1)
+    p_value = float(kstwo.sf(d_stat, n_eff))
+
+    return {"statistic": d_stat, "p_value": p_value, "psi": _psi(ref, cur)}
+
+
+def categorical_drift(
+    ref_counts: Dict[str, int], cur_counts: Dict[str, int]
+) -> Dict[str, float]:
+    """Chi-cuadrado sobre la tabla de contingencia referencia vs actual y PSI."""
+    from scipy.stats import chi2_contingency
+
+    categories = sorted(set(ref_counts) | set(cur_counts))
+    ref = np.array([ref_counts.get(c, 0) for c in categories], dtype=float)
+    cur = np.array([cur_counts.get(c, 0) for c in categories], dtype=float)
+
+    # chi2_contingency no admite filas en cero (p. ej. la columna falta en el dataset)
+    if len(categories) < 2 or ref.sum() == 0 or cur.sum() == 0:
+        return {"statistic": 0.0, "p_value": 1.0, "psi": _psi(ref, cur)}
+
+    chi2, p_value, _, _ = chi2_contingency(np.vstack([ref, cur]))
+    return {"statistic": float(chi2), "p_value": float(p_value), "psi": _psi(ref, cur)}
+
+
+# =============================================================================
+# Monitor en línea
+# =============================================================================
+
+
+class DriftMonitor:
+    """
+    Acumula el tráfico de predicción y calcula drift contra la referencia.
+
+    El costo por request es un puñado de actualizaciones de contadores; los
+    tests estadísticos solo se ejecutan en `compute()`, que se invoca de forma
+    periódica desde la API.
+    """
+
+    def __init__(
+        self,
+        reference: Dict[str, Any],
+        min_samples: int = 100,
+        alpha: float = 0.05,
+        psi_threshold: float = 0.2,
+    ):
+        self.reference = reference
+        self.min_samples = min_samples
+        self.alpha = alpha
+        self.psi_threshold = psi_threshold
+
+        self._numeric = {
+            col: NumericSketch(reference["numeric"][col]["edges"]) for col in NUMERIC_FEATURES
+        }
+        self._categorical = {col: CategoricalSketch() for col in CATEGORICAL_FEATURES}
+        self._lock = threading.Lock()
+        self._window_size = 0
+        self._total_observed = 0
+        self._last_report: Optional[Dict[str, Any]] = None
+
+    def observe(self, request: Any) -> None:
+        """
+        Registra un request (PredictionRequest u objeto con los mismos atributos).
+
+        Args:
+            request: Datos del individuo recibidos por la API
+        """
+        with self._lock:
+            for col, sketch in self._numeric.items():
+                sketch.update(getattr(request, col))
+            for col, sketch in self._categorical.items():
+                value = getattr(request, col)
+                sketch.update(getattr(value, "value", value))
+            self._window_size += 1
+            self._total_observed += 1
+
+    @property
+    def window_size(self) -> int:
+        """Número de requests acumulados en la ventana actual."""
+        return self._window_size
+
+    def compute(self, rotate: bool = True) -> Optional[Dict[str, Any]]:
+        """
+        Calcula los estadísticos de drift sobre la ventana actual.
+
+        Args:
+            rotate: Si es True, reinicia la ventana después de calcular
+
+        Returns:
+            Reporte de drift, o None si la ventana no alcanza `min_samples`
+        """
+        with self._lock:
+            if self._window_size < self.min_samples:
+                return None
+            window_size = self._window_size
+            numeric = {
+                col: (list(s.counts), s.quantile(0.05), s.quantile(0.5), s.quantile(0.95))
+                for col, s in self._numeric.items()
+            }
+            categorical = {col: dict(s.counts) for col, s in self._categorical.items()}
+            if rotate:
+                for sketch in self._numeric.values():
+                    sketch.reset()
+                for sketch in self._categorical.values():
+                    sketch.reset()
+                self._window_size = 0
+
+        # Los tests se calculan fuera del lock para no bloquear el camino de predicción
+        features: Dict[str, Dict[str, Any]] = {}
+        for col, (counts, p05, p50, p95) in numeric.items():
+            stats = numeric_drift(self.reference["numeric"][col]["counts"], counts)
+            stats.update({"type": "numeric", "test": "ks"})
+            stats["quantiles"] = {"p05": p05, "p50": p50, "p95": p95}
+            features[col] = stats
+        for col, counts in categorical.items():
+            stats = categorical_drift(self.reference["categorical"][col], counts)
+            stats.update({"type": "categorical", "test": "chi2"})
+            features[col] = stats
+
+        for stats in features.values():
+            stats["drift"] = bool(
+                stats["p_value"] < self.alpha or stats["psi"] > self.psi_threshold
+            )
+            for key in ("statistic", "p_value", "psi"):
+                if math.isnan(stats[key]):
+                    stats[key] = None
+
+        drifted = [col for col, stats in features.items() if stats["drift"]]
+        report = {
+            "computed_at": datetime.utcnow().isoformat() + "Z",
+            "window_size": window_size,
+            "reference_size": self.reference.get("n_rows"),
+            "alpha": self.alpha,
+            "psi_threshold": self.psi_threshold,
+            "drift_detected": bool(drifted),
+            "drifted_features": drifted,
+            "features": features,
+        }
+        self._last_report = report
+
+        if drifted:
+            logger.warning(f"Drift detectado en {len(drifted)} features: {drifted}")
+        else:
+            logger.info(f"Sin drift en ventana de {window_size} requests")
+
+        return report
+
+    def status(self) -> Dict[str, Any]:
+        """Estado actual del monitor con el último reporte calculado."""
+        return {
+            "enabled": True,
+            "window_size": self._window_size,
+            "total_observed": self._total_observed,
+            "min_samples": self.min_samples,
+            "last_report": self._last_report,
+        }
+
+
+# Instancia global del monitor (None si no hay perfil de referencia)
+_drift_monitor: Optional[DriftMonitor] = None
+
+
+def init_drift_monitor(
+    reference: Optional[Dict[str, Any]] = None, **kwargs: Any
+) -> Optional[DriftMonitor]:
+    """
+    Inicializa el monitor global de drift.
+
+    Args:
+        reference: Perfil de referencia. Si es None, se busca el que
+            acompaña al modelo (ver `load_reference_profile`).
+        **kwargs: Parámetros adicionales para `DriftMonitor`
+
+    Returns:
+        El monitor inicializado o None si no hay perfil disponible
+    """
+    global _drift_monitor
+
+    if reference is None:
+        reference = load_reference_profile()
+
+    if reference is None:
+        logger.warning("Monitor de drift deshabilitado: sin perfil de referencia")
+        _drift_monitor = None
+        return None
+
+    _drift_monitor = DriftMonitor(reference, **kwargs)
+    logger.info("Monitor de drift inicializado")
+    return _drift_monitor
+
+
+def get_drift_monitor() -> Optional[DriftMonitor]:
+    """Obtiene el monitor global de drift (None si no está inicializado)."""
+    return _drift_monitor
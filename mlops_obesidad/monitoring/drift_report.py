@@ -0,0 +1,538 @@
+"""
+Reporte batch de data drift entre un dataset de referencia y uno actual.
+
+Versión productiva del análisis del notebook 5.0 para datasets que no caben
+en memoria: ambos datasets se leen por chunks (CSV, Parquet o el log de
+predicciones en JSONL), los histogramas y tablas de contingencia se construyen
+de forma incremental en procesos paralelos, y los tests de todas las features
+también se reparten entre procesos. Opcionalmente se puntúan ambos datasets
+con el modelo para reportar los deltas de accuracy, F1 y ROC-AUC.
+"""
+
+from collections import Counter
+from concurrent.futures import Executor, ProcessPoolExecutor
+from datetime import datetime
+import html
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+from loguru import logger
+import numpy as np
+import pandas as pd
+import typer
+
+from mlops_obesidad.config import (
+    CATEGORICAL_FEATURES,
+    FEATURE_COLUMNS,
+    MODELS_DIR,
+    NUMERIC_FEATURES,
+    REPORTS_DIR,
+    TARGET,
+)
+from mlops_obesidad.monitoring.drift import categorical_drift, numeric_drift
+
+# Dominio de cada variable numérica (mismos límites que PredictionRequest);
+# los valores fuera de rango caen en los bins de desborde
+NUMERIC_DOMAINS = {
+    "Age": (0.0, 120.0),
+    "Height": (0.0, 3.0),
+    "Weight": (0.0, 300.0),
+    "FCVC": (1.0, 3.0),
+    "NCP": (1.0, 4.0),
+    "CH2O": (1.0, 3.0),
+    "FAF": (0.0, 3.0),
+    "TUE": (0.0, 2.0),
+}
+
+# Alias de nulos (mismos que DataCleanerTransformer)
+_NULL_ALIASES = {"", "na", "n/a", "nan"}
+
+# Resolución de los histogramas de probabilidad usados para el ROC-AUC en streaming
+AUC_BINS = 1000
+
+# Estado de cada proceso worker (modelo cargado una sola vez por proceso)
+_worker_model: Optional[Dict[str, Any]] = None
+
+app = typer.Typer()
+
+
+# =============================================================================
+# Lectura por chunks
+# =============================================================================
+
+
+def iter_chunks(path: Path, chunksize: int) -> Iterator[pd.DataFrame]:
+    """
+    Itera un dataset por chunks sin cargarlo completo en memoria.
+
+    Soporta CSV, Parquet y JSONL. En JSONL cada línea puede tener las features
+    en el primer nivel o anidadas bajo la clave 'request' (log de predicciones).
+
+    Args:
+        path: Ruta al dataset
+        chunksize: Número de filas por chunk
+
+    Yields:
+        DataFrames con a lo sumo `chunksize` filas
+
+    Raises:
+        ImportError: Si el archivo es Parquet y pyarrow no está instalado
+    """
+    suffix = path.suffix.lower()
+
+    if suffix == ".parquet":
+        try:
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise ImportError(f"Leer {path.name} requiere pyarrow: pip install pyarrow") from e
+
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunksize):
+            yield batch.to_pandas()
+    elif suffix in (".jsonl", ".json"):
+        for chunk in pd.read_json(path, lines=True, chunksize=chunksize):
+            if "request" in chunk.columns:
+                requests = pd.json_normalize(chunk["request"].tolist())
+                extra = chunk.drop(columns=["request"]).reset_index(drop=True)
+                chunk = pd.concat([requests, extra], axis=1)
+            yield chunk
+    else:
+        yield from pd.read_csv(path, chunksize=chunksize)
+
+
+# =============================================================================
+# Acumulación incremental
+# =============================================================================
+
+
+def numeric_edges(n_bins: int) -> Dict[str, np.ndarray]:
+    """Bordes uniformes sobre el dominio de cada variable numérica."""
+    return {
+        col: np.linspace(low, high, n_bins + 1) for col, (low, high) in NUMERIC_DOMAINS.items()
+    }
+
+
+def empty_partial(edges: Dict[str, np.ndarray], n_classes: int = 0) -> Dict[str, Any]:
+    """Acumulador vacío para un dataset."""
+    partial: Dict[str, Any] = {
+        "n_rows": 0,
+        "numeric": {col: np.zeros(len(e) + 1, dtype=np.int64) for col, e in edges.items()},
+        "categorical": {col: Counter() for col in CATEGORICAL_FEATURES},
+        "scored": 0,
+    }
+    if n_classes:
+        partial["confusion"] = np.zeros((n_classes, n_classes), dtype=np.int64)
+        partial["auc_pos"] = np.zeros((n_classes, AUC_BINS), dtype=np.int64)
+        partial["auc_neg"] = np.zeros((n_classes, AUC_BINS), dtype=np.int64)
+    return partial
+
+
+def merge_partials(left: Dict[str, Any], right: Dict[str, Any]) -> Dict[str, Any]:
+    """Combina dos acumuladores (la operación es asociativa)."""
+    left["n_rows"] += right["n_rows"]
+    left["scored"] += right["scored"]
+    for col, counts in right["numeric"].items():
+        left["numeric"][col] += counts
+    for col, counts in right["categorical"].items():
+        left["categorical"][col].update(counts)
+    for key in ("confusion", "auc_pos", "auc_neg"):
+        if key in right:
+            left[key] += right[key]
+    return left
+
+
+def _init_worker(model_path: Optional[str]) -> None:
+    """Inicializador de cada proceso: carga el modelo una sola vez."""
+    global _worker_model
+
+    if model_path is not None:
+        from mlops_obesidad.inference.model_loader import load_model
+
+        _worker_model = load_model(Path(model_path))
+
+
+def _score_chunk(chunk: pd.DataFrame, partial: Dict[str, Any]) -> None:
+    """Puntúa las filas etiquetadas del chunk y actualiza matriz de confusión y AUC."""
+    if _worker_model is None or TARGET not in chunk.columns:
+        return
+
+    labeled = chunk[chunk[TARGET].notna()]
+    if labeled.empty:
+        return
+
+    label_encoder = _worker_model["label_encoder"]
+    known = labeled[TARGET].astype(str).str.strip().isin(label_encoder.classes_)
+    labeled = labeled[known.to_numpy()]
+    if labeled.empty:
+        return
+
+    y_true = label_encoder.transform(labeled[TARGET].astype(str).str.strip())
+    proba = _worker_model["model"].predict_proba(labeled[FEATURE_COLUMNS])
+    y_pred = proba.argmax(axis=1)
+
+    n_classes = proba.shape[1]
+    np.add.at(partial["confusion"], (y_true, y_pred), 1)
+    bins = np.minimum((proba * AUC_BINS).astype(np.int64), AUC_BINS - 1)
+    for k in range(n_classes):
+        is_pos = y_true == k
+        partial["auc_pos"][k] += np.bincount(bins[is_pos, k], minlength=AUC_BINS)
+        partial["auc_neg"][k] += np.bincount(bins[~is_pos, k], minlength=AUC_BINS)
+    partial["scored"] += len(labeled)
+
+
+def process_chunk(
+    chunk: pd.DataFrame, edges: Dict[str, np.ndarray], n_classes: int
+) -> Dict[str, Any]:
+    """
+    Construye el acumulador parcial de un chunk.
+
+    Args:
+        chunk: Filas del dataset
+        edges: Bordes de los histogramas numéricos
+        n_classes: Número de clases del modelo (0 si no se puntúa)
+
+    Returns:
+        Acumulador parcial del chunk
+    """
+    partial = empty_partial(edges, n_classes)
+    partial["n_rows"] = len(chunk)
+
+    for col, col_edges in edges.items():
+        if col not in chunk.columns:
+            continue
+        values = pd.to_numeric(chunk[col], errors="coerce").dropna().to_numpy(dtype=float)
+        idx = np.searchsorted(col_edges, values, side="right")
+        partial["numeric"][col] += np.bincount(idx, minlength=len(col_edges) + 1)
+
+    for col in CATEGORICAL_FEATURES:
+        if col not in chunk.columns:
+            continue
+        values = chunk[col].dropna().astype(str).str.strip()
+        values = values[~values.str.lower().isin(_NULL_ALIASES)]
+        partial["categorical"][col].update(values.value_counts().to_dict())
+
+    if n_classes:
+        _score_chunk(chunk, partial)
+
+    return partial
+
+
+def accumulate(
+    path: Path,
+    edges: Dict[str, np.ndarray],
+    n_classes: int,
+    chunksize: int,
+    executor: Optional[Executor] = None,
+    max_in_flight: int = 4,
+) -> Dict[str, Any]:
+    """
+    Recorre un dataset por chunks y devuelve su acumulador total.
+
+    Con un executor, los chunks se procesan en paralelo manteniendo como
+    máximo `max_in_flight` chunks pendientes para acotar la memoria.
+    """
+    total = empty_partial(edges, n_classes)
+
+    if executor is None:
+        for chunk in iter_chunks(path, chunksize):
+            merge_partials(total, process_chunk(chunk, edges, n_classes))
+        return total
+
+    pending: List[Any] = []
+    for chunk in iter_chunks(path, chunksize):
+        pending.append(executor.submit(process_chunk, chunk, edges, n_classes))
+        if len(pending) >= max_in_flight:
+            merge_partials(total, pending.pop(0).result())
+    for future in pending:
+        merge_partials(total, future.result())
+
+    return total
+
+
+# =============================================================================
+# Tests y métricas
+# =============================================================================
+
+
+def feature_test(
+    feature: str, reference: Dict[str, Any], current: Dict[str, Any]
+) -> Dict[str, Any]:
+    """Test de drift de una feature a partir de los acumuladores."""
+    if feature in NUMERIC_FEATURES:
+        stats = numeric_drift(reference["numeric"][feature], current["numeric"][feature])
+        stats.update({"type": "numeric", "test": "ks"})
+    else:
+        stats = categorical_drift(
+            dict(reference["categorical"][feature]), dict(current["categorical"][feature])
+        )
+        stats.update({"type": "categorical", "test": "chi2"})
+    return stats
+
+
+def _binned_auc(pos: np.ndarray, neg: np.ndarray) -> Optional[float]:
+    """ROC-AUC a partir de histogramas de score de positivos y negativos."""
+    n_pos, n_neg = pos.sum(), neg.sum()
+    if n_pos == 0 or n_neg == 0:
+        return None
+    neg_below = np.cumsum(neg) - neg
+    return float(np.sum(pos * (neg_below + 0.5 * neg)) / (n_pos * n_neg))
+
+
+def performance_metrics(partial: Dict[str, Any]) -> Optional[Dict[str, float]]:
+    """
+    Accuracy, F1 macro y ROC-AUC macro (one-vs-rest) desde el acumulador.
+
+    Returns:
+        Métricas o None si el dataset no tenía filas etiquetadas
+    """
+    if not partial.get("scored"):
+        return None
+
+    confusion = partial["confusion"].astype(float)
+    tp = np.diag(confusion)
+    predicted, actual = confusion.sum(axis=0), confusion.sum(axis=1)
+    precision = np.divide(tp, predicted, out=np.zeros_like(tp), where=predicted > 0)
+    recall = np.divide(tp, actual, out=np.zeros_like(tp), where=actual > 0)
+    f1 = np.divide(
+        2 * precision * recall,
+        precision + recall,
+        out=np.zeros_like(tp),
+        where=(precision + recall) > 0,
+    )
+    present = actual > 0
+
+    aucs = [
+        _binned_auc(partial["auc_pos"][k], partial["auc_neg"][k])
+        for k in range(confusion.shape[0])
+    ]
+    aucs = [a for a in aucs if a is not None]
+
+    return {
+        "n_scored": int(partial["scored"]),
+        "accuracy": float(tp.sum() / confusion.sum()),
+        "f1_macro": float(f1[present].mean()),
+        "roc_auc_ovr": float(np.mean(aucs)) if aucs else None,
+    }
+
+
+# =============================================================================
+# Reporte
+# =============================================================================
+
+
+def build_report(
+    reference: Dict[str, Any],
+    current: Dict[str, Any],
+    tests: Dict[str, Dict[str, Any]],
+    alpha: float,
+    psi_threshold: float,
+) -> Dict[str, Any]:
+    """Arma el reporte final a partir de acumuladores y resultados de los tests."""
+    for stats in tests.values():
+        stats["drift"] = bool(stats["p_value"] < alpha or stats["psi"] > psi_threshold)
+
+    ref_metrics = performance_metrics(reference)
+    cur_metrics = performance_metrics(current)
+    deltas = None
+    if ref_metrics and cur_metrics:
+        deltas = {
+            key: (
+                cur_metrics[key] - ref_metrics[key]
+                if ref_metrics[key] is not None and cur_metrics[key] is not None
+                else None
+            )
+            for key in ("accuracy", "f1_macro", "roc_auc_ovr")
+        }
+
+    drifted = [col for col, stats in tests.items() if stats["drift"]]
+    return {
+        "generated_at": datetime.utcnow().isoformat() + "Z",
+        "reference_rows": int(reference["n_rows"]),
+        "current_rows": int(current["n_rows"]),
+        "alpha": alpha,
+        "psi_threshold": psi_threshold,
+        "drift_detected": bool(drifted),
+        "drifted_features": drifted,
+        "features": tests,
+        "performance": {"reference": ref_metrics, "current": cur_metrics, "delta": deltas},
+    }
+
+
+def json_safe(value: Any) -> Any:
+    """Reemplaza recursivamente NaN e infinitos por None (JSON estricto)."""
+    if isinstance(value, dict):
+        return {key: json_safe(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [json_safe(item) for item in value]
+    if isinstance(value, float) and not np.isfinite(value):
+        return None
+    return value
+
+
+def render_html(report: Dict[str, Any]) -> str:
+    """Renderiza el reporte como una página HTML autocontenida."""
+
+    def fmt(value: Any) -> str:
+        if value is None:
+            return "-"
+        if isinstance(value, float):
+            return f"{value:.4f}"
+        return html.escape(str(value))
+
+    rows = "".join(
+        f"<tr class=\"{'drift' if s['drift'] else ''}\"><td>{html.escape(col)}</td>"
+        f"<td>{s['type']}</td><td>{s['test']}</td><td>{fmt(s['statistic'])}</td>"
+        f"<td>{fmt(s['p_value'])}</td><td>{fmt(s['psi'])}</td>"
+        f"<td>{'sí' if s['drift'] else 'no'}</td></tr>"
+        for col, s in report["features"].items()
+    )
+
+    perf = report["performance"]
+    perf_rows = ""
+    if perf["reference"] or perf["current"]:
+        for key in ("accuracy", "f1_macro", "roc_auc_ovr"):
+            ref = perf["reference"][key] if perf["reference"] else None
+            cur = perf["current"][key] if perf["current"] else None
+            delta = perf["delta"][key] if perf["delta"] else None
+            perf_rows += (
+                f"<tr><td>{key}</td><td>{fmt(ref)}</td><td>{fmt(cur)}</td>"
+                f"<td>{fmt(delta)}</td></tr>"
+            )
+
+    perf_table = (
+        "<h2>Desempeño del modelo</h2><table><tr><th>Métrica</th><th>Referencia</th>"
+        f"<th>Actual</th><th>Delta</th></tr>{perf_rows}</table>"
+        if perf_rows
+        else ""
+    )
+
+    return f"""<!DOCTYPE html>
+<html lang="es">
+<head>
+<meta charset="utf-8">
+<title>Reporte de Data Drift</title>
+<style>
+body {{ font-family: sans-serif; margin: 2em; }}
+table {{ border-collapse: collapse; margin-bottom: 2em; }}
+th, td {{ border: 1px solid #ccc; padding: 4px 10px; text-align: right; }}
+th {{ background: #eee; }}
+td:first-child {{ text-align: left; }}
+tr.drift {{ background: #fdd; }}
+</style>
+</head>
+<body>
+<h1>Reporte de Data Drift</h1>
+<p>Generado: {report['generated_at']}<br>
+Filas referencia: {report['reference_rows']} &middot; Filas actuales: {report['current_rows']}<br>
+Alpha: {report['alpha']} &middot; Umbral PSI: {report['psi_threshold']}<br>
+Features con drift: {len(report['drifted_features'])} / {len(report['features'])}</p>
+<h2>Drift por feature</h2>
+<table>
+<tr><th>Feature</th><th>Tipo</th><th>Test</th><th>Estadístico</th><th>p-value</th><th>PSI</th><th>Drift</th></tr>
+{rows}
+</table>
+{perf_table}
+</body>
+</html>
+"""
+
+
+def run_drift_report(
+    reference_path: Path,
+    current_path: Path,
+    chunksize: int = 50_000,
+    n_jobs: int = 1,
+    n_bins: int = 100,
+    model_path: Optional[Path] = None,
+    alpha: float = 0.05,
+    psi_threshold: float = 0.2,
+) -> Dict[str, Any]:
+    """
+    Calcula el reporte de drift completo.
+
+    Args:
+        reference_path: Dataset de referencia (normalmente el de entrenamiento)
+        current_path: Dataset actual (datos nuevos o log de predicciones)
+        chunksize: Filas por chunk
+        n_jobs: Procesos en paralelo (1 = todo en el proceso actual)
+        n_bins: Bins de los histogramas numéricos
+        model_path: Artefacto del modelo para puntuar; None para omitir métricas
+        alpha: Nivel de significancia de los tests
+        psi_threshold: Umbral de PSI para marcar drift
+
+    Returns:
+        Reporte serializable a JSON
+    """
+    edges = numeric_edges(n_bins)
+    n_classes = 0
+    if model_path is not None:
+        _init_worker(str(model_path))
+        n_classes = len(_worker_model["label_encoder"].classes_)
+
+    features = NUMERIC_FEATURES + CATEGORICAL_FEATURES
+
+    if n_jobs <= 1:
+        reference = accumulate(reference_path, edges, n_classes, chunksize)
+        current = accumulate(current_path, edges, n_classes, chunksize)
+        tests = {f: feature_test(f, reference, current) for f in features}
+    else:
+        initargs = (str(model_path) if model_path is not None else None,)
+        with ProcessPoolExecutor(
+            max_workers=n_jobs, initializer=_init_worker, initargs=initargs
+        ) as executor:
+            in_flight = 2 * n_jobs
+            reference = accumulate(
+                reference_path, edges, n_classes, chunksize, executor, in_flight
+            )
+            current = accumulate(current_path, edges, n_classes, chunksize, executor, in_flight)
+            futures = {f: executor.submit(feature_test, f, reference, current) for f in features}
+            tests = {f: future.result() for f, future in futures.items()}
+
+    return build_report(reference, current, tests, alpha, psi_threshold)
+
+
+@app.command()
+def main(
+    reference_path: Path = typer.Argument(..., help="Dataset de referencia (CSV/Parquet/JSONL)"),
+    current_path: Path = typer.Argument(..., help="Dataset actual (CSV/Parquet/JSONL)"),
+    output_dir: Path = REPORTS_DIR / "drift",
+    chunksize: int = 50_000,
+    n_jobs: int = typer.Option(os.cpu_count() or 1, help="Procesos en paralelo"),
+    n_bins: int = 100,
+    model_path: Path = MODELS_DIR / "xgboost_model_artifacts.pkl",
+    score: bool = typer.Option(True, help="Puntuar ambos datasets con el modelo"),
+    alpha: float = 0.05,
+    psi_threshold: float = 0.2,
+):
+    """Genera el reporte de drift (JSON + HTML) entre dos datasets."""
+    logger.info(f"Referencia: {reference_path}")
+    logger.info(f"Actual: {current_path}")
+
+    report = run_drift_report(
+        reference_path,
+        current_path,
+        chunksize=chunksize,
+        n_jobs=n_jobs,
+        n_bins=n_bins,
+        model_path=model_path if score else None,
+        alpha=alpha,
+        psi_threshold=psi_threshold,
+    )
+
+    output_dir.mkdir(parents=True, exist_ok=True)
+    json_path = output_dir / "drift_report.json"
+    html_path = output_dir / "drift_report.html"
+    with open(json_path, "w", encoding="utf-8") as f:
+        json.dump(json_safe(report), f, indent=2, allow_nan=False)
+    with open(html_path, "w", encoding="utf-8") as f:
+        f.write(render_html(report))
+
+    logger.success(
+        f"Reporte generado: {json_path} y {html_path} "
+        f"({len(report['drifted_features'])} features con drift)"
+    )
+
+
+if __name__ == "__main__":
+    app()
@@ -0,0 +1,135 @@
+"""
+Uso de memoria del proceso.
+
+Lecturas baratas de /proc (RSS, pico de RSS y PSS), del heap de Python
+(tracemalloc, solo si el proceso se inició con PYTHONTRACEMALLOC o
+`tracemalloc.start()`) y de las caches de inferencia. Lo usan el endpoint
+`/admin/memory` de la API y la auditoría de memoria del artefacto
+(`mlops_obesidad.modeling.memory_audit`).
+"""
+
+import gc
+import sys
+import tracemalloc
+from typing import Any, Dict, Optional
+
+# Campos de /proc/<pid>/status y /proc/<pid>/smaps_rollup que se reportan (en kB)
+_STATUS_FIELDS = {"VmRSS": "rss_kb", "VmHWM": "peak_rss_kb"}
+_SMAPS_FIELDS = {
+    "Pss": "pss_kb",
+    "Shared_Clean": "shared_clean_kb",
+    "Private_Clean": "private_clean_kb",
+    "Private_Dirty": "private_dirty_kb",
+}
+
+
+def _read_kb_fields(path: str, fields: Dict[str, str]) -> Dict[str, int]:
+    """Lee campos 'Nombre:   1234 kB' de un archivo de /proc."""
+    values = {}
+    try:
+        with open(path) as f:
+            for line in f:
+                key, _, rest = line.partition(":")
+                if key in fields:
+                    values[fields[key]] = int(rest.split()[0])
+    except OSError:
+        pass
+    return values
+
+
+def rss_kb() -> int:
+    """RSS actual del proceso en kB (0 si /proc no está disponible)."""
+    return _read_kb_fields("/proc/self/status", {"VmRSS": "rss_kb"}).get("rss_kb", 0)
+
+
+def process_memory(detailed: bool = False) -> Dict[str, int]:
+    """
+    Memoria residente del proceso actual.
+
+    Args:
+        detailed: Si es True también lee /proc/self/smaps_rollup (PSS y páginas
+            compartidas/privadas); es más lento porque el kernel recorre todos
+            los mapeos del proceso.
+
+    Returns:
+        Diccionario con rss_kb y peak_rss_kb (y los campos de smaps si se
+        pidieron). Fuera de Linux se usa el pico de getrusage.
+    """
+    values = _read_kb_fields("/proc/self/status", _STATUS_FIELDS)
+    if not values:
+        import resource
+
+        maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # macOS reporta bytes y Linux kB
+        values = {"peak_rss_kb": maxrss // 1024 if sys.platform == "darwin" else maxrss}
+    if detailed:
+        values.update(_read_kb_fields("/proc/self/smaps_rollup", _SMAPS_FIELDS))
+    return values
+
+
+def heap_stats(top: int = 10) -> Dict[str, Any]:
+    """
+    Memoria del heap de Python según tracemalloc.
+
+    Args:
+        top: Número de archivos con más memoria asignada a reportar (0 para
+            no tomar snapshot, que recorre todas las asignaciones trazadas)
+
+    Returns:
+        Diccionario con 'tracing' y, si tracemalloc está activo, la memoria
+        actual y pico trazada y las asignaciones por archivo
+    """
+    stats: Dict[str, Any] = {
+        "tracing": tracemalloc.is_tracing(),
+        "gc_counts": list(gc.get_count()),
+        "gc_frozen_objects": gc.get_freeze_count(),
+    }
+    if not stats["tracing"]:
+        return stats
+
+    current, peak = tracemalloc.get_traced_memory()
+    stats["traced_kb"] = current // 1024
+    stats["traced_peak_kb"] = peak // 1024
+    if top > 0:
+        snapshot = tracemalloc.take_snapshot()
+        stats["top_files"] = [
+            {
+                "file": str(stat.traceback[0].filename),
+                "size_kb": stat.size // 1024,
+                "count": stat.count,
+            }
+            for stat in snapshot.statistics("filename")[:top]
+        ]
+    return stats
+
+
+def memory_report(top: int = 10, detailed: bool = True) -> Dict[str, Any]:
+    """
+    Reporte de memoria del proceso: RSS/PSS, heap de Python y caches de inferencia.
+
+    Args:
+        top: Archivos a listar en el detalle de tracemalloc
+        detailed: Incluir PSS y páginas compartidas (smaps_rollup)
+
+    Returns:
+        Diccionario serializable a JSON
+    """
+    report: Dict[str, Any] = {
+        "process": process_memory(detailed=detailed),
+        "heap": heap_stats(top=top),
+    }
+
+    # Solo se consultan las caches si la inferencia ya se importó: el reporte
+    # no debe cargar pandas/XGBoost por sí mismo
+    cache_module = sys.modules.get("mlops_obesidad.inference.cache")
+    if cache_module is not None:
+        report["caches"] = cache_module.cache_stats(include_bytes=True)
+
+    model_loader = sys.modules.get("mlops_obesidad.inference.model_loader")
+    artifacts: Optional[Dict[str, Any]] = getattr(model_loader, "_model_artifacts", None)
+    report["model"] = {
+        "loaded": artifacts is not None,
+        "slim": artifacts is not None and "slim" in artifacts,
+    }
+
+    return report
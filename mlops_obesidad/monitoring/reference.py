@@ -0,0 +1,103 @@
+"""
+Construcción del perfil de referencia para el monitor de drift.
+
+El perfil resume los datos de entrenamiento (bordes de cuantiles y conteos
+por feature) y se distribuye junto al artefacto del modelo.
+"""
+
+from datetime import datetime
+import json
+from pathlib import Path
+import pickle
+from typing import Any, Dict
+
+from loguru import logger
+import numpy as np
+import pandas as pd
+import typer
+
+from mlops_obesidad.config import (
+    CATEGORICAL_FEATURES,
+    INTERIM_DATA_DIR,
+    MODELS_DIR,
+    NUMERIC_FEATURES,
+    configure_logging,
+)
+from mlops_obesidad.monitoring.drift import REFERENCE_PROFILE_PATH
+
+app = typer.Typer()
+
+
+def build_reference_profile(df: pd.DataFrame, n_bins: int = 20) -> Dict[str, Any]:
+    """
+    Construye el perfil de referencia a partir de los datos de entrenamiento.
+
+    Las variables numéricas se discretizan con bordes en los cuantiles de la
+    referencia (bins equiprobables), de modo que el histograma de la ventana
+    actual funciona como un sketch de cuantiles comparable bin a bin.
+
+    Args:
+        df: DataFrame con las 16 features en formato crudo
+        n_bins: Número máximo de bins por variable numérica
+
+    Returns:
+        Diccionario serializable a JSON con bordes y conteos por feature
+    """
+    profile: Dict[str, Any] = {
+        "n_rows": int(len(df)),
+        "created_at": datetime.utcnow().isoformat() + "Z",
+        "numeric": {},
+        "categorical": {},
+    }
+
+    quantiles = np.linspace(0.0, 1.0, n_bins + 1)[1:-1]
+    for col in NUMERIC_FEATURES:
+        values = pd.to_numeric(df[col], errors="coerce").dropna().to_numpy(dtype=float)
+        edges = np.unique(np.quantile(values, quantiles))
+        # side="right" reproduce bisect_right usado en el camino en línea
+        idx = np.searchsorted(edges, values, side="right")
+        counts = np.bincount(idx, minlength=len(edges) + 1)
+        profile["numeric"][col] = {
+            "edges": [float(e) for e in edges],
+            "counts": [int(c) for c in counts],
+        }
+
+    for col in CATEGORICAL_FEATURES:
+        values = df[col].dropna().astype(str).str.strip()
+        profile["categorical"][col] = {
+            str(k): int(v) for k, v in values.value_counts().sort_index().items()
+        }
+
+    return profile
+
+
+@app.command()
+def build_reference(
+    data_path: Path = INTERIM_DATA_DIR / "obesity_clean_raw.csv",
+    output_path: Path = REFERENCE_PROFILE_PATH,
+    n_bins: int = 20,
+    embed: bool = typer.Option(False, help="Guardar el perfil también dentro del .pkl"),
+    model_path: Path = MODELS_DIR / "xgboost_model_artifacts.pkl",
+):
+    """Construye el perfil de referencia de drift a partir de los datos de entrenamiento."""
+    logger.info(f"Construyendo perfil de referencia desde: {data_path}")
+    df = pd.read_csv(data_path)
+    profile = build_reference_profile(df, n_bins=n_bins)
+
+    with open(output_path, "w", encoding="utf-8") as f:
+        json.dump(profile, f, indent=2)
+    logger.success(f"Perfil de referencia guardado en: {output_path}")
+
+    if embed:
+        from mlops_obesidad.inference.model_loader import load_model
+
+        artifacts = dict(load_model(model_path))
+        artifacts["reference_profile"] = profile
+        with open(model_path, "wb") as f:
+            pickle.dump(artifacts, f)
+        logger.success(f"Perfil de referencia incluido en el artefacto: {model_path}")
+
+
+if __name__ == "__main__":
+    configure_logging()
+    app()
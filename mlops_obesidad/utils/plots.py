@@ -1,29 +1,752 @@
+"""
+Figuras estándar de los reportes a partir de agregados.
+
+Reemplaza las figuras de los notebooks, que dibujan cada punto crudo, por un
+flujo en dos etapas cuyo costo de dibujo no depende del tamaño de los datos:
+
+1. El dataset (CSV/Parquet/JSONL) o el log de predicciones se recorre por
+   chunks, en procesos paralelos, y cada chunk se reduce a conteos con bordes
+   fijos: clases, histogramas por clase, una grilla 2D Height × Weight (en
+   lugar de un scatter), matriz de confusión, bins de confianza y los
+   histogramas para comparar contra la referencia.
+2. Cada figura se dibuja en un proceso distinto con el backend Agg, recibiendo
+   solo los agregados (unos pocos KB), nunca las filas.
+
+Las predicciones se toman de las columnas 'prediction' / 'probabilities' del
+log cuando existen, o se calculan con el modelo si se indica `model_path`.
+"""
+
+from collections import Counter
+from concurrent.futures import Executor, ProcessPoolExecutor
+import json
+import os
 from pathlib import Path
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 from loguru import logger
-from tqdm import tqdm
-import typer
+import matplotlib
+
+matplotlib.use("Agg")
+
+from matplotlib.colors import LogNorm  # noqa: E402
+import matplotlib.pyplot as plt  # noqa: E402
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+import typer  # noqa: E402
+
+from mlops_obesidad.config import (  # noqa: E402
+    CATEGORICAL_FEATURES,
+    FEATURE_COLUMNS,
+    FIGURES_DIR,
+    NUMERIC_FEATURES,
+    TARGET,
+    configure_logging,
+)
+from mlops_obesidad.monitoring.drift_report import (  # noqa: E402
+    NUMERIC_DOMAINS,
+    iter_chunks,
+)
+
+# Grilla de la densidad Height × Weight (rango visible de la población)
+DENSITY_GRID = {"Height": (1.40, 2.00), "Weight": (30.0, 180.0)}
 
-from mlops_obesidad.config import FIGURES_DIR, PROCESSED_DATA_DIR
+# Bins de confianza del diagrama de calibración
+CALIBRATION_BINS = 10
+
+# Grupo de las filas sin etiqueta ni predicción
+UNLABELED = "Sin etiqueta"
+
+# Alias de nulos (mismos que DataCleanerTransformer)
+_NULL_ALIASES = {"", "na", "n/a", "nan"}
+
+# Estado de cada proceso worker (modelo cargado una sola vez por proceso)
+_worker_model: Optional[Dict[str, Any]] = None
 
 app = typer.Typer()
 
 
+# =============================================================================
+# Bordes de los agregados
+# =============================================================================
+
+
+def build_edges(n_bins: int, profile: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Bordes fijos de todos los histogramas.
+
+    Args:
+        n_bins: Bins de los histogramas por clase y de la grilla 2D
+        profile: Perfil de referencia; si se indica, los histogramas de drift
+            usan sus bordes para poder compararse con sus conteos
+
+    Returns:
+        Diccionario con los bordes 'class' (uniformes sobre el dominio),
+        'drift' (bordes internos, como en el perfil) y 'grid' (Height, Weight)
+    """
+    class_edges = {
+        col: np.linspace(low, high, n_bins + 1) for col, (low, high) in NUMERIC_DOMAINS.items()
+    }
+    if profile is not None:
+        drift_edges = {
+            col: np.asarray(profile["numeric"][col]["edges"], dtype=float)
+            for col in NUMERIC_FEATURES
+        }
+    else:
+        drift_edges = {col: edges[1:-1] for col, edges in class_edges.items()}
+    grid_edges = tuple(np.linspace(low, high, n_bins + 1) for low, high in DENSITY_GRID.values())
+    return {"class": class_edges, "drift": drift_edges, "grid": grid_edges}
+
+
+# =============================================================================
+# Agregación por chunks
+# =============================================================================
+
+
+def empty_partial() -> Dict[str, Any]:
+    """Acumulador vacío; las clases se agregan a medida que aparecen."""
+    return {
+        "n_rows": 0,
+        "labels": Counter(),
+        "predicted": Counter(),
+        "class_hist": {},
+        "grid": {},
+        "drift": {},
+        "categorical": {col: Counter() for col in CATEGORICAL_FEATURES},
+        "confusion": Counter(),
+        "calibration": {
+            "count": np.zeros(CALIBRATION_BINS, dtype=np.int64),
+            "correct": np.zeros(CALIBRATION_BINS, dtype=np.int64),
+            "confidence": np.zeros(CALIBRATION_BINS),
+        },
+    }
+
+
+def _add_arrays(left: Dict[Any, np.ndarray], right: Dict[Any, np.ndarray]) -> None:
+    """Suma in-place diccionarios de arrays con claves posiblemente distintas."""
+    for key, value in right.items():
+        if key in left:
+            left[key] += value
+        else:
+            left[key] = value.copy()
+
+
+def merge_partials(left: Dict[str, Any], right: Dict[str, Any]) -> Dict[str, Any]:
+    """Combina dos acumuladores (la operación es asociativa)."""
+    left["n_rows"] += right["n_rows"]
+    for key in ("labels", "predicted", "confusion"):
+        left[key].update(right[key])
+    for key in ("class_hist", "grid", "drift"):
+        _add_arrays(left[key], right[key])
+    for col, counts in right["categorical"].items():
+        left["categorical"][col].update(counts)
+    for key, values in right["calibration"].items():
+        left["calibration"][key] += values
+    return left
+
+
+def _init_worker(model_path: Optional[str]) -> None:
+    """Inicializador de cada proceso: carga el modelo una sola vez."""
+    global _worker_model
+
+    if model_path is not None:
+        from mlops_obesidad.inference.model_loader import load_model
+
+        _worker_model = load_model(Path(model_path))
+
+
+def _clean_value(value: Any) -> Any:
+    """Recorta espacios y convierte los alias de nulo a None."""
+    if not isinstance(value, str):
+        return value
+    value = value.strip()
+    return None if value.lower() in _NULL_ALIASES else value
+
+
+def _clean_labels(values: pd.Series) -> pd.Series:
+    """Normaliza etiquetas de clase limpiando solo los valores distintos."""
+    codes, uniques = pd.factorize(values)
+    cleaned = np.array([_clean_value(v) for v in uniques] + [None], dtype=object)
+    return pd.Series(cleaned[codes], index=values.index)
+
+
+def _clean_counts(values: pd.Series) -> Counter:
+    """Frecuencias de una columna categórica, limpiando solo los valores distintos."""
+    counts: Counter = Counter()
+    for value, count in values.value_counts().items():
+        value = _clean_value(value)
+        if value is not None:
+            counts[str(value)] += int(count)
+    return counts
+
+
+def _predictions(chunk: pd.DataFrame) -> Tuple[Optional[pd.Series], Optional[pd.DataFrame]]:
+    """
+    Predicción y probabilidades de cada fila del chunk.
+
+    Usa las columnas del log de predicciones si existen y, si no, el modelo
+    cargado en el worker.
+
+    Returns:
+        (clase predicha, probabilidades por clase); cualquiera puede ser None
+    """
+    proba = None
+    if "probabilities" in chunk.columns:
+        proba = pd.DataFrame(
+            [p if isinstance(p, dict) else {} for p in chunk["probabilities"]],
+            index=chunk.index,
+        )
+    else:
+        proba_columns = [c for c in chunk.columns if c.startswith("probabilities.")]
+        if proba_columns:
+            proba = chunk[proba_columns].rename(columns=lambda c: c.split(".", 1)[1])
+
+    if "prediction" in chunk.columns:
+        return _clean_labels(chunk["prediction"]), proba
+
+    if _worker_model is None or not set(FEATURE_COLUMNS).issubset(chunk.columns):
+        return None, proba
+
+    classes = _worker_model["label_encoder"].classes_
+    scores = _worker_model["model"].predict_proba(chunk[FEATURE_COLUMNS])
+    proba = pd.DataFrame(scores, columns=classes, index=chunk.index)
+    predicted = pd.Series(classes[scores.argmax(axis=1)], index=chunk.index, dtype=object)
+    return predicted, proba
+
+
+def _bincount_by_group(
+    codes: np.ndarray, bins: np.ndarray, n_groups: int, n_bins: int
+) -> np.ndarray:
+    """Histograma por grupo en una sola pasada: (n_groups, n_bins)."""
+    counts = np.bincount(codes * n_bins + bins, minlength=n_groups * n_bins)
+    return counts.reshape(n_groups, n_bins)
+
+
+def process_chunk(chunk: pd.DataFrame, edges: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Reduce un chunk a conteos con bordes fijos.
+
+    Las filas se agrupan por la etiqueta real si el chunk trae la columna
+    objetivo y, si no, por la clase predicha.
+
+    Args:
+        chunk: Filas del dataset o del log de predicciones
+        edges: Bordes de `build_edges`
+
+    Returns:
+        Acumulador parcial del chunk
+    """
+    partial = empty_partial()
+    partial["n_rows"] = len(chunk)
+    chunk = chunk.reset_index(drop=True)
+
+    labels = _clean_labels(chunk[TARGET]) if TARGET in chunk.columns else None
+    predicted, proba = _predictions(chunk)
+
+    if labels is not None:
+        partial["labels"].update(labels.dropna().value_counts().to_dict())
+    if predicted is not None:
+        partial["predicted"].update(predicted.dropna().value_counts().to_dict())
+
+    groups = labels if labels is not None else predicted
+    if groups is None:
+        groups = pd.Series(UNLABELED, index=chunk.index)
+    codes, group_names = pd.factorize(groups.fillna(UNLABELED))
+    n_groups = len(group_names)
+
+    numeric = {
+        col: pd.to_numeric(chunk[col], errors="coerce").to_numpy(dtype=float)
+        for col in NUMERIC_FEATURES
+        if col in chunk.columns
+    }
+
+    # Histogramas por clase (con bins de desborde) y para drift
+    n_bins = len(edges["class"][NUMERIC_FEATURES[0]]) + 1
+    class_hist = np.zeros((n_groups, len(NUMERIC_FEATURES), n_bins), dtype=np.int64)
+    for j, col in enumerate(NUMERIC_FEATURES):
+        values = numeric.get(col)
+        if values is None:
+            continue
+        valid = ~np.isnan(values)
+        values = values[valid]
+        bins = np.searchsorted(edges["class"][col], values, side="right")
+        class_hist[:, j] = _bincount_by_group(codes[valid], bins, n_groups, n_bins)
+        drift_edges = edges["drift"][col]
+        partial["drift"][col] = np.bincount(
+            np.searchsorted(drift_edges, values, side="right"), minlength=len(drift_edges) + 1
+        )
+    for g, name in enumerate(group_names):
+        partial["class_hist"][name] = class_hist[g]
+
+    # Densidad Height × Weight: solo las filas dentro de la grilla
+    if "Height" in numeric and "Weight" in numeric:
+        x_edges, y_edges = edges["grid"]
+        x, y = numeric["Height"], numeric["Weight"]
+        inside = (x >= x_edges[0]) & (x < x_edges[-1]) & (y >= y_edges[0]) & (y < y_edges[-1])
+        nx, ny = len(x_edges) - 1, len(y_edges) - 1
+        cells = (
+            np.searchsorted(x_edges, x[inside], side="right") - 1
+        ) * ny + np.searchsorted(y_edges, y[inside], side="right") - 1
+        grid = _bincount_by_group(codes[inside], cells, n_groups, nx * ny)
+        for g, name in enumerate(group_names):
+            partial["grid"][name] = grid[g].reshape(nx, ny)
+
+    for col in CATEGORICAL_FEATURES:
+        if col not in chunk.columns:
+            continue
+        partial["categorical"][col].update(_clean_counts(chunk[col]))
+
+    # Matriz de confusión y calibración: solo filas con etiqueta y predicción
+    if labels is not None and predicted is not None:
+        both = labels.notna() & predicted.notna()
+        partial["confusion"].update(zip(labels[both], predicted[both]))
+
+        if proba is not None and not proba.empty:
+            confidence = proba.max(axis=1).to_numpy(dtype=float)
+            valid = (both & ~np.isnan(confidence)).to_numpy()
+            correct = (labels == predicted).to_numpy()[valid]
+            bins = np.minimum(
+                (confidence[valid] * CALIBRATION_BINS).astype(np.int64), CALIBRATION_BINS - 1
+            )
+            calibration = partial["calibration"]
+            calibration["count"] += np.bincount(bins, minlength=CALIBRATION_BINS)
+            calibration["correct"] += np.bincount(
+                bins, weights=correct, minlength=CALIBRATION_BINS
+            ).astype(np.int64)
+            calibration["confidence"] += np.bincount(
+                bins, weights=confidence[valid], minlength=CALIBRATION_BINS
+            )
+
+    return partial
+
+
+def accumulate(
+    path: Path,
+    edges: Dict[str, Any],
+    chunksize: int,
+    executor: Optional[Executor] = None,
+    max_in_flight: int = 4,
+) -> Dict[str, Any]:
+    """
+    Recorre un dataset por chunks y devuelve su acumulador total.
+
+    Con un executor, los chunks se procesan en paralelo manteniendo como
+    máximo `max_in_flight` chunks pendientes para acotar la memoria.
+    """
+    total = empty_partial()
+
+    if executor is None:
+        for chunk in iter_chunks(path, chunksize):
+            merge_partials(total, process_chunk(chunk, edges))
+        return total
+
+    pending: List[Any] = []
+    for chunk in iter_chunks(path, chunksize):
+        pending.append(executor.submit(process_chunk, chunk, edges))
+        if len(pending) >= max_in_flight:
+            merge_partials(total, pending.pop(0).result())
+    for future in pending:
+        merge_partials(total, future.result())
+
+    return total
+
+
+def profile_partial(profile: Dict[str, Any]) -> Dict[str, Any]:
+    """Acumulador de referencia a partir del perfil que acompaña al modelo."""
+    partial = empty_partial()
+    partial["n_rows"] = profile.get("n_rows", 0)
+    for col in NUMERIC_FEATURES:
+        partial["drift"][col] = np.asarray(profile["numeric"][col]["counts"], dtype=np.int64)
+    for col in CATEGORICAL_FEATURES:
+        partial["categorical"][col].update(profile["categorical"].get(col, {}))
+    return partial
+
+
+# =============================================================================
+# Figuras (cada función recibe solo agregados)
+# =============================================================================
+
+
+def _ordered(classes) -> List[str]:
+    """Orden estable de las clases: alfabético, con las filas sin etiqueta al final."""
+    return sorted(classes, key=lambda c: (c == UNLABELED, str(c)))
+
+
+def _save(fig, path: Path, dpi: int) -> str:
+    fig.tight_layout()
+    fig.savefig(path, dpi=dpi)
+    plt.close(fig)
+    return str(path)
+
+
+def plot_class_distribution(
+    labels: Dict[str, int], predicted: Dict[str, int], path: Path, dpi: int
+) -> str:
+    """Barras de la distribución de clases (real y predicha si existen ambas)."""
+    classes = _ordered(set(labels) | set(predicted))
+    series = [(name, counts) for name, counts in (("Real", labels), ("Predicha", predicted)) if counts]
+    width = 0.8 / len(series)
+    x = np.arange(len(classes))
+
+    fig, ax = plt.subplots(figsize=(10, 5))
+    for i, (name, counts) in enumerate(series):
+        ax.bar(x + i * width, [counts.get(c, 0) for c in classes], width, label=name)
+    ax.set_xticks(x + width * (len(series) - 1) / 2)
+    ax.set_xticklabels(classes, rotation=30, ha="right")
+    ax.set_ylabel("Filas")
+    ax.set_title("Distribución de clases")
+    ax.legend()
+    return _save(fig, path, dpi)
+
+
+def plot_feature_by_class(
+    feature: str, edges: np.ndarray, hist: Dict[str, np.ndarray], path: Path, dpi: int
+) -> str:
+    """Histograma normalizado de una variable numérica por clase (sin desbordes)."""
+    total = sum(hist.values())
+    nonzero = np.flatnonzero(total[1:-1])
+    fig, ax = plt.subplots(figsize=(9, 5))
+    for name in _ordered(hist):
+        counts = hist[name][1:-1]
+        if counts.sum() == 0:
+            continue
+        ax.stairs(counts / counts.sum(), edges, label=name)
+    if nonzero.size:
+        ax.set_xlim(edges[nonzero[0]], edges[nonzero[-1] + 1])
+    ax.set_xlabel(feature)
+    ax.set_ylabel("Proporción de la clase")
+    ax.set_title(f"{feature} por clase")
+    ax.legend(fontsize="small")
+    return _save(fig, path, dpi)
+
+
+def plot_density_grid(
+    edges: Tuple[np.ndarray, np.ndarray], grid: Dict[str, np.ndarray], path: Path, dpi: int
+) -> str:
+    """Densidad Height × Weight por clase como grilla 2D (reemplaza al scatter)."""
+    classes = _ordered(grid)
+    n_cols = min(4, len(classes))
+    n_rows = -(-len(classes) // n_cols)
+    fig, axes = plt.subplots(
+        n_rows, n_cols, figsize=(4 * n_cols, 3.5 * n_rows), sharex=True, sharey=True, squeeze=False
+    )
+    vmax = max(1, max(int(g.max()) for g in grid.values()))
+    for ax, name in zip(axes.flat, classes):
+        counts = np.ma.masked_equal(grid[name], 0).T
+        mesh = ax.pcolormesh(edges[0], edges[1], counts, norm=LogNorm(vmin=1, vmax=vmax))
+        ax.set_title(name, fontsize="small")
+    for ax in axes.flat[len(classes):]:
+        ax.set_visible(False)
+    for ax in axes[-1]:
+        ax.set_xlabel("Height")
+    for ax in axes[:, 0]:
+        ax.set_ylabel("Weight")
+    fig.colorbar(mesh, ax=axes, label="Filas")
+    fig.savefig(path, dpi=dpi)
+    plt.close(fig)
+    return str(path)
+
+
+def plot_confusion_matrix(confusion: Dict[Tuple[str, str], int], path: Path, dpi: int) -> str:
+    """Matriz de confusión normalizada por fila, con los conteos anotados."""
+    classes = _ordered({c for pair in confusion for c in pair})
+    index = {c: i for i, c in enumerate(classes)}
+    matrix = np.zeros((len(classes), len(classes)), dtype=np.int64)
+    for (true, pred), count in confusion.items():
+        matrix[index[true], index[pred]] += count
+    rows = matrix.sum(axis=1, keepdims=True)
+    normalized = np.divide(matrix, rows, out=np.zeros(matrix.shape), where=rows > 0)
+
+    fig, ax = plt.subplots(figsize=(8, 7))
+    image = ax.imshow(normalized, cmap="Blues", vmin=0, vmax=1)
+    for i in range(len(classes)):
+        for j in range(len(classes)):
+            if matrix[i, j]:
+                color = "white" if normalized[i, j] > 0.5 else "black"
+                ax.text(j, i, matrix[i, j], ha="center", va="center", color=color, fontsize=8)
+    ax.set_xticks(range(len(classes)))
+    ax.set_xticklabels(classes, rotation=45, ha="right")
+    ax.set_yticks(range(len(classes)))
+    ax.set_yticklabels(classes)
+    ax.set_xlabel("Predicha")
+    ax.set_ylabel("Real")
+    accuracy = np.trace(matrix) / max(matrix.sum(), 1)
+    ax.set_title(f"Matriz de confusión (accuracy {accuracy:.3f})")
+    fig.colorbar(image, ax=ax, label="Proporción de la fila")
+    return _save(fig, path, dpi)
+
+
+def plot_calibration(calibration: Dict[str, np.ndarray], path: Path, dpi: int) -> str:
+    """Diagrama de confiabilidad de la clase predicha, con el ECE en el título."""
+    count = calibration["count"]
+    seen = count > 0
+    accuracy = calibration["correct"][seen] / count[seen]
+    confidence = calibration["confidence"][seen] / count[seen]
+    ece = float(np.sum(count[seen] * np.abs(accuracy - confidence)) / count.sum())
+    edges = np.linspace(0, 1, CALIBRATION_BINS + 1)
+
+    fig, (ax, ax_count) = plt.subplots(
+        2, 1, figsize=(6, 7), sharex=True, gridspec_kw={"height_ratios": [3, 1]}
+    )
+    ax.plot([0, 1], [0, 1], linestyle="--", color="gray", label="Calibración perfecta")
+    ax.plot(confidence, accuracy, marker="o", label="Modelo")
+    ax.set_ylabel("Accuracy")
+    ax.set_title(f"Calibración (ECE {ece:.4f})")
+    ax.legend()
+    ax_count.stairs(count, edges, fill=True)
+    ax_count.set_yscale("log")
+    ax_count.set_xlabel("Confianza (probabilidad de la clase predicha)")
+    ax_count.set_ylabel("Filas")
+    return _save(fig, path, dpi)
+
+
+def _drift_boundaries(edges: np.ndarray) -> np.ndarray:
+    """Bordes para dibujar los bins abiertos de los extremos con un 10% del rango de ancho."""
+    margin = 0.1 * (edges[-1] - edges[0]) if len(edges) > 1 and edges[-1] > edges[0] else 1.0
+    return np.concatenate([[edges[0] - margin], edges, [edges[-1] + margin]])
+
+
+def plot_numeric_drift(
+    edges: Dict[str, np.ndarray],
+    reference: Dict[str, np.ndarray],
+    current: Dict[str, np.ndarray],
+    path: Path,
+    dpi: int,
+) -> str:
+    """Densidades de referencia vs actuales de cada variable numérica."""
+    features = [f for f in NUMERIC_FEATURES if f in reference and f in current]
+    n_cols = 4
+    n_rows = -(-len(features) // n_cols)
+    fig, axes = plt.subplots(n_rows, n_cols, figsize=(16, 3.5 * n_rows), squeeze=False)
+    for ax, feature in zip(axes.flat, features):
+        boundaries = _drift_boundaries(edges[feature])
+        widths = np.diff(boundaries)
+        for name, counts in (("Referencia", reference[feature]), ("Actual", current[feature])):
+            # Los bins de ancho cero (cuantiles repetidos) quedan vacíos con side="right"
+            density = np.divide(
+                counts / max(counts.sum(), 1), widths, out=np.zeros(len(widths)), where=widths > 0
+            )
+            ax.stairs(density, boundaries, label=name)
+        ax.set_title(feature)
+    for ax in axes.flat[len(features):]:
+        ax.set_visible(False)
+    axes.flat[0].legend()
+    fig.suptitle("Drift de variables numéricas (densidad)")
+    return _save(fig, path, dpi)
+
+
+def plot_categorical_drift(
+    reference: Dict[str, Counter], current: Dict[str, Counter], path: Path, dpi: int
+) -> str:
+    """Proporción de cada categoría en la referencia vs los datos actuales."""
+    n_cols = 4
+    n_rows = -(-len(CATEGORICAL_FEATURES) // n_cols)
+    fig, axes = plt.subplots(n_rows, n_cols, figsize=(16, 4 * n_rows), squeeze=False)
+    for ax, feature in zip(axes.flat, CATEGORICAL_FEATURES):
+        ref, cur = reference[feature], current[feature]
+        categories = sorted(set(ref) | set(cur))
+        x = np.arange(len(categories))
+        for offset, (name, counts) in zip((-0.2, 0.2), (("Referencia", ref), ("Actual", cur))):
+            total = max(sum(counts.values()), 1)
+            ax.bar(x + offset, [counts.get(c, 0) / total for c in categories], 0.4, label=name)
+        ax.set_xticks(x)
+        ax.set_xticklabels(categories, rotation=30, ha="right", fontsize="small")
+        ax.set_title(feature)
+    axes.flat[0].legend()
+    fig.suptitle("Drift de variables categóricas (proporción)")
+    return _save(fig, path, dpi)
+
+
+# =============================================================================
+# Orquestación
+# =============================================================================
+
+
+def figure_tasks(
+    current: Dict[str, Any],
+    edges: Dict[str, Any],
+    output_dir: Path,
+    reference: Optional[Dict[str, Any]] = None,
+    fmt: str = "png",
+    dpi: int = 100,
+) -> Dict[str, Tuple[Callable[..., str], tuple]]:
+    """
+    Figuras que se pueden generar con los agregados disponibles.
+
+    Returns:
+        Nombre de la figura -> (función, argumentos)
+    """
+    tasks: Dict[str, Tuple[Callable[..., str], tuple]] = {}
+
+    def add(name: str, func: Callable[..., str], *args) -> None:
+        tasks[name] = (func, (*args, output_dir / f"{name}.{fmt}", dpi))
+
+    if current["labels"] or current["predicted"]:
+        add(
+            "class_distribution",
+            plot_class_distribution,
+            dict(current["labels"]),
+            dict(current["predicted"]),
+        )
+
+    for j, feature in enumerate(NUMERIC_FEATURES):
+        hist = {name: counts[j] for name, counts in current["class_hist"].items()}
+        if hist and sum(h.sum() for h in hist.values()):
+            add(f"hist_{feature}_by_class", plot_feature_by_class, feature, edges["class"][feature], hist)
+
+    if current["grid"]:
+        add("height_weight_density", plot_density_grid, edges["grid"], current["grid"])
+
+    if current["confusion"]:
+        add("confusion_matrix", plot_confusion_matrix, dict(current["confusion"]))
+
+    if current["calibration"]["count"].sum():
+        add("calibration", plot_calibration, current["calibration"])
+
+    if reference is not None:
+        if reference["drift"] and current["drift"]:
+            add(
+                "drift_numeric",
+                plot_numeric_drift,
+                edges["drift"],
+                reference["drift"],
+                current["drift"],
+            )
+        if any(reference["categorical"].values()) and any(current["categorical"].values()):
+            add(
+                "drift_categorical",
+                plot_categorical_drift,
+                reference["categorical"],
+                current["categorical"],
+            )
+
+    return tasks
+
+
+def generate_figures(
+    input_path: Path,
+    output_dir: Path = FIGURES_DIR,
+    reference_path: Optional[Path] = None,
+    model_path: Optional[Path] = None,
+    use_profile: bool = True,
+    chunksize: int = 50_000,
+    n_jobs: int = 1,
+    n_bins: int = 60,
+    fmt: str = "png",
+    dpi: int = 100,
+) -> Dict[str, Any]:
+    """
+    Agrega el dataset y dibuja todas las figuras disponibles.
+
+    Args:
+        input_path: Dataset o log de predicciones (CSV/Parquet/JSONL)
+        output_dir: Directorio de salida de las figuras
+        reference_path: Dataset de referencia para el drift (opcional)
+        model_path: Artefacto del modelo para puntuar filas sin predicción (opcional)
+        use_profile: Sin `reference_path`, comparar contra el perfil de referencia
+        chunksize: Filas por chunk
+        n_jobs: Procesos en paralelo (1 = todo en el proceso actual)
+        n_bins: Bins de los histogramas por clase y de la grilla 2D
+        fmt: Formato de las imágenes (png, svg, pdf)
+        dpi: Resolución de las imágenes
+
+    Returns:
+        Resumen con las figuras generadas y los tiempos de cada etapa
+    """
+    profile = None
+    if reference_path is None and use_profile:
+        from mlops_obesidad.monitoring import load_reference_profile
+
+        profile = load_reference_profile()
+    edges = build_edges(n_bins, profile)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    if model_path is not None:
+        _init_worker(str(model_path))
+
+    executor = None
+    if n_jobs > 1:
+        initargs = (str(model_path) if model_path is not None else None,)
+        executor = ProcessPoolExecutor(
+            max_workers=n_jobs, initializer=_init_worker, initargs=initargs
+        )
+
+    try:
+        start = time.perf_counter()
+        current = accumulate(input_path, edges, chunksize, executor, 2 * n_jobs)
+        reference = None
+        if reference_path is not None:
+            reference = accumulate(reference_path, edges, chunksize, executor, 2 * n_jobs)
+        elif profile is not None:
+            reference = profile_partial(profile)
+        aggregate_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        tasks = figure_tasks(current, edges, output_dir, reference, fmt, dpi)
+        if executor is None:
+            figures = {name: func(*args) for name, (func, args) in tasks.items()}
+        else:
+            futures = {name: executor.submit(func, *args) for name, (func, args) in tasks.items()}
+            figures = {name: future.result() for name, future in futures.items()}
+        render_seconds = time.perf_counter() - start
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    return {
+        "input_path": str(input_path),
+        "rows": int(current["n_rows"]),
+        "reference": str(reference_path) if reference_path else ("profile" if profile else None),
+        "figures": figures,
+        "aggregate_seconds": round(aggregate_seconds, 3),
+        "render_seconds": round(render_seconds, 3),
+    }
+
+
 @app.command()
 def main(
-    # ---- REPLACE DEFAULT PATHS AS APPROPRIATE ----
-    input_path: Path = PROCESSED_DATA_DIR / "dataset.csv",
-    output_path: Path = FIGURES_DIR / "plot.png",
-    # -----------------------------------------
+    input_path: Path = typer.Argument(..., help="Dataset o log de predicciones (CSV/Parquet/JSONL)"),
+    output_dir: Path = FIGURES_DIR,
+    reference_path: Optional[Path] = typer.Option(
+        None, help="Dataset de referencia para las figuras de drift"
+    ),
+    model_path: Optional[Path] = typer.Option(
+        None, help="Artefacto del modelo para puntuar filas sin predicción"
+    ),
+    use_profile: bool = typer.Option(
+        True, help="Sin --reference-path, comparar contra el perfil de referencia"
+    ),
+    chunksize: int = 50_000,
+    n_jobs: int = typer.Option(os.cpu_count() or 1, help="Procesos en paralelo"),
+    n_bins: int = 60,
+    fmt: str = typer.Option("png", help="Formato de las imágenes (png, svg, pdf)"),
+    dpi: int = 100,
 ):
-    # ---- REPLACE THIS WITH YOUR OWN CODE ----
-    logger.info("Generating plot from data...")
-    for i in tqdm(range(10), total=10):
-        if i == 5:
-            logger.info("Something happened for iteration 5.")
-    logger.success("Plot generation complete.")
-    # -----------------------------------------
+    """Genera las figuras estándar del reporte a partir de agregados."""
+    logger.info(f"Generando figuras de {input_path}")
+
+    summary = generate_figures(
+        input_path,
+        output_dir,
+        reference_path=reference_path,
+        model_path=model_path,
+        use_profile=use_profile,
+        chunksize=chunksize,
+        n_jobs=n_jobs,
+        n_bins=n_bins,
+        fmt=fmt,
+        dpi=dpi,
+    )
+
+    with open(output_dir / "figures.json", "w", encoding="utf-8") as f:
+        json.dump(summary, f, indent=2)
+
+    logger.success(
+        f"{len(summary['figures'])} figuras en {output_dir} ({summary['rows']} filas; "
+        f"agregación {summary['aggregate_seconds']}s, dibujo {summary['render_seconds']}s)"
+    )
 
 
 if __name__ == "__main__":
+    configure_logging()
     app()
@@ -0,0 +1,119 @@
+"""
+Tests unitarios para el control de admisión de la API.
+"""
+
+import asyncio
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from API.admission import AdmissionController, AdmissionMiddleware, RateLimiter, TokenBucket
+
+
+class TestTokenBucket:
+    """Tests para el token bucket y el rate limiter."""
+
+    def test_bucket_refills_over_time(self):
+        """Test que el bucket permite ráfagas y se recarga a la tasa configurada."""
+        bucket = TokenBucket(rate=2.0, capacity=2.0, now=0.0)
+
+        assert bucket.try_acquire(0.0) == 0.0
+        assert bucket.try_acquire(0.0) == 0.0
+        assert bucket.try_acquire(0.0) == 0.5  # falta un token a 2 tokens/s
+        assert bucket.try_acquire(0.5) == 0.0
+
+    def test_limits_are_per_client(self):
+        """Test que cada cliente tiene su propio bucket."""
+        limiter = RateLimiter(rate=1.0, burst=1.0)
+
+        assert limiter.check("a", now=0.0) == 0.0
+        assert limiter.check("a", now=0.0) > 0
+        assert limiter.check("b", now=0.0) == 0.0
+
+
+class TestAdmissionController:
+    """Tests para el límite de concurrencia, la cola y los deadlines."""
+
+    def test_queue_and_release(self):
+        """Test que un request en cola entra cuando se libera un lugar."""
+        async def scenario():
+            controller = AdmissionController(max_concurrency=1, max_queue=1, max_queue_wait=1.0)
+            assert await controller.admit("a") is None
+
+            waiting = asyncio.create_task(controller.admit("b"))
+            await asyncio.sleep(0)
+            assert controller.queued == 1
+
+            # La cola está llena: el tercero se rechaza de inmediato
+            rejection = await controller.admit("c")
+            assert rejection.status_code == 503
+            assert rejection.error == "ServiceOverloaded"
+
+            controller.release(0.01)
+            assert await waiting is None
+            assert controller.in_flight == 1
+            controller.release(0.01)
+            assert controller.in_flight == 0
+
+        asyncio.run(scenario())
+
+    def test_unreachable_deadline_is_rejected(self):
+        """Test que un deadline menor que la espera estimada se rechaza sin encolar."""
+        async def scenario():
+            controller = AdmissionController(max_concurrency=1)
+            controller.service_time = 0.2
+            assert await controller.admit("a") is None
+
+            rejection = await controller.admit("b", deadline=0.1)
+            assert rejection.status_code == 503
+            assert rejection.error == "DeadlineExceeded"
+            assert controller.queued == 0
+
+        asyncio.run(scenario())
+
+    def test_queue_wait_timeout(self):
+        """Test que la espera en cola está acotada por max_queue_wait."""
+        async def scenario():
+            controller = AdmissionController(max_concurrency=1, max_queue_wait=0.01)
+            assert await controller.admit("a") is None
+
+            rejection = await controller.admit("b")
+            assert rejection.status_code == 503
+            assert controller.queued == 0
+            assert controller.in_flight == 1
+
+        asyncio.run(scenario())
+
+
+class TestAdmissionMiddleware:
+    """Tests del middleware sobre una aplicación mínima."""
+
+    def _client(self, **kwargs):
+        app = FastAPI()
+        app.add_middleware(AdmissionMiddleware, controller=AdmissionController(**kwargs),
+                           paths=("/predict",))
+
+        @app.get("/predict")
+        async def predict():
+            return {"ok": True}
+
+        @app.get("/other")
+        async def other():
+            return {"ok": True}
+
+        return TestClient(app)
+
+    def test_rate_limit_returns_429_with_retry_after(self):
+        """Test que exceder el rate limit de una API key retorna 429 y Retry-After."""
+        client = self._client(rate=1.0, burst=1.0)
+        headers = {"X-API-Key": "cliente-1"}
+
+        assert client.get("/predict", headers=headers).status_code == 200
+        response = client.get("/predict", headers=headers)
+
+        assert response.status_code == 429
+        assert response.headers["Retry-After"] == "1"
+        assert response.json()["detail"]["error"] == "RateLimitExceeded"
+        # Otra API key y otros paths no se ven afectados
+        assert client.get("/predict", headers={"X-API-Key": "cliente-2"}).status_code == 200
+        assert client.get("/other", headers=headers).status_code == 200
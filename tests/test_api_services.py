@@ -3,88 +3,17 @@ Tests unitarios para los servicios de la API.
 """
 
 import pytest
-from API.services import dummy_predict, real_predict, OBESITY_CLASSES
+from API.services import predict_records, prediction_record, OBESITY_CLASSES
 from API.schemas import PredictionRequest, Gender, YesNo, CAEC, CALC, MTRANS
 
 
-class TestDummyPredict:
-    """Tests para la función dummy_predict."""
+class TestPredictRecords:
+    """Tests para el camino de predicción de la API (predict_records)."""
     
-    def test_dummy_predict_returns_response(self):
-        """Test que dummy_predict retorna una respuesta válida."""
-        request = PredictionRequest(
-            Gender=Gender.FEMALE,
-            Age=21.0,
-            Height=1.62,
-            Weight=64.0,
-            family_history_with_overweight=YesNo.YES,
-            FAVC=YesNo.NO,
-            FCVC=2.0,
-            NCP=3.0,
-            CAEC=CAEC.SOMETIMES,
-            SMOKE=YesNo.NO,
-            CH2O=2.0,
-            SCC=YesNo.NO,
-            FAF=0.0,
-            TUE=1.0,
-            CALC=CALC.NO,
-            MTRANS=MTRANS.PUBLIC_TRANSPORTATION
-        )
-        
-        response = dummy_predict(request)
-        
-        assert response.prediction in OBESITY_CLASSES
-        assert response.confidence >= 0.0
-        assert response.confidence <= 1.0
-        assert response.model_version == "1.0.0"
-        assert response.model_id == "obesity-classifier-v1"
-        assert response.prediction_id is not None
-        assert response.timestamp is not None
-        assert response.processing_time_ms >= 0
-    
-    def test_dummy_predict_probabilities_sum_to_one(self):
-        """Test que las probabilidades suman aproximadamente 1.0."""
-        request = PredictionRequest(
-            Gender=Gender.MALE,
-            Age=30.0,
-            Height=1.80,
-            Weight=90.0,
-            family_history_with_overweight=YesNo.NO,
-            FAVC=YesNo.YES,
-            FCVC=2.5,
-            NCP=3.0,
-            CAEC=CAEC.FREQUENTLY,
-            SMOKE=YesNo.NO,
-            CH2O=2.0,
-            SCC=YesNo.NO,
-            FAF=1.0,
-            TUE=1.0,
-            CALC=CALC.NO,
-            MTRANS=MTRANS.AUTOMOBILE
-        )
-        
-        response = dummy_predict(request)
-        
-        total_prob = sum([
-            response.probabilities.Insufficient_Weight,
-            response.probabilities.Normal_Weight,
-            response.probabilities.Overweight_Level_I,
-            response.probabilities.Overweight_Level_II,
-            response.probabilities.Obesity_Type_I,
-            response.probabilities.Obesity_Type_II,
-            response.probabilities.Obesity_Type_III,
-        ])
-        
-        # Debe sumar aproximadamente 1.0 (con un pequeño margen de error)
-        assert abs(total_prob - 1.0) < 0.01
-
-
-class TestRealPredict:
-    """Tests para la función real_predict."""
-    
-    def test_real_predict_returns_response(self):
-        """Test que real_predict retorna una respuesta válida."""
+    def test_predict_records_returns_valid_responses(self):
+        """Test que predict_records retorna una respuesta válida por request."""
         from pathlib import Path
+        from API.schemas import PredictionResponse
         
         model_path = Path("models/xgboost_model_artifacts.pkl")
         if not model_path.exists():
@@ -109,24 +38,40 @@ class TestRealPredict:
             MTRANS=MTRANS.PUBLIC_TRANSPORTATION
         )
         
-        response = real_predict(request)
+        records = predict_records([request, request])
+        
+        assert len(records) == 2
+        for record in records:
+            response = PredictionResponse.model_validate(record)
+            assert response.prediction in OBESITY_CLASSES
+            assert 0.0 <= response.confidence <= 1.0
+            assert response.model_version == "1.0.0"
+            assert response.model_id == "obesity-classifier-v1"
+            assert response.processing_time_ms >= 0
+            assert abs(sum(record["probabilities"].values()) - 1.0) < 0.01
+
+
+class TestPredictionRecord:
+    """Tests para las respuestas construidas sin validación."""
+    
+    def test_record_matches_response_schema(self):
+        """Test que el formato completo cumple el schema de PredictionResponse."""
+        from API.schemas import PredictionResponse
+        
+        probabilities = {cls: 1.0 / len(OBESITY_CLASSES) for cls in OBESITY_CLASSES}
+        probabilities["Normal_Weight"] += 0.01
+        record = prediction_record("Normal_Weight", probabilities, "2024-01-15T10:30:00Z", 1.234)
         
-        assert response.prediction in OBESITY_CLASSES
-        assert response.confidence >= 0.0
-        assert response.confidence <= 1.0
-        assert response.model_version == "1.0.0"
-        assert response.model_id == "obesity-classifier-v1"
-        assert response.prediction_id is not None
-        assert response.timestamp is not None
-        assert response.processing_time_ms >= 0
+        response = PredictionResponse.model_validate(record)
+        assert response.probabilities.Normal_Weight == probabilities["Normal_Weight"]
+        assert response.processing_time_ms == 1.23
     
-    def test_real_predict_falls_back_to_dummy_on_error(self):
-        """Test que real_predict usa dummy como fallback si hay error."""
-        # Este test verifica que el manejo de errores funciona
-        # En un escenario real, si el modelo no se puede cargar,
-        # debería usar dummy_predict
+    def test_compact_record_uses_class_order(self):
+        """Test que el formato compacto envía las probabilidades en el orden de OBESITY_CLASSES."""
+        probabilities = {cls: i / 100 for i, cls in enumerate(OBESITY_CLASSES)}
+        record = prediction_record(
+            "Overweight_Level_II", probabilities, "2024-01-15T10:30:00Z", 1.0, compact=True
+        )
         
-        # Nota: Este test puede ser difícil de probar sin simular un error
-        # Por ahora, solo verificamos que la función existe y puede ejecutarse
-        pass
-
+        assert record["probabilities"] == [i / 100 for i in range(len(OBESITY_CLASSES))]
+        assert record["confidence"] == 0.06
@@ -0,0 +1,146 @@
+"""
+Tests unitarios para la predicción en cascada.
+"""
+
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from API.schemas import PredictionRequest
+from mlops_obesidad.config import CATEGORICAL_FEATURES, FEATURE_COLUMNS
+from mlops_obesidad.inference import cascade, predictor
+from mlops_obesidad.inference.cache import prediction_cache, request_key
+from mlops_obesidad.inference.cascade import CascadeStage, load_cascade_stage
+from mlops_obesidad.modeling.cascade_stage import choose_threshold, fit_stage, stage_features
+
+EXAMPLE = PredictionRequest.model_config["json_schema_extra"]["example"]
+CLASSES = ["Normal_Weight", "Obesity_Type_I", "Overweight_Level_I"]
+
+
+@pytest.fixture(scope="module")
+def training():
+    """Dataset sintético cuya clase depende del BMI, con algo de ruido en los bordes."""
+    rng = np.random.default_rng(0)
+    n = 600
+    df = pd.DataFrame([EXAMPLE] * n)
+    df["Height"] = rng.uniform(1.5, 1.95, n)
+    df["Weight"] = rng.uniform(45, 130, n)
+    df["Gender"] = rng.choice(["Male", "Female"], n)
+    df["MTRANS"] = rng.choice(["Walking", "Automobile", "Public_Transportation"], n)
+    bmi = df["Weight"] / df["Height"] ** 2 + rng.normal(0, 0.7, n)
+    labels = pd.Series(np.select([bmi < 25, bmi < 30], CLASSES[::2], CLASSES[1]))
+    return df, labels
+
+
+@pytest.fixture(scope="module")
+def stage_dict(training):
+    df, labels = training
+    return fit_stage(df, labels, CLASSES, min_accuracy=0.99, c_grid=[10.0])
+
+
+class FakeModel:
+    """Pipeline simulado que cuenta las filas que recibe."""
+
+    def __init__(self):
+        self.rows = 0
+
+    def predict_proba(self, X: pd.DataFrame) -> np.ndarray:
+        self.rows += len(X)
+        proba = np.zeros((len(X), len(CLASSES)))
+        proba[:, 2] = 1.0
+        return proba
+
+
+class FakeEncoder:
+    classes_ = np.array(CLASSES)
+
+    def inverse_transform(self, codes):
+        return self.classes_[codes]
+
+
+class TestFitStage:
+    """Tests para el entrenamiento y la calibración de la primera etapa."""
+
+    def test_choose_threshold(self):
+        """Test que se elige el prefijo más largo que alcanza la exactitud objetivo."""
+        confidence = np.array([0.99, 0.97, 0.95, 0.9, 0.8, 0.7])
+        correct = np.array([True, True, True, False, True, False])
+
+        assert choose_threshold(confidence, correct, 0.8) == 0.8
+        assert choose_threshold(confidence, correct, 0.95) == 0.95
+        assert choose_threshold(confidence, ~correct, 0.9) == 1.0
+
+    def test_stage_reproduces_logistic_regression(self, training, stage_dict):
+        """Test que la etapa exportada (numpy, JSON) coincide con la regresión de scikit-learn."""
+        from sklearn.linear_model import LogisticRegression
+
+        df, labels = training
+        numeric, onehot = stage_features(df, stage_dict["categories"])
+        features = np.hstack([(numeric - numeric.mean(axis=0)) / (numeric.std(axis=0) + 1e-12), onehot])
+        target = [CLASSES.index(label) for label in labels]
+        expected = LogisticRegression(C=10.0, max_iter=5000).fit(features, target).predict_proba(features)
+
+        stage = CascadeStage(json.loads(json.dumps(stage_dict)))
+        rows = list(df[FEATURE_COLUMNS].itertuples(index=False, name=None))
+        assert np.allclose(stage.predict_proba_rows(rows), expected, atol=1e-6)
+
+        assert 0.5 <= stage.threshold < 1.0
+        assert set(stage.categories) == set(CATEGORICAL_FEATURES)
+        # Un nivel desconocido o con espacios no rompe la etapa
+        row = list(rows[0])
+        row[FEATURE_COLUMNS.index("MTRANS")] = "Skateboard"
+        row[FEATURE_COLUMNS.index("Gender")] = " Male "
+        assert np.isclose(stage.predict_proba_rows([row]).sum(), 1.0)
+
+
+class TestCascadePrediction:
+    """Tests para el escalamiento en el predictor."""
+
+    @pytest.fixture
+    def model(self, stage_dict, tmp_path, monkeypatch):
+        model = FakeModel()
+        monkeypatch.setattr(
+            predictor, "get_model", lambda: {"model": model, "label_encoder": FakeEncoder()}
+        )
+        path = tmp_path / "cascade_stage.json"
+        path.write_text(json.dumps(stage_dict))
+        monkeypatch.setattr(cascade, "_cascade_stage", None)
+        assert load_cascade_stage(path, classes=CLASSES) is not None
+        prediction_cache.clear()
+        yield model
+        prediction_cache.clear()
+
+    def test_only_uncertain_requests_escalate(self, model):
+        """Test que solo los requests bajo el umbral llegan al pipeline."""
+        weights = [50.0, 70.0, 79.5, 95.0, 125.0]
+        requests = [PredictionRequest(**{**EXAMPLE, "Height": 1.75, "Weight": w}) for w in weights]
+        stage = cascade.get_cascade_stage()
+        proba = stage.predict_proba_rows([request_key(r) for r in requests])
+        accepted = stage.accept(proba)
+        assert accepted.any() and not accepted.all()
+
+        results = predictor.predict_batch(requests)
+
+        assert model.rows == int((~accepted).sum())
+        for (label, _, probabilities), p, answered in zip(results, proba, accepted):
+            if answered:
+                assert label == CLASSES[int(p.argmax())]
+                assert probabilities == pytest.approx(dict(zip(CLASSES, p)))
+            else:
+                assert label == "Overweight_Level_I"
+        assert stage.stats()["escalated"] == int((~accepted).sum())
+
+        label, _, _ = predictor.predict_single(PredictionRequest(**{**EXAMPLE, "Height": 1.75, "Weight": 51.0}))
+        assert label == "Normal_Weight" and model.rows == int((~accepted).sum())
+
+    def test_stage_with_other_classes_is_not_loaded(self, stage_dict, tmp_path, monkeypatch):
+        """Test que una etapa de otro modelo (otras clases) deja la cascada desactivada."""
+        path = tmp_path / "cascade_stage.json"
+        path.write_text(json.dumps(stage_dict))
+        monkeypatch.setattr(cascade, "_cascade_stage", None)
+
+        assert load_cascade_stage(path, classes=CLASSES[:2]) is None
+        assert cascade.get_cascade_stage() is None
+        assert load_cascade_stage(tmp_path / "missing.json") is None
@@ -0,0 +1,181 @@
+"""
+Tests unitarios para el cliente Python de la API.
+"""
+
+import asyncio
+import gzip
+import json
+
+import httpx
+import pytest
+
+from API import client as client_module
+from API.client import AsyncObesityClient, GzipCSVReader, ObesityClient, PredictionAPIError, retry_delay
+from API.schemas import PredictionRequest
+
+EXAMPLE = PredictionRequest.model_config["json_schema_extra"]["example"]
+CLASSES = ["Insufficient_Weight", "Normal_Weight", "Obesity_Type_I", "Obesity_Type_II",
+           "Obesity_Type_III", "Overweight_Level_I", "Overweight_Level_II"]
+
+
+def prediction(instance: dict) -> dict:
+    """Respuesta de /predict simulada: la clase depende del peso."""
+    label = CLASSES[int(instance["Weight"]) % len(CLASSES)]
+    return {
+        "prediction": label,
+        "probabilities": {name: 1.0 if name == label else 0.0 for name in CLASSES},
+        "confidence": 1.0,
+        "model_version": "1.0.0",
+        "model_id": "xgboost",
+        "prediction_id": "00000000-0000-0000-0000-000000000000",
+        "timestamp": "2025-01-01T00:00:00Z",
+        "processing_time_ms": 1.0,
+    }
+
+
+class FakeAPI:
+    """Servidor simulado que registra los requests y puede fallar con un status."""
+
+    def __init__(self, failures=(), batch=True):
+        self.failures = list(failures)
+        self.batch = batch
+        self.calls = []
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.calls.append(request.url.path)
+        if self.failures:
+            return httpx.Response(self.failures.pop(0), headers={"Retry-After": "0"}, json={
+                "detail": {"error": "Overloaded", "message": "Try later"}
+            })
+        body = json.loads(request.content)
+        if request.url.path == "/api/v1/predict/batch":
+            if not self.batch:
+                return httpx.Response(404, json={"detail": "Not Found"})
+            predictions = [prediction(instance) for instance in body["instances"]]
+            return httpx.Response(200, json={
+                "predictions": predictions, "count": len(predictions), "processing_time_ms": 1.0
+            })
+        return httpx.Response(200, json=prediction(body))
+
+
+@pytest.fixture(autouse=True)
+def no_sleep(monkeypatch):
+    """Los reintentos no esperan de verdad."""
+    monkeypatch.setattr(client_module.time, "sleep", lambda seconds: None)
+
+
+def instances(n: int) -> list:
+    return [{**EXAMPLE, "Weight": 50.0 + i} for i in range(n)]
+
+
+class TestSyncClient:
+    """Tests para el cliente síncrono."""
+
+    def test_retries_on_overload(self):
+        """Test que 429/503 se reintentan y que otros errores no."""
+        api = FakeAPI(failures=[503, 429])
+        with ObesityClient(transport=httpx.MockTransport(api), max_retries=2) as client:
+            assert client.predict(EXAMPLE).prediction == prediction(EXAMPLE)["prediction"]
+        assert len(api.calls) == 3
+
+        api = FakeAPI(failures=[503, 503, 503])
+        with ObesityClient(transport=httpx.MockTransport(api), max_retries=1) as client:
+            with pytest.raises(PredictionAPIError) as error:
+                client.predict(EXAMPLE)
+        assert error.value.status_code == 503 and "Overloaded" in str(error.value)
+        assert len(api.calls) == 2
+
+        api = FakeAPI(failures=[500])
+        with ObesityClient(transport=httpx.MockTransport(api)) as client:
+            with pytest.raises(PredictionAPIError):
+                client.predict(EXAMPLE)
+        assert len(api.calls) == 1
+
+        delays = [retry_delay(3, backoff=0.1, max_backoff=0.5) for _ in range(100)]
+        assert all(0 <= d <= 0.5 for d in delays) and len(set(delays)) > 1
+        assert retry_delay(0, backoff=0.1, retry_after="2") == 2.0
+
+    def test_predict_many_batches_and_falls_back(self):
+        """Test que las instancias viajan en lotes y que sin /predict/batch se usa /predict."""
+        api = FakeAPI()
+        with ObesityClient(transport=httpx.MockTransport(api), batch_size=2) as client:
+            responses = client.predict_many(instances(5))
+        assert api.calls == ["/api/v1/predict/batch"] * 3
+        assert [r.prediction for r in responses] == [prediction(i)["prediction"] for i in instances(5)]
+
+        api = FakeAPI(batch=False)
+        with ObesityClient(transport=httpx.MockTransport(api), batch_size=2) as client:
+            responses = client.predict_many(instances(3))
+            assert client.batch_supported is False
+        assert api.calls == ["/api/v1/predict/batch"] + ["/api/v1/predict"] * 3
+        assert len(responses) == 3
+
+        with ObesityClient(transport=httpx.MockTransport(FakeAPI())) as client:
+            with pytest.raises(ValueError):
+                client.predict_many([{**EXAMPLE, "Age": -1}])
+
+    def test_job_upload_and_streamed_results(self, tmp_path):
+        """Test que el archivo se sube con su formato y los resultados se leen por filas."""
+        parts = [b"row,prediction\n0,Normal_Weight\n1,Obesity_Type_I\n", b"2,Normal_Weight\n"]
+        results = b"".join(gzip.compress(part) for part in parts)
+        uploads = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            if request.method == "POST":
+                uploads.append((request.headers["Content-Type"], request.headers.get("Content-Encoding"), request.read()))
+                return httpx.Response(202, json={"id": "abc", "status": "queued"})
+            if request.url.path.endswith("/results"):
+                return httpx.Response(200, content=iter([results[:10], results[10:]]))
+            return httpx.Response(200, json={"id": "abc", "status": "succeeded"})
+
+        path = tmp_path / "data.csv.gz"
+        path.write_bytes(gzip.compress(b"Gender,Age\n"))
+        with ObesityClient(transport=httpx.MockTransport(handler)) as client:
+            job = client.submit_job(path)
+            assert client.wait_job(job["id"])["status"] == "succeeded"
+            rows = list(client.iter_job_results(job["id"]))
+        assert uploads == [("text/csv", "gzip", path.read_bytes())]
+        assert [row["prediction"] for row in rows] == ["Normal_Weight", "Obesity_Type_I", "Normal_Weight"]
+
+        # Bloques arbitrarios del stream (cortes dentro de un miembro y de una fila)
+        reader = GzipCSVReader()
+        rows = [row for i in range(0, len(results), 7) for row in reader.feed(results[i : i + 7])]
+        assert [row["row"] for row in rows + reader.close()] == ["0", "1", "2"]
+
+
+class TestAsyncClient:
+    """Tests para el cliente asyncio."""
+
+    def test_concurrent_predictions_share_a_batch(self):
+        """Test que los predict concurrentes viajan en un solo request a /predict/batch."""
+        api = FakeAPI()
+
+        async def run():
+            async with AsyncObesityClient(transport=httpx.MockTransport(api), max_wait=0.01) as client:
+                single = await asyncio.gather(*(client.predict(i) for i in instances(6)))
+                many = await client.predict_many(instances(3))
+            return single, many
+
+        single, many = asyncio.run(run())
+
+        assert api.calls == ["/api/v1/predict/batch"] * 2
+        assert [r.prediction for r in single] == [prediction(i)["prediction"] for i in instances(6)]
+        assert len(many) == 3
+
+    def test_batch_errors_reach_every_caller(self, monkeypatch):
+        """Test que un lote fallido (tras los reintentos) falla para todas sus llamadas."""
+        async def no_sleep(seconds):
+            return None
+
+        monkeypatch.setattr(client_module.asyncio, "sleep", no_sleep)
+        api = FakeAPI(failures=[503] * 3)
+
+        async def run():
+            async with AsyncObesityClient(transport=httpx.MockTransport(api), max_retries=2) as client:
+                return await asyncio.gather(
+                    *(client.predict(i) for i in instances(3)), return_exceptions=True
+                )
+
+        results = asyncio.run(run())
+        assert all(isinstance(r, PredictionAPIError) for r in results)
+        assert len(api.calls) == 3
@@ -0,0 +1,248 @@
+"""
+Tests unitarios para el router del cluster local de inferencia.
+"""
+
+import json
+
+from fastapi.testclient import TestClient
+import httpx
+
+from API.cluster import ClusterRouter, HashRing, WorkerEndpoint, create_app, routing_key
+from API.schemas import PredictionRequest
+
+EXAMPLE = PredictionRequest.model_config["json_schema_extra"]["example"]
+
+
+class StreamedBody(httpx.AsyncByteStream):
+    """Body de respuesta que llega en chunks, como el de un worker real."""
+
+    def __init__(self, data: bytes, chunk_size: int = 4):
+        self.data = data
+        self.chunk_size = chunk_size
+
+    async def __aiter__(self):
+        for i in range(0, len(self.data), self.chunk_size):
+            yield self.data[i : i + self.chunk_size]
+
+
+class FakeTransport(httpx.AsyncBaseTransport):
+    """
+    Transporte hacia un worker simulado.
+
+    Con el worker caído la conexión se rechaza antes de leer el body del
+    request, como en un socket real.
+    """
+
+    def __init__(self, worker: "FakeWorker", handler=None):
+        self.worker = worker
+        self.handler = handler or worker.handler
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        if not self.worker.up:
+            raise httpx.ConnectError("connection refused", request=request)
+        await request.aread()
+        response = self.handler(request)
+        return httpx.Response(
+            response.status_code, headers=response.headers, stream=StreamedBody(response.content)
+        )
+
+
+class FakeWorker:
+    """Worker simulado: responde /readyz, /predict y las estadísticas de su cache."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.up = True
+        self.seen = set()
+        self.hits = 0
+        self.misses = 0
+
+    def handler(self, request: httpx.Request) -> httpx.Response:
+        if request.url.path == "/readyz":
+            return httpx.Response(200, json={"status": "ready"})
+        if request.url.path == "/api/v1/monitoring/cache":
+            return httpx.Response(
+                200, json={"predictions": {"hits": self.hits, "misses": self.misses}}
+            )
+        key = routing_key(request.content)
+        if key in self.seen:
+            self.hits += 1
+        else:
+            self.misses += 1
+            self.seen.add(key)
+        return httpx.Response(200, json={"worker": self.name})
+
+    def endpoint(self) -> WorkerEndpoint:
+        client = httpx.AsyncClient(transport=FakeTransport(self), base_url="http://worker")
+        return WorkerEndpoint(name=self.name, client=client)
+
+
+def _request(weight: float) -> str:
+    return json.dumps({**EXAMPLE, "Weight": weight})
+
+
+class TestHashRing:
+    """Tests para el anillo de hashing consistente."""
+
+    def test_ejection_only_moves_keys_of_ejected_node(self):
+        """Test que al quitar un nodo solo cambian de destino sus propias claves."""
+        nodes = [f"worker-{i}" for i in range(4)]
+        ring = HashRing(nodes)
+        keys = [f"key-{i}".encode() for i in range(2000)]
+
+        before = {key: ring.lookup(key) for key in keys}
+        after = {key: ring.lookup(key, set(nodes) - {"worker-1"}) for key in keys}
+
+        moved = [key for key in keys if before[key] != after[key]]
+        assert all(before[key] == "worker-1" for key in moved)
+        # Con nodos virtuales cada worker recibe una fracción pareja de las claves
+        shares = [list(before.values()).count(node) / len(keys) for node in nodes]
+        assert min(shares) > 0.15 and max(shares) < 0.35
+
+    def test_routing_key_is_canonical(self):
+        """Test que requests equivalentes tienen la misma clave de enrutamiento."""
+        compact = json.dumps({**EXAMPLE, "Age": 21}, separators=(",", ":")).encode()
+        spaced = json.dumps({**EXAMPLE, "Age": 21.0}, indent=2).encode()
+
+        assert routing_key(compact) == routing_key(spaced)
+        assert routing_key(b"no es json") == b"no es json"
+
+
+class TestClusterRouter:
+    """Tests del router con workers simulados."""
+
+    def test_routing_ejection_and_stats(self):
+        """Test de afinidad por clave, expulsión de un worker caído y stats agregadas."""
+        workers = [FakeWorker(f"worker-{i}") for i in range(3)]
+        router = ClusterRouter(
+            [w.endpoint() for w in workers], max_failures=2, health_interval=3600
+        )
+
+        with TestClient(create_app(router)) as client:
+            assert client.get("/readyz").json()["workers_healthy"] == 3
+
+            # El mismo request siempre va al mismo worker, aunque cambie el formato
+            first = client.post("/api/v1/predict", content=_request(70.0))
+            target = first.headers["x-cluster-worker"]
+            for _ in range(3):
+                again = client.post("/api/v1/predict", content=_request(70.00))
+                assert again.headers["x-cluster-worker"] == target
+
+            # Worker caído: el request se reintenta en otro y el worker se expulsa
+            down = next(w for w in workers if w.name == target)
+            down.up = False
+            for _ in range(2):
+                response = client.post("/api/v1/predict", content=_request(70.0))
+                assert response.status_code == 200
+                assert response.headers["x-cluster-worker"] != target
+            assert target not in router.available()
+
+            stats = client.get("/cluster/stats").json()
+            assert stats["workers_healthy"] == 2
+            assert stats["workers"][target]["ejections"] == 1
+            assert stats["workers"][target]["errors"] == 2
+            assert stats["requests"] == 6
+            # Solo se consultan las caches de los workers sanos: 1 fallo y 1 acierto
+            assert stats["prediction_cache_hit_rate"] == 0.5
+
+            # Al volver a responder /readyz, el worker regresa con sus claves
+            down.up = True
+            client.portal.call(router.check_all)
+            response = client.post("/api/v1/predict", content=_request(70.0))
+            assert response.headers["x-cluster-worker"] == target
+
+    def test_non_idempotent_requests_are_not_retried(self):
+        """Test que un POST /jobs cortado a mitad no se repite y uno sin conexión sí."""
+        workers = [FakeWorker(f"worker-{i}") for i in range(2)]
+        jobs_calls = []
+        timeout = True
+
+        def handler(worker):
+            def handle(request: httpx.Request) -> httpx.Response:
+                if request.url.path == "/api/v1/jobs":
+                    jobs_calls.append(worker.name)
+                    if timeout:
+                        raise httpx.ReadTimeout("timeout", request=request)
+                    return httpx.Response(202, json={"worker": worker.name})
+                return worker.handler(request)
+            return handle
+
+        endpoints = [
+            WorkerEndpoint(
+                name=w.name,
+                client=httpx.AsyncClient(transport=FakeTransport(w, handler(w)), base_url="http://worker"),
+            )
+            for w in workers
+        ]
+        router = ClusterRouter(endpoints, max_failures=10, health_interval=3600)
+
+        with TestClient(create_app(router)) as client:
+            response = client.post("/api/v1/jobs", content=b"a\n1\n", headers={"Content-Type": "text/csv"})
+            assert response.status_code == 502
+            assert len(jobs_calls) == 1
+
+            # Conexión rechazada: el worker no recibió nada y se prueba el siguiente
+            timeout = False
+            workers[0].up = False
+            for _ in range(2):
+                response = client.post("/api/v1/jobs", content=b"a\n1\n", headers={"Content-Type": "text/csv"})
+                assert response.status_code == 202
+                assert response.json()["worker"] == "worker-1"
+
+    def test_no_workers_returns_503(self):
+        """Test que sin workers sanos el router responde 503 con Retry-After."""
+        worker = FakeWorker("worker-0")
+        worker.up = False
+        router = ClusterRouter([worker.endpoint()], health_interval=3600)
+
+        with TestClient(create_app(router)) as client:
+            response = client.post("/api/v1/predict", content=_request(70.0))
+
+        assert response.status_code == 503
+        assert response.headers["retry-after"] == "1"
+
+    def test_bodies_and_headers_are_streamed_through(self):
+        """Test que las subidas y descargas pasan en streaming con los headers del worker."""
+        worker = FakeWorker("worker-0")
+        uploads = []
+        results = b"prediction\n" + b"Normal_Weight\n" * 1000
+
+        def handle(request: httpx.Request) -> httpx.Response:
+            if request.url.path == "/api/v1/jobs":
+                uploads.append((request.headers.get("transfer-encoding"), request.content))
+                return httpx.Response(202, json={"job_id": "abc"})
+            if request.url.path == "/api/v1/jobs/abc/results":
+                headers = [
+                    ("Content-Type", "text/csv"),
+                    ("Content-Disposition", 'attachment; filename="abc.csv"'),
+                    ("X-Profile-Id", "p1"),
+                    ("Set-Cookie", "a=1"),
+                    ("Set-Cookie", "b=2"),
+                    ("Keep-Alive", "timeout=5"),
+                ]
+                return httpx.Response(200, headers=headers, content=results)
+            return worker.handler(request)
+
+        endpoint = WorkerEndpoint(
+            name=worker.name,
+            client=httpx.AsyncClient(transport=FakeTransport(worker, handle), base_url="http://worker"),
+        )
+        router = ClusterRouter([endpoint], health_interval=3600)
+
+        def chunks():
+            yield b"Age,Weight\n"
+            yield b"21,64\n"
+
+        with TestClient(create_app(router)) as client:
+            response = client.post("/api/v1/jobs", content=chunks())
+            assert response.status_code == 202
+            # El body llega al worker en streaming (chunked), sin pasar entero por el router
+            assert uploads == [("chunked", b"Age,Weight\n21,64\n")]
+
+            download = client.get("/api/v1/jobs/abc/results")
+            assert download.content == results
+            assert download.headers["content-disposition"] == 'attachment; filename="abc.csv"'
+            assert download.headers["x-profile-id"] == "p1"
+            assert download.headers.get_list("set-cookie") == ["a=1", "b=2"]
+            assert "keep-alive" not in download.headers
+            assert download.headers["x-cluster-worker"] == "worker-0"
@@ -0,0 +1,80 @@
+"""
+Tests unitarios para la compresión del modelo.
+"""
+
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from mlops_obesidad.modeling.compress import (
+    choose_candidate,
+    distill_classifier,
+    pareto_front,
+    softmax,
+    truncate_classifier,
+)
+
+
+def _candidate(name, accuracy, latency, size):
+    return {"name": name, "accuracy": accuracy, "row_latency_us": latency, "size_bytes": size}
+
+
+class TestParetoFront:
+    """Tests para la frontera de Pareto y la selección del candidato."""
+
+    def test_dominated_candidates_are_excluded(self):
+        """Test que un candidato peor en todo queda fuera de la frontera."""
+        candidates = [
+            _candidate("original", 0.97, 900, 2000),
+            _candidate("prefix_50", 0.96, 400, 400),
+            _candidate("prefix_60", 0.95, 450, 500),  # dominado por prefix_50
+            _candidate("prefix_10", 0.90, 280, 90),
+        ]
+
+        names = [c["name"] for c in pareto_front(candidates)]
+
+        assert names == ["original", "prefix_50", "prefix_10"]
+
+    def test_choose_respects_accuracy_drop_and_budget(self):
+        """Test que se elige el más rápido dentro de la pérdida de exactitud permitida."""
+        candidates = [
+            _candidate("original", 0.97, 900, 2000),
+            _candidate("prefix_50", 0.965, 400, 400),
+            _candidate("prefix_10", 0.90, 280, 90),
+        ]
+
+        assert choose_candidate(candidates, 0.97, 0.01)["name"] == "prefix_50"
+        assert choose_candidate(candidates, 0.97, 0.1)["name"] == "prefix_10"
+        assert choose_candidate(candidates, 0.97, 0.01, latency_budget_us=300) is None
+
+
+class TestCompressedModels:
+    """Tests para el truncado y la destilación."""
+
+    def test_truncated_classifier_keeps_original(self):
+        """Test que truncar crea un clasificador nuevo con menos rondas."""
+        model_path = Path("models/xgboost_model_artifacts.pkl")
+        if not model_path.exists():
+            pytest.skip("Modelo no encontrado, saltando test")
+
+        from mlops_obesidad.inference import get_model
+
+        classifier = get_model()["model"].named_steps["classifier"]
+        total = classifier.get_booster().num_boosted_rounds()
+
+        truncated = truncate_classifier(classifier, 20)
+
+        assert truncated.get_booster().num_boosted_rounds() == 20
+        assert classifier.get_booster().num_boosted_rounds() == total
+
+    def test_distilled_student_matches_soft_labels(self):
+        """Test que el alumno aprende la clase más probable del maestro."""
+        rng = np.random.default_rng(0)
+        features = rng.normal(size=(300, 4)).astype(np.float32)
+        teacher = softmax(np.column_stack([3 * features[:, 0], -3 * features[:, 0], features[:, 1]]))
+
+        student = distill_classifier(features, teacher, max_depth=2, n_estimators=30)
+
+        agreement = (student.predict(features) == teacher.argmax(axis=1)).mean()
+        assert agreement > 0.9
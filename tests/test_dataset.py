@@ -0,0 +1,62 @@
+"""
+Tests unitarios para la eliminación de duplicados por streaming.
+"""
+
+import pandas as pd
+import pytest
+
+from mlops_obesidad.dataset import deduplicate_csv
+from mlops_obesidad.preprocessing.transformers import DataCleanerTransformer
+
+ROWS = [
+    ["Female", "21", "1.62", "Sometimes"],
+    ["Female", "21.0", "1.62", "Sometimes"],  # duplicado exacto al leer con pandas
+    [" Female ", "21", "1.62", "Sometimes"],  # duplicado solo tras recortar espacios
+    ["Male", "23", "1.80", "NA"],
+    ["Male", "23", "1.80", ""],  # nulos equivalentes para read_csv
+    ["Male", "23", "1.80", "n/A"],  # alias de nulo de DataCleanerTransformer
+    ["Male", "24", "1.80", "no"],
+]
+
+
+class TestStreamingDedup:
+    """Tests para `deduplicate_csv`."""
+
+    @pytest.fixture
+    def raw_csv(self, tmp_path):
+        path = tmp_path / "raw.csv"
+        pd.DataFrame(ROWS * 3, columns=["Gender", "Age", "Height", "CAEC"]).to_csv(
+            path, sep=";", index=False
+        )
+        return path
+
+    @pytest.mark.parametrize("memory_limit_mb", [256, 0.0001])
+    def test_counts_match_pandas(self, raw_csv, tmp_path, memory_limit_mb):
+        """Test que los conteos coinciden con pandas, con y sin volcado a disco."""
+        df = pd.read_csv(raw_csv, sep=None, engine="python")
+        cleaned = DataCleanerTransformer().fit(df).transform(df)
+        output = tmp_path / "dedup.csv"
+
+        report = deduplicate_csv(
+            raw_csv, output, chunksize=4, memory_limit_mb=memory_limit_mb, n_partitions=4
+        )
+
+        assert report["exact_duplicates"] == df.duplicated().sum()
+        assert report["duplicates_dropped"] == cleaned.duplicated().sum()
+        assert (report["spills"] > 0) == (memory_limit_mb < 1)
+        pd.testing.assert_frame_equal(
+            pd.read_csv(output), df[~cleaned.duplicated()].reset_index(drop=True),
+            check_dtype=False,
+        )
+
+    def test_exact_mode_matches_drop_duplicates(self, raw_csv, tmp_path):
+        """Test que sin normalización el resultado es el de `drop_duplicates()`."""
+        df = pd.read_csv(raw_csv, sep=None, engine="python")
+        output = tmp_path / "dedup.csv"
+
+        report = deduplicate_csv(raw_csv, output, chunksize=5, normalize=False)
+
+        assert report["duplicates_dropped"] == report["exact_duplicates"]
+        pd.testing.assert_frame_equal(
+            pd.read_csv(output), df.drop_duplicates().reset_index(drop=True), check_dtype=False
+        )
@@ -0,0 +1,132 @@
+"""
+Tests unitarios para el reporte batch de drift.
+"""
+
+import json
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from mlops_obesidad.monitoring.drift_report import (
+    _binned_auc,
+    accumulate,
+    iter_chunks,
+    json_safe,
+    numeric_edges,
+    render_html,
+    run_drift_report,
+)
+
+
+def _make_dataset(n=300, weight_shift=0.0, seed=0):
+    """Genera un dataset sintético con las 16 features en formato crudo."""
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'Gender': rng.choice(['Female', 'Male'], n),
+        'Age': rng.normal(24, 5, n),
+        'Height': rng.normal(1.70, 0.09, n),
+        'Weight': rng.normal(85, 20, n) + weight_shift,
+        'family_history_with_overweight': rng.choice(['yes', 'no'], n),
+        'FAVC': rng.choice(['yes', 'no'], n),
+        'FCVC': rng.uniform(1, 3, n),
+        'NCP': rng.uniform(1, 4, n),
+        'CAEC': rng.choice(['no', 'Sometimes', 'Frequently'], n),
+        'SMOKE': rng.choice(['yes', 'no'], n),
+        'CH2O': rng.uniform(1, 3, n),
+        'SCC': rng.choice(['yes', 'no'], n),
+        'FAF': rng.uniform(0, 3, n),
+        'TUE': rng.uniform(0, 2, n),
+        'CALC': rng.choice(['no', 'Sometimes'], n),
+        'MTRANS': rng.choice(['Public_Transportation', 'Automobile'], n),
+    })
+
+
+class TestChunkedAccumulation:
+    """Tests para la acumulación incremental por chunks."""
+
+    def test_chunked_equals_single_pass(self, tmp_path):
+        """Test que el resultado no depende del tamaño de chunk."""
+        path = tmp_path / 'data.csv'
+        _make_dataset().to_csv(path, index=False)
+        edges = numeric_edges(50)
+
+        small = accumulate(path, edges, 0, chunksize=7)
+        full = accumulate(path, edges, 0, chunksize=10_000)
+
+        assert small['n_rows'] == full['n_rows'] == 300
+        for col in edges:
+            assert np.array_equal(small['numeric'][col], full['numeric'][col])
+        assert small['categorical']['Gender'] == full['categorical']['Gender']
+
+    def test_parquet_without_pyarrow_fails_clearly(self, tmp_path, monkeypatch):
+        """Test que sin pyarrow leer Parquet falla con un mensaje que dice qué instalar."""
+        monkeypatch.setitem(sys.modules, 'pyarrow.parquet', None)
+        with pytest.raises(ImportError, match='pip install pyarrow'):
+            next(iter_chunks(tmp_path / 'data.parquet', 10))
+
+    def test_jsonl_audit_log_with_nested_requests(self, tmp_path):
+        """Test que se leen logs JSONL con las features bajo la clave 'request'."""
+        path = tmp_path / 'audit.jsonl'
+        rows = _make_dataset(n=5).to_dict(orient='records')
+        with open(path, 'w') as f:
+            for row in rows:
+                f.write(json.dumps({'request': row, 'prediction': 'Normal_Weight'}) + '\n')
+
+        chunks = list(iter_chunks(path, chunksize=2))
+
+        assert sum(len(c) for c in chunks) == 5
+        assert 'Weight' in chunks[0].columns
+        assert 'prediction' in chunks[0].columns
+
+
+class TestMetrics:
+    """Tests para las métricas calculadas en streaming."""
+
+    def test_binned_auc_matches_exact(self):
+        """Test que el ROC-AUC por histogramas aproxima el exacto."""
+        from sklearn.metrics import roc_auc_score
+
+        rng = np.random.default_rng(0)
+        y = rng.integers(0, 2, 2000)
+        scores = np.clip(rng.normal(0.4 + 0.2 * y, 0.15), 0, 0.999)
+        bins = (scores * 1000).astype(int)
+
+        pos = np.bincount(bins[y == 1], minlength=1000)
+        neg = np.bincount(bins[y == 0], minlength=1000)
+
+        assert _binned_auc(pos, neg) == pytest.approx(roc_auc_score(y, scores), abs=1e-3)
+
+
+class TestDriftReport:
+    """Tests del reporte completo."""
+
+    def test_report_detects_shift(self, tmp_path):
+        """Test que el reporte marca drift en la variable desplazada."""
+        ref_path = tmp_path / 'ref.csv'
+        cur_path = tmp_path / 'cur.csv'
+        _make_dataset(seed=1).to_csv(ref_path, index=False)
+        _make_dataset(weight_shift=40.0, seed=2).to_csv(cur_path, index=False)
+
+        report = run_drift_report(ref_path, cur_path, chunksize=64)
+
+        assert report['reference_rows'] == 300
+        assert 'Weight' in report['drifted_features']
+        assert report['performance']['reference'] is None
+        assert '<table>' in render_html(report)
+
+    def test_missing_columns_and_nan_are_serializable(self, tmp_path):
+        """Test que una columna ausente en el dataset actual no rompe los tests y el JSON es estricto."""
+        ref_path = tmp_path / 'ref.csv'
+        cur_path = tmp_path / 'cur.csv'
+        _make_dataset(seed=1).to_csv(ref_path, index=False)
+        _make_dataset(seed=2).drop(columns=['CALC', 'Age']).to_csv(cur_path, index=False)
+
+        report = run_drift_report(ref_path, cur_path, chunksize=64)
+
+        assert report['features']['CALC']['p_value'] == 1.0
+        assert report['features']['Age']['p_value'] == 1.0
+        report['features']['Age']['psi'] = float('nan')
+        assert json.loads(json.dumps(json_safe(report), allow_nan=False))['features']['Age']['psi'] is None
+        assert json_safe({'a': [float('inf'), 1.0], 'b': (2, float('nan'))}) == {'a': [None, 1.0], 'b': [2, None]}
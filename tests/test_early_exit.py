@@ -0,0 +1,157 @@
+"""
+Tests unitarios para la predicción con salida temprana.
+"""
+
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from API.schemas import PredictionRequest
+from mlops_obesidad.config import FEATURE_COLUMNS
+from mlops_obesidad.inference import early_exit as early_exit_module
+from mlops_obesidad.inference import predictor
+from mlops_obesidad.inference.cache import prediction_cache
+from mlops_obesidad.inference.early_exit import EarlyExitBooster, load_early_exit
+from mlops_obesidad.modeling.early_exit_calibration import (
+    calibrate_early_exit,
+    lead_shrinkage,
+    remaining_leaf_bounds,
+    stage_boundaries,
+    staged_margins,
+)
+
+EXAMPLE = PredictionRequest.model_config["json_schema_extra"]["example"]
+CLASSES = ["Normal_Weight", "Obesity_Type_I", "Overweight_Level_I"]
+
+
+class Encoder:
+    classes_ = np.array(CLASSES)
+
+    def inverse_transform(self, codes):
+        return self.classes_[codes]
+
+
+@pytest.fixture(scope="module")
+def artifacts():
+    """Pipeline chico (BMI y edad -> XGBoost) entrenado sobre datos sintéticos."""
+    from sklearn.pipeline import Pipeline
+    from sklearn.preprocessing import FunctionTransformer
+    from xgboost import XGBClassifier
+
+    rng = np.random.default_rng(0)
+    n = 400
+    X = pd.DataFrame([EXAMPLE] * n)[FEATURE_COLUMNS]
+    X["Height"] = rng.uniform(1.5, 1.95, n)
+    X["Weight"] = rng.uniform(45, 130, n)
+    X["Age"] = rng.uniform(16, 60, n)
+    bmi = X["Weight"] / X["Height"] ** 2 + rng.normal(0, 0.7, n)
+    y = np.select([bmi < 25, bmi < 30], [0, 2], 1)
+
+    def features(df: pd.DataFrame) -> np.ndarray:
+        return np.column_stack([df["Weight"] / df["Height"] ** 2, df["Age"]]).astype(np.float32)
+
+    model = Pipeline(
+        [
+            ("features", FunctionTransformer(features)),
+            ("classifier", XGBClassifier(n_estimators=60, max_depth=3, learning_rate=0.3, n_jobs=1)),
+        ]
+    ).fit(X, y)
+    return {"model": model, "label_encoder": Encoder()}, X
+
+
+@pytest.fixture(scope="module")
+def config(artifacts):
+    artifacts, X = artifacts
+    model = artifacts["model"]
+    return calibrate_early_exit(model[-1].get_booster(), model[:-1].transform(X), CLASSES, stage_rounds=10)
+
+
+class TestCalibration:
+    """Tests para las cotas y los umbrales de cada etapa."""
+
+    def test_staged_margins_and_bounds(self, artifacts):
+        """Test que los márgenes por etapas suman el ensamble y las cotas lo contienen."""
+        artifacts, X = artifacts
+        model = artifacts["model"]
+        booster = model[-1].get_booster()
+        features = model[:-1].transform(X)
+        boundaries = stage_boundaries(booster.num_boosted_rounds(), 25)
+        assert boundaries == [25, 50, 60]
+
+        margins = staged_margins(booster, features, boundaries)
+        full = booster.inplace_predict(features, predict_type="margin")
+        assert np.allclose(margins[-1], full, atol=1e-5)
+
+        lower, upper = remaining_leaf_bounds(booster, boundaries, len(CLASSES))
+        remaining = margins[-1] - margins[:-1]
+        assert np.all(remaining >= lower[:, None, :] - 1e-5)
+        assert np.all(remaining <= upper[:, None, :] + 1e-5)
+
+        shrinkage = lead_shrinkage(margins)
+        assert shrinkage.shape == (2, len(X))
+
+    def test_zero_tolerance_keeps_train_predictions(self, artifacts, config):
+        """Test que con tolerancia 0 las filas de calibración conservan la clase del modelo completo."""
+        artifacts, X = artifacts
+        model = artifacts["model"]
+        early_exit = EarlyExitBooster(json.loads(json.dumps(config)), model)
+        features = model[:-1].transform(X)
+
+        margin, rounds = early_exit.predict_margin(features)
+        full = model[-1].get_booster().inplace_predict(features, predict_type="margin")
+
+        assert np.array_equal(margin.argmax(axis=1), full.argmax(axis=1))
+        assert rounds.mean() < early_exit.n_rounds
+        assert set(rounds) <= set(early_exit.stage_rounds)
+
+
+class TestEarlyExitPrediction:
+    """Tests para la salida temprana en el predictor."""
+
+    @pytest.fixture
+    def loaded(self, artifacts, config, tmp_path, monkeypatch):
+        artifacts, _ = artifacts
+        monkeypatch.setattr(predictor, "get_model", lambda: artifacts)
+        path = tmp_path / "early_exit.json"
+        path.write_text(json.dumps(config))
+        monkeypatch.setattr(early_exit_module, "_early_exit", None)
+        early_exit = load_early_exit(artifacts, path)
+        assert early_exit is not None
+        prediction_cache.clear()
+        yield artifacts, early_exit
+        prediction_cache.clear()
+
+    def test_predictor_uses_staged_ensemble(self, loaded):
+        """Test que el predictor evalúa por etapas y registra la fracción de árboles."""
+        artifacts, early_exit = loaded
+        weights = [50.0, 70.0, 80.0, 95.0, 125.0]
+        requests = [PredictionRequest(**{**EXAMPLE, "Height": 1.75, "Weight": w}) for w in weights]
+
+        results = predictor.predict_batch(requests)
+
+        full = artifacts["model"].predict_proba(predictor.requests_to_dataframe(requests))
+        assert [label for label, _, _ in results] == list(np.array(CLASSES)[full.argmax(axis=1)])
+        for _, proba, probabilities in results:
+            assert proba.sum() == pytest.approx(1.0, abs=1e-5)
+            assert list(probabilities) == CLASSES
+
+        label, _, _ = predictor.predict_single(PredictionRequest(**{**EXAMPLE, "Height": 1.75, "Weight": 51.0}))
+        assert label == "Normal_Weight"
+
+        stats = early_exit.stats()
+        assert stats["rows"] == len(weights) + 1
+        assert sum(stats["exits_by_stage"]) == stats["rows"]
+        assert 0 < stats["mean_tree_fraction"] <= 1
+
+    def test_thresholds_of_other_model_are_not_loaded(self, artifacts, config, tmp_path, monkeypatch):
+        """Test que umbrales calibrados para otro ensamble dejan el modo desactivado."""
+        artifacts, _ = artifacts
+        path = tmp_path / "early_exit.json"
+        path.write_text(json.dumps({**config, "n_rounds": config["n_rounds"] + 10}))
+        monkeypatch.setattr(early_exit_module, "_early_exit", None)
+
+        assert load_early_exit(artifacts, path) is None
+        assert early_exit_module.get_early_exit() is None
+        assert load_early_exit(artifacts, tmp_path / "missing.json") is None
@@ -0,0 +1,164 @@
+"""
+Tests unitarios para el reporte global de explicaciones.
+"""
+
+import itertools
+import pickle
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.compose import ColumnTransformer
+from sklearn.impute import SimpleImputer
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import LabelEncoder, OneHotEncoder, RobustScaler
+
+from API.schemas import PredictionRequest
+from mlops_obesidad.config import CATEGORICAL_FEATURES, FEATURE_COLUMNS, NUMERIC_FEATURES
+from mlops_obesidad.inference.explainer import explain_dataframe
+from mlops_obesidad.modeling import explain_report
+from mlops_obesidad.modeling.explain_report import (
+    accumulate,
+    explain_dataset,
+    partial_dependence,
+)
+from mlops_obesidad.preprocessing.transformers import DataCleanerTransformer
+
+xgb = pytest.importorskip("xgboost")
+
+EXAMPLE = PredictionRequest.model_config["json_schema_extra"]["example"]
+WEIGHTS = [48.0, 61.0, 70.0, 83.0, 95.0, 108.0, 120.0]
+HEIGHTS = [1.52, 1.64, 1.75, 1.88]
+
+
+@pytest.fixture(scope="module")
+def dataset():
+    """
+    Producto cartesiano de Weight, Height, Gender y FAF (features
+    independientes), con una de cada tres filas repetida para ejercitar el dedup.
+    """
+    grid = itertools.product(WEIGHTS, HEIGHTS, ["Female", "Male"], [0.0, 1.0, 2.0])
+    df = pd.DataFrame([EXAMPLE] * (len(WEIGHTS) * len(HEIGHTS) * 6))
+    df[["Weight", "Height", "Gender", "FAF"]] = pd.DataFrame(list(grid))
+    df = df.loc[df.index.repeat(1 + (df.index % 3 == 0))].reset_index(drop=True)
+
+    bmi = df["Weight"] / df["Height"] ** 2 - df["FAF"] + (df["Gender"] == "Male") * 2
+    labels = np.select([bmi < 25, bmi < 32], ["Normal_Weight", "Overweight_Level_I"], "Obesity_Type_I")
+    return df, labels
+
+
+@pytest.fixture(scope="module")
+def artifacts(dataset):
+    """Pipeline con la misma estructura que el modelo productivo."""
+    df, labels = dataset
+    preprocessor = ColumnTransformer(
+        [
+            ("num", Pipeline([
+                ("imputer", SimpleImputer(strategy="constant", fill_value=-20)),
+                ("scaler", RobustScaler()),
+            ]), NUMERIC_FEATURES),
+            ("cat", Pipeline([
+                ("imputer", SimpleImputer(strategy="constant", fill_value="Missing")),
+                ("onehot", OneHotEncoder(drop="first", handle_unknown="ignore", sparse_output=False)),
+            ]), CATEGORICAL_FEATURES),
+        ]
+    )
+    encoder = LabelEncoder().fit(labels)
+    model = Pipeline(
+        [
+            ("cleaner", DataCleanerTransformer()),
+            ("preprocessor", preprocessor),
+            ("classifier", xgb.XGBClassifier(n_estimators=15, max_depth=3, n_jobs=1)),
+        ]
+    )
+    model.fit(df[FEATURE_COLUMNS], encoder.transform(labels))
+    return {"model": model, "label_encoder": encoder}
+
+
+@pytest.fixture
+def data_path(dataset, tmp_path):
+    path = tmp_path / "data.csv"
+    dataset[0].to_csv(path, index=False)
+    return path
+
+
+@pytest.fixture
+def worker_model(artifacts, monkeypatch):
+    """Modelo sintético en lugar del artefacto que cargaría el worker."""
+    monkeypatch.setattr(explain_report, "_worker_artifacts", artifacts)
+
+
+def _margins(artifacts, df: pd.DataFrame) -> np.ndarray:
+    model = artifacts["model"]
+    features = np.asarray(model[:-1].transform(df[FEATURE_COLUMNS]))
+    booster = model.named_steps["classifier"].get_booster()
+    return booster.predict(xgb.DMatrix(features), output_margin=True)
+
+
+class TestAggregation:
+    """Tests para las contribuciones acumuladas por chunks."""
+
+    def test_chunked_importance_matches_direct(self, dataset, data_path, artifacts, worker_model):
+        """Test que los chunks con filas deduplicadas dan la misma media de |contribución|."""
+        df, _ = dataset
+        total = accumulate(data_path, chunksize=50)
+
+        _, contribs, _ = explain_dataframe(artifacts["model"], df[FEATURE_COLUMNS])
+        assert total["n_rows"] == len(df)
+        assert total["n_unique"] < len(df)
+        assert np.allclose(total["abs_sum"] / len(df), np.abs(contribs).mean(axis=0), atol=1e-5)
+        assert np.allclose(total["signed_sum"] / len(df), contribs.mean(axis=0), atol=1e-5)
+        # Cada árbol reparte todas las filas entre sus hojas
+        assert (total["leaf_counts"].sum(axis=1) == len(df)).all()
+
+
+class TestPartialDependence:
+    """Tests para la dependencia parcial por recorrido de los árboles."""
+
+    def test_matches_brute_force_on_independent_features(
+        self, dataset, data_path, artifacts, worker_model
+    ):
+        """Test que con features independientes coincide con promediar el margen reemplazando la feature."""
+        df, _ = dataset
+        total = accumulate(data_path, chunksize=50)
+        grids = {"Weight": WEIGHTS, "Gender": ["Female", "Male"]}
+
+        result = partial_dependence(artifacts, total, grids)
+
+        classes = list(artifacts["label_encoder"].classes_)
+        for feature, grid in grids.items():
+            expected = np.array([_margins(artifacts, df.assign(**{feature: v})).mean(axis=0) for v in grid])
+            curves = np.column_stack([result[feature]["margin"][name] for name in classes])
+            assert result[feature]["grid"] == grid
+            assert np.allclose(curves, expected, atol=1e-4)
+
+
+class TestExplainDataset:
+    """Tests para el reporte completo y su cache."""
+
+    def test_rerun_reads_cache(self, data_path, artifacts, tmp_path, monkeypatch):
+        """Test que una segunda corrida sobre el mismo modelo y dataset no recorre los datos."""
+        model_path = tmp_path / "model.pkl"
+        with open(model_path, "wb") as f:
+            pickle.dump(artifacts, f)
+        output_dir = tmp_path / "report"
+
+        first = explain_dataset(data_path, output_dir, model_path, chunksize=64, grid_points=5)
+        assert not first["cached"]
+        assert list(first["importance"])[0] in {"Weight", "Height"}
+        assert len(first["partial_dependence"]["Weight"]["grid"]) == 5
+        assert (output_dir / "importance.png").exists()
+
+        def fail(*args, **kwargs):
+            raise AssertionError("el dataset no debería volver a recorrerse")
+
+        monkeypatch.setattr(explain_report, "accumulate", fail)
+        (output_dir / "partial_dependence.png").unlink()
+        second = explain_dataset(data_path, output_dir, model_path, chunksize=64, grid_points=5)
+
+        assert second["cached"]
+        assert second["importance"] == first["importance"]
+        assert (output_dir / "partial_dependence.png").exists()
+        # Otros parámetros no reutilizan el reporte
+        with pytest.raises(AssertionError):
+            explain_dataset(data_path, output_dir, model_path, approx=True, grid_points=5)
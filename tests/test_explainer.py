@@ -0,0 +1,91 @@
+"""
+Tests unitarios para las explicaciones y la cache de inferencia.
+"""
+
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from mlops_obesidad.config import FEATURE_COLUMNS
+from mlops_obesidad.inference.cache import LRUCache, request_key
+from mlops_obesidad.inference.explainer import original_feature
+from API.schemas import PredictionRequest, Gender, YesNo, CAEC, CALC, MTRANS
+
+
+def _request(weight=64.0):
+    """Request de ejemplo."""
+    return PredictionRequest(
+        Gender=Gender.FEMALE,
+        Age=21.0,
+        Height=1.62,
+        Weight=weight,
+        family_history_with_overweight=YesNo.YES,
+        FAVC=YesNo.NO,
+        FCVC=2.0,
+        NCP=3.0,
+        CAEC=CAEC.SOMETIMES,
+        SMOKE=YesNo.NO,
+        CH2O=2.0,
+        SCC=YesNo.NO,
+        FAF=0.0,
+        TUE=1.0,
+        CALC=CALC.NO,
+        MTRANS=MTRANS.PUBLIC_TRANSPORTATION
+    )
+
+
+class TestCache:
+    """Tests para la cache de inferencia."""
+
+    def test_request_key_is_canonical(self):
+        """Test que requests con los mismos datos comparten clave."""
+        assert request_key(_request()) == request_key(_request())
+        assert request_key(_request()) != request_key(_request(weight=65.0))
+        assert request_key(_request())[0] == 'Female'
+
+    def test_lru_evicts_least_recently_used(self):
+        """Test que la cache descarta la entrada menos usada."""
+        cache = LRUCache(maxsize=2)
+        cache.put('a', 1)
+        cache.put('b', 2)
+        cache.get('a')
+        cache.put('c', 3)
+
+        assert cache.get('b') is None
+        assert cache.get('a') == 1
+        assert cache.stats()['size'] == 2
+
+
+class TestExplainer:
+    """Tests para el explicador con contribuciones nativas."""
+
+    def test_original_feature_mapping(self):
+        """Test que las columnas transformadas se mapean a su feature original."""
+        assert original_feature('num__Age') == 'Age'
+        assert original_feature('cat__CAEC_Sometimes') == 'CAEC'
+        assert original_feature('cat__family_history_with_overweight_yes') == (
+            'family_history_with_overweight'
+        )
+        assert original_feature('cat__MTRANS_Public_Transportation') == 'MTRANS'
+        with pytest.raises(ValueError):
+            original_feature('cat__Unknown_x')
+
+    def test_contributions_add_up_to_prediction(self):
+        """Test que sesgo + contribuciones reproduce las probabilidades del modelo."""
+        if not Path("models/xgboost_model_artifacts.pkl").exists():
+            pytest.skip("Modelo no encontrado, saltando test")
+
+        from mlops_obesidad.inference import explain_batch, predict_batch
+
+        requests = [_request(), _request(weight=110.0)]
+        explanations = explain_batch(requests)
+        predictions = predict_batch(requests)
+
+        for (proba, contribs, bias), (_, model_proba, _) in zip(explanations, predictions):
+            assert contribs.shape == (7, len(FEATURE_COLUMNS))
+            margins = contribs.sum(axis=1) + bias
+            softmax = np.exp(margins - margins.max())
+            softmax /= softmax.sum()
+            assert np.allclose(softmax, proba, atol=1e-5)
+            assert np.allclose(proba, model_proba, atol=1e-5)
@@ -0,0 +1,100 @@
+"""
+Tests unitarios para el circuit breaker del modelo y el modo degradado.
+"""
+
+from types import SimpleNamespace
+
+import pandas as pd
+import pytest
+
+from mlops_obesidad.config import INTERIM_DATA_DIR, TARGET
+from mlops_obesidad.inference.fallback import CircuitBreaker, FallbackTable
+from mlops_obesidad.modeling.fallback_table import build_fallback_table
+
+
+class TestCircuitBreaker:
+    """Tests para el circuit breaker."""
+
+    def test_opens_after_threshold_and_half_opens(self, monkeypatch):
+        """Test que el circuito se abre tras N fallos y permite un intento al vencer el backoff."""
+        now = [100.0]
+        monkeypatch.setattr("mlops_obesidad.inference.fallback.time.monotonic", lambda: now[0])
+        breaker = CircuitBreaker(failure_threshold=2, backoff=10.0)
+
+        breaker.record_failure()
+        assert breaker.allow()
+        breaker.record_failure()
+        assert breaker.state == "open"
+        assert not breaker.allow()
+        assert breaker.retry_after() == 10.0
+
+        now[0] += 10.0
+        assert breaker.allow()  # intento semiabierto
+        assert not breaker.allow()  # solo uno a la vez
+
+        # El intento falla: se reabre con el doble de backoff
+        breaker.record_failure()
+        assert breaker.retry_after() == 20.0
+
+        now[0] += 20.0
+        assert breaker.allow()
+        breaker.record_success()
+        assert breaker.state == "closed"
+        assert breaker.allow()
+
+
+class TestFallbackTable:
+    """Tests para la tabla precalculada del modo degradado."""
+
+    def _table(self):
+        path = INTERIM_DATA_DIR / "obesity_clean_raw.csv"
+        if not path.exists():
+            pytest.skip("Datos de entrenamiento no encontrados, saltando test")
+        return build_fallback_table(pd.read_csv(path))
+
+    def test_lookup_is_deterministic_and_normalized(self):
+        """Test que la tabla devuelve siempre las mismas probabilidades y suman 1."""
+        table = FallbackTable(self._table())
+        request = SimpleNamespace(
+            Height=1.62, Weight=55.0, Gender="Female", family_history_with_overweight="yes"
+        )
+
+        label, probabilities = table.lookup(request)
+
+        assert (label, probabilities) == table.lookup(request)
+        assert label == "Normal_Weight"
+        assert sum(probabilities.values()) == pytest.approx(1.0, abs=1e-4)
+
+    def test_sparse_cells_fall_back_to_bmi_bin(self):
+        """Test que una combinación sin celda usa la distribución del bin de BMI."""
+        table = FallbackTable(self._table())
+        request = SimpleNamespace(
+            Height=1.60, Weight=150.0, Gender="Unknown", family_history_with_overweight="yes"
+        )
+
+        label, _ = table.lookup(request)
+
+        assert label == "Obesity_Type_III"
+
+
+class TestDegradedPredictions:
+    """Tests del modo degradado en los servicios de la API."""
+
+    def test_records_are_flagged_when_model_is_unavailable(self, monkeypatch):
+        """Test que, con el circuito abierto, las respuestas vienen de la tabla y se marcan."""
+        from API import services
+        from API.schemas import PredictionRequest
+
+        if services.get_fallback_table() is None:
+            pytest.skip("Tabla de fallback no encontrada, saltando test")
+
+        breaker = CircuitBreaker(failure_threshold=1, backoff=60.0)
+        breaker.record_failure()
+        monkeypatch.setattr("mlops_obesidad.inference.model_loader.model_breaker", breaker)
+        monkeypatch.setattr(services, "model_breaker", breaker)
+
+        example = PredictionRequest.model_json_schema()["example"]
+        record = services.predict_records([PredictionRequest(**{**example, "Weight": 55.0})])[0]
+
+        assert record["degraded"] is True
+        assert record["prediction"] == "Normal_Weight"
@@ -0,0 +1,85 @@
+"""
+Tests unitarios para el calentamiento del modelo y los endpoints de health.
+"""
+
+from fastapi.testclient import TestClient
+
+from mlops_obesidad.inference import warmup
+from mlops_obesidad.inference.warmup import representative_requests
+
+
+class TestRepresentativeRequests:
+    """Tests para el lote de calentamiento generado desde el perfil de referencia."""
+
+    PROFILE = {
+        "numeric": {"Age": {"edges": [18.0, 20.0, 30.0], "counts": [0, 10, 0, 0]}},
+        "categorical": {"Gender": {"Female": 0, "Male": 5}},
+    }
+
+    def test_follows_profile_distribution(self):
+        """Test que los valores respetan los bins y frecuencias del perfil."""
+        requests = representative_requests(20, profile=self.PROFILE)
+
+        assert all(18.0 <= r.Age <= 20.0 for r in requests)
+        assert {r.Gender.value for r in requests} == {"Male"}
+
+    def test_deterministic(self):
+        """Test que la misma semilla genera el mismo lote."""
+        first = representative_requests(5, profile=self.PROFILE, seed=3)
+        second = representative_requests(5, profile=self.PROFILE, seed=3)
+
+        assert [r.Age for r in first] == [r.Age for r in second]
+
+
+class TestHealthEndpoints:
+    """Tests de /healthz y /readyz."""
+
+    def test_liveness_and_readiness(self, monkeypatch):
+        """Test que /readyz reporta 503 hasta que el modelo está cargado y calentado."""
+        from API.main import app
+        from mlops_obesidad.inference import model_loader
+
+        client = TestClient(app)
+        monkeypatch.setitem(warmup._warmup_state, "done", False)
+        monkeypatch.setattr(model_loader, "_model_artifacts", {"model": None})
+
+        assert client.get("/healthz").json() == {"status": "ok"}
+        response = client.get("/readyz")
+        assert response.status_code == 503
+        assert response.json()["checks"] == {
+            "model_loaded": True, "warmed_up": False, "queue_available": True,
+        }
+
+        monkeypatch.setitem(warmup._warmup_state, "done", True)
+        assert client.get("/readyz").status_code == 200
+
+        monkeypatch.setattr(app.state.admission, "max_queue", 0)
+        assert client.get("/readyz").json()["checks"]["queue_available"] is False
+
+    def test_startup_warms_up_after_loading_stages(self, monkeypatch):
+        """Test que el calentamiento corre después de cargar la cascada y la salida temprana."""
+        import asyncio
+        from types import SimpleNamespace
+
+        from API import jobs, main
+        from mlops_obesidad import inference, monitoring
+
+        calls = []
+        encoder = SimpleNamespace(classes_=["A", "B"])
+        monkeypatch.setattr(main, "CASCADE_ENABLED", True)
+        monkeypatch.setattr(main, "EARLY_EXIT_ENABLED", True)
+        monkeypatch.setattr(jobs, "JOBS_DISPATCHER", False)
+        monkeypatch.setattr(inference, "load_model", lambda: calls.append("model"))
+        monkeypatch.setattr(inference, "is_model_loaded", lambda: True)
+        monkeypatch.setattr(inference, "get_model", lambda: {"label_encoder": encoder})
+        monkeypatch.setattr(inference, "load_fallback_table", lambda: None)
+        monkeypatch.setattr(
+            inference, "load_cascade_stage", lambda classes: calls.append("cascade")
+        )
+        monkeypatch.setattr(inference, "load_early_exit", lambda: calls.append("early_exit"))
+        monkeypatch.setattr(inference, "warm_up", lambda n_rows: calls.append("warm_up"))
+        monkeypatch.setattr(monitoring, "init_drift_monitor", lambda profile: None)
+
+        asyncio.run(main.startup_event())
+
+        assert calls == ["model", "cascade", "early_exit", "warm_up"]
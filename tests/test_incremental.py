@@ -0,0 +1,68 @@
+"""
+Tests unitarios para la actualización incremental del modelo.
+"""
+
+import numpy as np
+import pandas as pd
+
+from mlops_obesidad.modeling.incremental import (
+    continue_boosting,
+    drop_holdout_rows,
+    next_version_path,
+    passes_gate,
+)
+
+
+class TestContinueBoosting:
+    """Tests para la continuación del boosting sobre datos nuevos."""
+
+    def test_adds_rounds_and_keeps_previous_trees(self):
+        """Test que se agregan rondas sin modificar los árboles existentes, aunque falte una clase."""
+        from xgboost import XGBClassifier
+
+        rng = np.random.default_rng(0)
+        X = rng.normal(size=(150, 4)).astype(np.float32)
+        y = np.arange(150) % 3
+        classifier = XGBClassifier(n_estimators=5, max_depth=2, random_state=42).fit(X, y)
+
+        # Lote nuevo sin ejemplos de la clase 2
+        updated = continue_boosting(classifier, X[y < 2], y[y < 2], rounds=3, learning_rate=0.05)
+
+        assert updated.get_booster().num_boosted_rounds() == 8
+        assert classifier.get_booster().num_boosted_rounds() == 5
+        np.testing.assert_allclose(
+            updated.get_booster().inplace_predict(X, iteration_range=(0, 5)),
+            classifier.get_booster().inplace_predict(X),
+        )
+        assert updated.predict_proba(X).shape == (150, 3)
+
+
+class TestGateAndVersioning:
+    """Tests para la validación contra el holdout y el versionado del artefacto."""
+
+    def test_gate_rejects_worse_metrics(self):
+        """Test que el candidato se rechaza si pierde exactitud o empeora la log-loss."""
+        baseline = {"accuracy": 0.97, "log_loss": 0.060}
+
+        assert passes_gate(baseline, {"accuracy": 0.968, "log_loss": 0.061}, 0.005, 0.02)[0]
+        accepted, reasons = passes_gate(baseline, {"accuracy": 0.95, "log_loss": 0.070}, 0.005, 0.02)
+        assert not accepted and len(reasons) == 2
+
+    def test_next_version_skips_existing(self, tmp_path):
+        """Test que la versión sigue a la del padre y no sobrescribe artefactos existentes."""
+        assert next_version_path({}, tmp_path)[0] == 2
+
+        (tmp_path / "xgboost_model_artifacts_v4.pkl").touch()
+        version, path = next_version_path({"incremental": {"version": 3}}, tmp_path)
+        assert version == 5 and path.name == "xgboost_model_artifacts_v5.pkl"
+
+    def test_drop_holdout_rows(self):
+        """Test que las filas del holdout no se usan para entrenar."""
+        holdout = pd.DataFrame({"Age": [21.0, 30.0], "NObeyesdad": ["Normal_Weight", "Obesity_Type_I"]})
+        data = pd.DataFrame(
+            {"Age": [21.0, 22.0, 30.0], "NObeyesdad": ["Normal_Weight", "Normal_Weight", "Obesity_Type_I"]}
+        )
+
+        kept, dropped = drop_holdout_rows(data, holdout)
+
+        assert dropped == 2 and kept["Age"].tolist() == [22.0]
@@ -0,0 +1,267 @@
+"""
+Tests unitarios para los jobs asíncronos de predicción.
+"""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import gzip
+import io
+import threading
+import time
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+import numpy as np
+import pandas as pd
+import pytest
+
+from API import jobs, routers
+from API.jobs import CANCELLED, FAILED, QUEUED, SUCCEEDED, JobError, JobManager, run_job
+from API.schemas import PredictionRequest
+
+EXAMPLE = PredictionRequest.model_config["json_schema_extra"]["example"]
+CLASSES = np.array(["Normal_Weight", "Obesity_Type_I", "Overweight_Level_I"])
+
+
+class FakeModel:
+    """Modelo simulado: la clase depende del peso; puede fallar a partir de una llamada."""
+
+    def __init__(self, fail_after: int = None):
+        self.calls = 0
+        self.fail_after = fail_after
+
+    def predict_proba(self, X: pd.DataFrame) -> np.ndarray:
+        self.calls += 1
+        if self.fail_after is not None and self.calls > self.fail_after:
+            raise RuntimeError("fallo simulado")
+        best = (X["Weight"].to_numpy() // 50).astype(int) % len(CLASSES)
+        proba = np.full((len(X), len(CLASSES)), 0.1)
+        proba[np.arange(len(X)), best] = 0.8
+        return proba
+
+
+class FakeEncoder:
+    classes_ = CLASSES
+
+
+@pytest.fixture
+def fake_model(monkeypatch):
+    """Reemplaza el modelo de los procesos de jobs por uno simulado."""
+    model = FakeModel()
+    monkeypatch.setattr(jobs, "_job_model", {"model": model, "label_encoder": FakeEncoder()})
+    return model
+
+
+@pytest.fixture
+def dataset(tmp_path):
+    """CSV de 1000 filas con una columna extra que debe copiarse a los resultados."""
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame([EXAMPLE] * 1000)
+    df["Weight"] = rng.uniform(40, 160, len(df))
+    df["patient_id"] = np.arange(len(df)) + 5000
+    path = tmp_path / "input" / "data.csv"
+    path.parent.mkdir()
+    df.to_csv(path, index=False)
+    return df, path
+
+
+@pytest.fixture
+def manager(tmp_path, dataset):
+    """Gestor despachador con un pool de hilos (los tests no levantan procesos)."""
+    manager = JobManager(
+        jobs_dir=tmp_path / "jobs",
+        input_dir=tmp_path / "input",
+        chunk_rows=300,
+        executor=ThreadPoolExecutor(max_workers=1),
+        poll_seconds=0.02,
+    )
+    manager.start()
+    yield manager
+    manager.stop()
+
+
+def _read_results(data: bytes) -> pd.DataFrame:
+    return pd.read_csv(io.BytesIO(gzip.decompress(data)))
+
+
+def _wait(manager: JobManager, job_id: str, timeout: float = 10.0) -> dict:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = manager.get(job_id)
+        if job["status"] in jobs.FINAL_STATES:
+            return job
+        time.sleep(0.02)
+    raise TimeoutError(job_id)
+
+
+class TestRunJob:
+    """Tests para el procesamiento por chunks."""
+
+    def test_chunked_results_match_direct_prediction(self, manager, dataset, fake_model):
+        """Test que los resultados por chunks coinciden con predecir todo de una vez."""
+        df, _ = dataset
+        job = _wait(manager, manager.submit_reference("data.csv")["id"])
+
+        assert job["status"] == SUCCEEDED
+        assert job["chunks_completed"] == 4 and job["rows_processed"] == len(df)
+        assert fake_model.calls == 4
+
+        parts = manager.result_parts(job["id"])
+        result = _read_results(b"".join(p.read_bytes() for p in parts))
+        expected = CLASSES[FakeModel().predict_proba(df).argmax(axis=1)]
+        assert result["row"].tolist() == list(range(len(df)))
+        assert result["patient_id"].tolist() == df["patient_id"].tolist()
+        assert result["prediction"].tolist() == expected.tolist()
+        assert set(f"proba_{c}" for c in CLASSES) <= set(result.columns)
+
+    def test_resume_reuses_completed_chunks(self, manager, dataset, monkeypatch):
+        """Test que un job fallido se reanuda desde su último chunk completo."""
+        df, _ = dataset
+        failing = FakeModel(fail_after=2)
+        monkeypatch.setattr(jobs, "_job_model", {"model": failing, "label_encoder": FakeEncoder()})
+
+        job = _wait(manager, manager.submit_reference("data.csv")["id"])
+        assert job["status"] == FAILED and job["chunks_completed"] == 2
+        first_part = manager.jobs_dir / job["id"] / "results" / "part-00000.csv.gz"
+        written_at = first_part.stat().st_mtime_ns
+
+        failing.fail_after = None
+        job = _wait(manager, manager.resume(job["id"])["id"])
+
+        assert job["status"] == SUCCEEDED and job["rows_processed"] == len(df)
+        # Solo se puntuaron los 2 chunks que faltaban (más la llamada que falló)
+        assert failing.calls == 5
+        assert first_part.stat().st_mtime_ns == written_at
+        result = _read_results(b"".join(p.read_bytes() for p in manager.result_parts(job["id"])))
+        assert result["row"].tolist() == list(range(len(df)))
+
+    def test_cancel_stops_before_next_chunk(self, manager, dataset, monkeypatch):
+        """Test que un job cancelado no procesa más chunks y conserva los escritos."""
+        model = FakeModel()
+        predict_proba = model.predict_proba
+
+        def cancel_after_first_chunk(X):
+            # Cancelación pedida mientras se puntúa el primer chunk
+            for job in manager.list():
+                manager.cancel(job["id"])
+            return predict_proba(X)
+
+        model.predict_proba = cancel_after_first_chunk
+        monkeypatch.setattr(jobs, "_job_model", {"model": model, "label_encoder": FakeEncoder()})
+
+        job = _wait(manager, manager.submit_reference("data.csv")["id"])
+
+        assert job["status"] == CANCELLED and job["chunks_completed"] == 1
+        assert model.calls == 1
+        assert (manager.jobs_dir / job["id"] / "results" / "part-00000.csv.gz").exists()
+        # Un job cancelado no se vuelve a procesar sin reanudarlo
+        assert run_job(str(manager.jobs_dir / job["id"])) == CANCELLED
+
+
+class TestDispatcher:
+    """Tests para el despachador único de jobs."""
+
+    def test_stop_pauses_job_and_next_dispatcher_resumes_it(self, manager, tmp_path, monkeypatch):
+        """Test que solo un proceso despacha y que detenerlo pausa el job sin perder chunks."""
+        model = FakeModel()
+        predict_proba = model.predict_proba
+        started, release = threading.Event(), threading.Event()
+
+        def block_first_chunk(X):
+            if model.calls == 0:
+                started.set()
+                release.wait(5)
+            return predict_proba(X)
+
+        model.predict_proba = block_first_chunk
+        monkeypatch.setattr(jobs, "_job_model", {"model": model, "label_encoder": FakeEncoder()})
+        standby = JobManager(
+            jobs_dir=manager.jobs_dir,
+            input_dir=tmp_path / "input",
+            executor=ThreadPoolExecutor(max_workers=1),
+            poll_seconds=0.02,
+        )
+        standby.start()
+        try:
+            job_id = manager.submit_reference("data.csv")["id"]
+            assert started.wait(5)
+            assert manager.is_dispatcher and not standby.is_dispatcher
+
+            stopping = threading.Thread(target=manager.stop)
+            stopping.start()
+            while not manager._stop_path.exists():
+                time.sleep(0.01)
+            release.set()
+            stopping.join()
+
+            job = jobs.read_job(manager.jobs_dir / job_id)
+            assert job["status"] == QUEUED and job["chunks_completed"] == 1
+
+            job = _wait(standby, job_id)
+            assert standby.is_dispatcher
+            assert job["status"] == SUCCEEDED and job["chunks_completed"] == 4
+            assert model.calls == 4
+        finally:
+            standby.stop()
+
+    def test_failed_upload_leaves_no_job(self, manager, dataset, monkeypatch):
+        """Test que una subida demasiado grande o interrumpida no deja directorios huérfanos."""
+        _, path = dataset
+        data = gzip.compress(path.read_bytes())
+
+        async def body(fail: bool = False):
+            yield data[: len(data) // 2]
+            if fail:
+                raise ConnectionResetError("cliente desconectado")
+            yield data[len(data) // 2 :]
+
+        monkeypatch.setattr(jobs, "JOBS_MAX_UPLOAD_MB", path.stat().st_size / 1024 / 1024 / 2)
+        with pytest.raises(JobError) as error:
+            asyncio.run(manager.submit_upload(body(), "text/csv", "gzip"))
+        assert error.value.status_code == 413
+
+        monkeypatch.setattr(jobs, "JOBS_MAX_UPLOAD_MB", 2048)
+        with pytest.raises(ConnectionResetError):
+            asyncio.run(manager.submit_upload(body(fail=True), "text/csv", "gzip"))
+
+        assert not [p for p in manager.jobs_dir.iterdir() if p.is_dir()]
+
+
+class TestJobEndpoints:
+    """Tests de los endpoints /api/v1/jobs."""
+
+    @pytest.fixture
+    def client(self, manager, monkeypatch):
+        monkeypatch.setattr(routers, "job_manager", manager)
+        app = FastAPI()
+        app.include_router(routers.router, prefix="/api/v1")
+        return TestClient(app)
+
+    def test_upload_poll_and_download(self, client, manager, dataset, fake_model):
+        """Test del flujo completo: subir un CSV comprimido, consultar y descargar."""
+        df, path = dataset
+        response = client.post(
+            "/api/v1/jobs",
+            content=gzip.compress(path.read_bytes()),
+            headers={"Content-Type": "text/csv", "Content-Encoding": "gzip"},
+        )
+        assert response.status_code == 202
+        job_id = response.json()["id"]
+
+        _wait(manager, job_id)
+        status = client.get(f"/api/v1/jobs/{job_id}").json()
+        assert status["status"] == SUCCEEDED and status["rows_processed"] == len(df)
+
+        download = client.get(f"/api/v1/jobs/{job_id}/results")
+        assert download.headers["content-type"] == "application/gzip"
+        assert len(_read_results(download.content)) == len(df)
+        assert client.post(f"/api/v1/jobs/{job_id}/cancel").status_code == 409
+
+    def test_invalid_requests(self, client):
+        """Test de errores: formato no soportado, ruta fuera del directorio, job inexistente."""
+        assert client.post(
+            "/api/v1/jobs", content=b"x", headers={"Content-Type": "text/plain"}
+        ).status_code == 415
+        assert client.post("/api/v1/jobs", json={"input_path": "../../etc/passwd"}).status_code == 400
+        assert client.get("/api/v1/jobs/noexiste").status_code == 404
+        assert client.get("/api/v1/jobs/noexiste/results").status_code == 404
@@ -0,0 +1,94 @@
+"""
+Tests unitarios para el reporte de memoria y el artefacto slim.
+"""
+
+from pathlib import Path
+import tracemalloc
+
+import numpy as np
+import pytest
+
+from mlops_obesidad.inference.cache import LRUCache, deep_sizeof
+from mlops_obesidad.modeling.memory_audit import _compact_array
+from mlops_obesidad.monitoring.memory import heap_stats, memory_report
+
+
+class TestMemoryReport:
+    """Tests para el reporte de memoria del proceso y de las caches."""
+
+    def test_cache_bytes_grow_with_entries(self):
+        """Test que el tamaño estimado de la cache escala con el número de entradas."""
+        cache = LRUCache(maxsize=100)
+        proba = np.full((100, 7), 1 / 7)
+        for i in range(10):
+            cache.put(("row", i), ("Normal_Weight", proba[i], {"Normal_Weight": 1.0}))
+        small = cache.approx_nbytes()
+        for i in range(10, 100):
+            cache.put(("row", i), ("Normal_Weight", proba[i], {"Normal_Weight": 1.0}))
+
+        assert deep_sizeof(proba[0]) >= proba[0].nbytes
+        assert cache.approx_nbytes() == pytest.approx(10 * small, rel=0.05)
+        assert cache.stats(include_bytes=True)["approx_kb"] == cache.approx_nbytes() // 1024
+
+    def test_heap_details_only_when_tracing(self):
+        """Test que el detalle de tracemalloc solo aparece si está activo."""
+        was_tracing = tracemalloc.is_tracing()
+        tracemalloc.stop()
+        assert "traced_kb" not in heap_stats()
+
+        tracemalloc.start()
+        try:
+            stats = heap_stats(top=3)
+        finally:
+            if not was_tracing:
+                tracemalloc.stop()
+
+        assert stats["tracing"] is True
+        assert len(stats["top_files"]) <= 3
+        assert "model" in memory_report(top=0)
+
+    def test_memory_endpoint_requires_token(self, monkeypatch):
+        """Test que /admin/memory existe sin profiling y exige el token de admin."""
+        from fastapi.testclient import TestClient
+
+        from API.main import app
+
+        client = TestClient(app)
+        monkeypatch.setattr(app.state, "admin_token", None)
+        assert client.get("/api/v1/admin/memory", headers={"X-Admin-Token": ""}).status_code == 403
+
+        monkeypatch.setattr(app.state, "admin_token", "secreto")
+        assert client.get("/api/v1/admin/memory").status_code == 403
+        report = client.get("/api/v1/admin/memory?top=0", headers={"X-Admin-Token": "secreto"})
+        assert report.status_code == 200
+        assert "process" in report.json()
+
+
+class TestSlimArtifacts:
+    """Tests para la exportación slim del artefacto."""
+
+    def test_compact_array_only_when_exact(self):
+        """Test que los arrays solo cambian de dtype si los valores se conservan."""
+        assert _compact_array(np.array([0.5, 2.0, np.nan])).dtype == np.float32
+        assert _compact_array(np.array([1.7, 2.0])).dtype == np.float64
+        assert _compact_array(np.array([0, 5, 300])).dtype == np.int16
+        assert _compact_array(np.array(["a", "b"], dtype=object)).dtype == object
+
+    def test_slim_artifact_predicts_identically(self):
+        """Test que el artefacto slim da exactamente las mismas probabilidades."""
+        model_path = Path("models/xgboost_model_artifacts.pkl")
+        if not model_path.exists():
+            pytest.skip("Modelo no encontrado, saltando test")
+
+        from mlops_obesidad.inference import get_model
+        from mlops_obesidad.modeling.memory_audit import sample_features, slim_artifacts
+
+        artifacts = get_model()
+        slim, changes = slim_artifacts(artifacts)
+        X = sample_features(None, 5)
+
+        assert changes
+        assert "slim" in slim and "slim" not in artifacts
+        np.testing.assert_array_equal(
+            slim["model"].predict_proba(X), artifacts["model"].predict_proba(X)
+        )
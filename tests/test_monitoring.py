@@ -0,0 +1,112 @@
+"""
+Tests unitarios para el monitor de data drift.
+"""
+
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from mlops_obesidad.config import CATEGORICAL_FEATURES, NUMERIC_FEATURES
+from mlops_obesidad.monitoring.drift import DriftMonitor, NumericSketch
+from mlops_obesidad.monitoring.reference import build_reference_profile
+
+
+def _make_dataset(n=600, weight_shift=0.0, seed=0):
+    """Genera un dataset sintético con las 16 features en formato crudo."""
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'Gender': rng.choice(['Female', 'Male'], n),
+        'Age': rng.normal(24, 5, n),
+        'Height': rng.normal(1.70, 0.09, n),
+        'Weight': rng.normal(85, 20, n) + weight_shift,
+        'family_history_with_overweight': rng.choice(['yes', 'no'], n, p=[0.8, 0.2]),
+        'FAVC': rng.choice(['yes', 'no'], n, p=[0.9, 0.1]),
+        'FCVC': rng.uniform(1, 3, n),
+        'NCP': rng.uniform(1, 4, n),
+        'CAEC': rng.choice(['no', 'Sometimes', 'Frequently', 'Always'], n),
+        'SMOKE': rng.choice(['yes', 'no'], n, p=[0.05, 0.95]),
+        'CH2O': rng.uniform(1, 3, n),
+        'SCC': rng.choice(['yes', 'no'], n, p=[0.05, 0.95]),
+        'FAF': rng.uniform(0, 3, n),
+        'TUE': rng.uniform(0, 2, n),
+        'CALC': rng.choice(['no', 'Sometimes', 'Frequently'], n),
+        'MTRANS': rng.choice(['Public_Transportation', 'Automobile', 'Walking'], n),
+    })
+
+
+def _rows(df):
+    """Convierte un DataFrame en objetos con la forma de PredictionRequest."""
+    return [SimpleNamespace(**row) for row in df.to_dict(orient='records')]
+
+
+class TestReferenceProfile:
+    """Tests para la construcción del perfil de referencia."""
+
+    def test_profile_has_all_features(self):
+        """Test que el perfil incluye todas las features numéricas y categóricas."""
+        profile = build_reference_profile(_make_dataset())
+
+        assert set(profile['numeric']) == set(NUMERIC_FEATURES)
+        assert set(profile['categorical']) == set(CATEGORICAL_FEATURES)
+        for stats in profile['numeric'].values():
+            assert len(stats['counts']) == len(stats['edges']) + 1
+            assert sum(stats['counts']) == 600
+
+
+class TestNumericSketch:
+    """Tests para el sketch numérico."""
+
+    def test_update_and_quantile(self):
+        """Test que el sketch cuenta valores y aproxima cuantiles."""
+        sketch = NumericSketch(edges=[1.0, 2.0, 3.0])
+        for value in [0.5, 1.5, 1.5, 2.5, 3.5]:
+            sketch.update(value)
+
+        assert sketch.n == 5
+        assert sketch.counts == [1, 2, 1, 1]
+        assert 1.0 <= sketch.quantile(0.5) <= 2.0
+
+        sketch.reset()
+        assert sketch.n == 0
+        assert sketch.quantile(0.5) is None
+
+
+class TestDriftMonitor:
+    """Tests para el monitor de drift en línea."""
+
+    def test_compute_requires_min_samples(self):
+        """Test que no se calcula drift con una ventana pequeña."""
+        monitor = DriftMonitor(build_reference_profile(_make_dataset()), min_samples=50)
+        for row in _rows(_make_dataset(n=10, seed=1)):
+            monitor.observe(row)
+
+        assert monitor.compute() is None
+        assert monitor.window_size == 10
+
+    def test_no_drift_on_same_distribution(self):
+        """Test que tráfico con la misma distribución no marca drift en Weight."""
+        monitor = DriftMonitor(build_reference_profile(_make_dataset()), min_samples=50)
+        for row in _rows(_make_dataset(n=400, seed=2)):
+            monitor.observe(row)
+
+        report = monitor.compute()
+
+        assert report['window_size'] == 400
+        assert report['features']['Weight']['drift'] is False
+        assert monitor.window_size == 0  # la ventana se reinicia
+
+    def test_detects_shifted_feature(self):
+        """Test que un desplazamiento en Weight se detecta como drift."""
+        monitor = DriftMonitor(build_reference_profile(_make_dataset()), min_samples=50)
+        for row in _rows(_make_dataset(n=400, weight_shift=30.0, seed=3)):
+            monitor.observe(row)
+
+        report = monitor.compute(rotate=False)
+
+        assert report['drift_detected'] is True
+        assert 'Weight' in report['drifted_features']
+        assert report['features']['Weight']['p_value'] < 0.05
+        assert monitor.window_size == 400
+        assert monitor.status()['last_report'] is report
@@ -0,0 +1,134 @@
+"""
+Tests unitarios para las figuras generadas a partir de agregados.
+"""
+
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from mlops_obesidad.config import NUMERIC_FEATURES, TARGET
+from mlops_obesidad.utils.plots import (
+    accumulate,
+    build_edges,
+    empty_partial,
+    generate_figures,
+    merge_partials,
+    process_chunk,
+)
+
+CLASSES = ["Normal_Weight", "Obesity_Type_I", "Overweight_Level_I"]
+
+
+@pytest.fixture
+def dataset():
+    """Dataset sintético con etiquetas sucias y valores fuera de rango."""
+    rng = np.random.default_rng(0)
+    n = 500
+    df = pd.DataFrame(
+        {
+            "Gender": rng.choice(["Male", " Female ", "na"], n),
+            "Age": rng.uniform(14, 61, n),
+            "Height": rng.uniform(1.45, 1.98, n),
+            "Weight": rng.uniform(39, 173, n),
+            "FCVC": rng.uniform(1, 3, n),
+            TARGET: rng.choice(CLASSES, n),
+        }
+    )
+    df.loc[:9, "Weight"] = 400.0
+    df.loc[10:14, "Age"] = np.nan
+    df.loc[15:19, TARGET] = " Normal_Weight "
+    return df
+
+
+class TestAggregation:
+    """Tests para la reducción por chunks."""
+
+    def test_chunked_matches_direct_counts(self, dataset, tmp_path):
+        """Test que los agregados por chunks coinciden con los conteos de pandas."""
+        path = tmp_path / "data.csv"
+        dataset.to_csv(path, index=False)
+        edges = build_edges(20)
+
+        total = accumulate(path, edges, chunksize=64)
+        labels = dataset[TARGET].str.strip()
+
+        assert total["n_rows"] == len(dataset)
+        assert dict(total["labels"]) == labels.value_counts().to_dict()
+        gender = dataset["Gender"].str.strip()
+        assert dict(total["categorical"]["Gender"]) == gender[gender != "na"].value_counts().to_dict()
+
+        height = total["class_hist"]["Normal_Weight"][NUMERIC_FEATURES.index("Height")]
+        expected, _ = np.histogram(
+            dataset.loc[labels == "Normal_Weight", "Height"], edges["class"]["Height"]
+        )
+        np.testing.assert_array_equal(height[1:-1], expected)
+
+        # Los pesos fuera de la grilla no entran en la densidad 2D
+        assert sum(g.sum() for g in total["grid"].values()) == len(dataset) - 10
+
+    def test_merge_is_order_independent(self, dataset):
+        """Test que combinar los chunks en cualquier orden da el mismo resultado."""
+        edges = build_edges(10)
+        parts = [process_chunk(dataset.iloc[i : i + 100], edges) for i in range(0, 500, 100)]
+
+        forward, backward = empty_partial(), empty_partial()
+        for part in parts:
+            merge_partials(forward, part)
+        for part in reversed(parts):
+            merge_partials(backward, part)
+
+        assert forward["labels"] == backward["labels"]
+        for name in forward["class_hist"]:
+            np.testing.assert_array_equal(forward["class_hist"][name], backward["class_hist"][name])
+
+
+class TestGenerateFigures:
+    """Tests para la generación de figuras."""
+
+    def test_prediction_log_produces_all_figures(self, dataset, tmp_path):
+        """Test que el log de predicciones (JSONL) genera también confusión y calibración."""
+        log_path = tmp_path / "predictions.jsonl"
+        with open(log_path, "w", encoding="utf-8") as f:
+            for i, row in dataset.iterrows():
+                prediction = CLASSES[i % len(CLASSES)]
+                record = {
+                    "request": row.drop(TARGET).to_dict(),
+                    "prediction": prediction,
+                    "probabilities": {c: (0.8 if c == prediction else 0.1) for c in CLASSES},
+                    TARGET: row[TARGET],
+                }
+                f.write(json.dumps(record) + "\n")
+        reference_path = tmp_path / "reference.csv"
+        dataset.to_csv(reference_path, index=False)
+
+        summary = generate_figures(
+            log_path, tmp_path / "figures", reference_path=reference_path, chunksize=128, n_bins=20
+        )
+
+        assert set(summary["figures"]) >= {
+            "class_distribution",
+            "hist_Age_by_class",
+            "height_weight_density",
+            "confusion_matrix",
+            "calibration",
+            "drift_numeric",
+            "drift_categorical",
+        }
+        assert all(
+            (tmp_path / "figures" / f"{name}.png").stat().st_size > 0 for name in summary["figures"]
+        )
+        assert summary["rows"] == len(dataset)
+
+    def test_unlabeled_dataset_skips_model_figures(self, dataset, tmp_path):
+        """Test que sin etiquetas ni predicciones no se generan confusión ni calibración."""
+        path = tmp_path / "data.csv"
+        dataset.drop(columns=[TARGET]).to_csv(path, index=False)
+
+        summary = generate_figures(path, tmp_path / "figures", use_profile=False, n_bins=20)
+
+        assert "hist_Age_by_class" in summary["figures"]
+        assert "confusion_matrix" not in summary["figures"]
+        assert "calibration" not in summary["figures"]
+        assert "drift_numeric" not in summary["figures"]
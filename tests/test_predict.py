@@ -0,0 +1,182 @@
+"""
+Tests unitarios para el scoring por lotes incremental.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from API.schemas import PredictionRequest
+from mlops_obesidad.modeling import predict
+from mlops_obesidad.modeling.predict import load_predictions, row_hashes, score_incremental
+
+EXAMPLE = PredictionRequest.model_config["json_schema_extra"]["example"]
+CLASSES = np.array(["Normal_Weight", "Obesity_Type_I"])
+
+
+class FakeModel:
+    """Modelo simulado que cuenta las filas puntuadas; la clase depende del peso."""
+
+    def __init__(self):
+        self.rows = 0
+
+    def predict_proba(self, X: pd.DataFrame) -> np.ndarray:
+        self.rows += len(X)
+        heavy = (X["Weight"].to_numpy() > 100).astype(float)
+        return np.column_stack([1 - heavy * 0.9 - 0.05, heavy * 0.9 + 0.05])
+
+
+class FakeEncoder:
+    classes_ = CLASSES
+
+
+@pytest.fixture
+def model(monkeypatch):
+    """Reemplaza la carga del artefacto; `model.sha256` simula la versión del archivo."""
+    model = FakeModel()
+    model.sha256 = "a" * 64
+    monkeypatch.setattr(
+        predict,
+        "load_signed_artifacts",
+        lambda path: (
+            {"model": model, "label_encoder": FakeEncoder()},
+            {"sha256": model.sha256, "version": 1},
+        ),
+    )
+    return model
+
+
+def _history(n: int, start: int = 0) -> pd.DataFrame:
+    df = pd.DataFrame([EXAMPLE] * n)
+    df["patient_id"] = np.arange(start, start + n)
+    df["Weight"] = 50.0 + (df["patient_id"] % 100)
+    df["created_at"] = pd.date_range("2026-01-01", periods=n, freq="min").shift(start).astype(str)
+    return df
+
+
+class TestRowHashes:
+    """Tests para el fingerprint de las filas."""
+
+    def test_hash_ignores_inferred_types(self):
+        """Test que el hash no depende de si read_csv infirió int, float o texto."""
+        df = pd.DataFrame([EXAMPLE] * 3)
+        as_float = df.assign(Age=21.0, FCVC=2.0)
+        as_text = df.assign(Age="21", FCVC=" 2.0 ")
+
+        assert (row_hashes(as_float) == row_hashes(df.assign(Age=21, FCVC=2))).all()
+        assert (row_hashes(as_float) == row_hashes(as_text)).all()
+        assert row_hashes(df.assign(Weight=70.5))[0] != row_hashes(df.assign(Weight=70.6))[0]
+
+
+class TestScoreIncremental:
+    """Tests para las corridas incrementales."""
+
+    def test_hash_watermark_scores_only_new_and_changed_rows(self, model, tmp_path):
+        """Test que solo se puntúan filas nuevas o modificadas y la última predicción gana."""
+        path, store = tmp_path / "history.csv", tmp_path / "store"
+        _history(500).to_csv(path, index=False)
+        first = score_incremental(path, store, key_column="patient_id", chunksize=128)
+        assert first["full_rescore"] == "store nuevo" and model.rows == 500
+
+        history = pd.concat([_history(500), _history(40, start=500)], ignore_index=True)
+        history.loc[7, "Weight"] = 180.0
+        history.to_csv(path, index=False)
+        second = score_incremental(path, store, key_column="patient_id", chunksize=128)
+
+        assert second["full_rescore"] is None
+        assert second["rows_read"] == 540 and second["rows_scored"] == 41
+        predictions = load_predictions(store)
+        assert len(predictions) == 540
+        assert predictions.set_index("patient_id").loc[7, "prediction"] == "Obesity_Type_I"
+
+        assert score_incremental(path, store, key_column="patient_id")["rows_scored"] == 0
+
+    def test_key_reverting_to_previous_content_is_rescored(self, model, tmp_path):
+        """Test que con clave A -> B -> A vuelve a puntuar A y la predicción vigente es la de A."""
+        path, store = tmp_path / "history.csv", tmp_path / "store"
+        history = _history(50)
+        weights = [60.0, 180.0, 60.0]
+        for run, weight in enumerate(weights):
+            history.loc[3, "Weight"] = weight
+            history.to_csv(path, index=False)
+            report = score_incremental(path, store, key_column="patient_id", chunksize=16)
+            assert report["rows_scored"] == (50 if run == 0 else 1)
+            assert load_predictions(store).set_index("patient_id").loc[3, "prediction"] == (
+                "Obesity_Type_I" if weight > 100 else "Normal_Weight"
+            )
+
+        # Dentro de una misma corrida gana la última versión de cada clave
+        pd.concat([history, history.iloc[[3]].assign(Weight=180.0)]).to_csv(path, index=False)
+        assert score_incremental(path, store, key_column="patient_id", chunksize=16)["rows_scored"] == 1
+        assert score_incremental(path, store, key_column="patient_id", chunksize=16)["rows_scored"] == 0
+
+    def test_model_change_rescores_everything(self, model, tmp_path):
+        """Test que un artefacto distinto descarta el store y vuelve a puntuar todo."""
+        path, store = tmp_path / "history.csv", tmp_path / "store"
+        _history(300).to_csv(path, index=False)
+        score_incremental(path, store, key_column="patient_id")
+
+        model.sha256 = "b" * 64
+        report = score_incremental(path, store, key_column="patient_id")
+
+        assert report["full_rescore"].startswith("cambió el modelo")
+        assert report["rows_scored"] == 300
+        parts_dirs = [p for p in store.iterdir() if p.is_dir()]
+        assert [p.name for p in parts_dirs] == ["parts-00001"]
+        assert len(list(parts_dirs[0].glob("part-*.csv.gz"))) == 1
+
+    def test_interrupted_rescore_keeps_previous_store(self, model, tmp_path, monkeypatch):
+        """Test que una re-puntuación completa cortada a la mitad deja legible el store anterior."""
+        path, store = tmp_path / "history.csv", tmp_path / "store"
+        _history(300).to_csv(path, index=False)
+        score_incremental(path, store, key_column="patient_id", chunksize=100)
+        before = load_predictions(store)
+
+        predict_proba = model.predict_proba
+
+        def fail_on_second_chunk(X):
+            if model.rows >= 400:
+                raise RuntimeError("corte simulado")
+            return predict_proba(X)
+
+        model.sha256 = "b" * 64
+        monkeypatch.setattr(model, "predict_proba", fail_on_second_chunk)
+        with pytest.raises(RuntimeError):
+            score_incremental(path, store, key_column="patient_id", chunksize=100)
+        pd.testing.assert_frame_equal(load_predictions(store), before)
+
+        monkeypatch.setattr(model, "predict_proba", predict_proba)
+        report = score_incremental(path, store, key_column="patient_id", chunksize=100)
+        assert report["full_rescore"].startswith("cambió el modelo") and report["rows_scored"] == 300
+        assert [p.name for p in store.iterdir() if p.is_dir()] == ["parts-00001"]
+
+    def test_offset_watermark_reads_only_appended_lines(self, model, tmp_path):
+        """Test que el modo offset lee solo lo agregado y deja una línea incompleta para después."""
+        path, store = tmp_path / "history.csv", tmp_path / "store"
+        _history(200).to_csv(path, index=False)
+        with open(path, "a", encoding="utf-8") as f:
+            f.write("Female,21")
+        assert score_incremental(path, store, watermark="offset")["rows_scored"] == 200
+
+        _history(200).to_csv(path, index=False)
+        _history(30, start=200).to_csv(path, mode="a", header=False, index=False)
+        report = score_incremental(path, store, watermark="offset", key_column="patient_id")
+        assert report["full_rescore"] == "cambió la configuración del watermark"
+
+        _history(20, start=230).to_csv(path, mode="a", header=False, index=False)
+        report = score_incremental(path, store, watermark="offset", key_column="patient_id")
+        assert report["rows_read"] == 20 and report["rows_scored"] == 20
+        assert load_predictions(store)["patient_id"].tolist() == list(range(250))
+
+    def test_timestamp_watermark(self, model, tmp_path):
+        """Test que el modo timestamp puntúa solo filas posteriores al máximo ya visto."""
+        path, store = tmp_path / "history.csv", tmp_path / "store"
+        _history(100).to_csv(path, index=False)
+        kwargs = {"watermark": "timestamp", "timestamp_column": "created_at", "key_column": "patient_id"}
+        score_incremental(path, store, **kwargs)
+
+        pd.concat([_history(100), _history(10, start=100)]).to_csv(path, index=False)
+        report = score_incremental(path, store, **kwargs)
+
+        assert report["rows_scored"] == 10
+        assert predict.read_state(store)["max_timestamp"] == "2026-01-01T01:49:00"
@@ -0,0 +1,98 @@
+"""
+Tests unitarios para el profiling bajo demanda.
+"""
+
+from collections import Counter
+import time
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from API import profiling
+from API.profiling import ProfileStore, RequestProfiler, to_folded, to_pstats
+
+
+def _busy_inference(seconds: float) -> float:
+    end = time.perf_counter() + seconds
+    total = 0.0
+    while time.perf_counter() < end:
+        total += sum(range(100))
+    return total
+
+
+class TestSampledStats:
+    """Tests para la conversión de muestras a pstats y pilas colapsadas."""
+
+    def test_self_and_cumulative_times(self):
+        """Test que el tiempo propio es el del tope de la pila y el acumulado el de toda la pila."""
+        root, child, leaf = ("a.py", 1, "root"), ("a.py", 5, "child"), ("b.py", 3, "leaf")
+        samples = Counter({(root, child, leaf): 3, (root, child): 1})
+
+        stats = to_pstats(samples, interval=0.01)
+
+        assert stats[root][3] == 0.04 and stats[root][2] == 0.0
+        assert stats[child][2] == 0.01
+        assert stats[leaf][2] == stats[leaf][3] == 0.03
+        assert stats[leaf][4][child][0] == 3
+        assert to_folded(samples).splitlines()[0].endswith(" 3")
+
+
+class TestProfilingMiddleware:
+    """Tests del middleware y de los endpoints de administración."""
+
+    def _client(self, tmp_path, **kwargs):
+        app = FastAPI()
+        profiler = RequestProfiler(ProfileStore(tmp_path), token="secreto", interval=0.001, **kwargs)
+        profiling.install(app, profiler)
+
+        @app.post("/api/v1/predict")
+        async def predict():
+            await profiling.run_in_threadpool(_busy_inference, 0.05)
+            return {"ok": True}
+
+        return TestClient(app)
+
+    def test_header_profiles_request(self, tmp_path):
+        """Test que el header con el token perfila el request y el perfil se descarga."""
+        client = self._client(tmp_path)
+        admin = {"X-Admin-Token": "secreto"}
+
+        assert "X-Profile-Id" not in client.post("/api/v1/predict").headers
+        assert "X-Profile-Id" not in client.post(
+            "/api/v1/predict", headers={"X-Profile": "otro"}
+        ).headers
+        profile_id = client.post("/api/v1/predict", headers={"X-Profile": "secreto"}).headers[
+            "X-Profile-Id"
+        ]
+
+        assert client.get("/api/v1/admin/profiles").status_code == 403
+        profiles = client.get("/api/v1/admin/profiles", headers=admin).json()
+        assert [p["profile_id"] for p in profiles] == [profile_id]
+        assert profiles[0]["samples"] > 0
+
+        folded = client.get(
+            f"/api/v1/admin/profiles/{profile_id}?format=folded", headers=admin
+        ).text
+        assert "_busy_inference" in folded
+        assert "_busy_inference" in client.get(
+            f"/api/v1/admin/profiles/{profile_id}", headers=admin
+        ).text
+
+    def test_window_aggregates_requests(self, tmp_path):
+        """Test que una ventana agrega los próximos N requests en un solo perfil."""
+        client = self._client(tmp_path)
+        admin = {"X-Admin-Token": "secreto"}
+
+        client.post("/api/v1/admin/profiles/window?requests=2", headers=admin)
+        ids = {client.post("/api/v1/predict").headers.get("X-Profile-Id") for _ in range(3)}
+
+        profiles = client.get("/api/v1/admin/profiles", headers=admin).json()
+        assert len(profiles) == 1
+        assert len(profiles[0]["requests"]) == 2
+        assert ids == {profiles[0]["profile_id"], None}
+
+    def test_disabled_by_default(self, monkeypatch):
+        """Test que sin PROFILING_ENABLED no se crea el profiler."""
+        monkeypatch.delenv("PROFILING_ENABLED", raising=False)
+
+        assert profiling.profiler_from_env() is None
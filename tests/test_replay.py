@@ -0,0 +1,125 @@
+"""
+Tests unitarios para el replay offline de tráfico.
+"""
+
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from API.schemas import PredictionRequest
+from mlops_obesidad.modeling import replay
+from mlops_obesidad.modeling.replay import (
+    RECORDED,
+    accumulate,
+    build_report,
+    class_union,
+    model_names,
+    request_latency,
+)
+
+EXAMPLE = PredictionRequest.model_config["json_schema_extra"]["example"]
+
+
+class FakeModel:
+    """Modelo simulado: la clase depende de si el peso supera un umbral."""
+
+    def __init__(self, threshold: float, confidence: float = 0.9):
+        self.threshold = threshold
+        self.confidence = confidence
+        self.rows = 0
+
+    def predict_proba(self, X: pd.DataFrame) -> np.ndarray:
+        self.rows += len(X)
+        heavy = (X["Weight"].to_numpy(dtype=float) > self.threshold).astype(float)
+        high = heavy * self.confidence + (1 - heavy) * (1 - self.confidence)
+        return np.column_stack([1 - high, high])
+
+
+class FakeEncoder:
+    def __init__(self, classes):
+        self.classes_ = np.array(classes)
+
+
+@pytest.fixture
+def models(monkeypatch):
+    """Referencia y candidato que discrepan con pesos entre 90 y 100."""
+    models = [
+        ("reference", {"model": FakeModel(100), "label_encoder": FakeEncoder(["Normal_Weight", "Obesity_Type_I"])}),
+        ("candidate", {"model": FakeModel(90, 0.8), "label_encoder": FakeEncoder(["Normal_Weight", "Obesity_Type_I"])}),
+    ]
+    monkeypatch.setattr(replay, "_worker_models", models)
+    return models
+
+
+@pytest.fixture
+def traffic_log(tmp_path):
+    """Log JSONL con 20 pesos distintos repetidos y la predicción grabada."""
+    path = tmp_path / "predictions.jsonl"
+    weights = [60.0 + 5 * (i % 20) for i in range(400)]
+    with open(path, "w", encoding="utf-8") as f:
+        for i, weight in enumerate(weights):
+            recorded = "Obesity_Type_I" if weight > 100 else "Normal_Weight"
+            if i % 50 == 0:
+                recorded = None
+            f.write(json.dumps({"request": {**EXAMPLE, "Weight": weight}, "prediction": recorded}) + "\n")
+    return path, np.array(weights)
+
+
+class TestReplay:
+    """Tests para la comparación de modelos sobre el tráfico grabado."""
+
+    def test_agreement_deltas_and_confusion(self, models, traffic_log):
+        """Test que la matriz de acuerdo, la confusión y los deltas coinciden con lo esperado."""
+        path, weights = traffic_log
+        classes = class_union(models)
+        total = accumulate(path, chunksize=64, classes=classes, recorded=True, max_examples=3)
+        report = build_report(model_names(["a/reference.pkl", "b/candidate.pkl"]), classes, total, True)
+
+        disagree = ((weights > 90) & (weights <= 100)).mean()
+        assert report["rows"] == 400
+        # Cada chunk de 64 filas tiene a lo sumo 20 pesos distintos
+        assert report["unique_rows_scored"] <= 7 * 20
+        assert models[0][1]["model"].rows == report["unique_rows_scored"]
+
+        matrix = report["agreement_matrix"]
+        assert matrix["candidate"]["reference"] == pytest.approx(1 - disagree)
+        assert matrix[RECORDED]["reference"] == 1.0
+        assert report["models"][RECORDED]["rows_compared"] == 392
+
+        candidate = report["models"]["candidate"]
+        assert candidate["confusion_vs_reference"]["Normal_Weight"]["Obesity_Type_I"] == disagree * 400
+        assert candidate["confusion_vs_reference"]["Obesity_Type_I"]["Normal_Weight"] == 0
+        assert candidate["probability_delta"]["max_abs_per_row"]["max"] == pytest.approx(0.7)
+        assert report["models"]["reference"]["probability_delta"]["max_abs_per_row"]["p99"] == 0.0
+
+        assert len(report["disagreement_examples"]) == 3
+        example = report["disagreement_examples"][0]
+        assert 90 < example["request"]["Weight"] <= 100
+        assert example["predictions"] == {"reference": "Normal_Weight", "candidate": "Obesity_Type_I"}
+
+    def test_candidate_with_different_classes(self, models, traffic_log, monkeypatch):
+        """Test que un candidato con otras clases se compara sobre la unión de clases."""
+        path, _ = traffic_log
+        other = ("other", {"model": FakeModel(100), "label_encoder": FakeEncoder(["Normal_Weight", "Overweight_Level_I"])})
+        monkeypatch.setattr(replay, "_worker_models", [models[0], other])
+        classes = class_union(replay._worker_models)
+        assert classes == ["Normal_Weight", "Obesity_Type_I", "Overweight_Level_I"]
+
+        total = accumulate(path, chunksize=128, classes=classes, recorded=False)
+        report = build_report(["reference", "other"], classes, total, False)
+
+        heavy = report["models"]["reference"]["prediction_counts"]["Obesity_Type_I"]
+        assert report["models"]["other"]["prediction_counts"]["Overweight_Level_I"] == heavy
+        assert report["agreement_matrix"]["reference"]["other"] == pytest.approx(1 - heavy / 400)
+
+    def test_request_latency_measures_every_model(self, models):
+        """Test que la latencia individual se mide fila por fila para cada modelo."""
+        sample = pd.DataFrame([EXAMPLE] * 10)
+        latency = request_latency(models, sample)
+
+        assert set(latency) == {"reference", "candidate"}
+        assert latency["reference"]["p50"] <= latency["reference"]["max"]
+        # Una llamada de calentamiento más una por fila
+        assert models[1][1]["model"].rows == 11
@@ -0,0 +1,93 @@
+"""
+Tests unitarios para las curvas what-if (/predict/sensitivity).
+"""
+
+from pathlib import Path
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+import numpy as np
+from pydantic import ValidationError
+import pytest
+
+from API.routers import router
+from API.schemas import MAX_GRID_SIZE, PredictionRequest, SensitivityRequest
+
+EXAMPLE = PredictionRequest.model_config["json_schema_extra"]["example"]
+
+
+class TestSensitivityRequest:
+    """Tests para la validación de la grilla."""
+
+    def test_default_grids_follow_schema(self):
+        """Test que las grillas por defecto usan el rango o las categorías del schema."""
+        faf = SensitivityRequest(instance=EXAMPLE, feature="FAF", points=4).grid()
+        assert faf == [0.0, 1.0, 2.0, 3.0]
+
+        # Weight > 0: el rango abierto no incluye el 0
+        weight = SensitivityRequest(instance=EXAMPLE, feature="Weight", points=3).grid()
+        assert weight == [100.0, 200.0, 300.0]
+
+        caec = SensitivityRequest(instance=EXAMPLE, feature="CAEC").grid()
+        assert caec == ["no", "Sometimes", "Frequently", "Always"]
+
+    def test_invalid_grids_are_rejected(self):
+        """Test que se rechazan features desconocidas, valores no finitos o fuera de rango y grillas grandes."""
+        invalid = [
+            {"feature": "BMI"},
+            {"feature": "Weight", "start": 50, "stop": 400},
+            {"feature": "Weight", "values": [0.0, 70.0]},
+            {"feature": "Weight", "values": ["heavy"]},
+            {"feature": "CAEC", "values": ["Never"]},
+            {"feature": "CAEC", "start": 0, "stop": 1},
+            {"feature": "FAF", "points": MAX_GRID_SIZE + 1},
+            {"feature": "FAF", "values": [1.0] * (MAX_GRID_SIZE + 1)},
+            {"feature": "Weight", "values": [float("nan"), 70.0]},
+            {"feature": "Weight", "start": float("nan"), "stop": 100},
+            {"feature": "Age", "stop": float("nan")},
+            {"feature": "FAF", "start": float("-inf")},
+        ]
+        for kwargs in invalid:
+            with pytest.raises(ValidationError):
+                SensitivityRequest(instance=EXAMPLE, **kwargs)
+
+
+class TestSensitivityEndpoint:
+    """Tests del endpoint /api/v1/predict/sensitivity."""
+
+    @pytest.fixture
+    def client(self):
+        app = FastAPI()
+        app.include_router(router, prefix="/api/v1")
+        return TestClient(app)
+
+    def test_invalid_grid_returns_422(self, client):
+        """Test que una grilla fuera del schema se rechaza antes de llegar al modelo."""
+        response = client.post(
+            "/api/v1/predict/sensitivity",
+            json={"instance": EXAMPLE, "feature": "Age", "start": 10, "stop": 200},
+        )
+        assert response.status_code == 422
+
+    def test_curves_match_individual_predictions(self, client):
+        """Test que cada punto de la curva coincide con predecir ese individuo por separado."""
+        if not Path("models/xgboost_model_artifacts.pkl").exists():
+            pytest.skip("Modelo no encontrado, saltando test")
+
+        from mlops_obesidad.inference import load_model, predict_batch
+
+        load_model()
+        response = client.post(
+            "/api/v1/predict/sensitivity",
+            json={"instance": EXAMPLE, "feature": "Weight", "start": 50, "stop": 150, "points": 11},
+        )
+        assert response.status_code == 200
+        body = response.json()
+        assert body["grid"][0] == 50.0 and body["grid"][-1] == 150.0
+        assert body["baseline"] == EXAMPLE["Weight"]
+
+        requests = [PredictionRequest(**{**EXAMPLE, "Weight": w}) for w in body["grid"]]
+        for i, (label, proba, _) in enumerate(predict_batch(requests)):
+            curve = [body["probabilities"][name][i] for name in body["classes"]]
+            assert np.allclose(curve, proba, atol=1e-5)
+            assert body["predictions"][i] == label
@@ -0,0 +1,43 @@
+"""
+Tests para el servidor multi-worker de producción.
+"""
+
+from pathlib import Path
+
+import pytest
+
+
+class TestPreload:
+    """Tests para la precarga del modelo en el proceso maestro."""
+
+    def test_preload_warms_model_without_caching(self):
+        """Test que la precarga deja el modelo en un hilo y las caches vacías."""
+        if not Path("models/xgboost_model_artifacts.pkl").exists():
+            pytest.skip("Modelo no encontrado, saltando test")
+
+        from API.server import preload_model, set_model_threads
+        from mlops_obesidad.inference import get_model
+        from mlops_obesidad.inference.cache import cache_stats
+
+        preload_model(warmup_rows=8)
+
+        classifier = get_model()["model"].named_steps["classifier"]
+        assert classifier.get_params()["n_jobs"] == 1
+        assert all(stats["size"] == 0 for stats in cache_stats().values())
+
+        set_model_threads(2)
+        assert classifier.get_params()["n_jobs"] == 2
+        set_model_threads(1)
+
+    def test_worker_starts_without_preloaded_model(self, monkeypatch):
+        """Test que un worker sin modelo precargado arranca sin fijar hilos."""
+        from API import server
+        from mlops_obesidad import inference
+
+        monkeypatch.setattr(inference, "is_model_loaded", lambda: False)
+
+        def fail(n_threads):
+            raise AssertionError("no debería fijar hilos sin modelo")
+
+        monkeypatch.setattr(server, "set_model_threads", fail)
+        server._configure_worker(0, threads_per_worker=1, pin_cpus=False)
@@ -0,0 +1,108 @@
+"""
+Tests unitarios para el canal WebSocket de predicción.
+"""
+
+import asyncio
+from pathlib import Path
+
+import pytest
+
+from API.streaming import MicroBatcher, merge_fields, missing_fields
+
+EXAMPLE_FIELDS = {
+    "Gender": "Female", "Age": 21.0, "Height": 1.62, "Weight": 64.0,
+    "family_history_with_overweight": "yes", "FAVC": "no", "FCVC": 2.0, "NCP": 3.0,
+    "CAEC": "Sometimes", "SMOKE": "no", "CH2O": 2.0, "SCC": "no", "FAF": 0.0,
+    "TUE": 1.0, "CALC": "no", "MTRANS": "Public_Transportation",
+}
+
+
+class TestMergeFields:
+    """Tests para la acumulación de campos parciales."""
+
+    def test_partial_then_complete(self):
+        """Test que los campos se acumulan hasta formar un request completo."""
+        state = {}
+        request, errors = merge_fields(state, {"Gender": "Female", "Age": 21.0})
+
+        assert request is None and errors == []
+        assert "Age" not in missing_fields(state) and "Weight" in missing_fields(state)
+
+        request, errors = merge_fields(state, EXAMPLE_FIELDS)
+        assert errors == [] and request.Weight == 64.0
+
+    def test_invalid_field_keeps_state(self):
+        """Test que un valor inválido o un campo desconocido no modifican el estado."""
+        state = dict(EXAMPLE_FIELDS)
+
+        _, errors = merge_fields(state, {"Age": -5})
+        assert errors[0]["loc"] == ["Age"]
+        _, errors = merge_fields(state, {"Peso": 70})
+        assert errors[0]["type"] == "extra_forbidden"
+        assert state == EXAMPLE_FIELDS
+
+
+class TestMicroBatcher:
+    """Tests para el agrupamiento de predicciones concurrentes."""
+
+    def test_concurrent_requests_share_batch(self, monkeypatch):
+        """Test que requests concurrentes se evalúan en un solo lote y los cancelados se omiten."""
+        from API import streaming
+        from API.schemas import PredictionRequest
+
+        calls = []
+
+        def fake_predict_records(requests, compact):
+            calls.append(len(requests))
+            return [{"Weight": r.Weight} for r in requests]
+
+        monkeypatch.setattr(streaming, "predict_records", fake_predict_records)
+
+        async def scenario():
+            batcher = MicroBatcher(max_wait=0.01)
+            requests = [PredictionRequest(**{**EXAMPLE_FIELDS, "Weight": w}) for w in (60, 70, 80)]
+            tasks = [asyncio.create_task(batcher.predict(r)) for r in requests]
+            await asyncio.sleep(0)
+            tasks[1].cancel()
+            done = await asyncio.gather(*tasks, return_exceptions=True)
+            return batcher, done
+
+        batcher, done = asyncio.run(scenario())
+
+        assert calls == [2]
+        assert done[0] == {"Weight": 60.0} and done[2] == {"Weight": 80.0}
+        assert batcher.counters["cancelled"] == 1
+
+
+class TestStreamEndpoint:
+    """Tests del endpoint /api/v1/predict/stream."""
+
+    def test_partial_and_prediction(self):
+        """Test que el canal responde parciales, predicciones y errores sin cambiar el estado."""
+        if not Path("models/xgboost_model_artifacts.pkl").exists():
+            pytest.skip("Modelo no encontrado, saltando test")
+
+        from fastapi.testclient import TestClient
+
+        from API.main import app
+
+        with TestClient(app) as client:
+            with client.websocket_connect("/api/v1/predict/stream") as ws:
+                ws.send_json({"id": 1, "Gender": "Female"})
+                partial = ws.receive_json()
+                assert partial["type"] == "partial" and partial["id"] == 1
+                assert "Gender" not in partial["missing"]
+
+                ws.send_json({"id": 2, **EXAMPLE_FIELDS})
+                prediction = ws.receive_json()
+                assert prediction["type"] == "prediction" and prediction["id"] == 2
+                assert "prediction" in prediction["result"]
+
+                ws.send_json({"id": 3, "Height": 9})
+                assert ws.receive_json()["type"] == "error"
+
+                ws.send_json({"id": 4, "reset": True, "Age": 30})
+                assert len(ws.receive_json()["missing"]) == len(EXAMPLE_FIELDS) - 1
+
+            stats = client.get("/api/v1/monitoring/stream").json()
+            assert stats["predicted"] >= 1